@@ -1,51 +1,175 @@
 """A tool for executing Python code in a sandboxed environment."""
 
 import asyncio
+import contextlib
+import json
 import logging
 from typing import Any
 
+from fastmcp import Context
+
+from agent_tools_mcp.interpreter_pool import get_interpreter_pool
+from agent_tools_mcp.interpreter_sessions import get_session_manager
+from agent_tools_mcp.log_setup import shorten
+from agent_tools_mcp.settings import settings
+
 logger = logging.getLogger(__name__)
 
 
-async def python_interpreter(code: str, timeout: int = 60) -> dict[str, Any]:
+class OutputStreamer:
+    """Forwards interpreter output to the client as MCP progress notifications.
+
+    ``on_output`` is called from the thread running the code; chunks are handed to the event
+    loop, merged while a notification is in flight, and sent with ``ctx.report_progress``.
+    Each notification's message is a JSON object ``{"stream": ..., "text": ...}`` and its
+    progress value is the number of bytes streamed so far. Streaming stops after
+    ``max_bytes``; the final result still carries the head and tail of the output.
+    """
+
+    def __init__(self, ctx: Context, max_bytes: int = 0):
+        """Initialize the streamer.
+
+        Args:
+            ctx: Context of the running tool call
+            max_bytes: Bytes streamed before forwarding stops, 0 streams everything
+        """
+        self.ctx = ctx
+        self.max_bytes = max_bytes
+        self.sent_bytes = 0  # Output bytes forwarded, without the stop notice
+        self.notifications = 0
+        self.stopped = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[tuple[str, str] | None] = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def on_output(self, stream: str, text: str) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (stream, text))
+
+    async def __aenter__(self) -> "OutputStreamer":
+        self._task = asyncio.create_task(self._forward())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        # Chunks queued by the worker thread are scheduled before ``to_thread`` returns,
+        # so the sentinel lands after the last one.
+        self._queue.put_nowait(None)
+        await self._task
+
+    async def _forward(self) -> None:
+        done = False
+        while not done:
+            chunks = [await self._queue.get()]
+            while not self._queue.empty():
+                chunks.append(self._queue.get_nowait())
+            if chunks[-1] is None:
+                done = True
+                chunks.pop()
+            for stream in ("stdout", "stderr"):
+                text = "".join(chunk for name, chunk in chunks if name == stream)
+                if text:
+                    await self._send(stream, text)
+
+    async def _send(self, stream: str, text: str) -> None:
+        if self.stopped:
+            return
+        data = text.encode()
+        notice = ""
+        if self.max_bytes and self.sent_bytes + len(data) > self.max_bytes:
+            # Cut at the limit; a multi-byte character split there is dropped.
+            data = data[: self.max_bytes - self.sent_bytes]
+            text = data.decode(errors="ignore")
+            data = text.encode()
+            notice = "\n... [streaming stopped, output limit reached]"
+            self.stopped = True
+        self.sent_bytes += len(data)
+        self.notifications += 1
+        try:
+            await self.ctx.report_progress(
+                self.sent_bytes, message=json.dumps({"stream": stream, "text": text + notice})
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send interpreter output notification: {e}")
+
+
+async def python_interpreter(
+    code: str,
+    timeout: int = 60,
+    session_id: str | None = None,
+    stream: bool = False,
+    ctx: Context | None = None,
+) -> dict[str, Any]:
     """
     Executes a string of Python code and returns the output.
 
     Args:
         code: The Python code to execute.
-        timeout: The timeout in seconds for the code execution.
+        timeout: The timeout in seconds for the code execution, including any wait for a
+            free interpreter.
+        session_id: Optional session identifier. Calls with the same session id share
+            variables, imports and loaded data; without one each call starts fresh.
+        stream: Send output as progress notifications while the code runs.
 
     Returns:
         A dictionary containing the standard output, standard error, and return code.
+        Long output keeps only its head and tail; the dictionary then also contains
+        "truncated" and the full byte counts.
     """
-    logger.info(f"Executing Python code: {code}")
-    # need to replace single quotes with double quotes for the shell command
-    # Replace newlines with semicolons for single line execution
-    code = code.replace("'", '"')
+    logger.info(f"Executing Python code: {shorten(code, settings.log_max_field_chars)}")
     try:
-        process = await asyncio.create_subprocess_shell(
-            f"python -c '{code}'",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
-
-        result = {
-            "stdout": stdout.decode().strip(),
-            "stderr": stderr.decode().strip(),
-            "returncode": process.returncode,
-        }
-        logger.info(f"Execution result: {result}")
-        return result
-
-    except TimeoutError:
-        logger.warning(f"Code execution timed out after {timeout} seconds.")
-        return {
-            "stdout": "",
-            "stderr": f"TimeoutError: Code execution exceeded {timeout} seconds.",
-            "returncode": -1,
-        }
+        streamer = None
+        if stream and ctx is not None:
+            streamer = OutputStreamer(ctx, max_bytes=settings.interpreter_max_output_bytes)
+        async with streamer or contextlib.nullcontext():
+            on_output = streamer.on_output if streamer else None
+            if session_id:
+                result = await get_session_manager().execute(
+                    session_id, code, timeout, on_output=on_output
+                )
+            else:
+                # Code runs on a warm worker from the pool; it is sent over a pipe unmodified,
+                # so no shell quoting is involved.
+                result = await get_interpreter_pool().execute(code, timeout, on_output=on_output)
+
+        if result.timed_out:
+            logger.warning(f"Code execution timed out after {timeout} seconds.")
+        else:
+            logger.info(
+                f"Execution result: returncode={result.returncode}, "
+                f"stdout={len(result.stdout)} chars, stderr={len(result.stderr)} chars"
+            )
+        output = result.to_dict()
+        if session_id:
+            output["session_id"] = session_id
+        return output
+
     except Exception as e:
         logger.error(f"An error occurred during code execution: {e}")
         return {"stdout": "", "stderr": str(e), "returncode": 1}
+
+
+async def reset_interpreter_session(session_id: str) -> dict[str, Any]:
+    """
+    Clears all variables and imports of an interpreter session.
+
+    Args:
+        session_id: The session to reset.
+
+    Returns:
+        A dictionary with the session id and whether the session existed.
+    """
+    existed = await asyncio.to_thread(get_session_manager().reset, session_id)
+    return {"session_id": session_id, "reset": existed}
+
+
+async def close_interpreter_session(session_id: str) -> dict[str, Any]:
+    """
+    Closes an interpreter session and frees its memory.
+
+    Args:
+        session_id: The session to close.
+
+    Returns:
+        A dictionary with the session id and whether the session existed.
+    """
+    existed = await asyncio.to_thread(get_session_manager().close, session_id)
+    return {"session_id": session_id, "closed": existed}
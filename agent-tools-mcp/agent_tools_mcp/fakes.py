@@ -0,0 +1,79 @@
+"""Offline stand-in for the Brave Search client, for tests and benchmarks."""
+
+import asyncio
+import hashlib
+from types import SimpleNamespace
+from typing import Any
+
+
+class FakeBraveSearch:
+    """Deterministic stand-in for ``brave_search_python_client.BraveSearch``.
+
+    Responses have the attributes the search tools read, are derived from the query so the
+    same request always returns the same results, and are delayed by ``latency`` seconds to
+    mimic a network round trip. Every request is recorded in ``requests``, and
+    ``peak_in_flight`` is the most requests that were running at the same time.
+    """
+
+    def __init__(self, latency: float = 0.0, description_chars: int = 200):
+        """Initialize the fake client.
+
+        Args:
+            latency: Seconds each request takes
+            description_chars: Length of each result's description, to control payload size
+        """
+        self.latency = latency
+        self.description_chars = description_chars
+        self.requests: list[tuple[str, Any]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _description(self, query: str, index: int) -> str:
+        seed = hashlib.sha1(f"{query}:{index}".encode()).hexdigest()
+        text = f"Result {index} for {query}. {seed} "
+        return (text * (self.description_chars // len(text) + 1))[: self.description_chars]
+
+    async def _respond(self, kind: str, request: Any) -> list[SimpleNamespace]:
+        self.requests.append((kind, request))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        count = request.count or 10
+        # Brave counts the offset in pages of ``count`` results.
+        first = (getattr(request, "offset", None) or 0) * count
+        return [
+            SimpleNamespace(
+                title=f"{request.q} ({kind} {i})",
+                url=f"https://example.com/{kind}/{i}?q={request.q.replace(' ', '+')}",
+                description=self._description(request.q, i),
+                age=f"{i + 1} hours ago",
+                language="en",
+                source="example.com",
+                breaking=i == 0,
+                thumbnail=SimpleNamespace(src=f"https://example.com/thumb/{i}.jpg"),
+                properties=SimpleNamespace(
+                    url=f"https://example.com/image/{i}.jpg",
+                    placeholder=f"https://example.com/placeholder/{i}.jpg",
+                ),
+                video=SimpleNamespace(
+                    duration="03:14", views=1000 * (i + 1), creator="fake", publisher="Example"
+                ),
+            )
+            for i in range(first, first + count)
+        ]
+
+    async def web(self, request: Any) -> SimpleNamespace:
+        return SimpleNamespace(web=SimpleNamespace(results=await self._respond("web", request)))
+
+    async def images(self, request: Any) -> SimpleNamespace:
+        return SimpleNamespace(results=await self._respond("images", request))
+
+    async def videos(self, request: Any) -> SimpleNamespace:
+        return SimpleNamespace(results=await self._respond("videos", request))
+
+    async def news(self, request: Any) -> SimpleNamespace:
+        return SimpleNamespace(results=await self._respond("news", request))
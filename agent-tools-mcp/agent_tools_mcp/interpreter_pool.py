@@ -0,0 +1,505 @@
+"""Pool of warm Python worker processes for the code interpreter tool."""
+
+import asyncio
+import atexit
+import codecs
+import contextlib
+import json
+import logging
+import os
+import selectors
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from agent_tools_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interpreter_worker.py")
+READ_SIZE = 65536
+
+# Called from the executing thread with the stream name ("stdout" or "stderr") and a chunk of
+# decoded output as soon as the worker writes it.
+OutputCallback = Callable[[str, str], None]
+
+
+class WorkerError(RuntimeError):
+    """Raised when a worker cannot be started or stops responding."""
+
+
+@dataclass
+class ExecutionResult:
+    """Outcome of running code in a worker."""
+
+    stdout: str
+    stderr: str
+    returncode: int
+    timed_out: bool = False
+    crashed: bool = False
+    stdout_bytes: int = 0
+    stderr_bytes: int = 0
+    truncated: bool = False
+
+    def to_dict(self) -> dict[str, Any]:
+        result = {"stdout": self.stdout, "stderr": self.stderr, "returncode": self.returncode}
+        if self.truncated:
+            result.update(
+                truncated=True, stdout_bytes=self.stdout_bytes, stderr_bytes=self.stderr_bytes
+            )
+        return result
+
+
+class OutputBuffer:
+    """Keeps the first and last bytes of a stream and counts everything written.
+
+    With a limit of N bytes, at most N/2 bytes from the start and N/2 bytes from the end are
+    retained, so a runaway ``print`` cannot grow server memory without bound.
+    """
+
+    def __init__(self, limit: int = 0):
+        """Initialize the buffer.
+
+        Args:
+            limit: Maximum retained bytes, 0 keeps everything
+        """
+        self.head_limit = (limit + 1) // 2 if limit else 0
+        self.tail_limit = limit // 2
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total = 0
+        self.limit = limit
+
+    def extend(self, data: bytes) -> None:
+        self.total += len(data)
+        if not self.limit:
+            self.head.extend(data)
+            return
+        room = self.head_limit - len(self.head)
+        if room > 0:
+            self.head.extend(data[:room])
+            data = data[room:]
+        if data:
+            self.tail.extend(data[-self.tail_limit :] if self.tail_limit else b"")
+            del self.tail[: max(0, len(self.tail) - self.tail_limit)]
+
+    @property
+    def truncated(self) -> bool:
+        return self.total > len(self.head) + len(self.tail)
+
+    def text(self) -> str:
+        if not self.truncated:
+            return (self.head + self.tail).decode(errors="replace").strip()
+        omitted = self.total - len(self.head) - len(self.tail)
+        return (
+            f"{self.head.decode(errors='replace')}\n"
+            f"... [{omitted} bytes truncated] ...\n"
+            f"{self.tail.decode(errors='replace')}"
+        ).strip()
+
+
+class _Stream:
+    """One output pipe of a worker: a bounded buffer plus optional live forwarding."""
+
+    def __init__(self, name: str, limit: int, on_output: OutputCallback | None):
+        self.name = name
+        self.buffer = OutputBuffer(limit)
+        self.on_output = on_output
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def write(self, data: bytes) -> None:
+        self.buffer.extend(data)
+        if self.on_output is not None and (text := self._decoder.decode(data)):
+            self.on_output(self.name, text)
+
+
+class InterpreterWorker:
+    """A single pre-started interpreter process.
+
+    Code is sent over a request pipe; the worker's stdout and stderr are pipes read by
+    the parent while the code runs, and a reply pipe carries the exit status. All methods
+    are blocking and are meant to run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        preload: str = "",
+        memory_mb: int = 0,
+        persistent: bool = False,
+        startup_timeout: float = 10.0,
+    ):
+        """Start the worker process and wait until its preload imports are done.
+
+        Args:
+            preload: Comma-separated modules imported once at startup
+            memory_mb: Address-space limit of the process in MiB, 0 disables
+            persistent: Keep the namespace between executions
+            startup_timeout: Seconds to wait for the worker to become ready
+        """
+        request_read, request_write = os.pipe()
+        reply_read, reply_write = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                [
+                    sys.executable,
+                    WORKER_SCRIPT,
+                    "--request-fd",
+                    str(request_read),
+                    "--reply-fd",
+                    str(reply_write),
+                    "--preload",
+                    preload,
+                    "--memory-mb",
+                    str(memory_mb),
+                    *(["--persistent"] if persistent else []),
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                pass_fds=(request_read, reply_write),
+            )
+        finally:
+            os.close(request_read)
+            os.close(reply_write)
+        self._requests = os.fdopen(request_write, "w", encoding="utf-8", buffering=1)
+        self._reply_fd = reply_read
+        self._reply_buffer = b""
+        self.runs = 0
+
+        ready = self._read_reply(time.monotonic() + startup_timeout)
+        if ready is None or not ready.get("ready"):
+            self.kill()
+            raise WorkerError("Interpreter worker failed to start")
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_reply(self, deadline: float) -> dict[str, Any] | None:
+        """Block until a full reply line arrives, the deadline passes or the worker dies."""
+        while b"\n" not in self._reply_buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            with selectors.DefaultSelector() as selector:
+                selector.register(self._reply_fd, selectors.EVENT_READ)
+                if not selector.select(remaining):
+                    return None
+            data = os.read(self._reply_fd, READ_SIZE)
+            if not data:
+                return None
+            self._reply_buffer += data
+        line, self._reply_buffer = self._reply_buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def run(
+        self,
+        code: str,
+        timeout: float,
+        cpu_seconds: float = 0,
+        reset: bool = False,
+        max_output_bytes: int = 0,
+        on_output: OutputCallback | None = None,
+        deadline: float | None = None,
+    ) -> ExecutionResult:
+        """Execute code and collect its output.
+
+        Args:
+            code: Python source to execute
+            timeout: Wall-clock limit in seconds; the worker is killed when it is exceeded
+            cpu_seconds: CPU-time limit in seconds, 0 disables
+            reset: Start from an empty namespace (persistent workers only)
+            max_output_bytes: Bytes retained per stream (head and tail), 0 keeps everything
+            on_output: Called with each chunk of output while the code runs
+            deadline: ``time.monotonic()`` value the run must end by, when time already
+                passed before the run (e.g. waiting for a worker) counts against ``timeout``
+
+        Returns:
+            Execution result
+        """
+        self.runs += 1
+        request = {"code": code, "cpu_seconds": cpu_seconds, "reset": reset}
+        self._requests.write(json.dumps(request) + "\n")
+
+        streams = {
+            self.process.stdout.fileno(): _Stream("stdout", max_output_bytes, on_output),
+            self.process.stderr.fileno(): _Stream("stderr", max_output_bytes, on_output),
+        }
+        if deadline is None:
+            deadline = time.monotonic() + timeout
+        reply = None
+
+        with selectors.DefaultSelector() as selector:
+            for fd in (*streams, self._reply_fd):
+                selector.register(fd, selectors.EVENT_READ)
+            while reply is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.kill()
+                    return self._result(
+                        streams,
+                        returncode=-1,
+                        stderr=f"TimeoutError: Code execution exceeded {timeout} seconds.",
+                        timed_out=True,
+                    )
+                for key, _ in selector.select(remaining):
+                    data = os.read(key.fd, READ_SIZE)
+                    if key.fd == self._reply_fd:
+                        if not data:
+                            self.process.wait()
+                            self._drain(selector, streams)
+                            return self._crashed(streams)
+                        self._reply_buffer += data
+                        if b"\n" in self._reply_buffer:
+                            reply = self._read_reply(deadline)
+                    elif data:
+                        streams[key.fd].write(data)
+                    else:
+                        selector.unregister(key.fd)
+
+            # The worker flushes before replying, so whatever it printed is already buffered
+            # in the pipes; drain it without waiting.
+            self._drain(selector, streams)
+
+        return self._result(streams, returncode=reply["returncode"])
+
+    @staticmethod
+    def _drain(selector: selectors.BaseSelector, streams: dict[int, "_Stream"]) -> None:
+        """Read output that is already buffered in the pipes without blocking."""
+        while ready := selector.select(0):
+            drained = False
+            for key, _ in ready:
+                if key.fd in streams and (data := os.read(key.fd, READ_SIZE)):
+                    streams[key.fd].write(data)
+                    drained = True
+            if not drained:
+                break
+
+    @staticmethod
+    def _result(
+        streams: dict[int, "_Stream"], returncode: int, stderr: str | None = None, **flags: bool
+    ) -> ExecutionResult:
+        stdout_stream, stderr_stream = streams.values()
+        return ExecutionResult(
+            stdout=stdout_stream.buffer.text(),
+            stderr=stderr_stream.buffer.text() if stderr is None else stderr,
+            returncode=returncode,
+            stdout_bytes=stdout_stream.buffer.total,
+            stderr_bytes=stderr_stream.buffer.total,
+            truncated=stdout_stream.buffer.truncated or stderr_stream.buffer.truncated,
+            **flags,
+        )
+
+    def _crashed(self, streams: dict[int, "_Stream"]) -> ExecutionResult:
+        returncode = self.process.wait()
+        message = list(streams.values())[1].buffer.text()
+        if returncode == -signal.SIGXCPU:
+            message = f"{message}\nCPU time limit exceeded".strip()
+        elif returncode < 0:
+            message = f"{message}\nWorker killed by signal {-returncode}".strip()
+        return self._result(streams, returncode=returncode or 1, stderr=message, crashed=True)
+
+    def kill(self) -> None:
+        """Terminate the worker process and release its pipes."""
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        for stream in (self._requests, self.process.stdout, self.process.stderr):
+            with contextlib.suppress(OSError, ValueError):
+                stream.close()
+        with contextlib.suppress(OSError):
+            os.close(self._reply_fd)
+
+
+class InterpreterPool:
+    """Fixed-size pool of warm interpreter workers.
+
+    Each execution borrows an idle worker, so code runs without paying for a shell, an
+    interpreter startup or the preload imports. Workers are recycled after ``max_runs``
+    executions, after a crash or CPU-limit kill, and after a timeout; replacements are
+    started in the background so the pool stays warm.
+    """
+
+    def __init__(
+        self,
+        size: int | None = None,
+        max_runs: int | None = None,
+        cpu_seconds: float | None = None,
+        memory_mb: int | None = None,
+        preload: str | None = None,
+    ):
+        """Initialize the pool. Workers are started lazily, or eagerly via ``start``.
+
+        Args:
+            size: Maximum number of workers (defaults to settings)
+            max_runs: Executions before a worker is replaced (defaults to settings)
+            cpu_seconds: CPU-time limit per execution, 0 disables (defaults to settings)
+            memory_mb: Memory limit per worker in MiB, 0 disables (defaults to settings)
+            preload: Comma-separated modules to import in each worker (defaults to settings)
+        """
+        self.size = size or settings.interpreter_pool_size
+        self.max_runs = max_runs or settings.interpreter_max_runs_per_worker
+        self.cpu_seconds = settings.interpreter_cpu_seconds if cpu_seconds is None else cpu_seconds
+        self.memory_mb = settings.interpreter_memory_mb if memory_mb is None else memory_mb
+        self.preload = settings.interpreter_preload_modules if preload is None else preload
+        self.max_output_bytes = settings.interpreter_max_output_bytes
+
+        self._idle: list[InterpreterWorker] = []
+        self._workers = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.executions = 0
+        self.recycled = 0
+
+    def _spawn(self) -> InterpreterWorker:
+        return InterpreterWorker(preload=self.preload, memory_mb=self.memory_mb)
+
+    def start(self) -> None:
+        """Start all workers up front so the first executions are warm."""
+        with self._condition:
+            missing = self.size - self._workers
+            self._workers += missing
+        for _ in range(missing):
+            self._add_idle(self._spawn_or_none())
+
+    def _spawn_or_none(self) -> InterpreterWorker | None:
+        try:
+            return self._spawn()
+        except (OSError, WorkerError) as e:
+            logger.error(f"Failed to start interpreter worker: {e}")
+            return None
+
+    def _add_idle(self, worker: InterpreterWorker | None) -> None:
+        with self._condition:
+            if worker is None:
+                self._workers -= 1
+            elif self._closed:
+                self._workers -= 1
+                worker.kill()
+            else:
+                self._idle.append(worker)
+            self._condition.notify()
+
+    def _acquire(self, deadline: float) -> InterpreterWorker | None:
+        """Borrow an idle worker, or start one; None when ``deadline`` passes first."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise WorkerError("Interpreter pool is shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if self._workers < self.size:
+                    self._workers += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+        try:
+            return self._spawn()
+        except BaseException:
+            with self._condition:
+                self._workers -= 1
+                self._condition.notify()
+            raise
+
+    def _release(self, worker: InterpreterWorker, healthy: bool) -> None:
+        if healthy and worker.runs < self.max_runs and worker.is_alive():
+            self._add_idle(worker)
+            return
+
+        worker.kill()
+        with self._condition:
+            self.recycled += 1
+            if self._closed:
+                self._workers -= 1
+                self._condition.notify()
+                return
+        # Keep the slot reserved while a replacement warms up in the background.
+        threading.Thread(target=lambda: self._add_idle(self._spawn_or_none()), daemon=True).start()
+
+    def run(
+        self, code: str, timeout: float, on_output: OutputCallback | None = None
+    ) -> ExecutionResult:
+        """Execute code on a pooled worker, blocking until it finishes.
+
+        Args:
+            code: Python source to execute
+            timeout: Wall-clock limit in seconds, including the wait for a free worker
+            on_output: Called with each chunk of output while the code runs
+
+        Returns:
+            Execution result; timed out when no worker was free in time
+        """
+        deadline = time.monotonic() + timeout
+        worker = self._acquire(deadline)
+        if worker is None:
+            return ExecutionResult(
+                stdout="",
+                stderr=f"TimeoutError: Code execution exceeded {timeout} seconds.",
+                returncode=-1,
+                timed_out=True,
+            )
+        healthy = False
+        try:
+            result = worker.run(
+                code,
+                timeout,
+                cpu_seconds=self.cpu_seconds,
+                max_output_bytes=self.max_output_bytes,
+                on_output=on_output,
+                deadline=deadline,
+            )
+            healthy = not (result.timed_out or result.crashed)
+            self.executions += 1
+            return result
+        finally:
+            self._release(worker, healthy)
+
+    async def execute(
+        self, code: str, timeout: float, on_output: OutputCallback | None = None
+    ) -> ExecutionResult:
+        """Execute code on a pooled worker without blocking the event loop."""
+        return await asyncio.to_thread(self.run, code, timeout, on_output)
+
+    def shutdown(self) -> None:
+        """Kill all idle workers and refuse new executions."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._workers -= len(idle)
+            self._condition.notify_all()
+        for worker in idle:
+            worker.kill()
+
+    def stats(self) -> dict[str, int]:
+        """Get pool counters."""
+        with self._condition:
+            return {
+                "workers": self._workers,
+                "idle": len(self._idle),
+                "executions": self.executions,
+                "recycled": self.recycled,
+            }
+
+
+_pool: InterpreterPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_interpreter_pool() -> InterpreterPool:
+    """Get the shared interpreter pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = InterpreterPool()
+            atexit.register(_pool.shutdown)
+        return _pool
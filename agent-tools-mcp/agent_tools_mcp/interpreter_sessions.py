@@ -0,0 +1,234 @@
+"""Stateful interpreter sessions whose namespace survives between tool calls."""
+
+import asyncio
+import atexit
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from agent_tools_mcp.interpreter_pool import ExecutionResult, InterpreterWorker, OutputCallback
+from agent_tools_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InterpreterSession:
+    """A dedicated persistent worker and its bookkeeping."""
+
+    session_id: str
+    worker: InterpreterWorker
+    last_used: float
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    executions: int = 0
+
+
+class InterpreterSessionManager:
+    """Keeps one persistent worker per session id.
+
+    Each session owns a worker started with ``--persistent``, so variables, imports and
+    loaded data stay in memory between calls. Sessions are closed after
+    ``idle_seconds`` without use, the least recently used session is closed when
+    ``max_sessions`` is reached, and a session whose worker times out or crashes is dropped
+    so the next call starts from a clean namespace.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int | None = None,
+        idle_seconds: float | None = None,
+        memory_mb: int | None = None,
+        cpu_seconds: float | None = None,
+        preload: str | None = None,
+        clock=time.monotonic,
+    ):
+        """Initialize the manager.
+
+        Args:
+            max_sessions: Maximum number of live sessions (defaults to settings)
+            idle_seconds: Idle time before a session is closed (defaults to settings)
+            memory_mb: Memory limit per session in MiB, 0 disables (defaults to settings)
+            cpu_seconds: CPU-time limit per execution, 0 disables (defaults to settings)
+            preload: Comma-separated modules imported by each session (defaults to settings)
+            clock: Monotonic clock, overridable for tests
+        """
+        self.max_sessions = max_sessions or settings.interpreter_max_sessions
+        self.idle_seconds = (
+            settings.interpreter_session_idle_seconds if idle_seconds is None else idle_seconds
+        )
+        self.memory_mb = settings.interpreter_session_memory_mb if memory_mb is None else memory_mb
+        self.cpu_seconds = settings.interpreter_cpu_seconds if cpu_seconds is None else cpu_seconds
+        self.preload = settings.interpreter_preload_modules if preload is None else preload
+        self.max_output_bytes = settings.interpreter_max_output_bytes
+        self.clock = clock
+
+        self._sessions: dict[str, InterpreterSession] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: threading.Thread | None = None
+        self.evicted = 0
+
+    def _start_reaper(self) -> None:
+        if self._reaper is None and self.idle_seconds:
+            self._reaper = threading.Thread(target=self._reap, daemon=True)
+            self._reaper.start()
+
+    def _reap(self) -> None:
+        interval = max(1.0, min(self.idle_seconds / 4, 60.0))
+        while not self._stop.wait(interval):
+            self.evict_idle()
+
+    def evict_idle(self) -> list[str]:
+        """Close sessions that have not been used for ``idle_seconds``.
+
+        Returns:
+            Ids of the closed sessions
+        """
+        now = self.clock()
+        with self._lock:
+            expired = [
+                session
+                for session in self._sessions.values()
+                if now - session.last_used >= self.idle_seconds and not session.lock.locked()
+            ]
+            for session in expired:
+                del self._sessions[session.session_id]
+        for session in expired:
+            logger.info(f"Closing idle interpreter session {session.session_id}")
+            session.worker.kill()
+        self.evicted += len(expired)
+        return [session.session_id for session in expired]
+
+    def _get_or_create(self, session_id: str) -> InterpreterSession:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_used = self.clock()
+                return session
+
+            victim = None
+            if len(self._sessions) >= self.max_sessions:
+                idle = [s for s in self._sessions.values() if not s.lock.locked()]
+                if not idle:
+                    raise RuntimeError(
+                        f"Too many interpreter sessions ({self.max_sessions}) are busy"
+                    )
+                victim = min(idle, key=lambda s: s.last_used)
+                del self._sessions[victim.session_id]
+                self.evicted += 1
+
+        if victim is not None:
+            logger.info(f"Evicting least recently used interpreter session {victim.session_id}")
+            victim.worker.kill()
+
+        worker = InterpreterWorker(preload=self.preload, memory_mb=self.memory_mb, persistent=True)
+        session = InterpreterSession(session_id, worker, last_used=self.clock())
+        with self._lock:
+            existing = self._sessions.setdefault(session_id, session)
+        if existing is not session:
+            # Another caller created the same session first.
+            worker.kill()
+        self._start_reaper()
+        return existing
+
+    def run(
+        self,
+        session_id: str,
+        code: str,
+        timeout: float,
+        on_output: OutputCallback | None = None,
+    ) -> ExecutionResult:
+        """Execute code in a session, creating the session on first use.
+
+        Args:
+            session_id: Session identifier chosen by the caller
+            code: Python source to execute
+            timeout: Wall-clock limit in seconds
+            on_output: Called with each chunk of output while the code runs
+
+        Returns:
+            Execution result
+        """
+        self.evict_idle()
+        session = self._get_or_create(session_id)
+        with session.lock:
+            result = session.worker.run(
+                code,
+                timeout,
+                cpu_seconds=self.cpu_seconds,
+                max_output_bytes=self.max_output_bytes,
+                on_output=on_output,
+            )
+            session.executions += 1
+            session.last_used = self.clock()
+
+        if result.timed_out or result.crashed:
+            self.close(session_id)
+            result.stderr = f"{result.stderr}\nInterpreter session state was lost.".strip()
+        return result
+
+    async def execute(
+        self,
+        session_id: str,
+        code: str,
+        timeout: float,
+        on_output: OutputCallback | None = None,
+    ) -> ExecutionResult:
+        """Execute code in a session without blocking the event loop."""
+        return await asyncio.to_thread(self.run, session_id, code, timeout, on_output)
+
+    def reset(self, session_id: str) -> bool:
+        """Clear a session's namespace while keeping its worker.
+
+        Returns:
+            Whether the session existed
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            return False
+        with session.lock:
+            session.worker.run("", timeout=10, reset=True)
+            session.last_used = self.clock()
+        return True
+
+    def close(self, session_id: str) -> bool:
+        """Close a session and stop its worker.
+
+        Returns:
+            Whether the session existed
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.worker.kill()
+        return True
+
+    def sessions(self) -> list[str]:
+        """Ids of the live sessions."""
+        with self._lock:
+            return list(self._sessions)
+
+    def shutdown(self) -> None:
+        """Close every session and stop the idle reaper."""
+        self._stop.set()
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.worker.kill()
+
+
+_manager: InterpreterSessionManager | None = None
+_manager_lock = threading.Lock()
+
+
+def get_session_manager() -> InterpreterSessionManager:
+    """Get the shared interpreter session manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = InterpreterSessionManager()
+            atexit.register(_manager.shutdown)
+        return _manager
@@ -0,0 +1,114 @@
+"""Long-lived Python worker process used by the interpreter pool.
+
+The worker is started by ``agent_tools_mcp.interpreter_pool`` as a standalone script. It
+imports the preload modules once, then reads one JSON request per line from the request
+pipe, executes the submitted code with its stdout and stderr going straight to the parent,
+and answers with one JSON line on the reply pipe. With ``--persistent`` the namespace is kept
+between requests until a request asks for a reset. It must not import anything from
+``agent_tools_mcp`` so that startup stays cheap.
+"""
+
+import argparse
+import builtins
+import contextlib
+import importlib
+import json
+import math
+import os
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+def _apply_memory_limit(memory_mb: int) -> None:
+    if resource is None or memory_mb <= 0:
+        return
+    limit = memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _apply_cpu_limit(cpu_seconds: float) -> None:
+    """Allow ``cpu_seconds`` more CPU time; the kernel sends SIGXCPU beyond that."""
+    if resource is None or not cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = usage.ru_utime + usage.ru_stime
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = math.ceil(used + cpu_seconds)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _new_namespace() -> dict:
+    return {"__name__": "__main__", "__builtins__": builtins}
+
+
+def _execute(code: str, namespace: dict) -> int:
+    """Run code the way ``python -c`` would and return its exit status."""
+    try:
+        compiled = compile(code, "<string>", "exec")
+        exec(compiled, namespace)
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    except BaseException as e:
+        # Drop this module's frame so the traceback starts at the user's code.
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        return 1
+    finally:
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--request-fd", type=int, required=True)
+    parser.add_argument("--reply-fd", type=int, required=True)
+    parser.add_argument("--preload", default="")
+    parser.add_argument("--memory-mb", type=int, default=0)
+    parser.add_argument("--persistent", action="store_true")
+    args = parser.parse_args()
+
+    # Running as a script puts this package directory first on sys.path; user code
+    # must not be able to shadow stdlib modules with ours.
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+
+    for name in filter(None, (name.strip() for name in args.preload.split(","))):
+        with contextlib.suppress(ImportError):
+            importlib.import_module(name)
+
+    _apply_memory_limit(args.memory_mb)
+    sys.stdout.reconfigure(line_buffering=True)
+
+    requests = os.fdopen(args.request_fd, "r", encoding="utf-8")
+    replies = os.fdopen(args.reply_fd, "w", encoding="utf-8", buffering=1)
+    replies.write(json.dumps({"ready": True, "pid": os.getpid()}) + "\n")
+
+    namespace = _new_namespace()
+    for line in requests:
+        request = json.loads(line)
+        if request.get("reset") or not args.persistent:
+            namespace = _new_namespace()
+        _apply_cpu_limit(request.get("cpu_seconds") or 0)
+        returncode = _execute(request.get("code", ""), namespace)
+        replies.write(json.dumps({"returncode": returncode}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
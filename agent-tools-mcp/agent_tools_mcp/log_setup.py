@@ -0,0 +1,155 @@
+"""Logging setup for the MCP server.
+
+``LOG_FORMAT=dev`` (the default) writes plain lines from the calling thread. ``LOG_FORMAT=json``
+is meant for production: each record becomes one JSON object with its message cut to
+``LOG_MAX_FIELD_CHARS``, and records are handed to a background thread through a bounded
+queue, so tool calls never wait on stdout. Records that do not fit the queue are dropped.
+Hot-path records are sampled: ``LOG_SAMPLE_RATES`` maps a message prefix to the share of
+matching records kept, and kept records carry ``sampled=<rate>``. Warnings and errors are
+always kept.
+
+These are the same limits, digests and sampling as the agents-core ``json`` pipeline; the
+two packages do not depend on each other, so each carries its own copy.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import math
+import queue
+import sys
+import time
+
+from agent_tools_mcp.settings import settings
+
+_handler: logging.Handler | None = None
+_listener: logging.handlers.QueueListener | None = None
+
+
+def digest(value: str) -> str:
+    """Short, stable fingerprint of a payload."""
+    return hashlib.sha256(value.encode("utf-8", "replace")).hexdigest()[:12]
+
+
+def shorten(value: str, max_chars: int) -> str:
+    """Return ``value`` if it is short, otherwise its start tagged with its length and digest."""
+    if not max_chars or len(value) <= max_chars:
+        return value
+    return f"{value[:max_chars]}...[{len(value)} chars, sha256:{digest(value)}]"
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as one JSON object with a bounded message."""
+
+    def __init__(self, max_chars: int = 0):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": shorten(record.getMessage(), self.max_chars),
+        }
+        if hasattr(record, "sampled"):
+            line["sampled"] = record.sampled
+        if record.exc_info:
+            line["exception"] = self.formatException(record.exc_info)
+        return json.dumps(line)
+
+
+class EventSampler(logging.Filter):
+    """Filter that keeps a share of the records whose message starts with a key of ``rates``.
+
+    Sampling is deterministic: a prefix with rate 0.1 is kept once every ten records, and kept
+    records carry ``sampled=<rate>`` so counts can be scaled back up.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._calls: dict[str, int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        message = record.getMessage()
+        prefix = next((prefix for prefix in self.rates if message.startswith(prefix)), None)
+        if prefix is None or self.rates[prefix] >= 1:
+            return True
+        rate = self.rates[prefix]
+        calls = self._calls.get(prefix, 0) + 1
+        self._calls[prefix] = calls
+        # Keep the calls where the expected number of kept records steps up.
+        if math.ceil(calls * rate) == math.ceil((calls - 1) * rate):
+            self.dropped += 1
+            return False
+        record.sampled = rate
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks: records that do not fit are dropped and counted.
+
+    Records are queued as they are and formatted by the writer thread, so a tool only pays
+    for creating the record.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def stop_logging() -> None:
+    """Write the records still queued and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure_logging(stream=None) -> logging.Handler:
+    """Configure the root logger from the settings.
+
+    Args:
+        stream: Destination of the log lines, stdout by default
+
+    Returns:
+        The handler installed on the root logger
+    """
+    global _handler, _listener
+    if settings.log_format not in ("dev", "json"):
+        raise ValueError(f"Unknown log format: {settings.log_format}")
+    stop_logging()
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    root.setLevel(settings.log_level.upper())
+
+    target = logging.StreamHandler(stream or sys.stdout)
+    if settings.log_format == "dev":
+        target.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        _handler = target
+    else:
+        target.setFormatter(JSONFormatter(settings.log_max_field_chars))
+        _handler = DroppingQueueHandler(queue.Queue(settings.log_queue_size))
+        _handler.addFilter(EventSampler(settings.log_sample_rates))
+        _listener = logging.handlers.QueueListener(_handler.queue, target)
+        _listener.start()
+        atexit.register(stop_logging)
+    root.addHandler(_handler)
+    return _handler
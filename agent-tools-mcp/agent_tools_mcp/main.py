@@ -1,8 +1,16 @@
 """Main module for Brave Search MCP Server."""
 
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
-from agent_tools_mcp.code_interpreter import python_interpreter
+from agent_tools_mcp.code_interpreter import (
+    close_interpreter_session,
+    python_interpreter,
+    reset_interpreter_session,
+)
+from agent_tools_mcp.log_setup import configure_logging
+from agent_tools_mcp.search_cache import search_cache
 from agent_tools_mcp.search_tools import (
     image_search,
     news_search,
@@ -10,18 +18,38 @@ from agent_tools_mcp.search_tools import (
     web_search,
 )
 from agent_tools_mcp.settings import settings
+from agent_tools_mcp.telemetry import SpanWriter, TelemetryMiddleware, render_metrics
 
 # Create the MCP server instance
 server = FastMCP("agent-tools-mcp")
+server.add_middleware(
+    TelemetryMiddleware(spans=SpanWriter(settings.trace_file) if settings.trace_file else None)
+)
 
 # Register tools
 server.tool()(python_interpreter)
+server.tool()(reset_interpreter_session)
+server.tool()(close_interpreter_session)
 server.tool()(web_search)
 server.tool()(image_search)
 server.tool()(video_search)
 server.tool()(news_search)
 
 
+@server.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Tool latency histograms and search cache counters for Prometheus."""
+    counters = {
+        f"search_cache_{name}_total": value
+        for name, value in search_cache.stats().items()
+        if name != "entries"
+    }
+    return PlainTextResponse(
+        render_metrics(counters), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 if __name__ == "__main__":
     # For development, run the server directly
+    configure_logging()
     server.run(transport="http", host=settings.server_host, port=settings.server_port, path="/mcp")
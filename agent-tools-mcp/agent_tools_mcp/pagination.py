@@ -0,0 +1,186 @@
+"""Deep pagination for the search tools.
+
+Brave returns at most one page of results per request and pages up to an offset of 9.
+``fetch_pages`` requests the pages covering a larger ``count`` concurrently, at most
+``concurrency`` at a time, and merges them in page order. Results whose canonical URL was
+already seen on an earlier page are dropped; when that leaves fewer than ``count`` results,
+further pages are requested to make up the difference. A failed page does not fail the
+search: the results of the other pages are returned, with the failed offsets listed under
+``failed_pages``. Once a page comes back empty, later pages are not requested, and those
+already in flight are ignored.
+
+``progress_reporter`` sends each page's new results to the client as an MCP progress
+notification while the other pages are still loading. Pages are passed on in page order,
+so the streamed results are exactly those of the final response.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from fastmcp import Context
+
+logger = logging.getLogger(__name__)
+
+# Highest page offset Brave accepts, plus one
+MAX_PAGES = 10
+
+# Query parameters that only track the visit and do not change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src"}
+
+PageFetch = Callable[[int, int], Awaitable[dict[str, Any]]]
+PageCallback = Callable[[int, dict[str, Any]], Awaitable[None]]
+
+
+def canonical_url(url: str) -> str:
+    """Reduce a URL to a key that equivalent links share.
+
+    The scheme, a leading ``www.``, default ports, the fragment, a trailing slash, tracking
+    parameters and the order of the query parameters are ignored, as is the case of the host.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host += f":{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/")
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+async def fetch_pages(
+    fetch_page: PageFetch,
+    count: int,
+    page_size: int,
+    concurrency: int = 3,
+    on_page: PageCallback | None = None,
+) -> dict[str, Any]:
+    """Fetch enough pages for ``count`` results and merge them.
+
+    Args:
+        fetch_page: Called with ``(offset, page_size)``; returns a search response with a
+            ``results`` list, or with ``error`` when the page failed
+        count: Number of results wanted
+        page_size: Results per page; ``count`` up to this size is a single request
+        concurrency: Pages requested at the same time
+        on_page: Awaited with ``(offset, response)`` for each page of the final response,
+            in page order, as soon as it and every page before it have arrived
+
+    Returns:
+        ``total_results``, ``results``, ``pages`` and ``duplicates``, plus ``failed_pages``
+        when some pages failed. When every page failed, the first failed response.
+    """
+    if count <= page_size:
+        page_size = max(count, 1)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    merging = asyncio.Lock()
+    arrived: dict[int, dict[str, Any]] = {}
+    fetched: list[dict[str, Any]] = []
+    failed: list[dict[str, Any]] = []
+    results: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    duplicates = 0
+    last_page = MAX_PAGES - 1
+
+    async def merge() -> None:
+        # Take the pages in order, up to the first one still missing.
+        nonlocal duplicates
+        async with merging:
+            while len(fetched) in arrived and len(fetched) <= last_page:
+                offset = len(fetched)
+                response = arrived.pop(offset)
+                fetched.append(response)
+                if "error" in response:
+                    failed.append({"offset": offset, "error": response["error"]})
+                for result in response.get("results", []):
+                    key = canonical_url(result.get("url") or "")
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    results.append(result)
+                if on_page is not None:
+                    await on_page(offset, response)
+
+    async def run(offset: int) -> None:
+        nonlocal last_page
+        async with semaphore:
+            if offset > last_page:
+                return  # An earlier page was the last one
+            try:
+                response = await fetch_page(offset, page_size)
+            except Exception as e:
+                response = {"error": f"Search failed: {e}"}
+        if "error" not in response and not response.get("results"):
+            last_page = min(last_page, offset)
+        arrived[offset] = response
+        await merge()
+
+    # Request the pages still needed, again when duplicates left the merge short. A round
+    # with a failed page is not topped up, so an outage costs one round of requests.
+    start = 0
+    while len(results) < count and start <= last_page and not failed:
+        pages = math.ceil((count - len(results)) / page_size)
+        offsets = range(start, min(start + pages, last_page + 1))
+        await asyncio.gather(*(run(offset) for offset in offsets))
+        start = offsets.stop
+
+    if len(failed) == len(fetched):
+        return fetched[0]
+    merged: dict[str, Any] = {
+        "total_results": len(results[:count]),
+        "results": results[:count],
+        "pages": len(fetched),
+        "duplicates": duplicates,
+    }
+    if failed:
+        merged["failed_pages"] = failed
+        logger.warning(f"{len(failed)} of {len(fetched)} search pages failed: {failed[0]['error']}")
+    return merged
+
+
+def progress_reporter(
+    ctx: Context,
+    total: int,
+    shape: Callable[[list[dict[str, Any]]], Any] | None = None,
+) -> PageCallback:
+    """Build an ``on_page`` callback that streams new results as progress notifications.
+
+    Each notification's message is a JSON object ``{"offset": ..., "results": [...]}`` with
+    the page's results not already sent, and its progress value is the number of results
+    sent so far out of ``total``. ``fetch_pages`` calls it in page order, so the streamed
+    results are the final response's results, in the same order.
+
+    Args:
+        ctx: Context of the running tool call
+        total: Number of results requested
+        shape: Applied to each batch before it is sent, e.g. a field projection
+    """
+    sent: set[str] = set()
+
+    async def report(offset: int, response: dict[str, Any]) -> None:
+        batch = []
+        for result in response.get("results", []):
+            key = canonical_url(result.get("url") or "")
+            if len(sent) < total and key not in sent:
+                sent.add(key)
+                batch.append(result)
+        if not batch:
+            return
+        try:
+            await ctx.report_progress(
+                len(sent),
+                total,
+                message=json.dumps({"offset": offset, "results": shape(batch) if shape else batch}),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send search page notification: {e}")
+
+    return report
@@ -0,0 +1,127 @@
+"""Field projection and size budgets for search tool responses.
+
+Search responses carry every field Brave returns, and an agent pastes the whole payload
+into its prompt. ``shape_results`` cuts a response down before it is returned:
+
+- ``fields`` keeps only the named fields of each result
+- ``format="compact"`` renders the results as a table, one `` | ``-separated line each
+- ``max_chars`` bounds the size of the serialized response. Long free-text fields
+  (``TEXT_FIELDS``) are shortened first, then trailing results are dropped until it fits.
+  URLs and other values are never cut, so every link returned still works. What was cut is
+  reported under ``dropped``.
+
+Shaping runs after the search cache, so every projection of a query shares one entry.
+"""
+
+import json
+from typing import Any
+
+FORMATS = ("json", "compact")
+
+# Length text values are shortened to when a response is over its budget
+SNIPPET_CHARS = 160
+
+# Fields holding prose that can be cut without breaking the value
+TEXT_FIELDS = frozenset({"title", "description"})
+
+
+def response_chars(response: dict[str, Any]) -> int:
+    """Size of a response as the client receives it."""
+    return len(json.dumps(response, default=str))
+
+
+def _shorten(value: Any, max_chars: int) -> Any:
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[: max_chars - 3] + "..."
+    return value
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return " ".join(value.replace("|", "/").split())
+
+
+def render_compact(results: list[dict[str, Any]], fields: list[str]) -> str:
+    """Render results as a header line followed by one line per result."""
+    lines = [" | ".join(fields)]
+    lines += [" | ".join(_cell(result.get(name)) for name in fields) for result in results]
+    return "\n".join(lines)
+
+
+def shape_results(
+    response: dict[str, Any],
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    format: str = "json",
+) -> dict[str, Any]:
+    """Project, render and trim a search response.
+
+    Args:
+        response: Search tool response with a ``results`` list
+        fields: Result fields to keep, all of them when None
+        max_chars: Budget for the serialized response, None or 0 for no limit
+        format: "json" for a list of objects, "compact" for a table in one string
+
+    Returns:
+        The shaped response; error responses are returned unchanged
+    """
+    if "error" in response:
+        return response
+    if format not in FORMATS:
+        return {
+            "error": f"Unknown format: {format}. Use one of {FORMATS}",
+            "query": response.get("query"),
+        }
+
+    results = response.get("results", [])
+    available = list(dict.fromkeys(name for result in results for name in result))
+    if fields:
+        unknown = [name for name in fields if name not in available]
+        if results and unknown:
+            return {
+                "error": f"Unknown fields: {unknown}. Available: {available}",
+                "query": response.get("query"),
+            }
+        columns = list(fields)
+    else:
+        columns = available
+    results = [{name: result.get(name) for name in columns} for result in results]
+
+    def render(items: list[dict[str, Any]]) -> dict[str, Any]:
+        if format == "compact":
+            return {**response, "results": render_compact(items, columns)}
+        return {**response, "results": items}
+
+    shaped = render(results)
+    if not max_chars:
+        return shaped
+    original = response_chars(shaped)
+    if original <= max_chars:
+        return shaped
+
+    results = [
+        {
+            name: _shorten(value, SNIPPET_CHARS) if name in TEXT_FIELDS else value
+            for name, value in result.items()
+        }
+        for result in results
+    ]
+
+    def trimmed(kept: int) -> dict[str, Any]:
+        shaped = render(results[:kept])
+        cut = original - response_chars(shaped)
+        shaped["dropped"] = {"results": len(results) - kept, "chars": cut}
+        return shaped
+
+    # Keep the longest prefix of results that fits; the size grows with every result.
+    low, high = 0, len(results)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if response_chars(trimmed(middle)) <= max_chars:
+            low = middle
+        else:
+            high = middle - 1
+    return trimmed(low)
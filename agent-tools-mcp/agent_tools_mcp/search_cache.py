@@ -0,0 +1,319 @@
+"""Response cache for the Brave Search tools."""
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from agent_tools_mcp.settings import settings
+from agent_tools_mcp.telemetry import annotate
+
+logger = logging.getLogger(__name__)
+
+SearchTool = Callable[..., Awaitable[dict[str, Any]]]
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for cache lookups (case and whitespace insensitive)."""
+    return " ".join(query.casefold().split())
+
+
+def _normalize_arguments(arguments: dict[str, Any]) -> dict[str, Any]:
+    """Normalize tool arguments so equivalent requests share a cache key."""
+    normalized = {}
+    for name, value in arguments.items():
+        if name == "query":
+            value = normalize_query(value)
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        normalized[name] = value
+    return normalized
+
+
+class DiskCacheBackend:
+    """SQLite-backed store so cached responses survive server restarts.
+
+    The methods block; ``SearchCache`` calls them from a worker thread. Expired rows are
+    pruned at most once per ``prune_interval`` seconds, using an index on their expiry.
+    """
+
+    def __init__(self, path: str, prune_interval: float = 60.0):
+        """Initialize the backend.
+
+        Args:
+            path: Path of the SQLite database file
+            prune_interval: Minimum seconds between deletions of expired rows
+        """
+        self.path = path
+        self.prune_interval = prune_interval
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_cache_expires_at ON search_cache (expires_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, now: float) -> tuple[dict[str, Any], float] | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: dict[str, Any], expires_at: float) -> None:
+        data = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, expires_at),
+            )
+            now = time.time()
+            if now - self._pruned_at >= self.prune_interval:
+                self._pruned_at = now
+                self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SearchCache:
+    """In-memory LRU cache with freshness-aware TTLs and request coalescing.
+
+    Identical requests (same tool, normalized query and filters) made while one is already
+    in flight wait for that call instead of hitting Brave again. Successful responses are
+    kept for a TTL that depends on how time-sensitive the request is, and optionally
+    written through to a ``DiskCacheBackend``. Error responses are never cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttls: dict[str, float] | None = None,
+        disk: DiskCacheBackend | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of in-memory entries
+            ttls: TTL in seconds per tool kind ("web", "images", "videos", "news") and per
+                freshness filter ("pd", "pw", "pm", "py"); the shorter one applies
+            disk: Optional persistent backend
+            clock: Wall clock, overridable for tests
+        """
+        self.max_entries = max_entries
+        self.ttls = ttls or {}
+        self.disk = disk
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def ttl_for(self, kind: str, freshness: str | None = None) -> float:
+        """Get the TTL for a request.
+
+        Args:
+            kind: Tool kind
+            freshness: Brave freshness filter, if any
+
+        Returns:
+            TTL in seconds
+        """
+        ttl = self.ttls.get(kind, 3600.0)
+        if freshness in self.ttls:
+            ttl = min(ttl, self.ttls[freshness])
+        return ttl
+
+    def _lookup(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+        return None
+
+    async def _lookup_disk(self, key: str) -> dict[str, Any] | None:
+        if self.disk is None:
+            return None
+        try:
+            stored = await asyncio.to_thread(self.disk.get, key, self.clock())
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read search cache entry from disk: {e}")
+            return None
+        if stored is None:
+            return None
+        value, expires_at = stored
+        self._store_memory(key, value, expires_at)
+        return value
+
+    def _store_memory(self, key: str, value: dict[str, Any], expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _store_disk(self, key: str, value: dict[str, Any], expires_at: float) -> None:
+        try:
+            await asyncio.to_thread(self.disk.set, key, value, expires_at)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to write search cache entry to disk: {e}")
+
+    async def get_or_fetch(
+        self, key: str, ttl: float, fetch: Callable[[], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Return a cached response or fetch it, coalescing concurrent identical requests.
+
+        Args:
+            key: Cache key of the request
+            ttl: TTL for a freshly fetched response
+            fetch: Coroutine function performing the upstream request
+
+        Returns:
+            Response dictionary (shared, must not be mutated)
+        """
+        cached = self._lookup(key)
+        if cached is not None:
+            self.hits += 1
+            annotate(search_cache="hit")
+            return cached
+
+        pending = self._pending.get(key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            annotate(search_cache="coalesced")
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            # Registered as pending first, so identical requests wait for the disk read too.
+            stored = await self._lookup_disk(key)
+            if stored is not None:
+                self.hits += 1
+                annotate(search_cache="hit")
+                future.set_result(stored)
+                return stored
+
+            self.misses += 1
+            annotate(search_cache="miss")
+            result = await fetch()
+            if "error" in result:
+                future.set_result(result)
+                return result
+            expires_at = self.clock() + ttl
+            self._store_memory(key, result, expires_at)
+            future.set_result(result)
+            if self.disk is not None:
+                await self._store_disk(key, result, expires_at)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Get cache counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
+
+
+def _default_cache() -> SearchCache:
+    disk = DiskCacheBackend(settings.search_cache_path) if settings.search_cache_path else None
+    return SearchCache(
+        max_entries=settings.search_cache_max_entries,
+        ttls={
+            "web": settings.search_cache_ttl_web,
+            "images": settings.search_cache_ttl_web,
+            "videos": settings.search_cache_ttl_web,
+            "news": settings.search_cache_ttl_news,
+            "pd": settings.search_cache_ttl_news,
+            "pw": settings.search_cache_ttl_week,
+        },
+        disk=disk,
+    )
+
+
+# Shared cache used by the search tools
+search_cache = _default_cache()
+
+
+def cached_search(
+    kind: str, cache: SearchCache | None = None
+) -> Callable[[SearchTool], SearchTool]:
+    """Decorate a search tool so its responses go through the search cache.
+
+    The cache key is built from the tool kind and every bound argument, with the query
+    normalized. The wrapper keeps the tool's signature and docstring, so it can be
+    registered with ``server.tool()`` like the undecorated function.
+
+    Args:
+        kind: Tool kind used for the key and TTL ("web", "images", "videos", "news")
+        cache: Cache to use (defaults to the shared one)
+
+    Returns:
+        Decorator
+    """
+
+    def decorator(func: SearchTool) -> SearchTool:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> dict[str, Any]:
+            active = cache or search_cache
+            if not settings.search_cache_enabled:
+                return await func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = _normalize_arguments(bound.arguments)
+            query = bound.arguments["query"]
+            key = f"{kind}:{json.dumps(arguments, sort_keys=True, default=str)}"
+            ttl = active.ttl_for(kind, arguments.get("freshness"))
+
+            result = await active.get_or_fetch(key, ttl, lambda: func(*args, **kwargs))
+            # Report the caller's own spelling of the query.
+            return {**result, "query": query}
+
+        return wrapper
+
+    return decorator
@@ -1,21 +1,88 @@
 """Brave Search API tools for the MCP Server."""
 
-from typing import Any
-
-from brave_search_python_client import (
-    BraveSearch,
-    CountryCode,
-    ImagesSearchRequest,
-    LanguageCode,
-    NewsSearchRequest,
-    VideosSearchRequest,
-    WebSearchRequest,
-)
+from typing import TYPE_CHECKING, Any
 
+from fastmcp import Context
+
+from agent_tools_mcp.pagination import PageFetch, fetch_pages, progress_reporter
+from agent_tools_mcp.result_shaping import shape_results
+from agent_tools_mcp.search_cache import cached_search
 from agent_tools_mcp.settings import settings
 
-# Initialize the Brave Search client
-bs = BraveSearch(api_key=settings.brave_search_api_key)
+if TYPE_CHECKING:
+    from brave_search_python_client import BraveSearch
+
+    from agent_tools_mcp.fakes import FakeBraveSearch
+
+# Brave Search client, built by ``get_search_client`` on the first search. The Brave SDK
+# takes a large share of the server's import time, so it is imported on first use as well.
+bs: "BraveSearch | FakeBraveSearch | None" = None
+
+# Most results Brave returns per request
+WEB_PAGE_SIZE = 20
+NEWS_PAGE_SIZE = 50
+
+# Results a search returns by default; the default size limit is meant for this many
+DEFAULT_COUNT = 10
+
+
+def get_search_client() -> "BraveSearch | FakeBraveSearch":
+    """Return the Brave Search client, creating it on first use.
+
+    The offline stand-in is used for load tests and benchmarks.
+    """
+    global bs
+    if bs is None:
+        if settings.brave_search_fake:
+            from agent_tools_mcp.fakes import FakeBraveSearch
+
+            bs = FakeBraveSearch(latency=settings.brave_search_fake_latency)
+        else:
+            from brave_search_python_client import BraveSearch
+
+            bs = BraveSearch(api_key=settings.brave_search_api_key)
+    return bs
+
+
+def _shape(
+    response: dict[str, Any],
+    count: int,
+    fields: list[str] | None,
+    max_chars: int | None,
+    format: str,
+) -> dict[str, Any]:
+    if max_chars is None:
+        # The server's limit is sized for the default count; larger requests get a share
+        # per result, so asking for several pages is not undone by the budget.
+        max_chars = settings.search_max_chars * max(count, DEFAULT_COUNT) // DEFAULT_COUNT
+    return shape_results(response, fields, max_chars, format)
+
+
+async def _paginate(
+    query: str,
+    fetch_page: PageFetch,
+    count: int,
+    page_size: int,
+    fields: list[str] | None,
+    format: str,
+    ctx: Context | None,
+) -> dict[str, Any]:
+    """Fetch the pages for ``count`` results, streaming each page's results to ``ctx``."""
+    if count < 1:
+        return {"error": f"Search failed: count must be at least 1, got {count}", "query": query}
+    on_page = None
+    if ctx is not None and count > page_size:
+        on_page = progress_reporter(
+            ctx,
+            count,
+            lambda results: shape_results({"results": results}, fields, 0, format).get(
+                "results", results
+            ),
+        )
+    response = await fetch_pages(
+        fetch_page, count, page_size, settings.search_page_concurrency, on_page
+    )
+    return {**response, "query": query}
 
 
 async def web_search(
@@ -25,25 +92,55 @@ async def web_search(
     search_lang: str | None = None,
     safe_search: str | None = None,
     freshness: str | None = None,
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    format: str = "json",
+    ctx: Context | None = None,
 ) -> dict[str, Any]:
     """Search the web using Brave Search API.
 
     Args:
         query: The search query string
-        count: Number of results to return (default: 10, max: 20)
+        count: Number of results to return (default: 10, max: 200); more than 20 are fetched as several pages
         country: Country code for search results (e.g., 'US', 'DE', 'FR')
         search_lang: Language code for search results (e.g., 'en', 'de', 'fr')
         safe_search: Safe search filter ('strict', 'moderate', 'off')
         freshness: Freshness filter ('pd' for past day, 'pw' for past week, 'pm' for past month, 'py' for past year)
+        fields: Result fields to return, out of title, url, description, age, language (default: all)
+        max_chars: Size limit of the response; long titles and descriptions are shortened (URLs never) and trailing results dropped to fit (default: the server setting per 10 results requested, 0 for none)
+        format: 'json' for a list of result objects, 'compact' for one ' | '-separated line per result
 
     Returns:
         Search results as a dictionary.
     """
+
+    async def fetch_page(offset: int, page_size: int) -> dict[str, Any]:
+        return await _web_search(
+            query, page_size, country, search_lang, safe_search, freshness, offset
+        )
+
+    response = await _paginate(query, fetch_page, count, WEB_PAGE_SIZE, fields, format, ctx)
+    return _shape(response, count, fields, max_chars, format)
+
+
+@cached_search("web")
+async def _web_search(
+    query: str,
+    count: int = 10,
+    country: str | None = None,
+    search_lang: str | None = None,
+    safe_search: str | None = None,
+    freshness: str | None = None,
+    offset: int = 0,
+) -> dict[str, Any]:
+    from brave_search_python_client import CountryCode, LanguageCode, WebSearchRequest
+
     try:
         # Create the search request
         request = WebSearchRequest(
             q=query,
-            count=min(count, 20),  # Limit to max 20 results
+            count=min(count, WEB_PAGE_SIZE),
+            offset=offset or None,
             country=CountryCode(country.upper()) if country else None,
             search_lang=LanguageCode(search_lang.lower()) if search_lang else None,
             safesearch=safe_search,
@@ -51,7 +148,7 @@ async def web_search(
         )
 
         # Perform the search
-        response = await bs.web(request)
+        response = await get_search_client().web(request)
 
         # Format the results
         results = []
@@ -73,19 +170,35 @@ async def web_search(
         return {"error": f"Search failed: {str(e)}", "query": query}
 
 
-async def image_search(query: str, count: int = 10) -> dict[str, Any]:
+async def image_search(
+    query: str,
+    count: int = 10,
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    format: str = "json",
+) -> dict[str, Any]:
     """Search for images using Brave Search API.
 
     Args:
         query: The search query string
         count: Number of results to return (default: 10, max: 20)
+        fields: Result fields to return, out of title, url, thumbnail, source, properties (default: all)
+        max_chars: Size limit of the response; long titles and descriptions are shortened (URLs never) and trailing results dropped to fit (default: the server setting per 10 results requested, 0 for none)
+        format: 'json' for a list of result objects, 'compact' for one ' | '-separated line per result
 
     Returns:
         Image search results as a dictionary.
     """
+    return _shape(await _image_search(query, count), count, fields, max_chars, format)
+
+
+@cached_search("images")
+async def _image_search(query: str, count: int = 10) -> dict[str, Any]:
+    from brave_search_python_client import ImagesSearchRequest
+
     try:
         request = ImagesSearchRequest(q=query, count=min(count, 20))
-        response = await bs.images(request)
+        response = await get_search_client().images(request)
 
         results = []
         if response.results:
@@ -117,19 +230,35 @@ async def image_search(query: str, count: int = 10) -> dict[str, Any]:
         return {"error": f"Image search failed: {str(e)}", "query": query}
 
 
-async def video_search(query: str, count: int = 10) -> dict[str, Any]:
+async def video_search(
+    query: str,
+    count: int = 10,
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    format: str = "json",
+) -> dict[str, Any]:
     """Search for videos using Brave Search API.
 
     Args:
         query: The search query string
         count: Number of results to return (default: 10, max: 20)
+        fields: Result fields to return, out of title, url, thumbnail, description, age, duration, views, creator, publisher (default: all)
+        max_chars: Size limit of the response; long titles and descriptions are shortened (URLs never) and trailing results dropped to fit (default: the server setting per 10 results requested, 0 for none)
+        format: 'json' for a list of result objects, 'compact' for one ' | '-separated line per result
 
     Returns:
         Video search results as a dictionary.
     """
+    return _shape(await _video_search(query, count), count, fields, max_chars, format)
+
+
+@cached_search("videos")
+async def _video_search(query: str, count: int = 10) -> dict[str, Any]:
+    from brave_search_python_client import VideosSearchRequest
+
     try:
         request = VideosSearchRequest(q=query, count=min(count, 20))
-        response = await bs.videos(request)
+        response = await get_search_client().videos(request)
 
         results = []
         if response.results:
@@ -158,19 +287,43 @@ async def video_search(query: str, count: int = 10) -> dict[str, Any]:
         return {"error": f"Video search failed: {str(e)}", "query": query}
 
 
-async def news_search(query: str, count: int = 10) -> dict[str, Any]:
+async def news_search(
+    query: str,
+    count: int = 10,
+    fields: list[str] | None = None,
+    max_chars: int | None = None,
+    format: str = "json",
+    ctx: Context | None = None,
+) -> dict[str, Any]:
     """Search for news articles using Brave Search API.
 
     Args:
         query: The search query string
-        count: Number of results to return (default: 10, max: 20)
+        count: Number of results to return (default: 10, max: 500); more than 50 are fetched as several pages
+        fields: Result fields to return, out of title, url, description, age, breaking (default: all)
+        max_chars: Size limit of the response; long titles and descriptions are shortened (URLs never) and trailing results dropped to fit (default: the server setting per 10 results requested, 0 for none)
+        format: 'json' for a list of result objects, 'compact' for one ' | '-separated line per result
 
     Returns:
         News search results as a dictionary.
     """
+
+    async def fetch_page(offset: int, page_size: int) -> dict[str, Any]:
+        return await _news_search(query, page_size, offset)
+
+    response = await _paginate(query, fetch_page, count, NEWS_PAGE_SIZE, fields, format, ctx)
+    return _shape(response, count, fields, max_chars, format)
+
+
+@cached_search("news")
+async def _news_search(query: str, count: int = 10, offset: int = 0) -> dict[str, Any]:
+    from brave_search_python_client import NewsSearchRequest
+
     try:
-        request = NewsSearchRequest(q=query, count=min(count, 20))
-        response = await bs.news(request)
+        request = NewsSearchRequest(
+            q=query, count=min(count, NEWS_PAGE_SIZE), offset=offset or None
+        )
+        response = await get_search_client().news(request)
 
         results = []
         if response.results:
@@ -1,5 +1,7 @@
 """Settings configuration for Brave Search MCP Server."""
 
+from typing import Any, cast
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -8,7 +10,21 @@ class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
 
     brave_search_api_key: str = Field(
-        ..., description="Brave Search API key", env="BRAVE_SEARCH_API_KEY"
+        default="",
+        description="Brave Search API key, needed once a search tool is called",
+        env="BRAVE_SEARCH_API_KEY",
+    )
+
+    brave_search_fake: bool = Field(
+        default=False,
+        description="Serve deterministic offline results instead of calling Brave",
+        env="BRAVE_SEARCH_FAKE",
+    )
+
+    brave_search_fake_latency: float = Field(
+        default=0.0,
+        description="Simulated latency of the offline Brave stand-in in seconds",
+        env="BRAVE_SEARCH_FAKE_LATENCY",
     )
 
     server_host: str = Field(
@@ -19,6 +35,154 @@ class Settings(BaseSettings):
 
     log_level: str = Field(default="info", description="Log level for the server", env="LOG_LEVEL")
 
+    log_format: str = Field(
+        default="dev",
+        description='"dev" for plain lines, "json" for the queued production pipeline',
+        env="LOG_FORMAT",
+    )
+
+    log_max_field_chars: int = Field(
+        default=512,
+        description="Characters kept of a logged payload, 0 keeps everything",
+        env="LOG_MAX_FIELD_CHARS",
+    )
+
+    log_queue_size: int = Field(
+        default=10_000,
+        description="Log records waiting for the writer thread before new ones are dropped",
+        env="LOG_QUEUE_SIZE",
+    )
+
+    log_sample_rates: dict[str, float] = Field(
+        default_factory=lambda: {"Executing Python code": 0.1, "Execution result": 0.1},
+        description="Share of hot-path records kept per message prefix (json); "
+        "warnings and errors are always kept",
+        env="LOG_SAMPLE_RATES",
+    )
+
+    trace_file: str | None = Field(
+        default=None,
+        description="File receiving a JSON span per tool call, disabled when unset",
+        env="TRACE_FILE",
+    )
+
+    search_cache_enabled: bool = Field(
+        default=True, description="Cache Brave Search responses", env="SEARCH_CACHE_ENABLED"
+    )
+
+    search_cache_max_entries: int = Field(
+        default=1024,
+        description="Maximum number of in-memory cached search responses",
+        env="SEARCH_CACHE_MAX_ENTRIES",
+    )
+
+    search_cache_path: str | None = Field(
+        default=None,
+        description="SQLite file for a persistent search cache, disabled when unset",
+        env="SEARCH_CACHE_PATH",
+    )
+
+    search_cache_ttl_web: float = Field(
+        default=3600.0,
+        description="TTL in seconds for web, image and video results",
+        env="SEARCH_CACHE_TTL_WEB",
+    )
+
+    search_cache_ttl_week: float = Field(
+        default=1800.0,
+        description="TTL in seconds for results filtered to the past week",
+        env="SEARCH_CACHE_TTL_WEEK",
+    )
+
+    search_cache_ttl_news: float = Field(
+        default=300.0,
+        description="TTL in seconds for news and past-day results",
+        env="SEARCH_CACHE_TTL_NEWS",
+    )
+
+    search_max_chars: int = Field(
+        default=6000,
+        description="Default size limit in characters of a search response of 10 results, "
+        "scaled up for larger counts; 0 disables",
+        env="SEARCH_MAX_CHARS",
+    )
+
+    search_page_concurrency: int = Field(
+        default=3,
+        description="Result pages of one search requested at the same time",
+        env="SEARCH_PAGE_CONCURRENCY",
+    )
+
+    interpreter_pool_size: int = Field(
+        default=4, description="Number of warm interpreter workers", env="INTERPRETER_POOL_SIZE"
+    )
+
+    interpreter_max_runs_per_worker: int = Field(
+        default=100,
+        description="Executions before an interpreter worker is replaced",
+        env="INTERPRETER_MAX_RUNS_PER_WORKER",
+    )
+
+    interpreter_cpu_seconds: float = Field(
+        default=30.0,
+        description="CPU-time limit per execution in seconds, 0 disables",
+        env="INTERPRETER_CPU_SECONDS",
+    )
+
+    interpreter_memory_mb: int = Field(
+        default=1024,
+        description="Memory limit per interpreter worker in MiB, 0 disables",
+        env="INTERPRETER_MEMORY_MB",
+    )
+
+    interpreter_preload_modules: str = Field(
+        default="json,math,re,collections,itertools,functools,datetime,statistics,random",
+        description="Comma-separated modules imported once by each interpreter worker",
+        env="INTERPRETER_PRELOAD_MODULES",
+    )
+
+    interpreter_max_output_bytes: int = Field(
+        default=1_000_000,
+        description="Output bytes kept per stream (head and tail), 0 keeps everything",
+        env="INTERPRETER_MAX_OUTPUT_BYTES",
+    )
+
+    interpreter_max_sessions: int = Field(
+        default=16,
+        description="Maximum number of live interpreter sessions",
+        env="INTERPRETER_MAX_SESSIONS",
+    )
+
+    interpreter_session_idle_seconds: float = Field(
+        default=600.0,
+        description="Seconds before an unused interpreter session is closed",
+        env="INTERPRETER_SESSION_IDLE_SECONDS",
+    )
+
+    interpreter_session_memory_mb: int = Field(
+        default=2048,
+        description="Memory limit per interpreter session in MiB, 0 disables",
+        env="INTERPRETER_SESSION_MEMORY_MB",
+    )
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """Read the settings from the environment on first use."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
+
+
+class _LazySettings:
+    """Stands in for the ``Settings`` instance until an attribute is read."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
 
-# Create a global settings instance
-settings = Settings()
+# Global settings instance, read from the environment on first use
+settings = cast(Settings, _LazySettings())
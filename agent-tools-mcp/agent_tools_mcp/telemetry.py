@@ -0,0 +1,230 @@
+"""Latency metrics and trace spans for the MCP tools.
+
+``TelemetryMiddleware`` times every tool call. It records the latency in a per-tool
+histogram, served in the Prometheus text format by the ``/metrics`` route (``render_metrics``).
+With ``TRACE_FILE`` set, it also writes one span per call to that file as a JSON line. A
+client that sends a W3C ``traceparent`` in the request ``_meta`` (as ``agents_core`` does)
+gets the server span in its own trace, with its tool-call span as the parent. Code running
+inside a tool can add attributes to the span with ``annotate``, as the search cache does
+for hits and misses.
+"""
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import secrets
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+from agent_tools_mcp.log_setup import DroppingQueueHandler
+
+# Upper bounds of the latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_attributes: contextvars.ContextVar[dict[str, Any] | None] = contextvars.ContextVar(
+    "agent_tools_span_attributes", default=None
+)
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the span of the running tool call, if any."""
+    current = _attributes.get()
+    if current is not None:
+        current.update(attributes)
+
+
+class Histogram:
+    """Cumulative latency histogram with fixed buckets."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """``(upper bound, observations at or below it)`` per bucket."""
+        total, result = 0, []
+        for bound, count in zip(self.buckets, self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class ToolMetrics:
+    """Latency histograms and call counters per tool."""
+
+    def __init__(self):
+        self.latency: dict[str, Histogram] = {}
+        self.calls: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, tool: str, seconds: float, status: str) -> None:
+        with self._lock:
+            self.latency.setdefault(tool, Histogram()).observe(seconds)
+            self.calls[tool, status] = self.calls.get((tool, status), 0) + 1
+
+    def render(self) -> list[str]:
+        """Metric lines in the Prometheus text format."""
+        lines = [
+            "# HELP mcp_tool_duration_seconds Latency of MCP tool calls.",
+            "# TYPE mcp_tool_duration_seconds histogram",
+        ]
+        with self._lock:
+            for tool, histogram in sorted(self.latency.items()):
+                label = f'tool="{_escape(tool)}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(
+                        f'mcp_tool_duration_seconds_bucket{{{label},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'mcp_tool_duration_seconds_bucket{{{label},le="+Inf"}} {histogram.count}'
+                )
+                lines.append(f"mcp_tool_duration_seconds_sum{{{label}}} {histogram.sum}")
+                lines.append(f"mcp_tool_duration_seconds_count{{{label}}} {histogram.count}")
+            lines += [
+                "# HELP mcp_tool_calls_total MCP tool calls by outcome.",
+                "# TYPE mcp_tool_calls_total counter",
+            ]
+            for (tool, status), count in sorted(self.calls.items()):
+                lines.append(
+                    f'mcp_tool_calls_total{{tool="{_escape(tool)}",status="{status}"}} {count}'
+                )
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class SpanWriter:
+    """Appends spans to a file as JSON lines from a background thread.
+
+    Spans go through a bounded queue like the JSON logs; when it is full they are dropped.
+    """
+
+    def __init__(self, path: str, max_queued: int = 10_000):
+        self._logger = logging.Logger("agent_tools_mcp.spans")
+        target = logging.FileHandler(path, encoding="utf-8")
+        target.setFormatter(logging.Formatter("%(message)s"))
+        self.handler = DroppingQueueHandler(queue.Queue(max_queued))
+        self._logger.addHandler(self.handler)
+        self.listener = logging.handlers.QueueListener(self.handler.queue, target)
+        self.listener.start()
+
+    def write(self, span: dict[str, Any]) -> None:
+        self._logger.info(json.dumps(span, default=str))
+
+    def close(self) -> None:
+        """Write the queued spans and close the file."""
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def parse_traceparent(value: Any) -> tuple[str, str] | None:
+    """Trace and parent span id of a W3C ``traceparent`` value, None when malformed."""
+    parts = value.split("-") if isinstance(value, str) else []
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+def _traceparent(context: MiddlewareContext) -> Any:
+    """The ``traceparent`` the client sent in the request ``_meta``, if any."""
+    try:
+        meta = context.fastmcp_context.request_context.meta
+    except (AttributeError, LookupError, ValueError):
+        return None
+    return getattr(meta, "traceparent", None)
+
+
+class TelemetryMiddleware(Middleware):
+    """Times tool calls into ``metrics`` and, with a span writer, writes a span per call."""
+
+    def __init__(
+        self,
+        metrics: ToolMetrics | None = None,
+        spans: SpanWriter | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """Initialize the middleware.
+
+        Args:
+            metrics: Metrics to record into (defaults to the shared ones)
+            spans: Destination of the spans, None to skip them
+            clock: Monotonic clock, overridable for tests
+        """
+        self.metrics = metrics or tool_metrics
+        self.spans = spans
+        self.clock = clock
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        tool = context.message.name
+        attributes: dict[str, Any] = {"tool": tool}
+        token = _attributes.set(attributes)
+        started_at, started = time.time(), self.clock()
+        error: Exception | None = None
+        try:
+            return await call_next(context)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _attributes.reset(token)
+            duration = self.clock() - started
+            self.metrics.observe(tool, duration, "error" if error else "ok")
+            if self.spans is not None:
+                self._write_span(context, attributes, started_at, duration, error)
+
+    def _write_span(
+        self,
+        context: MiddlewareContext,
+        attributes: dict[str, Any],
+        started_at: float,
+        duration: float,
+        error: Exception | None,
+    ) -> None:
+        parent = parse_traceparent(_traceparent(context))
+        arguments = context.message.arguments or {}
+        attributes["argument_bytes"] = len(json.dumps(arguments, default=str).encode("utf-8"))
+        self.spans.write(
+            {
+                "service": "agent-tools-mcp",
+                "name": "tool.call",
+                "trace_id": parent[0] if parent else secrets.token_hex(16),
+                "span_id": secrets.token_hex(8),
+                "parent_id": parent[1] if parent else None,
+                "start_time": started_at,
+                "duration": duration,
+                "attributes": attributes,
+                "status": "error" if error else "ok",
+                "error": str(error) if error else None,
+            }
+        )
+
+
+# Shared metrics of the server's tools
+tool_metrics = ToolMetrics()
+
+
+def render_metrics(counters: dict[str, float] | None = None) -> str:
+    """The shared tool metrics, plus extra ``counters``, in the Prometheus text format."""
+    lines = tool_metrics.render()
+    for name, value in (counters or {}).items():
+        lines += [f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
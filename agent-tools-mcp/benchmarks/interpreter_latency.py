@@ -0,0 +1,73 @@
+"""Compare per-call latency of the pooled interpreter with a fresh shell per call.
+
+Usage:
+    uv run python benchmarks/interpreter_latency.py --runs 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from agent_tools_mcp.interpreter_pool import InterpreterPool
+
+SNIPPET = "import json, math\nprint(json.dumps({'sqrt': math.sqrt(2)}))"
+
+
+async def shell_per_call(code: str, timeout: int = 60) -> dict:
+    """The previous implementation: a shell and a fresh interpreter for every call."""
+    code = code.replace("'", '"')
+    process = await asyncio.create_subprocess_shell(
+        f"python -c '{code}'",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+    return {"stdout": stdout.decode().strip(), "returncode": process.returncode}
+
+
+async def pooled(pool: InterpreterPool, code: str, timeout: int = 60) -> dict:
+    return (await pool.execute(code, timeout)).to_dict()
+
+
+async def measure(name: str, call, runs: int) -> dict:
+    latencies = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await call(SNIPPET)
+        latencies.append((time.perf_counter() - started) * 1000)
+        assert result["returncode"] == 0, result
+    latencies.sort()
+    return {
+        "name": name,
+        "mean_ms": statistics.fmean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    pool = InterpreterPool(size=1)
+    pool.start()
+    try:
+        results = [
+            await measure("shell per call", shell_per_call, args.runs),
+            await measure("warm pool", lambda code: pooled(pool, code), args.runs),
+        ]
+    finally:
+        pool.shutdown()
+
+    print(f"{'approach':<16}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in results:
+        print(
+            f"{row['name']:<16}{row['mean_ms']:>10.2f}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+        )
+    print(f"speedup (mean): {results[0]['mean_ms'] / results[1]['mean_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
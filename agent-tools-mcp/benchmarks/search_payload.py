@@ -0,0 +1,52 @@
+"""Compare the size of search responses with and without projection and compact output.
+
+Uses the offline Brave stand-in, so no API key is needed.
+
+Usage:
+    uv run python benchmarks/search_payload.py --count 20
+"""
+
+import argparse
+import asyncio
+
+from agent_tools_mcp import search_tools
+from agent_tools_mcp.fakes import FakeBraveSearch
+from agent_tools_mcp.result_shaping import response_chars
+
+VARIANTS = {
+    "full json": {"max_chars": 0},
+    "default budget": {},
+    "title, url, description": {"fields": ["title", "url", "description"], "max_chars": 0},
+    "compact title, url, description": {
+        "fields": ["title", "url", "description"],
+        "format": "compact",
+        "max_chars": 0,
+    },
+    "compact title, url": {"fields": ["title", "url"], "format": "compact", "max_chars": 0},
+    "compact, 2000 chars": {
+        "fields": ["title", "url", "description"],
+        "format": "compact",
+        "max_chars": 2000,
+    },
+}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--description-chars", type=int, default=250)
+    args = parser.parse_args()
+
+    search_tools.bs = FakeBraveSearch(description_chars=args.description_chars)
+    baseline = None
+    print(f"{'variant':<34}{'chars':>8}{'results':>9}{'vs full':>9}")
+    for name, options in VARIANTS.items():
+        result = await search_tools.web_search("python asyncio", count=args.count, **options)
+        chars = response_chars(result)
+        baseline = baseline or chars
+        kept = args.count - result.get("dropped", {}).get("results", 0)
+        print(f"{name:<34}{chars:>8}{kept:>9}{baseline / chars:>8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
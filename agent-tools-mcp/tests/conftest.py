@@ -0,0 +1,28 @@
+"""Shared fixtures for the agent_tools_mcp tests."""
+
+import pytest
+
+from agent_tools_mcp import search_tools
+from agent_tools_mcp.fakes import FakeBraveSearch
+from agent_tools_mcp.search_cache import SearchCache
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "fake_brave(**kwargs): FakeBraveSearch arguments for the fake_brave fixture"
+    )
+
+
+@pytest.fixture
+def fake_brave(request, monkeypatch):
+    """Serve searches from the offline Brave stand-in with an empty cache.
+
+    The stand-in is built with the keyword arguments of the closest ``fake_brave`` marker,
+    e.g. ``pytestmark = pytest.mark.fake_brave(latency=0.05)`` for a whole module, and with
+    the defaults without one.
+    """
+    marker = request.node.get_closest_marker("fake_brave")
+    fake = FakeBraveSearch(**(marker.kwargs if marker else {}))
+    monkeypatch.setattr(search_tools, "bs", fake)
+    monkeypatch.setattr("agent_tools_mcp.search_cache.search_cache", SearchCache())
+    return fake
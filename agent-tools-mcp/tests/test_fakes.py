@@ -0,0 +1,37 @@
+import time
+
+import pytest
+
+from agent_tools_mcp import search_tools
+
+pytestmark = pytest.mark.fake_brave(latency=0.05, description_chars=50)
+
+
+@pytest.mark.asyncio
+async def test_fake_brave_serves_all_search_tools(fake_brave):
+    """Every search tool formats the fake responses without errors."""
+    results = [
+        await search_tools.web_search("offline", count=3),
+        await search_tools.image_search("offline", count=3),
+        await search_tools.video_search("offline", count=3),
+        await search_tools.news_search("offline", count=3),
+    ]
+
+    for result in results:
+        assert "error" not in result
+        assert result["total_results"] == 3
+    assert len(results[0]["results"][0]["description"]) == 50
+    assert results[2]["results"][0]["creator"] == "fake"
+    assert [kind for kind, _ in fake_brave.requests] == ["web", "images", "videos", "news"]
+
+
+@pytest.mark.asyncio
+async def test_fake_brave_is_deterministic_and_delayed(fake_brave):
+    """The same query gives the same results after the configured latency."""
+    started = time.monotonic()
+    first = await search_tools.web_search("repeatable", count=2, country="US")
+    elapsed = time.monotonic() - started
+    second = await search_tools.web_search("repeatable", count=2, freshness="pd")
+
+    assert elapsed >= 0.05
+    assert first["results"] == second["results"]
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from agent_tools_mcp.interpreter_pool import InterpreterPool, OutputBuffer
+
+
+@pytest.fixture
+def pool():
+    """Small pool with a low recycle threshold."""
+    pool = InterpreterPool(size=2, max_runs=3, cpu_seconds=1, memory_mb=256, preload="json")
+    yield pool
+    pool.shutdown()
+
+
+def test_code_with_both_quote_styles(pool):
+    """Code is passed through unmodified, whatever quotes it uses."""
+    result = pool.run("""print('single', "double", 'it"s')""", timeout=10)
+
+    assert result.returncode == 0
+    assert result.stdout == 'single double it"s'
+
+
+def test_worker_is_reused_then_recycled(pool):
+    """A worker serves several runs and is replaced after max_runs."""
+    pids = [int(pool.run("import os; print(os.getpid())", timeout=10).stdout) for _ in range(4)]
+
+    assert pids[0] == pids[1] == pids[2]
+    assert pids[3] != pids[0]
+    assert pool.stats()["recycled"] == 1
+
+
+def test_namespace_is_fresh_for_each_run(pool):
+    """Variables from one execution are not visible to the next."""
+    pool.run("leaked = 1", timeout=10)
+    result = pool.run("print(leaked)", timeout=10)
+
+    assert result.returncode == 1
+    assert "NameError" in result.stderr
+    assert 'File "<string>", line 1' in result.stderr
+    assert "interpreter_worker" not in result.stderr
+
+
+def test_timeout_replaces_worker(pool):
+    """A run past its timeout is killed and the pool keeps working."""
+    result = pool.run("import time; time.sleep(5)", timeout=0.5)
+    assert result.timed_out
+    assert result.returncode == -1
+
+    assert pool.run("print('still alive')", timeout=10).stdout == "still alive"
+
+
+def test_waiting_for_a_busy_pool_counts_against_the_timeout():
+    """A call that finds every worker busy gives up at its timeout instead of waiting on."""
+    pool = InterpreterPool(size=1, max_runs=10, cpu_seconds=0, memory_mb=0, preload="")
+    try:
+        pool.start()
+        busy = threading.Thread(target=pool.run, args=("import time; time.sleep(1)", 10))
+        busy.start()
+        time.sleep(0.2)  # Let the long run take the only worker
+
+        started = time.monotonic()
+        result = pool.run("print('never')", timeout=0.3)
+        waited = time.monotonic() - started
+        busy.join()
+    finally:
+        pool.shutdown()
+
+    assert result.timed_out
+    assert result.returncode == -1
+    assert result.stderr == "TimeoutError: Code execution exceeded 0.3 seconds."
+    assert waited < 0.8
+    assert pool.stats()["executions"] == 1
+
+
+def test_crash_and_exit_codes(pool):
+    """Hard exits are reported with their status and the worker is replaced."""
+    assert pool.run("import sys; sys.exit(4)", timeout=10).returncode == 4
+
+    crashed = pool.run("import os; os._exit(3)", timeout=10)
+    assert crashed.crashed
+    assert crashed.returncode == 3
+    assert pool.run("print(1 + 1)", timeout=10).stdout == "2"
+
+
+def test_output_buffer_keeps_head_and_tail():
+    """Only the first and last bytes are retained, but every byte is counted."""
+    buffer = OutputBuffer(limit=10)
+    for chunk in (b"abc", b"defgh", b"ijklmnop", b"qrst"):
+        buffer.extend(chunk)
+
+    assert buffer.total == 20
+    assert buffer.truncated
+    assert buffer.text() == "abcde\n... [10 bytes truncated] ...\npqrst"
+
+
+def test_large_output_is_truncated(pool):
+    """A huge print keeps bounded memory and reports the full byte count."""
+    pool.max_output_bytes = 1000
+    result = pool.run("print('x' * 1_000_000); print('end')", timeout=10)
+
+    assert result.truncated
+    assert result.stdout_bytes == 1_000_005
+    assert len(result.stdout) < 1100
+    assert result.stdout.endswith("end")
+    assert result.to_dict()["stdout_bytes"] == 1_000_005
+
+
+def test_output_is_forwarded_while_running(pool):
+    """The output callback sees each line before the code finishes."""
+    chunks = []
+    started = time.monotonic()
+
+    def on_output(stream, text):
+        chunks.append((stream, text, time.monotonic() - started))
+
+    result = pool.run(
+        "import sys, time\nprint('first')\ntime.sleep(0.5)\nprint('oops', file=sys.stderr)",
+        timeout=10,
+        on_output=on_output,
+    )
+
+    assert result.stdout == "first"
+    assert [(stream, text) for stream, text, _ in chunks] == [
+        ("stdout", "first\n"),
+        ("stderr", "oops\n"),
+    ]
+    assert chunks[0][2] < 0.4
+
+
+def test_cpu_and_memory_limits(pool):
+    """Runaway CPU use is stopped and oversized allocations fail."""
+    spin = pool.run("while True: pass", timeout=20)
+    assert spin.crashed
+    assert "CPU time limit exceeded" in spin.stderr
+
+    big = pool.run("data = bytearray(512 * 1024 * 1024)", timeout=10)
+    assert big.returncode == 1
+    assert "MemoryError" in big.stderr
+
+
+@pytest.mark.asyncio
+async def test_executions_run_concurrently(pool):
+    """Executions are spread over the pool's workers."""
+    pool.start()
+    started = time.monotonic()
+    results = await asyncio.gather(
+        *(pool.execute("import time; time.sleep(0.3); print('done')", 10) for _ in range(4))
+    )
+    elapsed = time.monotonic() - started
+
+    assert [result.stdout for result in results] == ["done"] * 4
+    assert elapsed < 1.1
+
+
+@pytest.mark.asyncio
+async def test_tool_streams_output_as_progress():
+    """With stream=True the client receives output chunks as progress notifications."""
+    from fastmcp import Client
+
+    from agent_tools_mcp.main import server
+
+    messages = []
+
+    async def on_progress(progress, total, message):
+        messages.append(json.loads(message))
+
+    async with Client(server) as client:
+        result = await client.call_tool(
+            "python_interpreter",
+            {"code": "print('a')\nimport sys; print('b', file=sys.stderr)", "stream": True},
+            progress_handler=on_progress,
+        )
+
+    assert result.data["stdout"] == "a"
+    assert "".join(m["text"] for m in messages if m["stream"] == "stdout") == "a\n"
+    assert "".join(m["text"] for m in messages if m["stream"] == "stderr") == "b\n"
+
+
+@pytest.mark.asyncio
+async def test_streamer_counts_only_the_bytes_it_sends():
+    """Past the limit, output is cut and the progress value is what was actually sent."""
+    from agent_tools_mcp.code_interpreter import OutputStreamer
+
+    sent = []
+
+    class Context:
+        async def report_progress(self, progress, total=None, message=None):
+            sent.append((progress, json.loads(message)["text"]))
+
+    async with OutputStreamer(Context(), max_bytes=10) as streamer:
+        await streamer._send("stdout", "12345678")
+        await streamer._send("stdout", "abcdef")
+        await streamer._send("stdout", "ignored")
+
+    assert [progress for progress, _ in sent] == [8, 10]
+    assert sent[1][1].startswith("ab\n... [streaming stopped")
+    assert streamer.sent_bytes == 10
@@ -0,0 +1,120 @@
+import pytest
+
+from agent_tools_mcp.code_interpreter import python_interpreter
+from agent_tools_mcp.interpreter_sessions import InterpreterSessionManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def manager(clock):
+    """Small manager driven by a fake clock."""
+    manager = InterpreterSessionManager(
+        max_sessions=2, idle_seconds=60, memory_mb=256, cpu_seconds=1, preload="", clock=clock
+    )
+    yield manager
+    manager.shutdown()
+
+
+def test_state_persists_within_a_session(manager):
+    """Variables defined in one call are visible to the next call of the same session."""
+    manager.run("a", "data = [1, 2, 3]", timeout=10)
+    result = manager.run("a", "print(sum(data))", timeout=10)
+
+    assert result.returncode == 0
+    assert result.stdout == "6"
+
+
+def test_sessions_are_isolated(manager):
+    """Sessions do not see each other's variables."""
+    manager.run("a", "secret = 1", timeout=10)
+    result = manager.run("b", "print(secret)", timeout=10)
+
+    assert result.returncode == 1
+    assert "NameError" in result.stderr
+
+
+def test_reset_clears_namespace_and_keeps_worker(manager):
+    """Reset empties the namespace without restarting the process."""
+    pid = manager.run("a", "import os; value = 1; print(os.getpid())", timeout=10).stdout
+
+    assert manager.reset("a") is True
+    result = manager.run("a", "import os; print(os.getpid()); print(value)", timeout=10)
+
+    assert result.stdout == pid
+    assert "NameError" in result.stderr
+    assert manager.reset("missing") is False
+
+
+def test_close_drops_session(manager):
+    """A closed session starts over on the next call."""
+    manager.run("a", "value = 1", timeout=10)
+
+    assert manager.close("a") is True
+    assert manager.sessions() == []
+    assert "NameError" in manager.run("a", "print(value)", timeout=10).stderr
+    assert manager.close("missing") is False
+
+
+def test_idle_sessions_are_evicted(manager, clock):
+    """Sessions unused for idle_seconds are closed."""
+    manager.run("a", "value = 1", timeout=10)
+    clock.now = 30
+    manager.run("b", "value = 2", timeout=10)
+    clock.now = 70
+
+    assert manager.evict_idle() == ["a"]
+    assert manager.sessions() == ["b"]
+
+
+def test_least_recently_used_session_is_evicted_at_capacity(manager, clock):
+    """Opening a session beyond max_sessions closes the least recently used one."""
+    manager.run("a", "value = 1", timeout=10)
+    clock.now = 1
+    manager.run("b", "value = 2", timeout=10)
+    clock.now = 2
+    manager.run("a", "value += 1", timeout=10)
+    clock.now = 3
+    manager.run("c", "value = 3", timeout=10)
+
+    assert sorted(manager.sessions()) == ["a", "c"]
+    assert manager.evicted == 1
+
+
+def test_memory_cap_drops_session(manager):
+    """Exceeding the session memory cap fails the call but leaves the manager usable."""
+    result = manager.run("a", "data = bytearray(512 * 1024 * 1024)", timeout=10)
+
+    assert result.returncode != 0
+    assert "MemoryError" in result.stderr
+    assert manager.run("a", "print('ok')", timeout=10).stdout == "ok"
+
+
+def test_timeout_drops_session(manager):
+    """A timed-out session is closed so the next call starts from a fresh namespace."""
+    manager.run("a", "value = 1", timeout=10)
+    result = manager.run("a", "while True: pass", timeout=0.5)
+
+    assert result.timed_out
+    assert "session state was lost" in result.stderr
+    assert manager.sessions() == []
+
+
+@pytest.mark.asyncio
+async def test_tool_reports_session_id():
+    """The tool echoes the session id and keeps state between calls."""
+    await python_interpreter("x = 41", session_id="tool-test")
+    result = await python_interpreter("print(x + 1)", session_id="tool-test")
+
+    assert result == {"stdout": "42", "stderr": "", "returncode": 0, "session_id": "tool-test"}
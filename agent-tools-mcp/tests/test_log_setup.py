@@ -0,0 +1,75 @@
+"""Tests for the logging setup."""
+
+import io
+import json
+import logging
+
+import pytest
+
+from agent_tools_mcp import log_setup
+from agent_tools_mcp.settings import get_settings
+
+
+@pytest.fixture
+def json_logging(monkeypatch):
+    monkeypatch.setattr(get_settings(), "log_format", "json")
+    monkeypatch.setattr(get_settings(), "log_max_field_chars", 20)
+    output = io.StringIO()
+    handler = log_setup.configure_logging(output)
+    yield output, handler
+    log_setup.stop_logging()
+    logging.getLogger().removeHandler(handler)
+
+
+def test_json_lines_have_bounded_messages(json_logging):
+    output, _ = json_logging
+    logger = logging.getLogger("agent_tools_mcp.test")
+    code = "print('x')\n" * 50
+    logger.info(f"Executing Python code: {code}")
+    logger.warning("short")
+    log_setup.stop_logging()
+
+    first, second = (json.loads(line) for line in output.getvalue().splitlines())
+    assert first["level"] == "info"
+    assert first["logger"] == "agent_tools_mcp.test"
+    assert first["event"].startswith("Executing Python cod...[")
+    assert first["event"].endswith(f"sha256:{log_setup.digest(f'Executing Python code: {code}')}]")
+    assert second["event"] == "short"
+
+
+def test_full_queue_drops_instead_of_blocking(json_logging):
+    _, handler = json_logging
+    log_setup.stop_logging()  # Nothing drains the queue
+    handler.queue.maxsize = 1
+    for _ in range(3):
+        logging.getLogger("agent_tools_mcp.test").warning("line")
+
+    assert handler.dropped == 2
+
+
+def test_json_mode_samples_hot_path_records(json_logging):
+    output, _ = json_logging
+    logger = logging.getLogger("agent_tools_mcp.test")
+    for i in range(20):
+        logger.info(f"Execution result: {i}")
+    logger.warning("Execution result: slow")
+    logger.info("Idle session closed")
+    log_setup.stop_logging()
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [(line["event"], line.get("sampled")) for line in lines] == [
+        ("Execution result: 0", 0.1),
+        ("Execution result: 10", 0.1),
+        (
+            "Execution result: sl...[22 chars, sha256:"
+            + log_setup.digest("Execution result: slow")
+            + "]",
+            None,
+        ),
+        ("Idle session closed", None),
+    ]
+
+
+def test_shorten_keeps_short_values():
+    assert log_setup.shorten("short", 10) == "short"
+    assert log_setup.shorten("x" * 20, 0) == "x" * 20
@@ -0,0 +1,147 @@
+"""Tests for deep pagination of the search tools."""
+
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from agent_tools_mcp import search_tools
+from agent_tools_mcp.pagination import canonical_url, fetch_pages
+from agent_tools_mcp.result_shaping import response_chars
+from agent_tools_mcp.settings import get_settings
+
+pytestmark = pytest.mark.fake_brave(latency=0.05, description_chars=20)
+
+
+@pytest.mark.asyncio
+async def test_large_counts_fetch_pages_concurrently(fake_brave):
+    result = await search_tools.web_search("otters", count=55, max_chars=0)
+
+    assert result["query"] == "otters"
+    assert result["total_results"] == 55
+    assert result["pages"] == 3
+    assert len({r["url"] for r in result["results"]}) == 55
+    assert sorted((r.offset, r.count) for _, r in fake_brave.requests) == [
+        (0, 20),
+        (1, 20),
+        (2, 20),
+    ]
+    assert fake_brave.peak_in_flight == 3
+
+    # Pages are cached one by one, so a smaller request reuses them.
+    await search_tools.web_search("otters", count=40, max_chars=0)
+    assert len(fake_brave.requests) == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, -1])
+async def test_counts_below_one_are_reported_as_errors(fake_brave, count):
+    for search in (search_tools.web_search, search_tools.news_search):
+        result = await search("otters", count=count)
+
+        assert result == {
+            "error": f"Search failed: count must be at least 1, got {count}",
+            "query": "otters",
+        }
+    assert fake_brave.requests == []
+
+
+@pytest.mark.asyncio
+async def test_failed_pages_give_partial_deduplicated_results():
+    requested = []
+
+    async def fetch_page(offset, page_size):
+        requested.append(offset)
+        if offset == 1:
+            raise TimeoutError("page timed out")
+        urls = [f"https://example.com/{offset}/{i}" for i in range(page_size)]
+        if offset == 2:
+            urls[0] = "http://www.Example.com/0/3/?utm_source=feed#top"
+        if offset == 3:
+            urls = urls[:4]  # A short page does not end the search
+        if offset == 4:
+            urls = []  # Last page
+        return {"results": [{"url": url} for url in urls]}
+
+    result = await fetch_pages(fetch_page, count=100, page_size=10, concurrency=1)
+
+    assert requested == [0, 1, 2, 3, 4]
+    assert result["failed_pages"] == [{"offset": 1, "error": "Search failed: page timed out"}]
+    assert result["duplicates"] == 1
+    assert result["total_results"] == 10 + 9 + 4
+    assert result["pages"] == 5
+    assert canonical_url("https://example.com/a?b=2&a=1&gclid=x") == "example.com/a?a=1&b=2"
+
+
+@pytest.mark.asyncio
+async def test_pages_stream_as_progress_notifications(fake_brave):
+    server = FastMCP("tools")
+    server.tool()(search_tools.news_search)
+    batches = []
+
+    async def on_progress(progress, total, message):
+        batches.append((progress, total, json.loads(message)))
+
+    async with Client(server) as client:
+        result = await client.call_tool(
+            "news_search",
+            {"query": "otters", "count": 120, "fields": ["url"], "max_chars": 0},
+            progress_handler=on_progress,
+        )
+
+    assert result.data["total_results"] == 120
+    assert [batch["offset"] for _, _, batch in batches] == [0, 1, 2]
+    assert batches[-1][:2] == (120, 120)
+    streamed = [r["url"] for _, _, batch in batches for r in batch["results"]]
+    assert streamed == [r["url"] for r in result.data["results"]]
+    assert set(batches[0][2]["results"][0]) == {"url"}
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_topped_up_and_pages_after_the_last_are_ignored():
+    requested = []
+    reported = []
+
+    async def fetch_page(offset, page_size):
+        requested.append(offset)
+        # Page 4 is still in flight when page 3 comes back empty.
+        await asyncio.sleep(0.01 if offset == 4 else 0)
+        if offset == 3:
+            return {"results": []}
+        # Page 1 repeats half of page 0.
+        first = offset * page_size - (page_size // 2 if offset else 0)
+        return {"results": [{"url": f"https://example.com/{i}"} for i in range(first, first + 10)]}
+
+    async def on_page(offset, response):
+        reported.append(offset)
+
+    topped_up = await fetch_pages(fetch_page, count=20, page_size=10, on_page=on_page)
+
+    assert requested == [0, 1, 2]
+    assert reported == [0, 1, 2]
+    assert topped_up["duplicates"] == 5
+    assert [r["url"] for r in topped_up["results"]] == [
+        f"https://example.com/{i}" for i in range(20)
+    ]
+
+    requested.clear()
+    reported.clear()
+    ended = await fetch_pages(fetch_page, count=50, page_size=10, concurrency=5, on_page=on_page)
+
+    assert sorted(requested) == [0, 1, 2, 3, 4]
+    assert reported == [0, 1, 2, 3]
+    assert ended["pages"] == 4
+    assert ended["total_results"] == 25
+
+
+@pytest.mark.asyncio
+@pytest.mark.fake_brave()  # Full-length descriptions
+async def test_default_budget_scales_with_the_count(fake_brave):
+    single = await search_tools.web_search("otters", count=20)
+    deep = await search_tools.web_search("otters", count=100)
+
+    assert response_chars(single) <= 2 * get_settings().search_max_chars
+    assert deep["total_results"] == 100
+    assert len(deep["results"]) == 100
+    assert response_chars(deep) <= 10 * get_settings().search_max_chars
@@ -0,0 +1,70 @@
+"""Tests for field projection and size budgets of search responses."""
+
+import json
+
+import pytest
+
+from agent_tools_mcp import search_tools
+from agent_tools_mcp.result_shaping import response_chars, shape_results
+
+pytestmark = pytest.mark.fake_brave(description_chars=300)
+
+
+@pytest.mark.asyncio
+async def test_projections_share_one_cached_search(fake_brave):
+    full = await search_tools.web_search("otters", max_chars=0)
+    projected = await search_tools.web_search("otters", fields=["title", "url"])
+    compact = await search_tools.web_search("otters", fields=["title", "url"], format="compact")
+
+    assert len(fake_brave.requests) == 1
+    assert projected["results"][0] == {"title": "otters (web 0)", "url": full["results"][0]["url"]}
+    lines = compact["results"].splitlines()
+    assert lines[0] == "title | url"
+    assert lines[1] == f"otters (web 0) | {full['results'][0]['url']}"
+    assert len(lines) == 11
+    # The compact projection is a fraction of the full payload.
+    assert response_chars(compact) * 4 < response_chars(full)
+
+
+@pytest.mark.asyncio
+async def test_budget_shortens_text_then_drops_results(fake_brave):
+    result = await search_tools.news_search("otters", count=20, max_chars=2000)
+
+    assert response_chars(result) <= 2000
+    assert 0 < len(result["results"]) < 20
+    assert all(len(r["description"]) <= 160 for r in result["results"])
+    assert result["dropped"]["results"] == 20 - len(result["results"])
+    full = await search_tools.news_search("otters", count=20, max_chars=0)
+    assert result["dropped"]["chars"] == response_chars(full) - response_chars(
+        {k: v for k, v in result.items() if k != "dropped"}
+    )
+    assert "dropped" not in full
+
+
+def test_unknown_fields_and_errors():
+    response = {"query": "q", "total_results": 1, "results": [{"title": "t", "url": "u"}]}
+
+    assert "Unknown fields: ['body']" in shape_results(response, fields=["body"])["error"]
+    assert "Unknown format" in shape_results(response, format="xml")["error"]
+    failed = {"error": "Search failed: boom", "query": "q"}
+    assert shape_results(failed, fields=["title"], max_chars=10) == failed
+    assert json.loads(json.dumps(shape_results(response, max_chars=10)))["results"] == []
+
+
+def test_budget_never_shortens_urls():
+    url = "https://example.com/" + "a/" * 150
+    response = {
+        "query": "q",
+        "total_results": 2,
+        "results": [
+            {"title": "t" * 300, "url": url, "thumbnail": url + "thumb.png"},
+            {"title": "short", "url": url + "2", "thumbnail": url + "thumb2.png"},
+        ],
+    }
+
+    shaped = shape_results(response, max_chars=1200)
+
+    assert shaped["results"] == [
+        {"title": "t" * 157 + "...", "url": url, "thumbnail": url + "thumb.png"}
+    ]
+    assert shaped["dropped"]["results"] == 1
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent_tools_mcp.search_cache import DiskCacheBackend, SearchCache, cached_search
+
+
+class FakeClock:
+    """Manually advanced wall clock."""
+
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_tool(cache, kind="web"):
+    """Build a cached fake search tool that counts upstream calls."""
+
+    @cached_search(kind, cache=cache)
+    async def search(
+        query: str, count: int = 10, country: str | None = None, freshness: str | None = None
+    ) -> dict:
+        """Fake search."""
+        search.upstream_calls += 1
+        await asyncio.sleep(0.01)
+        if query == "fail":
+            return {"error": "Search failed", "query": query}
+        return {"query": query, "total_results": 1, "results": [{"title": query}]}
+
+    search.upstream_calls = 0
+    return search
+
+
+@pytest.mark.asyncio
+async def test_equivalent_queries_share_cache_entry():
+    """Case, whitespace and country spelling do not split the cache."""
+    cache = SearchCache(ttls={"web": 60})
+    search = make_tool(cache)
+
+    first = await search("Capital of  France", country="FR")
+    second = await search("capital of france", country="fr")
+    other = await search("capital of france", count=5)
+
+    assert search.upstream_calls == 2
+    assert second["results"] == first["results"]
+    assert second["query"] == "capital of france"
+    assert other["query"] == "capital of france"
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced():
+    """Simultaneous identical requests make a single upstream call."""
+    cache = SearchCache(ttls={"web": 60})
+    search = make_tool(cache)
+
+    results = await asyncio.gather(*(search("python asyncio") for _ in range(10)))
+
+    assert search.upstream_calls == 1
+    assert all(result["results"] == results[0]["results"] for result in results)
+    assert cache.stats()["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_freshness_shortens_ttl_and_errors_are_not_cached():
+    """Past-day results expire sooner, and failed searches are retried."""
+    clock = FakeClock()
+    cache = SearchCache(ttls={"web": 3600, "pd": 300}, clock=clock)
+    search = make_tool(cache)
+
+    await search("ai news", freshness="pd")
+    await search("ai research")
+    clock.now += 600
+    await search("ai news", freshness="pd")
+    await search("ai research")
+    assert search.upstream_calls == 3
+
+    await search("fail")
+    await search("fail")
+    assert search.upstream_calls == 5
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_oldest_entry():
+    """The least recently used entry is evicted when the cache is full."""
+    cache = SearchCache(max_entries=2, ttls={"web": 60})
+    search = make_tool(cache)
+
+    await search("a")
+    await search("b")
+    await search("a")
+    await search("c")
+    await search("a")
+    await search("b")
+
+    assert search.upstream_calls == 4
+
+
+@pytest.mark.asyncio
+async def test_disk_backend_survives_restart(tmp_path):
+    """Responses written to disk are served by a new cache instance."""
+    path = str(tmp_path / "cache.sqlite")
+    first_tool = make_tool(SearchCache(ttls={"web": 60}, disk=DiskCacheBackend(path)))
+    await first_tool("persistent query")
+
+    second_tool = make_tool(SearchCache(ttls={"web": 60}, disk=DiskCacheBackend(path)))
+    result = await second_tool("persistent query")
+
+    assert second_tool.upstream_calls == 0
+    assert result["results"] == [{"title": "persistent query"}]
+
+
+@pytest.mark.asyncio
+async def test_disk_backend_runs_off_the_event_loop_and_prunes_periodically(tmp_path):
+    """SQLite calls run in a worker thread, and expired rows are pruned by index."""
+    disk = DiskCacheBackend(str(tmp_path / "cache.sqlite"), prune_interval=3600)
+    threads = set()
+    get = disk.get
+
+    def recording_get(key, now):
+        threads.add(threading.get_ident())
+        return get(key, now)
+
+    disk.get = recording_get
+    tool = make_tool(SearchCache(ttls={"web": 60}, disk=disk))
+    await tool("off the loop")
+    assert threads and threading.get_ident() not in threads
+
+    rows = "SELECT COUNT(*) FROM search_cache"
+    disk.set("expired", {}, expires_at=0)  # Kept: the tool call just pruned
+    assert disk._conn.execute(rows).fetchone()[0] == 2
+    disk._pruned_at = 0
+    disk.set("fresh", {}, expires_at=time.time() + 60)
+    assert disk._conn.execute(rows).fetchone()[0] == 2
+    plan = disk._conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM search_cache WHERE expires_at <= 0"
+    ).fetchall()
+    assert "search_cache_expires_at" in str(plan)
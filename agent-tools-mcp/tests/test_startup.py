@@ -0,0 +1,15 @@
+"""Startup regression check: the server starts without the Brave SDK or an API key."""
+
+import json
+import os
+import subprocess
+import sys
+
+
+def test_server_import_defers_brave_client():
+    env = {k: v for k, v in os.environ.items() if k != "BRAVE_SEARCH_API_KEY"}
+    code = "import json, sys, agent_tools_mcp.main\nprint(json.dumps(list(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert "brave_search_python_client" not in json.loads(result.stdout.splitlines()[-1])
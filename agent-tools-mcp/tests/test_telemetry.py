@@ -0,0 +1,83 @@
+"""Tests for tool metrics and spans."""
+
+import json
+
+import httpx
+import mcp
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from agent_tools_mcp.telemetry import SpanWriter, TelemetryMiddleware, ToolMetrics, annotate
+
+TRACEPARENT = f"00-{'a' * 32}-{'b' * 16}-01"
+
+
+def send_traceparent(client: Client) -> None:
+    """Add a traceparent to the client's tool calls, as agents_core does."""
+    send_request = client.session.send_request
+
+    async def send(request, *args, **kwargs):
+        if isinstance(request.root, mcp.types.CallToolRequest):
+            request.root.params.meta = mcp.types.RequestParams.Meta(traceparent=TRACEPARENT)
+        return await send_request(request, *args, **kwargs)
+
+    client.session.send_request = send
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_timed_and_traced(tmp_path):
+    times = iter([0.0, 0.03, 1.0, 3.0])
+    metrics = ToolMetrics()
+    spans = SpanWriter(str(tmp_path / "spans.jsonl"))
+    server = FastMCP("tools")
+    server.add_middleware(TelemetryMiddleware(metrics, spans, clock=lambda: next(times)))
+
+    @server.tool()
+    async def web_search(query: str) -> str:
+        """Search the web."""
+        annotate(search_cache="miss")
+        if query == "fail":
+            raise ValueError("upstream failed")
+        return f"results for {query}"
+
+    async with Client(server) as client:
+        send_traceparent(client)
+        await client.call_tool("web_search", {"query": "otters"})
+        with pytest.raises(ToolError):
+            await client.call_tool("web_search", {"query": "fail"})
+    spans.close()
+
+    lines = metrics.render()
+    assert 'mcp_tool_duration_seconds_bucket{tool="web_search",le="0.025"} 0' in lines
+    assert 'mcp_tool_duration_seconds_bucket{tool="web_search",le="0.05"} 1' in lines
+    assert 'mcp_tool_duration_seconds_bucket{tool="web_search",le="2.5"} 2' in lines
+    assert 'mcp_tool_duration_seconds_count{tool="web_search"} 2' in lines
+    assert 'mcp_tool_calls_total{tool="web_search",status="ok"} 1' in lines
+    assert 'mcp_tool_calls_total{tool="web_search",status="error"} 1' in lines
+
+    first, second = (
+        json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()
+    )
+    assert (first["trace_id"], first["parent_id"]) == ("a" * 32, "b" * 16)
+    assert first["attributes"] == {
+        "tool": "web_search",
+        "search_cache": "miss",
+        "argument_bytes": 19,
+    }
+    assert first["duration"] == pytest.approx(0.03)
+    assert second["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_metrics_route_serves_prometheus_text():
+    from agent_tools_mcp.main import server
+
+    transport = httpx.ASGITransport(server.http_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://tools") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE mcp_tool_duration_seconds histogram" in response.text
+    assert "search_cache_hits_total" in response.text
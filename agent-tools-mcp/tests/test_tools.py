@@ -12,7 +12,7 @@ from agent_tools_mcp.search_tools import (
 
 
 @pytest.mark.asyncio
-async def test_web_search():
+async def test_web_search(fake_brave):
     """Tests the web_search tool."""
     query = "what is the capital of france"
     result = await web_search(query)
@@ -21,10 +21,11 @@ async def test_web_search():
     assert result["query"] == query
     assert "results" in result
     assert len(result["results"]) > 0
+    assert fake_brave.requests[-1][0] == "web"
 
 
 @pytest.mark.asyncio
-async def test_image_search():
+async def test_image_search(fake_brave):
     """Tests the image_search tool."""
     query = "pictures of paris"
     result = await image_search(query)
@@ -33,10 +34,11 @@ async def test_image_search():
     assert result["query"] == query
     assert "results" in result
     assert len(result["results"]) > 0
+    assert fake_brave.requests[-1][0] == "images"
 
 
 @pytest.mark.asyncio
-async def test_video_search():
+async def test_video_search(fake_brave):
     """Tests the video_search tool."""
     query = "tour of the eiffel tower"
     result = await video_search(query)
@@ -45,10 +47,11 @@ async def test_video_search():
     assert result["query"] == query
     assert "results" in result
     assert len(result["results"]) > 0
+    assert fake_brave.requests[-1][0] == "videos"
 
 
 @pytest.mark.asyncio
-async def test_news_search():
+async def test_news_search(fake_brave):
     """Tests the news_search tool."""
     query = "latest tech news"
     result = await news_search(query)
@@ -57,6 +60,7 @@ async def test_news_search():
     assert result["query"] == query
     assert "results" in result
     assert len(result["results"]) > 0
+    assert fake_brave.requests[-1][0] == "news"
 
 
 @pytest.mark.asyncio
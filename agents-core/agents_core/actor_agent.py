@@ -1,16 +1,26 @@
 """Actor agent that interacts with tools to accomplish a task."""
 
+import asyncio
+import inspect
 import json
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 from typing import Any
 
-import mcp
 import structlog
-from fastmcp import Client
 
 from agents_core.base_agent import BaseAgent
+from agents_core.config import config
+from agents_core.function_calling import JSONStreamExtractor, iter_json_values
+from agents_core.mcp_session import MCPSessionManager, get_session_manager
+from agents_core.semantic_cache import SemanticCache, get_semantic_cache
+from agents_core.tracing import current_span, get_tracer, payload_bytes
 
 logger = structlog.get_logger(__name__)
 
+# Receives partial tool output as it arrives: the stream name ("stdout", "stderr", or
+# "progress" for plain progress messages) and a chunk of text.
+ToolOutputCallback = Callable[[str, str], Awaitable[None] | None]
+
 
 class ActorAgent(BaseAgent):
     """Actor agent that interacts with tools to accomplish a task."""
@@ -20,27 +30,175 @@ class ActorAgent(BaseAgent):
         name: str = "Actor",
         model_name: str | None = None,
         mcp_server_url: str = "http://localhost:8000/mcp/",
+        mcp_session: MCPSessionManager | None = None,
+        on_tool_output: ToolOutputCallback | None = None,
+        max_parallel_tool_calls: int | None = None,
+        tool_call_timeout: float | None = None,
+        cache: SemanticCache | None = None,
+        cache_scope: str | None = None,
+        **kwargs: Any,
     ):
-        super().__init__(name, model_name)
+        """Initialize the actor agent.
+
+        Args:
+            name: Name of the agent
+            model_name: Gemini model to use
+            mcp_server_url: URL of the MCP server providing the tools
+            mcp_session: Session manager to use (defaults to the shared one for the URL)
+            on_tool_output: Called with partial output of tools that support streaming
+            max_parallel_tool_calls: Batched tool calls that run at once (defaults to config)
+            tool_call_timeout: Timeout in seconds for each batched tool call (defaults to config)
+            cache: Semantic cache of first-turn answers (defaults to the shared one when
+                enabled in config)
+            cache_scope: Keeps cached turns to agents with the same scope, e.g. a user or a
+                server session; None shares them with every agent on the same server and model
+            **kwargs: Extra arguments for ``BaseAgent``
+        """
+        super().__init__(name, model_name, **kwargs)
         self.mcp_server_url = mcp_server_url
-        self.mcp_client = Client({"mcpServers": {"default": {"url": self.mcp_server_url}}})
+        self.mcp_session = mcp_session or get_session_manager(self.mcp_server_url)
+        self.on_tool_output = on_tool_output
+        self.max_parallel_tool_calls = max_parallel_tool_calls or config.mcp.max_parallel_tool_calls
+        self.tool_call_timeout = (
+            config.mcp.tool_call_timeout if tool_call_timeout is None else tool_call_timeout
+        )
+        # Model replies, and how their tool calls were read: as native function calls, as
+        # JSON text, or extracted from text around the JSON. A parse failure costs a
+        # "Tool result error" round trip before the model retries.
+        self.parse_stats = {
+            "replies": 0,
+            "native": 0,
+            "text": 0,
+            "recovered": 0,
+            "parse_failures": 0,
+        }
+        self.cache = cache or get_semantic_cache()
+        self.cache_namespace = f"actor:{self.mcp_server_url}:{self.model_name}"
+        if cache_scope is not None:
+            self.cache_namespace += f":{cache_scope}"
 
     async def get_system_prompt(self) -> str:
         return (
             "You are an actor agent. Your goal is to accomplish the given task by using the available tools. "
-            "When you need to use a tool, respond with a JSON object with two keys: "
+            "When you need to use a tool, call it as a function, or respond with a JSON object with two keys: "
             '"tool_name" (the name of the tool to call) and "parameters" (an object of arguments to pass to the tool). '
+            "To make several independent tool calls at once, respond with a JSON list of such objects, "
+            'or with an object whose "tool_calls" key holds that list; the calls run in parallel and '
+            "their results come back in the order you listed them. "
             "Otherwise, respond with your thoughts."
         )
 
     async def get_available_tools(self) -> list[dict[str, any]]:
         """Get list of tools available to this agent."""
-        async with self.mcp_client as client:
-            tools: list[mcp.types.Tool] = await client.list_tools()
-            return [tool.model_dump() for tool in tools]
+        return await self.mcp_session.list_tools_serialized()
+
+    @staticmethod
+    def _supports_streaming(tools: list[dict[str, Any]], tool_name: str) -> bool:
+        for tool in tools:
+            if tool.get("name") == tool_name:
+                properties = (tool.get("inputSchema") or {}).get("properties") or {}
+                return properties.get("stream", {}).get("type") == "boolean"
+        return False
+
+    async def _handle_tool_progress(
+        self, progress: float, total: float | None, message: str | None
+    ) -> None:
+        """Pass streamed tool output to ``on_tool_output``."""
+        if not message:
+            return
+        try:
+            chunk = json.loads(message)
+            stream, text = chunk["stream"], chunk["text"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            stream, text = "progress", message
+        result = self.on_tool_output(stream, text)
+        if inspect.isawaitable(result):
+            await result
+
+    async def _call_tool(
+        self, tool_name: str, parameters: dict[str, Any], tools: list[dict[str, Any]]
+    ) -> Any:
+        """Call a tool, streaming its partial output when a callback is set and supported."""
+        if self.on_tool_output is None or not self._supports_streaming(tools, tool_name):
+            return await self.mcp_session.call_tool(tool_name, arguments=parameters)
+        return await self.mcp_session.call_tool(
+            tool_name,
+            arguments={**parameters, "stream": True},
+            progress_handler=self._handle_tool_progress,
+        )
 
     async def process_message(self, message: str, context: dict[str, Any] | None = None) -> str:
-        """Process a user message, execute tool calls, and return a response."""
+        """Process a user message, execute tool calls, and return a response.
+
+        The first message of a conversation is looked up in the semantic cache, if one is
+        set; on a hit, the cached turn (response and history entries) is replayed without
+        calling the model or any tool. Later messages depend on the conversation so far and
+        are never cached.
+        """
+        with get_tracer().span("agent.turn", agent=self.name) as span:
+            if not self._cacheable(context):
+                response = await self._process_turn(message, context)
+            else:
+                response = await self._replay_cached_turn(message)
+                if response is None:
+                    response = await self._process_turn(message, context)
+                    await self._cache_turn(message, response)
+            if span.recording:
+                span.set(message_bytes=payload_bytes(message), reply_bytes=payload_bytes(response))
+            return response
+
+    async def stream_message(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """Process a user message like ``process_message``, yielding the response in chunks.
+
+        The model's text is yielded as it arrives. Tool calls are detected on the streamed
+        text and start running as soon as their JSON is complete; their results are yielded
+        last, in the ``"\nTool result: ..."`` form ``process_message`` appends.
+        """
+        with get_tracer().span("agent.turn", agent=self.name, streamed=True) as span:
+            cacheable = self._cacheable(context)
+            cached = await self._replay_cached_turn(message) if cacheable else None
+            if cached is not None:
+                chunks = [cached]
+                yield cached
+            else:
+                chunks = []
+                async for chunk in self._stream_turn(message, context):
+                    chunks.append(chunk)
+                    yield chunk
+                if cacheable:
+                    await self._cache_turn(message, "".join(chunks))
+            if span.recording:
+                span.set(
+                    message_bytes=payload_bytes(message), reply_bytes=payload_bytes("".join(chunks))
+                )
+
+    def _cacheable(self, context: dict[str, Any] | None) -> bool:
+        return self.cache is not None and not self.conversation_history and not context
+
+    async def _replay_cached_turn(self, message: str) -> str | None:
+        hit = await self.cache.lookup(self.cache_namespace, message)
+        current_span().set(semantic_cache="hit" if hit is not None else "miss")
+        if hit is None:
+            return None
+        self.conversation_history.extend(hit.value["history"])
+        return hit.value["response"]
+
+    async def _cache_turn(self, message: str, response: str) -> None:
+        if self._turn_succeeded:
+            await self.cache.store(
+                self.cache_namespace,
+                message,
+                {"response": response, "history": list(self.conversation_history)},
+            )
+
+    async def _start_turn(
+        self, message: str, context: dict[str, Any] | None
+    ) -> tuple[str, list[dict[str, Any]], dict[str, Any]]:
+        """Record the user message and gather the system prompt, tools and context."""
+        # Cleared when a tool call fails, so the turn is not cached.
+        self._turn_succeeded = True
         # Add user message to history
         self.conversation_history.append({"role": "user", "content": message})
 
@@ -50,44 +208,229 @@ class ActorAgent(BaseAgent):
         # We will inject the tools into the context for the model
         context = context or {}
         context["available_tools"] = tools
+        return system_prompt, tools, context
 
-        # Prepare the conversation for Gemini
-        conversation_text = self._format_conversation_for_gemini(system_prompt)
+    async def _process_turn(self, message: str, context: dict[str, Any] | None = None) -> str:
+        """Run one turn: ask the model and execute the tool calls it requests."""
+        system_prompt, tools, context = await self._start_turn(message, context)
 
         # Generate response from the model
-        raw_response = await self._generate_response(conversation_text, context)
+        raw_response = await self._complete(system_prompt, context)
 
         self.conversation_history.append({"role": "assistant", "content": raw_response})
-        # Check if the response is a tool call
+        # Check if the response is a tool call or a list of tool calls
+        try:
+            tool_calls = self._extract_tool_calls(raw_response)
+            if tool_calls is None:
+                return raw_response
+            results = await self._execute_tool_calls(tool_calls, tools)
+            return raw_response + self._record_tool_results(tool_calls, results)
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return raw_response + self._record_invalid_tool_call(raw_response)
+
+    async def _stream_turn(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """Run one turn like ``_process_turn``, streaming the model's reply."""
+        system_prompt, tools, context = await self._start_turn(message, context)
+
+        extractor = JSONStreamExtractor()
+        chunks: list[str] = []
+        early: tuple[list[tuple[str, dict[str, Any]]], asyncio.Task] | None = None
         try:
-            tool_call = json.loads(raw_response)
-            if "tool_name" in tool_call and "parameters" in tool_call:
-                tool_name = tool_call["tool_name"]
-                parameters = tool_call["parameters"]
-
-                # Execute the tool call
-                async with self.mcp_client as client:
-                    tool_result = await client.call_tool(tool_name, arguments=parameters)
-
-                # Add tool call and result to history
-                if tool_result.content:
-                    # we iterate over the content and convert the pydantic model to json before appending.
-                    tool_result = [item.model_dump() for item in tool_result.content]
-                    self.conversation_history.append(
-                        {"role": "user", "content": f"Tool result: {json.dumps(tool_result)}"}
-                    )
-                    raw_response += f"\nTool result: {json.dumps(tool_result)}"
+            async for chunk in self._stream_complete(system_prompt, context):
+                chunks.append(chunk)
+                yield chunk
+                if early is None:
+                    calls = self._first_tool_calls(extractor.feed(chunk))
+                    if calls:
+                        # Start the tools while the rest of the reply streams in.
+                        task = asyncio.create_task(self._execute_tool_calls(calls, tools))
+                        # An unused early result must not be reported as never retrieved.
+                        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+                        early = (calls, task)
+
+            raw_response = "".join(chunks)
+            self.conversation_history.append({"role": "assistant", "content": raw_response})
+            try:
+                tool_calls = self._extract_tool_calls(raw_response)
+                if tool_calls is None:
+                    suffix = ""
                 else:
-                    self.conversation_history.append(
-                        {"role": "user", "content": "Tool result error"}
-                    )
-                    raw_response += "\nTool result: error"
-        except (json.JSONDecodeError, KeyError):
-            # Not a valid tool call, treat as a regular message
-            logger.warning(
-                "Received response that is not a valid tool call.",
-                response=raw_response,
-            )
+                    if early is not None and early[0] == tool_calls:
+                        results = await early[1]
+                    else:
+                        results = await self._execute_tool_calls(tool_calls, tools)
+                    suffix = self._record_tool_results(tool_calls, results)
+            except (json.JSONDecodeError, KeyError, TypeError):
+                suffix = self._record_invalid_tool_call(raw_response)
+        finally:
+            if early is not None and not early[1].done():
+                early[1].cancel()
+        if suffix:
+            yield suffix
+
+    def _first_tool_calls(self, payloads: Iterable[Any]) -> list[tuple[str, dict[str, Any]]] | None:
+        """The tool calls of the first parsed JSON value that is a tool call, if any."""
+        for payload in payloads:
+            try:
+                tool_calls = self._tool_calls_from_payload(payload)
+            except (KeyError, TypeError):
+                continue
+            if tool_calls:
+                return tool_calls
+        return None
+
+    async def _execute_tool_calls(
+        self, tool_calls: list[tuple[str, dict[str, Any]]], tools: list[dict[str, Any]]
+    ) -> list[Any]:
+        """Run the tool calls of one reply.
+
+        A single call runs on its own and its errors propagate; several calls run
+        concurrently, see ``_call_tools``.
+        """
+        if len(tool_calls) == 1:
+            tool_name, parameters = tool_calls[0]
+            # Execute the tool call on the shared session
+            return [await self._call_tool(tool_name, parameters, tools)]
+        return await self._call_tools(tool_calls, tools)
+
+    def _record_tool_results(
+        self, tool_calls: list[tuple[str, dict[str, Any]]], results: list[Any]
+    ) -> str:
+        """Add tool results to the history.
+
+        Returns:
+            The text appended to the reply for these results
+        """
+        self._turn_succeeded = not any(self._tool_failed(result) for result in results)
+        if len(tool_calls) == 1:
+            tool_result = results[0]
+            # Add tool call and result to history
+            if tool_result.content:
+                # we iterate over the content and convert the pydantic model to json before appending.
+                tool_result = [item.model_dump() for item in tool_result.content]
+                self.conversation_history.append(
+                    {"role": "user", "content": f"Tool result: {json.dumps(tool_result)}"}
+                )
+                return f"\nTool result: {json.dumps(tool_result)}"
             self.conversation_history.append({"role": "user", "content": "Tool result error"})
-            raw_response += "\nTool result: error"
-        return raw_response
+            return "\nTool result: error"
+
+        # Results are recorded in the order the model listed the calls, whatever
+        # order they finished in.
+        suffix = ""
+        for (tool_name, _), result in zip(tool_calls, results, strict=True):
+            entry = self._batch_result_entry(tool_name, result)
+            self.conversation_history.append({"role": "user", "content": f"Tool result: {entry}"})
+            suffix += f"\nTool result: {entry}"
+        return suffix
+
+    def _record_invalid_tool_call(self, raw_response: str) -> str:
+        # Not a valid tool call, treat as a regular message
+        logger.warning(
+            "Received response that is not a valid tool call.",
+            response=raw_response,
+        )
+        self.conversation_history.append({"role": "user", "content": "Tool result error"})
+        self._turn_succeeded = False
+        return "\nTool result: error"
+
+    @staticmethod
+    def _tool_failed(result: Any) -> bool:
+        return isinstance(result, BaseException) or result.is_error or not result.content
+
+    @staticmethod
+    def _parse_tool_calls(raw_response: str) -> list[tuple[str, dict[str, Any]]] | None:
+        """Parse a model response into tool calls.
+
+        Accepts a single ``{"tool_name", "parameters"}`` object, a list of them, or an object
+        with a ``"tool_calls"`` list.
+
+        Returns:
+            List of ``(tool_name, parameters)`` pairs, or None if the response is a JSON
+            object that is not a tool call
+
+        Raises:
+            json.JSONDecodeError: If the response is not JSON
+            KeyError: If an entry of a list is not a tool call
+        """
+        return ActorAgent._tool_calls_from_payload(json.loads(raw_response))
+
+    @staticmethod
+    def _tool_calls_from_payload(payload: Any) -> list[tuple[str, dict[str, Any]]] | None:
+        """Read tool calls from a parsed JSON reply, see ``_parse_tool_calls``."""
+        if isinstance(payload, dict) and "tool_calls" in payload:
+            payload = payload["tool_calls"]
+        if isinstance(payload, dict):
+            if "tool_name" in payload and "parameters" in payload:
+                return [(payload["tool_name"], payload["parameters"])]
+            return None
+        if not isinstance(payload, list) or not payload:
+            raise KeyError("tool_name")
+        return [(call["tool_name"], call["parameters"]) for call in payload]
+
+    def _extract_tool_calls(self, raw_response: str) -> list[tuple[str, dict[str, Any]]] | None:
+        """Read the tool calls of a reply, tolerating text around the JSON.
+
+        Native function calls arrive already rendered as JSON. A text reply that is not
+        exactly a tool call is scanned for embedded JSON values, so a preamble or a Markdown
+        fence does not cost a round trip. A reply without a tool call is a plain message.
+
+        Returns:
+            The tool calls, or None for a plain message
+
+        Raises:
+            json.JSONDecodeError: If the reply mentions a tool call that cannot be parsed
+        """
+        self.parse_stats["replies"] += 1
+        try:
+            tool_calls = self._parse_tool_calls(raw_response)
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            tool_calls = self._first_tool_calls(iter_json_values(raw_response))
+            if tool_calls:
+                self.parse_stats["recovered"] += 1
+                logger.info("Extracted tool calls from text reply", count=len(tool_calls))
+                return tool_calls
+            if "tool_name" not in raw_response:
+                return None
+            self.parse_stats["parse_failures"] += 1
+            raise json.JSONDecodeError("No valid tool call in reply", raw_response, 0) from e
+        if tool_calls:
+            self.parse_stats["native" if self.last_function_calls else "text"] += 1
+        return tool_calls
+
+    async def _call_tools(
+        self, tool_calls: list[tuple[str, dict[str, Any]]], tools: list[dict[str, Any]]
+    ) -> list[Any]:
+        """Run tool calls concurrently with bounded concurrency and per-call timeouts.
+
+        Returns:
+            One entry per call in the same order: the tool result or the exception it raised
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel_tool_calls)
+
+        async def run(tool_name: str, parameters: dict[str, Any]) -> Any:
+            async with semaphore:
+                return await asyncio.wait_for(
+                    self._call_tool(tool_name, parameters, tools), self.tool_call_timeout
+                )
+
+        return await asyncio.gather(
+            *(run(tool_name, parameters) for tool_name, parameters in tool_calls),
+            return_exceptions=True,
+        )
+
+    @staticmethod
+    def _batch_result_entry(tool_name: str, result: Any) -> str:
+        if isinstance(result, TimeoutError):
+            return json.dumps({"tool_name": tool_name, "error": "timed out"})
+        if isinstance(result, BaseException):
+            logger.warning("Tool call failed", tool_name=tool_name, error=str(result))
+            return json.dumps(
+                {"tool_name": tool_name, "error": str(result) or type(result).__name__}
+            )
+        if not result.content:
+            return json.dumps({"tool_name": tool_name, "error": "empty result"})
+        content = [item.model_dump() for item in result.content]
+        return json.dumps({"tool_name": tool_name, "content": content})
@@ -1,44 +1,94 @@
 """Base agent class using Google's agent protocol."""
 
+import contextlib
 import json
+import time
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator
 from typing import Any
 
-import google.generativeai as genai
 import structlog
 
 from agents_core.config import config
+from agents_core.function_calling import function_calls, function_declarations
+from agents_core.gemini import GeminiBackend
+from agents_core.history import HistoryPolicy, history_tokens
+from agents_core.tokens import estimate_tokens
+from agents_core.tracing import Span, current_span, get_tracer, payload_bytes
+from agents_core.transcript import STABLE_CONTEXT_KEYS, Transcript
 
 logger = structlog.get_logger(__name__)
 
+EXECUTION_MODES = ("text", "chat")
+
+# A context cache is recreated this many seconds before it expires (at most a tenth of its TTL)
+CONTEXT_CACHE_REFRESH_SECONDS = 60.0
+
 
 class BaseAgent(ABC):
     """Base class for all agents using Google's agent protocol."""
 
-    def __init__(self, name: str, model_name: str | None = None):
+    def __init__(
+        self,
+        name: str,
+        model_name: str | None = None,
+        execution_mode: str | None = None,
+        backend: GeminiBackend | None = None,
+        history_policy: HistoryPolicy | None = None,
+    ):
         """Initialize the base agent.
 
         Args:
             name: Name of the agent
             model_name: Gemini model to use (defaults to config)
+            execution_mode: "text" to send the history as one flattened prompt, or "chat" to
+                send role/parts contents with a system instruction and a cached prefix
+                (defaults to config)
+            backend: Factory for Gemini models and context caches
+            history_policy: Optional policy compacting the history before each model call
         """
         self.name = name
         self.model_name = model_name or config.gemini.gemini_model
-
-        # Configure Gemini
-        if config.gemini.gemini_api_key:
-            genai.configure(api_key=config.gemini.gemini_api_key)
-
-        # Initialize the model
-        self.model = genai.GenerativeModel(
-            model_name=self.model_name,
-            generation_config=genai.types.GenerationConfig(
-                temperature=config.gemini.gemini_temperature,
-                max_output_tokens=config.gemini.gemini_max_tokens,
-            ),
-        )
+        self.execution_mode = execution_mode or config.gemini.gemini_execution_mode
+        if self.execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown execution mode: {self.execution_mode}")
+        self.backend = backend or GeminiBackend()
+        self.history_policy = history_policy
+        self.tokens_saved = 0
+
+        # Initialize the model; a plain dict spares importing the Gemini SDK for its type.
+        self.generation_config = {
+            "temperature": config.gemini.gemini_temperature,
+            "max_output_tokens": config.gemini.gemini_max_tokens,
+        }
+        self.model = self.backend.generative_model(self.model_name, self.generation_config)
 
         self.conversation_history: list[dict[str, str]] = []
+        self._transcript = Transcript()
+
+        # Chat mode: model bound to the current stable prefix and its cache
+        self._chat_model = None
+        self._chat_prefix_key: tuple[str, str] | None = None
+        self._chat_inline_prefix: list[dict[str, Any]] = []
+        self.context_cache_name: str | None = None
+        self._context_cache_expires_at = 0.0  # time.monotonic() value
+        self._chat_tools_cached = False
+
+        # Native function calling: declarations of the last tool list, and the calls
+        # made in the last reply
+        self._declared_tools: tuple[list[dict[str, Any]], list[dict[str, Any]]] | None = None
+        self.last_function_calls: list[tuple[str, dict[str, Any]]] = []
+
+        self.usage = {
+            "calls": 0,
+            "prompt_tokens": 0,
+            "cached_tokens": 0,
+            "output_tokens": 0,
+            "latency_seconds": 0.0,
+            "streamed_calls": 0,
+            "first_token_seconds": 0.0,  # Summed time to first token of streamed calls
+        }
+        self.last_time_to_first_token: float | None = None
 
     @abstractmethod
     async def get_system_prompt(self) -> str:
@@ -69,20 +119,22 @@ class BaseAgent(ABC):
             Agent response
         """
         try:
-            # Add user message to conversation history
-            self.conversation_history.append({"role": "user", "content": message})
+            with get_tracer().span("agent.turn", agent=self.name) as span:
+                # Add user message to conversation history
+                self.conversation_history.append({"role": "user", "content": message})
 
-            # Get system prompt
-            system_prompt = await self.get_system_prompt()
+                # Get system prompt
+                system_prompt = await self.get_system_prompt()
 
-            # Prepare the conversation for Gemini
-            conversation_text = self._format_conversation_for_gemini(system_prompt)
+                # Generate response
+                response = await self._complete(system_prompt, context)
 
-            # Generate response
-            response = await self._generate_response(conversation_text, context)
-
-            # Add agent response to conversation history
-            self.conversation_history.append({"role": "assistant", "content": response})
+                # Add agent response to conversation history
+                self.conversation_history.append({"role": "assistant", "content": response})
+                if span.recording:
+                    span.set(
+                        message_bytes=payload_bytes(message), reply_bytes=payload_bytes(response)
+                    )
 
             logger.info("Message processed", agent=self.name, message_length=len(message))
             return response
@@ -91,22 +143,144 @@ class BaseAgent(ABC):
             logger.error("Failed to process message", agent=self.name, error=str(e))
             raise
 
+    async def stream_message(
+        self, message: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """Process a user message, yielding the response in chunks as they arrive.
+
+        The chunks join up to the response ``process_message`` would return, and the full
+        response is added to the history once the stream ends.
+
+        Args:
+            message: User message
+            context: Optional context information
+
+        Yields:
+            Chunks of the response text
+        """
+        with get_tracer().span("agent.turn", agent=self.name, streamed=True) as span:
+            self.conversation_history.append({"role": "user", "content": message})
+            system_prompt = await self.get_system_prompt()
+            chunks = []
+            async for chunk in self._stream_complete(system_prompt, context):
+                chunks.append(chunk)
+                yield chunk
+            response = "".join(chunks)
+            self.conversation_history.append({"role": "assistant", "content": response})
+            if span.recording:
+                span.set(message_bytes=payload_bytes(message), reply_bytes=payload_bytes(response))
+        logger.info("Message streamed", agent=self.name, message_length=len(message))
+
+    async def _stream_complete(
+        self, system_prompt: str, context: dict[str, Any] | None = None
+    ) -> AsyncIterator[str]:
+        """Stream the next reply to the conversation history in the configured mode.
+
+        Text is yielded as it arrives. Native function calls arrive whole and are yielded
+        last, rendered as tool-call JSON (see ``_reply_text``). The time to the first chunk
+        is recorded in ``last_time_to_first_token`` and ``usage``.
+
+        Args:
+            system_prompt: System prompt to include
+            context: Optional context information
+
+        Yields:
+            Chunks of the reply text
+        """
+        await self._compact_history()
+        if self.execution_mode == "chat":
+            model, contents, kwargs = await self._chat_request(system_prompt, context)
+        else:
+            model = self.model
+            contents = self._format_conversation_for_gemini(system_prompt)
+            contents += self._transcript.render_context(context)
+            tools = self._function_tools(context)
+            kwargs = {"tools": tools} if tools else {}
+
+        started = time.perf_counter()
+        self.last_time_to_first_token = None
+        self.last_function_calls = []
+
+        def first_token() -> None:
+            if self.last_time_to_first_token is None:
+                self.last_time_to_first_token = time.perf_counter() - started
+                self.usage["streamed_calls"] += 1
+                self.usage["first_token_seconds"] += self.last_time_to_first_token
+
+        with self._model_span(contents, streamed=True) as span:
+            try:
+                try:
+                    response = await model.generate_content_async(contents, stream=True, **kwargs)
+                except Exception as e:
+                    if not self._context_cache_lost(e):
+                        raise
+                    model, contents, kwargs = await self._chat_request(system_prompt, context)
+                    response = await model.generate_content_async(contents, stream=True, **kwargs)
+                async for chunk in response:
+                    calls = function_calls(chunk)
+                    if calls:
+                        self.last_function_calls.extend(calls)
+                        continue
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # A chunk without text parts, e.g. one carrying only the finish reason
+                        continue
+                    if text:
+                        first_token()
+                        yield text
+            except Exception as e:
+                logger.error("Failed to stream response", error=str(e))
+                raise
+            self._record_usage(response, started)
+            span.set(time_to_first_token=self.last_time_to_first_token)
+        if self.last_function_calls:
+            first_token()
+            yield self._render_function_calls(self.last_function_calls)
+
+    async def _complete(self, system_prompt: str, context: dict[str, Any] | None = None) -> str:
+        """Generate the next reply to the conversation history in the configured mode.
+
+        Args:
+            system_prompt: System prompt to include
+            context: Optional context information
+
+        Returns:
+            Generated response
+        """
+        await self._compact_history()
+        if self.execution_mode == "chat":
+            return await self._generate_chat_response(system_prompt, context)
+        conversation_text = self._format_conversation_for_gemini(system_prompt)
+        return await self._generate_response(conversation_text, context)
+
+    async def _compact_history(self) -> None:
+        """Apply the history policy and record how many tokens it saved."""
+        if self.history_policy is None or not self.conversation_history:
+            return
+        compacted = await self.history_policy.compact(self.conversation_history)
+        if compacted is self.conversation_history:
+            return
+        saved = history_tokens(self.conversation_history) - history_tokens(compacted)
+        self.conversation_history[:] = compacted
+        # Messages may have been rewritten in place, so the cached transcript is stale.
+        self._transcript.reset()
+        self.tokens_saved += saved
+        logger.info("Conversation history compacted", agent=self.name, tokens_saved=saved)
+
     def _format_conversation_for_gemini(self, system_prompt: str) -> str:
         """Format conversation history for Gemini.
 
+        Only messages added since the previous call are formatted; earlier turns are
+        reused from the cached transcript.
+
         Args:
             system_prompt: System prompt to include
 
         Returns:
             Formatted conversation string
         """
-        formatted = f"System: {system_prompt}\n\n"
-
-        for message in self.conversation_history:
-            role = "Human" if message["role"] == "user" else "Assistant"
-            formatted += f"{role}: {message['content']}\n\n"
-
-        return formatted
+        return self._transcript.render(system_prompt, self.conversation_history)
 
     async def _generate_response(
         self, conversation_text: str, context: dict[str, Any] | None = None
@@ -122,24 +296,268 @@ class BaseAgent(ABC):
         """
         try:
             # Add context if provided
-            if context:
-                conversation_text += f"\nContext: {json.dumps(context, indent=2)}\n\n"
-
-            # Generate response
+            conversation_text += self._transcript.render_context(context)
 
-            response = await self.model.generate_content_async(conversation_text)
+            # Generate response, offering the tools as function declarations
+            tools = self._function_tools(context)
+            kwargs = {"tools": tools} if tools else {}
+            with self._model_span(conversation_text):
+                started = time.perf_counter()
+                response = await self.model.generate_content_async(conversation_text, **kwargs)
+                self._record_usage(response, started)
 
-            return response.text
+            return self._reply_text(response)
 
         except Exception as e:
             logger.error("Failed to generate response", error=str(e))
             raise
 
+    def _build_chat_contents(self, context: dict[str, Any] | None = None) -> list[dict[str, Any]]:
+        """Convert the conversation history to Gemini role/parts contents.
+
+        Args:
+            context: Optional context information; stable keys are left to the prefix
+
+        Returns:
+            List of contents
+        """
+        contents = [
+            {"role": "user" if msg["role"] == "user" else "model", "parts": [msg["content"]]}
+            for msg in self.conversation_history
+        ]
+        dynamic = {k: v for k, v in (context or {}).items() if k not in STABLE_CONTEXT_KEYS}
+        if dynamic:
+            contents.append(
+                {"role": "user", "parts": [f"Context: {json.dumps(dynamic, indent=2)}"]}
+            )
+        return contents
+
+    async def _get_chat_model(self, system_prompt: str, context: dict[str, Any] | None = None):
+        """Get the model for the stable prefix, creating its context cache on first use.
+
+        The system prompt and the stable context (the tool catalog) form the prefix. It is
+        stored as cached content when large enough and caching is enabled; otherwise the
+        system prompt becomes the system instruction and the stable context is sent inline.
+
+        Args:
+            system_prompt: System prompt to include
+            context: Optional context information
+
+        Returns:
+            Model to send the conversation to
+        """
+        stable = {k: v for k, v in (context or {}).items() if k in STABLE_CONTEXT_KEYS}
+        stable_block = self._transcript.render_context(stable).strip()
+        key = (system_prompt, stable_block)
+        if key == self._chat_prefix_key and not self._context_cache_expiring():
+            return self._chat_model
+
+        await self._release_context_cache()
+        prefix = [{"role": "user", "parts": [stable_block]}] if stable_block else []
+        model = None
+        self._chat_tools_cached = False
+        prefix_tokens = estimate_tokens(system_prompt + stable_block)
+        if (
+            prefix
+            and config.gemini.gemini_context_cache
+            and prefix_tokens >= config.gemini.gemini_context_cache_min_tokens
+        ):
+            try:
+                model, self.context_cache_name = await self.backend.cached_model(
+                    self.model_name,
+                    self.generation_config,
+                    system_prompt,
+                    prefix,
+                    config.gemini.gemini_context_cache_ttl,
+                    tools=self._function_tools(context),
+                )
+                prefix = []
+                self._chat_tools_cached = True
+                self._context_cache_expires_at = (
+                    time.monotonic() + config.gemini.gemini_context_cache_ttl
+                )
+                logger.info(
+                    "Context cache created",
+                    agent=self.name,
+                    cache=self.context_cache_name,
+                    prefix_tokens=prefix_tokens,
+                )
+            except Exception as e:
+                logger.warning("Context cache unavailable, sending prefix inline", error=str(e))
+
+        if model is None:
+            model = self.backend.generative_model(
+                self.model_name, self.generation_config, system_instruction=system_prompt
+            )
+
+        self._chat_model = model
+        self._chat_prefix_key = key
+        self._chat_inline_prefix = prefix
+        return model
+
+    async def _generate_chat_response(
+        self, system_prompt: str, context: dict[str, Any] | None = None
+    ) -> str:
+        """Generate response using structured multi-turn contents.
+
+        Args:
+            system_prompt: System prompt to include
+            context: Optional context information
+
+        Returns:
+            Generated response
+        """
+        try:
+            model, contents, kwargs = await self._chat_request(system_prompt, context)
+            try:
+                response = await self._send_chat(model, contents, kwargs)
+            except Exception as e:
+                if not self._context_cache_lost(e):
+                    raise
+                model, contents, kwargs = await self._chat_request(system_prompt, context)
+                response = await self._send_chat(model, contents, kwargs)
+
+            return self._reply_text(response)
+
+        except Exception as e:
+            logger.error("Failed to generate chat response", error=str(e))
+            raise
+
+    async def _chat_request(
+        self, system_prompt: str, context: dict[str, Any] | None
+    ) -> tuple[Any, list[dict[str, Any]], dict[str, Any]]:
+        """Model, contents and keyword arguments of the next chat-mode request."""
+        model = await self._get_chat_model(system_prompt, context)
+        contents = self._chat_inline_prefix + self._build_chat_contents(context)
+        # A cached prefix already holds the function declarations.
+        tools = None if self._chat_tools_cached else self._function_tools(context)
+        return model, contents, {"tools": tools} if tools else {}
+
+    async def _send_chat(self, model: Any, contents: list[dict[str, Any]], kwargs: dict) -> Any:
+        with self._model_span(contents):
+            started = time.perf_counter()
+            response = await model.generate_content_async(contents, **kwargs)
+            self._record_usage(response, started)
+        return response
+
+    def _context_cache_expiring(self) -> bool:
+        """Whether the context cache expires soon and should be recreated."""
+        if self.context_cache_name is None:
+            return False
+        margin = min(CONTEXT_CACHE_REFRESH_SECONDS, config.gemini.gemini_context_cache_ttl / 10)
+        return time.monotonic() >= self._context_cache_expires_at - margin
+
+    def _context_cache_lost(self, error: Exception) -> bool:
+        """Forget the context cache if ``error`` says it no longer exists.
+
+        Returns:
+            True when the request should be retried with a new cache
+        """
+        if self.context_cache_name is None or getattr(error, "code", None) != 404:
+            return False
+        logger.warning(
+            "Context cache not found, recreating it",
+            cache=self.context_cache_name,
+            error=str(error),
+        )
+        self.context_cache_name = None
+        self._chat_prefix_key = None
+        return True
+
+    def _function_tools(self, context: dict[str, Any] | None) -> list[dict[str, Any]] | None:
+        """Gemini ``tools`` declaring the context's available tools as functions.
+
+        Returns:
+            The tools argument, or None when function calling is disabled or there are no
+            tools
+        """
+        tools = (context or {}).get("available_tools")
+        if not tools or not config.gemini.gemini_function_calling:
+            return None
+        # The tool catalog hands out the same list until it changes, so convert it once.
+        if self._declared_tools is None or self._declared_tools[0] is not tools:
+            self._declared_tools = (tools, function_declarations(tools))
+        return [{"function_declarations": self._declared_tools[1]}]
+
+    def _reply_text(self, response: Any) -> str:
+        """Text of a model reply, with native function calls rendered as tool-call JSON.
+
+        Function calls are recorded in ``last_function_calls`` and rendered in the
+        ``{"tool_name", "parameters"}`` format (a list for several calls), so the
+        conversation history keeps a single text representation of tool calls.
+        """
+        self.last_function_calls = function_calls(response)
+        if not self.last_function_calls:
+            return response.text
+        return self._render_function_calls(self.last_function_calls)
+
+    @staticmethod
+    def _render_function_calls(calls: list[tuple[str, dict[str, Any]]]) -> str:
+        rendered = [{"tool_name": name, "parameters": arguments} for name, arguments in calls]
+        return json.dumps(rendered[0] if len(rendered) == 1 else rendered)
+
+    async def _release_context_cache(self) -> None:
+        """Delete the context cache of the current prefix, if any."""
+        if self.context_cache_name is None:
+            return
+        name, self.context_cache_name = self.context_cache_name, None
+        try:
+            await self.backend.delete_cache(name)
+        except Exception as e:
+            logger.warning("Failed to delete context cache", cache=name, error=str(e))
+
+    @contextlib.contextmanager
+    def _model_span(self, contents: Any, streamed: bool = False) -> Iterator[Span]:
+        """Span of a model call, with the size of the request."""
+        with get_tracer().span(
+            "model.generate",
+            agent=self.name,
+            model=self.model_name,
+            mode=self.execution_mode,
+            streamed=streamed,
+            context_cache=self.execution_mode == "chat" and self.context_cache_name is not None,
+        ) as span:
+            if span.recording:
+                span.set(prompt_bytes=payload_bytes(contents))
+            yield span
+
+    def _record_usage(self, response: Any, started: float) -> None:
+        """Accumulate latency and token usage of a model call.
+
+        The call's token counts are also added to the current span.
+        """
+        self.usage["calls"] += 1
+        self.usage["latency_seconds"] += time.perf_counter() - started
+        metadata = getattr(response, "usage_metadata", None)
+        span = current_span()
+        for key, field in (
+            ("prompt_tokens", "prompt_token_count"),
+            ("cached_tokens", "cached_content_token_count"),
+            ("output_tokens", "candidates_token_count"),
+        ):
+            value = getattr(metadata, field, None)
+            if isinstance(value, int):
+                self.usage[key] += value
+                span.set(**{key: value})
+
     def clear_conversation(self) -> None:
         """Clear the conversation history."""
         self.conversation_history.clear()
+        self._transcript.reset()
         logger.info("Conversation history cleared", agent=self.name)
 
+    def truncate_conversation(self, length: int) -> None:
+        """Drop the messages after the first ``length``, e.g. to undo an abandoned turn."""
+        del self.conversation_history[length:]
+
+    def restore_conversation(self, messages: list[dict[str, str]]) -> None:
+        """Replace the history with an earlier copy of it, e.g. to undo an abandoned turn.
+
+        Unlike ``truncate_conversation``, this also undoes a history policy compacting or
+        rewriting the history during the turn.
+        """
+        self.conversation_history[:] = messages
+
     def get_conversation_summary(self) -> dict[str, Any]:
         """Get a summary of the current conversation.
 
@@ -151,4 +569,8 @@ class BaseAgent(ABC):
             "model": self.model_name,
             "message_count": len(self.conversation_history),
             "conversation_length": sum(len(msg["content"]) for msg in self.conversation_history),
+            "estimated_tokens": history_tokens(self.conversation_history),
+            "tokens_saved": self.tokens_saved,
+            "execution_mode": self.execution_mode,
+            "usage": dict(self.usage),
         }
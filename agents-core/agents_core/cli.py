@@ -1,10 +1,12 @@
 import asyncio
+import json
+from collections.abc import Iterator
+from typing import TextIO
 
 import click
-import mcp
-from fastmcp import Client
 
-from agents_core.search_agent import SearchAgent
+# Commands import what they use when they run, so ``--help`` and light commands such as
+# ``list-tools`` do not load the Gemini SDK or the agents (see benchmarks/startup.py).
 
 
 @click.group()
@@ -17,35 +19,130 @@ def cli():
 @click.option("--url", default="http://localhost:8000/mcp/", help="The URL of the MCP server.")
 def list_tools(url):
     """Lists the available tools on the MCP server."""
-    config = {
-        "mcpServers": {
-            "default": {"url": url},
-        }
-    }
-    client = Client(config)
+    from agents_core.mcp_session import close_all_sessions, get_session_manager
 
     async def _list_tools():
-        async with client:
-            tools: list[mcp.types.Tool] = await client.list_tools()
+        try:
+            tools = await get_session_manager(url).list_tools()
             for tool in tools:
                 click.echo(f"- {tool.name}: {tool.description}")
+        finally:
+            await close_all_sessions()
 
     asyncio.run(_list_tools())
 
 
+def _read_batch(file: TextIO) -> Iterator[str | ValueError]:
+    """Yield queries from a JSONL file of strings or objects with a "query" key.
+
+    A line that is not valid JSON, or an object without a "query", is yielded as a
+    ValueError so ``run_batch`` reports it in place and carries on with the other lines.
+    """
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield ValueError(f"line {number}: invalid JSON: {e}")
+            continue
+        if not isinstance(record, dict):
+            yield str(record)
+        elif "query" in record:
+            yield str(record["query"])
+        else:
+            yield ValueError(f'line {number}: object has no "query" key')
+
+
 @cli.command()
-@click.argument("question")
+@click.argument("question", required=False)
 @click.option("--url", default="http://localhost:8000/mcp/", help="The URL of the MCP server.")
-def search_agent(question, url):
-    """Runs the search agent with a given question."""
+@click.option(
+    "--batch",
+    type=click.File("r"),
+    help="JSONL file of queries; results are written as JSONL as they complete.",
+)
+@click.option("--concurrency", default=8, show_default=True, help="Queries in flight in --batch.")
+@click.option(
+    "--selection-batch-size",
+    default=1,
+    show_default=True,
+    help="Queries routed by one Gemini call in --batch.",
+)
+def search_agent(question, url, batch, concurrency, selection_batch_size):
+    """Runs the search agent with a given question, or over a batch of questions."""
+    if (question is None) == (batch is None):
+        raise click.UsageError("Pass either QUESTION or --batch.")
+    from agents_core.mcp_session import close_all_sessions
+    from agents_core.search_agent import SearchAgent
 
     async def _search_agent():
-        agent = SearchAgent(mcp_server_url=url)
-        result = await agent(question)
-        click.echo(result)
+        try:
+            agent = SearchAgent(mcp_server_url=url)
+            if batch is None:
+                click.echo(await agent(question))
+                return
+            entries = agent.run_batch(
+                _read_batch(batch),
+                concurrency=concurrency,
+                selection_batch_size=selection_batch_size,
+            )
+            async for entry in entries:
+                click.echo(json.dumps(entry))
+        finally:
+            await close_all_sessions()
 
     asyncio.run(_search_agent())
 
 
+@cli.command()
+@click.argument("message")
+@click.option("--url", default="http://localhost:8000/mcp/", help="The URL of the MCP server.")
+@click.option(
+    "--stream/--no-stream",
+    default=True,
+    show_default=True,
+    help="Print the reply as it arrives and report the time to first token.",
+)
+def actor(message, url, stream):
+    """Sends a message to the actor agent and prints its reply."""
+    from agents_core.actor_agent import ActorAgent
+    from agents_core.mcp_session import close_all_sessions
+
+    async def _actor():
+        try:
+            agent = ActorAgent(mcp_server_url=url)
+            if not stream:
+                click.echo(await agent.process_message(message))
+                return
+            async for chunk in agent.stream_message(message):
+                click.echo(chunk, nl=False)
+            click.echo()
+            if agent.last_time_to_first_token is not None:
+                click.echo(f"Time to first token: {agent.last_time_to_first_token:.3f}s", err=True)
+        finally:
+            await close_all_sessions()
+
+    asyncio.run(_actor())
+
+
+@cli.command()
+@click.option("--url", default="http://localhost:8000/mcp/", help="The URL of the MCP server.")
+@click.option("--host", help="Address to bind (defaults to SERVER_HOST).")
+@click.option("--port", type=int, help="Port to bind (defaults to SERVER_PORT).")
+def serve(url, host, port):
+    """Serves actor agent sessions over HTTP."""
+    import uvicorn
+
+    from agents_core.config import config
+    from agents_core.server import AgentServer
+
+    uvicorn.run(
+        AgentServer(mcp_server_url=url).app(),
+        host=host or config.server.server_host,
+        port=port or config.server.server_port,
+    )
+
+
 if __name__ == "__main__":
     cli()
@@ -1,27 +1,121 @@
 """Configuration management for agents_core."""
 
+import atexit
 import logging.config
 import sys
+from typing import TYPE_CHECKING, Any, cast
 
 import structlog
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
+if TYPE_CHECKING:
+    from agents_core.log_pipeline import QueuedStream
+
 
 class MCPServerConfig(BaseSettings):
     """Configuration for MCP servers."""
 
     web_search_mcp_url: str = "http://localhost:8000/mcp"
     timeout: int = 10  # Timeout for MCP requests in seconds
+    max_concurrency: int = 8  # Maximum in-flight requests per shared session
+    keepalive_interval: float = 30.0  # Seconds between keep-alive pings, 0 disables
+    max_retries: int = 1  # Reconnect attempts for a read (not a tool call) that lost its session
+    tool_catalog_ttl: float = 300.0  # Seconds a cached tool catalog stays fresh
+    max_parallel_tool_calls: int = 4  # Tool calls from one actor turn that run at once
+    tool_call_timeout: float = 120.0  # Per-call timeout for batched tool calls in seconds
 
 
 class GeminiConfig(BaseSettings):
     """Configuration for Google Gemini."""
 
-    gemini_api_key: str
+    gemini_api_key: str = ""  # Only needed once a Gemini model is used
     gemini_model: str = "gemini-2.5-flash"
     gemini_temperature: float = 0.1
     gemini_max_tokens: int = 8192
+    gemini_execution_mode: str = "text"  # "text" flattens history, "chat" sends role/parts
+    gemini_context_cache: bool = True  # Cache the system prompt and tool catalog in chat mode
+    gemini_context_cache_ttl: int = 3600  # Lifetime of a cached prefix in seconds
+    gemini_context_cache_min_tokens: int = 1024  # Smaller prefixes are sent inline
+    gemini_function_calling: bool = True  # Offer tools as native function declarations
+
+
+class RouterConfig(BaseSettings):
+    """Configuration for the local tool pre-router."""
+
+    # Route obvious queries without a model call. Off by default: a routed query is passed
+    # to the tool verbatim, where the model would have rewritten it.
+    router_enabled: bool = False
+    router_threshold: float = 0.75  # Minimum confidence of a local routing decision
+
+
+class SemanticCacheConfig(BaseSettings):
+    """Configuration for the semantic answer cache."""
+
+    semantic_cache_enabled: bool = False  # Answer near-duplicate queries from the cache
+    semantic_cache_url: str = "http://localhost:6333"  # Qdrant, empty for in-process only
+    semantic_cache_collection: str = "semantic_cache"
+    semantic_cache_embedder: str = "hashing"  # "hashing" (local) or "gemini"
+    semantic_cache_embedding_model: str = "models/text-embedding-004"
+    semantic_cache_threshold: float = 0.92  # Minimum cosine similarity of a cache hit
+    semantic_cache_ttl: float = 3600.0  # Lifetime of a cached answer in seconds
+    semantic_cache_max_entries: int = 1000  # Entries kept by the in-process index
+
+
+class OrchestratorConfig(BaseSettings):
+    """Configuration for the actor-critic orchestrator."""
+
+    orchestrator_max_turns: int = 8  # Maximum actor steps per run
+    orchestrator_max_tokens: int = 200_000  # Token budget of both agents per run, 0 disables
+    orchestrator_max_seconds: float = 300.0  # Wall-time budget per run, 0 disables
+    orchestrator_speculative: bool = True  # Start the next actor step during each review
+    orchestrator_critic_memory: int = 2  # Earlier reviews kept in the critic's history
+
+
+class ServerConfig(BaseSettings):
+    """Configuration for the multi-session agent server."""
+
+    server_host: str = "127.0.0.1"
+    server_port: int = 8080
+    server_max_sessions: int = 1000  # Sessions kept at once; the least recently used idle one goes
+    server_max_active_turns: int = 32  # Turns processed at once
+    server_max_queued_turns: int = 128  # Turns waiting for a slot before answering 429
+    server_max_model_calls: int = 16  # Gemini calls in flight across all sessions
+    server_max_tool_calls: int = 16  # MCP tool calls in flight across all sessions
+    server_idle_timeout: float = 1800.0  # Seconds before an unused session is evicted, 0 disables
+
+
+class SessionStoreConfig(BaseSettings):
+    """Configuration for durable agent sessions."""
+
+    session_store: str = ""  # "memory", "sqlite" or "file"; empty keeps sessions in process
+    session_store_path: str = "sessions.db"  # SQLite database or directory of session files
+
+
+class TracingConfig(BaseSettings):
+    """Configuration for spans of agent turns, model calls and MCP round trips."""
+
+    tracing_exporter: str = ""  # "file" or "otlp"; empty disables tracing
+    tracing_file: str = "traces.jsonl"  # JSON lines written by the "file" exporter
+    tracing_otlp_endpoint: str = "http://localhost:4318"  # Collector for the "otlp" exporter
+    tracing_service_name: str = "agents-core"
+
+
+class LoggingConfig(BaseSettings):
+    """Configuration for the log pipeline."""
+
+    log_format: str = "dev"  # "dev" renders for a terminal, "json" is the production pipeline
+    log_max_field_chars: int = 512  # Longer values are cut and tagged with a digest (json)
+    log_queue_size: int = 10_000  # Lines waiting for the writer thread before dropping (json)
+    # Share of calls kept per hot-path event (json); warnings and errors are always kept
+    log_sample_rates: dict[str, float] = Field(
+        default_factory=lambda: {
+            "Message processed": 0.1,
+            "Message streamed": 0.1,
+            "Agent received query": 0.1,
+            "Selected tool": 0.1,
+        }
+    )
 
 
 class AgentConfig(BaseModel):
@@ -33,35 +127,109 @@ class AgentConfig(BaseModel):
     # Gemini settings
     gemini: GeminiConfig = Field(default_factory=GeminiConfig)
 
+    # Tool pre-router settings
+    router: RouterConfig = Field(default_factory=RouterConfig)
+
+    # Semantic answer cache settings
+    semantic_cache: SemanticCacheConfig = Field(default_factory=SemanticCacheConfig)
+
+    # Actor-critic orchestrator settings
+    orchestrator: OrchestratorConfig = Field(default_factory=OrchestratorConfig)
+
+    # Multi-session server settings
+    server: ServerConfig = Field(default_factory=ServerConfig)
+
+    # Session store settings
+    session_store: SessionStoreConfig = Field(default_factory=SessionStoreConfig)
+
+    # Tracing settings
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+
     # Logging
     log_level: str = "INFO"
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
 
 
-def configure_logging(log_level: str = "INFO") -> None:
-    """Configure structured logging with filename information."""
+_log_stream: "QueuedStream | None" = None
 
-    # Configure standard logging
-    logging.basicConfig(
-        format="%(message)s",
-        stream=sys.stdout,
-        level=getattr(logging, log_level.upper()),
-    )
 
-    # Configure structlog processors
-    processors = [
-        # Add filename and line number to log records
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.add_logger_name,
-        structlog.processors.CallsiteParameterAdder(
-            parameters=[
-                structlog.processors.CallsiteParameter.FILENAME,
-                structlog.processors.CallsiteParameter.LINENO,
-                structlog.processors.CallsiteParameter.FUNC_NAME,
-            ]
-        ),
-        structlog.processors.TimeStamper(fmt="ISO"),
-        structlog.dev.ConsoleRenderer(),
-    ]
+def stop_logging() -> None:
+    """Write the log lines still queued by the ``json`` pipeline and stop its writer thread."""
+    global _log_stream
+    if _log_stream is not None:
+        logging.getLogger().removeHandler(_log_stream.handler)
+        _log_stream.stop()
+        _log_stream = None
+
+
+def configure_logging(log_level: str = "INFO", settings: LoggingConfig | None = None) -> None:
+    """Configure structured logging.
+
+    The ``dev`` format adds the call site to every event and renders for a terminal. The
+    ``json`` format skips the frame inspection, samples hot-path events, bounds field sizes
+    and writes JSON lines from a background thread (see ``agents_core.log_pipeline``);
+    records of stdlib loggers get the same timestamp, level and exception rendering.
+
+    Args:
+        log_level: Minimum level of the events written
+        settings: Log pipeline settings, ``dev`` format when omitted
+    """
+    global _log_stream
+    if settings is not None and settings.log_format not in ("dev", "json"):
+        raise ValueError(f"Unknown log format: {settings.log_format}")
+    level = getattr(logging, log_level.upper())
+    stop_logging()
+
+    if settings is None or settings.log_format == "dev":
+        # Configure standard logging
+        logging.basicConfig(format="%(message)s", stream=sys.stdout, level=level)
+
+        processors = [
+            # Add filename and line number to log records
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.CallsiteParameterAdder(
+                parameters=[
+                    structlog.processors.CallsiteParameter.FILENAME,
+                    structlog.processors.CallsiteParameter.LINENO,
+                    structlog.processors.CallsiteParameter.FUNC_NAME,
+                ]
+            ),
+            structlog.processors.TimeStamper(fmt="ISO"),
+            structlog.dev.ConsoleRenderer(),
+        ]
+    else:
+        from agents_core.log_pipeline import EventSampler, FieldLimiter, QueuedStream
+
+        # Shared by structlog events and records of stdlib loggers
+        shared = [
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt="iso", utc=True),
+            structlog.processors.format_exc_info,
+        ]
+        if settings.log_max_field_chars:
+            shared.append(FieldLimiter(settings.log_max_field_chars))
+        formatter = structlog.stdlib.ProcessorFormatter(
+            processors=[
+                structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+                structlog.processors.JSONRenderer(),
+            ],
+            foreign_pre_chain=shared,
+        )
+        _log_stream = QueuedStream(max_queued=settings.log_queue_size, formatter=formatter)
+        root = logging.getLogger()
+        root.addHandler(_log_stream.handler)
+        root.setLevel(level)
+        atexit.register(stop_logging)
+
+        processors = [
+            # Drop filtered and sampled-out events before any work is done on them
+            structlog.stdlib.filter_by_level,
+            EventSampler(settings.log_sample_rates),
+            *shared,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ]
 
     # Configure structlog
     structlog.configure(
@@ -72,8 +240,28 @@ def configure_logging(log_level: str = "INFO") -> None:
     )
 
 
-# Global configuration instance
-config = AgentConfig()
+_config: AgentConfig | None = None
+
+
+def get_config() -> AgentConfig:
+    """Read the configuration from the environment on first use and configure logging."""
+    global _config
+    if _config is None:
+        _config = AgentConfig()
+        configure_logging(_config.log_level, _config.logging)
+    return _config
+
 
-# Configure logging on module import
-configure_logging(config.log_level)
+class _LazyConfig:
+    """Stands in for the ``AgentConfig`` instance until an attribute is read.
+
+    Importing a module that uses ``config`` then costs neither reading the environment
+    nor configuring logging; commands that never read a setting never pay for it.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_config(), name)
+
+
+# Global configuration instance
+config = cast(AgentConfig, _LazyConfig())
@@ -1,16 +1,57 @@
 """Critic agent that evaluates the work of other agents."""
 
+from dataclasses import dataclass
+from typing import Any
+
 from agents_core.base_agent import BaseAgent
+from agents_core.function_calling import iter_json_values
+
+
+@dataclass
+class Verdict:
+    """The critic's assessment of one step."""
+
+    approved: bool  # The step is correct and moves the task forward
+    complete: bool  # The task is fully accomplished
+    feedback: str
 
 
 class CriticAgent(BaseAgent):
     """Critic agent that evaluates the work of other agents."""
 
-    def __init__(self, name: str = "Critic", model_name: str | None = None):
-        super().__init__(name, model_name)
+    def __init__(self, name: str = "Critic", model_name: str | None = None, **kwargs: Any):
+        super().__init__(name, model_name, **kwargs)
 
     async def get_system_prompt(self) -> str:
         return "You are a critic agent. Your goal is to evaluate the work of other agents and provide constructive feedback."
 
     async def get_available_tools(self) -> list[dict[str, any]]:
         return []
+
+    async def review(self, task: str, step: int, output: str) -> Verdict:
+        """Review one step of another agent's work on a task.
+
+        Args:
+            task: The task being worked on
+            step: Number of the step, starting at 1
+            output: What the agent produced in this step
+
+        Returns:
+            The verdict; a reply without a JSON verdict counts as a rejection with the
+            reply as feedback
+        """
+        reply = await self.process_message(
+            f"Task: {task}\n\nStep {step} of the agent:\n{output}\n\n"
+            'Reply with a JSON object with three keys: "approved" (true if the step is '
+            'correct and moves the task forward), "complete" (true if the task is fully '
+            'accomplished) and "feedback" (what to change, or an empty string).'
+        )
+        for payload in iter_json_values(reply):
+            if isinstance(payload, dict) and "approved" in payload:
+                approved = payload["approved"] is True
+                return Verdict(
+                    approved=approved,
+                    complete=approved and payload.get("complete") is True,
+                    feedback=str(payload.get("feedback") or ""),
+                )
+        return Verdict(approved=False, complete=False, feedback=reply.strip())
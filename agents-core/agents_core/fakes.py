@@ -0,0 +1,257 @@
+"""Offline stand-ins for Gemini, for tests and benchmarks."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any
+
+from agents_core.tokens import estimate_tokens
+
+
+def _contents_text(contents: Any) -> str:
+    """Flatten prompt contents (a string or role/parts dictionaries) to text."""
+    if isinstance(contents, str):
+        return contents
+    parts = []
+    for content in contents:
+        if isinstance(content, dict):
+            parts.extend(str(part) for part in content.get("parts", []))
+        else:
+            parts.append(str(content))
+    return "\n".join(parts)
+
+
+@dataclass
+class FakeUsageMetadata:
+    """Token usage reported by the fake model."""
+
+    prompt_token_count: int
+    candidates_token_count: int
+    cached_content_token_count: int = 0
+    total_token_count: int = field(init=False)
+
+    def __post_init__(self):
+        self.total_token_count = self.prompt_token_count + self.candidates_token_count
+
+
+@dataclass
+class FakeFunctionCall:
+    """A native function call returned by the fake model instead of text."""
+
+    name: str
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+class FakeNotFound(Exception):
+    """Raised like ``google.api_core.exceptions.NotFound`` for an expired context cache."""
+
+    code = 404
+
+
+# A fake reply: text, one function call, or several function calls made in one turn.
+FakeReply = str | FakeFunctionCall | tuple[FakeFunctionCall, ...]
+
+
+@dataclass
+class FakeResponse:
+    """Minimal ``GenerateContentResponse`` look-alike."""
+
+    text: str
+    usage_metadata: FakeUsageMetadata
+    function_calls: list[FakeFunctionCall] = field(default_factory=list)
+
+    @property
+    def candidates(self) -> list[SimpleNamespace]:
+        parts = [SimpleNamespace(text="", function_call=call) for call in self.function_calls]
+        if self.text:
+            parts.insert(0, SimpleNamespace(text=self.text, function_call=None))
+        return [SimpleNamespace(content=SimpleNamespace(parts=parts))]
+
+
+class FakeStreamResponse:
+    """Streamed reply: iterating yields ``FakeResponse`` chunks, like ``stream=True``.
+
+    The usage metadata describes the whole reply, as Gemini's last chunk does.
+    """
+
+    def __init__(self, response: FakeResponse, chunk_chars: int, chunk_latency: float):
+        self.usage_metadata = response.usage_metadata
+        self._response = response
+        self._chunk_chars = max(1, chunk_chars)
+        self._chunk_latency = chunk_latency
+
+    async def __aiter__(self) -> AsyncIterator[FakeResponse]:
+        text = self._response.text
+        for start in range(0, len(text), self._chunk_chars):
+            if start and self._chunk_latency:
+                await asyncio.sleep(self._chunk_latency)
+            yield FakeResponse(text[start : start + self._chunk_chars], self.usage_metadata)
+        if self._response.function_calls:
+            yield FakeResponse("", self.usage_metadata, self._response.function_calls)
+
+
+class FakeGenerativeModel:
+    """Deterministic stand-in for ``genai.GenerativeModel``.
+
+    Replies come from ``responder`` (a fixed reply, a list consumed in order, or a
+    callable receiving the prompt contents), and every request is recorded in ``calls``
+    with its keyword arguments (e.g. ``tools``) in ``call_kwargs``. A reply is text or one
+    or more ``FakeFunctionCall`` objects.
+    ``latency`` delays each reply to mimic a model round trip, and replies shorter than
+    ``response_chars`` are padded with trailing whitespace, which keeps JSON replies parseable.
+    With ``stream=True`` the reply arrives in chunks of ``chunk_chars`` characters,
+    ``chunk_latency`` seconds apart. A model reading a context cache listed in
+    ``expired_caches`` raises ``FakeNotFound``, as Gemini does once the cache has expired.
+    """
+
+    def __init__(
+        self,
+        responder: FakeReply | list[FakeReply] | Callable[[Any], FakeReply] = "ok",
+        system_instruction: str | None = None,
+        cached_tokens: int = 0,
+        latency: float = 0.0,
+        response_chars: int = 0,
+        chunk_chars: int = 16,
+        chunk_latency: float = 0.0,
+        cache_name: str | None = None,
+        expired_caches: set[str] | None = None,
+    ):
+        self.responder = responder
+        self.system_instruction = system_instruction
+        self.cache_name = cache_name
+        self.expired_caches = expired_caches if expired_caches is not None else set()
+        self.cached_tokens = cached_tokens
+        self.latency = latency
+        self.response_chars = response_chars
+        self.chunk_chars = chunk_chars
+        self.chunk_latency = chunk_latency
+        self.calls: list[Any] = []
+        self.call_kwargs: list[dict[str, Any]] = []
+
+    def _reply(self, contents: Any) -> FakeReply:
+        if callable(self.responder):
+            return self.responder(contents)
+        if isinstance(self.responder, list):
+            return self.responder.pop(0) if self.responder else "ok"
+        return self.responder
+
+    async def generate_content_async(
+        self, contents: Any, stream: bool = False, **kwargs: Any
+    ) -> FakeResponse | FakeStreamResponse:
+        if self.cache_name in self.expired_caches:
+            raise FakeNotFound(f"CachedContent not found: {self.cache_name}")
+        self.calls.append(contents)
+        self.call_kwargs.append(kwargs)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        reply = self._reply(contents)
+        function_calls = []
+        if isinstance(reply, FakeFunctionCall):
+            function_calls, reply = [reply], ""
+        elif isinstance(reply, tuple):
+            function_calls, reply = list(reply), ""
+        text = reply.ljust(self.response_chars) if reply else ""
+        prompt_tokens = estimate_tokens(_contents_text(contents))
+        if self.system_instruction:
+            prompt_tokens += estimate_tokens(self.system_instruction)
+        response = FakeResponse(
+            text=text,
+            usage_metadata=FakeUsageMetadata(
+                prompt_token_count=prompt_tokens + self.cached_tokens,
+                candidates_token_count=estimate_tokens(text),
+                cached_content_token_count=self.cached_tokens,
+            ),
+            function_calls=function_calls,
+        )
+        if stream:
+            return FakeStreamResponse(response, self.chunk_chars, self.chunk_latency)
+        return response
+
+
+class FakeGeminiBackend:
+    """Offline ``GeminiBackend`` handing out ``FakeGenerativeModel`` instances.
+
+    Add a cache name to ``expired_caches`` to make the models reading it fail.
+    """
+
+    def __init__(
+        self,
+        responder: FakeReply | list[FakeReply] | Callable[[Any], FakeReply] = "ok",
+        latency: float = 0.0,
+        response_chars: int = 0,
+        chunk_chars: int = 16,
+        chunk_latency: float = 0.0,
+    ):
+        # Models created by one backend consume a single shared list of replies.
+        self.responder = list(responder) if isinstance(responder, list) else responder
+        self.latency = latency
+        self.response_chars = response_chars
+        self.chunk_chars = chunk_chars
+        self.chunk_latency = chunk_latency
+        self.models: list[FakeGenerativeModel] = []
+        self.caches: dict[str, dict[str, Any]] = {}
+        self.deleted_caches: list[str] = []
+        self.expired_caches: set[str] = set()
+        self.embeddings = 0
+
+    def _model(self, **kwargs: Any) -> FakeGenerativeModel:
+        model = FakeGenerativeModel(
+            self.responder,
+            latency=self.latency,
+            response_chars=self.response_chars,
+            chunk_chars=self.chunk_chars,
+            chunk_latency=self.chunk_latency,
+            **kwargs,
+        )
+        self.models.append(model)
+        return model
+
+    def generative_model(
+        self, model_name: str, generation_config: Any, system_instruction: str | None = None
+    ) -> FakeGenerativeModel:
+        return self._model(system_instruction=system_instruction)
+
+    async def cached_model(
+        self,
+        model_name: str,
+        generation_config: Any,
+        system_instruction: str,
+        contents: list[dict[str, Any]],
+        ttl_seconds: int,
+        tools: list[dict[str, Any]] | None = None,
+    ) -> tuple[FakeGenerativeModel, str]:
+        name = f"cachedContents/fake-{len(self.caches)}"
+        self.caches[name] = {
+            "system_instruction": system_instruction,
+            "contents": contents,
+            "tools": tools,
+        }
+        cached_text = system_instruction + _contents_text(contents)
+        model = self._model(
+            cached_tokens=estimate_tokens(cached_text),
+            cache_name=name,
+            expired_caches=self.expired_caches,
+        )
+        return model, name
+
+    async def delete_cache(self, name: str) -> None:
+        self.deleted_caches.append(name)
+
+    async def embed(self, text: str, model_name: str = "fake-embedding") -> list[float]:
+        # Local import: semantic_cache imports config, which fakes must not require.
+        from agents_core.semantic_cache import hashing_embedding
+
+        self.embeddings += 1
+        return hashing_embedding(text)
+
+
+def fake_tool_call(tool_name: str, **parameters: Any) -> str:
+    """Render an actor tool call the way the model is asked to reply."""
+    return json.dumps({"tool_name": tool_name, "parameters": parameters})
+
+
+def fake_function_call(tool_name: str, **arguments: Any) -> FakeFunctionCall:
+    """A native function call of a tool, as Gemini returns it with function declarations."""
+    return FakeFunctionCall(tool_name, arguments)
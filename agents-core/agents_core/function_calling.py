@@ -0,0 +1,159 @@
+"""Native Gemini function calling for MCP tools, and a tolerant JSON extractor for text replies."""
+
+import json
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any
+
+# Schema keys Gemini's OpenAPI subset accepts; anything else (titles, defaults, $defs,
+# additionalProperties, ...) is rejected by the API and dropped.
+_SCHEMA_KEYS = ("type", "format", "description", "nullable", "enum", "items", "properties")
+_SCHEMA_TYPES = {"string", "number", "integer", "boolean", "array", "object"}
+
+
+def _gemini_schema(schema: Mapping[str, Any]) -> dict[str, Any]:
+    """Convert a JSON schema to the subset Gemini function declarations accept."""
+    schema = dict(schema)
+    options = schema.pop("anyOf", None) or schema.pop("oneOf", None)
+    if options:
+        # Optional[X] becomes a nullable X; other unions keep their first alternative.
+        concrete = [option for option in options if option.get("type") != "null"]
+        merged = {**(concrete[0] if concrete else {"type": "string"}), **schema}
+        if len(concrete) < len(options):
+            merged["nullable"] = True
+        return _gemini_schema(merged)
+
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        concrete = [name for name in kind if name != "null"]
+        schema["type"] = concrete[0] if concrete else "string"
+        if len(concrete) < len(kind):
+            schema["nullable"] = True
+    if schema.get("type") not in _SCHEMA_TYPES:
+        schema["type"] = "object" if "properties" in schema else "string"
+
+    converted = {key: schema[key] for key in _SCHEMA_KEYS if key in schema}
+    if "enum" in converted:
+        converted["enum"] = [str(value) for value in converted["enum"]]
+    if converted["type"] == "array":
+        converted["items"] = _gemini_schema(schema.get("items") or {"type": "string"})
+    if converted["type"] == "object":
+        properties = {
+            name: _gemini_schema(value) for name, value in (schema.get("properties") or {}).items()
+        }
+        if not properties:
+            # Gemini rejects objects without properties; a free-form value travels as text.
+            return {"type": "string", "description": schema.get("description", "JSON object")}
+        converted["properties"] = properties
+        required = [name for name in schema.get("required", []) if name in properties]
+        if required:
+            converted["required"] = required
+    return converted
+
+
+def function_declarations(tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Convert serialized MCP tools to Gemini function declarations.
+
+    Args:
+        tools: Tools as ``model_dump`` dictionaries with ``name``, ``description`` and
+            ``inputSchema``
+
+    Returns:
+        Function declarations, to be passed as ``tools=[{"function_declarations": ...}]``
+    """
+    declarations = []
+    for tool in tools:
+        declaration = {"name": tool["name"], "description": tool.get("description") or ""}
+        properties = (tool.get("inputSchema") or {}).get("properties")
+        if properties:
+            declaration["parameters"] = _gemini_schema(tool["inputSchema"])
+        declarations.append(declaration)
+    return declarations
+
+
+def _to_python(value: Any) -> Any:
+    """Convert protobuf map and list wrappers in function-call arguments to plain values."""
+    if isinstance(value, Mapping):
+        return {key: _to_python(item) for key, item in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, str | bytes):
+        return [_to_python(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        # Struct values carry every number as a float.
+        return int(value)
+    return value
+
+
+def function_calls(response: Any) -> list[tuple[str, dict[str, Any]]]:
+    """Read the ``function_call`` parts of a Gemini response.
+
+    Returns:
+        ``(name, arguments)`` pairs in the order the model made the calls, empty when the
+        reply is plain text
+    """
+    calls = []
+    for candidate in getattr(response, "candidates", None) or []:
+        for part in getattr(getattr(candidate, "content", None), "parts", None) or []:
+            call = getattr(part, "function_call", None)
+            if call and call.name:
+                calls.append((call.name, _to_python(call.args or {})))
+        # Only the first candidate is used, as with ``response.text``.
+        break
+    return calls
+
+
+class JSONStreamExtractor:
+    """Finds complete JSON objects and arrays in text that may arrive in chunks.
+
+    Prose, Markdown fences and other text around the JSON values are skipped. Bracket
+    depth is tracked outside string literals, and a span that closes but does not parse
+    (e.g. ``{placeholder}`` in prose) is rescanned from its next opening bracket.
+    """
+
+    def __init__(self):
+        self._buffer: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        """Consume a chunk of text.
+
+        Returns:
+            The JSON values completed by this chunk, in order
+        """
+        values: list[Any] = []
+        for char in chunk:
+            if self._depth == 0:
+                if char in "{[":
+                    self._buffer = [char]
+                    self._depth = 1
+                continue
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    values.extend(self._close())
+        return values
+
+    def _close(self) -> list[Any]:
+        text = "".join(self._buffer)
+        self._buffer = []
+        try:
+            return [json.loads(text)]
+        except json.JSONDecodeError:
+            return self.feed(text[1:])
+
+
+def iter_json_values(text: str) -> Iterator[Any]:
+    """Yield the complete JSON objects and arrays embedded in a text, in order."""
+    yield from JSONStreamExtractor().feed(text)
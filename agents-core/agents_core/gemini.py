@@ -0,0 +1,115 @@
+"""Construction of Gemini models and context caches."""
+
+import asyncio
+import datetime
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from agents_core.config import config
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
+
+logger = structlog.get_logger(__name__)
+
+
+def _genai():
+    """Import the Gemini SDK on first use; it is the slowest import of the package."""
+    import google.generativeai as genai
+
+    return genai
+
+
+class GeminiBackend:
+    """Builds Gemini models, optionally on top of a cached-content prefix.
+
+    Agents go through this class rather than ``genai`` directly so the model can be swapped
+    for an offline stand-in such as ``agents_core.fakes.FakeGeminiBackend``.
+    """
+
+    def __init__(self):
+        if config.gemini.gemini_api_key:
+            _genai().configure(api_key=config.gemini.gemini_api_key)
+
+    def generative_model(
+        self,
+        model_name: str,
+        generation_config: "genai.types.GenerationConfigType | None",
+        system_instruction: str | None = None,
+    ) -> "genai.GenerativeModel":
+        """Create a model.
+
+        Args:
+            model_name: Gemini model to use
+            generation_config: Generation settings
+            system_instruction: Optional system instruction
+
+        Returns:
+            Generative model
+        """
+        return _genai().GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            system_instruction=system_instruction,
+        )
+
+    async def cached_model(
+        self,
+        model_name: str,
+        generation_config: "genai.types.GenerationConfigType",
+        system_instruction: str,
+        contents: list[dict[str, Any]],
+        ttl_seconds: int,
+        tools: list[dict[str, Any]] | None = None,
+    ) -> tuple["genai.GenerativeModel", str]:
+        """Create a cached-content prefix and a model that reads from it.
+
+        Args:
+            model_name: Gemini model to use
+            generation_config: Generation settings
+            system_instruction: System instruction stored in the cache
+            contents: Stable leading contents stored in the cache
+            ttl_seconds: Lifetime of the cache
+            tools: Function declarations stored in the cache; a model reading from a cache
+                cannot be sent tools with each request
+
+        Returns:
+            Tuple of the model and the cache name
+        """
+        genai = _genai()
+        cache = await asyncio.to_thread(
+            genai.caching.CachedContent.create,
+            model=model_name,
+            system_instruction=system_instruction,
+            contents=contents,
+            tools=tools,
+            ttl=datetime.timedelta(seconds=ttl_seconds),
+        )
+        model = genai.GenerativeModel.from_cached_content(
+            cache, generation_config=generation_config
+        )
+        return model, cache.name
+
+    async def delete_cache(self, name: str) -> None:
+        """Delete a cached-content prefix.
+
+        Args:
+            name: Cache name returned by ``cached_model``
+        """
+        await asyncio.to_thread(_genai().caching.CachedContent(name).delete)
+
+    async def embed(self, text: str, model_name: str = "models/text-embedding-004") -> list[float]:
+        """Embed a text for similarity search.
+
+        Args:
+            text: Text to embed
+            model_name: Gemini embedding model
+
+        Returns:
+            Embedding vector
+        """
+        result = await _genai().embed_content_async(
+            model=model_name, content=text, task_type="semantic_similarity"
+        )
+        return result["embedding"]
@@ -0,0 +1,173 @@
+"""Policies that bound the size of an agent's conversation history."""
+
+import hashlib
+from abc import ABC, abstractmethod
+from typing import Any
+
+import structlog
+
+from agents_core.tokens import estimate_tokens
+
+logger = structlog.get_logger(__name__)
+
+TOOL_RESULT_PREFIX = "Tool result:"
+SUMMARY_PREFIX = "Summary of the earlier conversation:"
+
+
+def history_tokens(history: list[dict[str, str]]) -> int:
+    """Estimate the number of tokens in a conversation history."""
+    return sum(estimate_tokens(message["content"]) for message in history)
+
+
+class HistoryPolicy(ABC):
+    """Base class for history compaction policies.
+
+    A policy receives the full history before each model call and returns the history to
+    keep. Policies must not mutate the messages they are given; changed messages are
+    returned as new dictionaries.
+    """
+
+    @abstractmethod
+    async def compact(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        """Compact a conversation history.
+
+        Args:
+            history: Conversation history, oldest message first
+
+        Returns:
+            History to keep
+        """
+        pass
+
+
+def starts_turn(message: dict[str, str]) -> bool:
+    """Whether a message opens a user turn (a user message that is not a tool result)."""
+    # "Tool result: ..." and "Tool result error" both answer the assistant's tool call.
+    return message["role"] == "user" and not message["content"].startswith("Tool result")
+
+
+class SlidingWindowPolicy(HistoryPolicy):
+    """Keeps the most recent turns that fit in a token budget.
+
+    The window always starts at a user turn, so it never opens on an assistant reply or on
+    a tool result whose tool call was cut off.
+    """
+
+    def __init__(self, max_tokens: int):
+        """Initialize the policy.
+
+        Args:
+            max_tokens: Token budget for the history; the newest turn is always kept whole
+        """
+        self.max_tokens = max_tokens
+
+    async def compact(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        kept = 0
+        total = 0
+        for message in reversed(history):
+            total += estimate_tokens(message["content"])
+            if kept and total > self.max_tokens:
+                break
+            kept += 1
+        if kept == len(history):
+            return history
+
+        cut = len(history) - kept
+        turn_starts = [i for i, message in enumerate(history) if starts_turn(message)]
+        # Move the cut forward to the next turn; when the newest turn alone is over budget,
+        # move it back to that turn's start instead.
+        later = [i for i in turn_starts if i >= cut]
+        cut = later[0] if later else max([i for i in turn_starts if i < cut], default=0)
+        return history[cut:] if cut else history
+
+
+class ToolResultDigestPolicy(HistoryPolicy):
+    """Shrinks all but the most recent tool results to a short digest."""
+
+    def __init__(self, keep_recent: int = 1, max_chars: int = 200):
+        """Initialize the policy.
+
+        Args:
+            keep_recent: Number of most recent tool results left untouched
+            max_chars: Characters of each older tool result kept in its digest
+        """
+        self.keep_recent = keep_recent
+        self.max_chars = max_chars
+
+    @staticmethod
+    def _is_digest(content: str) -> bool:
+        return content.startswith(f"{TOOL_RESULT_PREFIX} [digest of ")
+
+    def _digest(self, content: str) -> str:
+        body = content[len(TOOL_RESULT_PREFIX) :].strip()
+        checksum = hashlib.sha1(body.encode()).hexdigest()[:12]
+        return (
+            f"{TOOL_RESULT_PREFIX} [digest of {len(body)} chars, sha1 {checksum}] "
+            f"{body[: self.max_chars]}..."
+        )
+
+    async def compact(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        positions = [
+            i
+            for i, message in enumerate(history)
+            if message["content"].startswith(TOOL_RESULT_PREFIX)
+            and len(message["content"]) > len(TOOL_RESULT_PREFIX) + self.max_chars
+            and not self._is_digest(message["content"])
+        ]
+        older = positions[: max(0, len(positions) - self.keep_recent)]
+        if not older:
+            return history
+
+        compacted = list(history)
+        for i in older:
+            compacted[i] = {**compacted[i], "content": self._digest(compacted[i]["content"])}
+        return compacted
+
+
+class SummarizingPolicy(HistoryPolicy):
+    """Replaces older turns with a model-written summary once over a token budget."""
+
+    def __init__(self, model: Any, max_tokens: int, keep_recent: int = 4):
+        """Initialize the policy.
+
+        Args:
+            model: Model with ``generate_content_async``, e.g. a ``genai.GenerativeModel``
+                or ``agents_core.fakes.FakeGenerativeModel``
+            max_tokens: Token budget that triggers summarization
+            keep_recent: Number of most recent messages kept verbatim
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+
+    async def compact(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        if history_tokens(history) <= self.max_tokens or len(history) <= self.keep_recent:
+            return history
+
+        split = len(history) - self.keep_recent
+        older, recent = history[:split], history[split:]
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in older)
+        prompt = (
+            "Summarize the following conversation between a user and an assistant. "
+            "Keep facts, decisions, tool results and open questions that later turns may "
+            "need, and omit everything else.\n\n" + transcript
+        )
+        try:
+            response = await self.model.generate_content_async(prompt)
+        except Exception as e:
+            logger.warning("History summarization failed, keeping full history", error=str(e))
+            return history
+        summary = {"role": "user", "content": f"{SUMMARY_PREFIX} {response.text.strip()}"}
+        return [summary, *recent]
+
+
+class CompositePolicy(HistoryPolicy):
+    """Applies several policies in order."""
+
+    def __init__(self, *policies: HistoryPolicy):
+        self.policies = policies
+
+    async def compact(self, history: list[dict[str, str]]) -> list[dict[str, str]]:
+        for policy in self.policies:
+            history = await policy.compact(history)
+        return history
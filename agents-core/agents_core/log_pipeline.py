@@ -0,0 +1,141 @@
+"""Production logging: bounded fields, sampled hot-path events, JSON written off the loop.
+
+The pieces ``configure_logging`` assembles in ``json`` mode:
+
+- ``FieldLimiter`` cuts long values down to a prefix, tagging them with their full length
+  and a short digest so identical payloads can still be matched across lines
+- ``EventSampler`` keeps a fixed share of high-volume events; warnings and errors are
+  always kept
+- ``DroppingQueueHandler`` hands rendered lines to a ``QueueListener`` thread, so a slow
+  stdout never blocks the event loop; when the queue is full the line is dropped and
+  counted instead
+
+The handler sits on the root logger and renders with a ``structlog.stdlib.ProcessorFormatter``,
+so records of stdlib loggers (httpx, fastmcp, ...) become JSON lines too.
+"""
+
+import hashlib
+import logging
+import logging.handlers
+import math
+import queue
+import sys
+from typing import Any
+
+import structlog
+
+# Keys added by structlog itself, never limited.
+_RESERVED = frozenset({"event", "level", "logger", "timestamp", "sampled"})
+_KEPT_LEVELS = frozenset({"warn", "warning", "error", "critical", "exception"})
+
+
+def digest(value: str | bytes) -> str:
+    """Short, stable fingerprint of a payload."""
+    if isinstance(value, str):
+        value = value.encode("utf-8", "replace")
+    return hashlib.sha256(value).hexdigest()[:12]
+
+
+def limit_value(value: Any, max_chars: int) -> Any:
+    """Return ``value`` unchanged if it is short, otherwise a truncated string describing it."""
+    if isinstance(value, (bool, int, float)) or value is None:
+        return value
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= max_chars:
+        return value
+    return f"{text[:max_chars]}...[{len(text)} chars, sha256:{digest(text)}]"
+
+
+class FieldLimiter:
+    """Processor that bounds the size of every field of an event."""
+
+    def __init__(self, max_chars: int):
+        """Initialize the processor.
+
+        Args:
+            max_chars: Characters kept per field
+        """
+        self.max_chars = max_chars
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict) -> dict:
+        for key, value in event_dict.items():
+            if key not in _RESERVED:
+                event_dict[key] = limit_value(value, self.max_chars)
+        return event_dict
+
+
+class EventSampler:
+    """Processor that keeps a share of the events named in ``rates``.
+
+    Sampling is deterministic: an event with rate 0.1 is kept once every ten calls, and kept
+    events carry ``sampled=<rate>`` so counts can be scaled back up.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        """Initialize the processor.
+
+        Args:
+            rates: Share of calls to keep per event name, between 0 and 1
+        """
+        self.rates = rates
+        self._calls: dict[str, int] = {}
+        self.dropped = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: dict) -> dict:
+        event = event_dict.get("event")
+        rate = self.rates.get(event) if isinstance(event, str) else None
+        if rate is None or rate >= 1 or method_name in _KEPT_LEVELS:
+            return event_dict
+        calls = self._calls.get(event, 0) + 1
+        self._calls[event] = calls
+        # Keep the calls where the expected number of kept events steps up.
+        if math.ceil(calls * rate) == math.ceil((calls - 1) * rate):
+            self.dropped += 1
+            raise structlog.DropEvent
+        event_dict["sampled"] = rate
+        return event_dict
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that never blocks: records that do not fit are dropped and counted."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class QueuedStream:
+    """A ``DroppingQueueHandler`` and the listener thread writing its records to a stream."""
+
+    def __init__(
+        self,
+        stream: Any = None,
+        max_queued: int = 10_000,
+        formatter: logging.Formatter | None = None,
+    ):
+        """Initialize and start the listener.
+
+        Args:
+            stream: Destination of the log lines, stdout by default
+            max_queued: Records waiting to be written before new ones are dropped
+            formatter: Renders each record before it is queued, the bare message by default
+        """
+        target = logging.StreamHandler(stream or sys.stdout)
+        target.setFormatter(logging.Formatter("%(message)s"))
+        self.handler = DroppingQueueHandler(queue.Queue(max_queued))
+        if formatter is not None:
+            self.handler.setFormatter(formatter)
+        self.listener = logging.handlers.QueueListener(self.handler.queue, target)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Write the records still queued and stop the listener."""
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.flush()
@@ -0,0 +1,371 @@
+"""Long-lived MCP client sessions shared between agents."""
+
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
+
+import anyio
+import httpx
+import mcp
+import structlog
+from fastmcp import Client
+from fastmcp.client.client import CallToolResult
+from fastmcp.client.messages import MessageHandler
+from fastmcp.exceptions import ToolError
+
+from agents_core.config import config
+from agents_core.tool_catalog import ToolCatalogCache, tool_catalog
+from agents_core.tracing import get_tracer, payload_bytes
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# Errors that mean the underlying session is gone rather than that the request itself failed.
+_CONNECTION_ERRORS = (
+    ConnectionError,
+    httpx.TransportError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+)
+
+
+def default_client_factory(
+    server_url: str, message_handler: MessageHandler | None = None
+) -> Client:
+    """Create a fastmcp client for a single streamable-HTTP MCP server."""
+    return Client({"mcpServers": {"default": {"url": server_url}}}, message_handler=message_handler)
+
+
+def _propagate_trace_context(client: Client) -> None:
+    """Send the current ``traceparent`` in the ``_meta`` of the client's tool calls.
+
+    Requests are built in the calling task, so the current span is the caller's.
+    """
+    session = client.session
+    send_request = session.send_request
+
+    async def send_with_trace_context(request: Any, *args: Any, **kwargs: Any) -> Any:
+        traceparent = get_tracer().traceparent()
+        if traceparent and isinstance(request.root, mcp.types.CallToolRequest):
+            params = request.root.params
+            meta = params.meta or mcp.types.RequestParams.Meta()
+            params.meta = meta.model_copy(update={"traceparent": traceparent})
+        return await send_request(request, *args, **kwargs)
+
+    session.send_request = send_with_trace_context
+
+
+def _is_unknown_tool(text: str) -> bool:
+    return "unknown tool" in text.lower()
+
+
+class _CatalogInvalidator(MessageHandler):
+    """Drops the cached tool catalog when the server says its tools changed."""
+
+    def __init__(self, server_url: str, catalog: ToolCatalogCache):
+        self.server_url = server_url
+        self.catalog = catalog
+
+    async def on_tool_list_changed(self, message: mcp.types.ToolListChangedNotification) -> None:
+        self.catalog.invalidate(self.server_url, reason="tools_changed")
+
+
+class MCPSessionManager:
+    """Keeps one MCP session open per server and shares it between callers.
+
+    Opening a fastmcp ``Client`` costs an HTTP handshake plus an MCP ``initialize`` round
+    trip, so the manager connects lazily on first use and keeps the session open until
+    ``close`` is called. A background task pings the server every ``keepalive_interval``
+    seconds, reads such as ``list_tools`` that fail with a connection error are retried on a
+    fresh session, and a semaphore caps the number of in-flight requests. Tool calls are not
+    retried by default: the request may have reached the server before the connection
+    dropped, and running a tool with side effects twice is worse than reporting the error.
+    """
+
+    def __init__(
+        self,
+        server_url: str,
+        max_concurrency: int | None = None,
+        keepalive_interval: float | None = None,
+        max_retries: int | None = None,
+        client_factory: Callable[..., Client] = default_client_factory,
+        catalog: ToolCatalogCache | None = None,
+    ):
+        """Initialize the session manager.
+
+        Args:
+            server_url: URL of the MCP server
+            max_concurrency: Maximum number of in-flight requests (defaults to config)
+            keepalive_interval: Seconds between keep-alive pings, 0 disables (defaults to config)
+            max_retries: Reconnect attempts for a retried request that lost its session
+                (defaults to config)
+            client_factory: Callable building a new ``Client`` for ``server_url``, receiving
+                the ``message_handler`` keyword argument
+            catalog: Tool catalog cache (defaults to the process-wide one)
+        """
+        self.server_url = server_url
+        self.max_concurrency = max_concurrency or config.mcp.max_concurrency
+        self.keepalive_interval = (
+            config.mcp.keepalive_interval if keepalive_interval is None else keepalive_interval
+        )
+        self.max_retries = config.mcp.max_retries if max_retries is None else max_retries
+        self.client_factory = client_factory
+        self.catalog = catalog or tool_catalog
+        self._message_handler = _CatalogInvalidator(server_url, self.catalog)
+
+        self._client: Client | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._keepalive_task: asyncio.Task | None = None
+        self.connect_count = 0
+
+    @property
+    def is_connected(self) -> bool:
+        """Whether a session is currently open."""
+        return self._client is not None and self._client.is_connected()
+
+    def _bind_loop(self) -> None:
+        """Reset loop-bound state when used from a different event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Sessions and asyncio primitives belong to the loop that created them, so a manager
+        # reused from a new loop (e.g. successive ``asyncio.run`` calls) starts over.
+        self._loop = loop
+        self._client = None
+        self._keepalive_task = None
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def connect(self) -> Client:
+        """Return the open session, connecting first if needed.
+
+        Returns:
+            Connected fastmcp client
+        """
+        self._bind_loop()
+        async with self._lock:
+            if self.is_connected:
+                return self._client
+
+            client = self.client_factory(self.server_url, message_handler=self._message_handler)
+            await client.__aenter__()
+            if get_tracer().enabled:
+                _propagate_trace_context(client)
+            self._client = client
+            self.connect_count += 1
+            logger.info(
+                "MCP session opened", server_url=self.server_url, connects=self.connect_count
+            )
+
+            if self.keepalive_interval and (
+                self._keepalive_task is None or self._keepalive_task.done()
+            ):
+                self._keepalive_task = asyncio.create_task(self._keepalive())
+            return client
+
+    async def _discard(self, client: Client) -> None:
+        """Drop a session, if it is still the current one."""
+        async with self._lock:
+            if self._client is client:
+                self._client = None
+        with contextlib.suppress(Exception):
+            await client.__aexit__(None, None, None)
+
+    async def _keepalive(self) -> None:
+        """Ping the server periodically and reopen the session if the ping fails."""
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            client = self._client
+            if client is None:
+                continue
+            try:
+                async with self._semaphore:
+                    await client.ping()
+            except Exception as e:
+                logger.warning("MCP keep-alive failed", server_url=self.server_url, error=str(e))
+                await self._discard(client)
+                with contextlib.suppress(Exception):
+                    await self.connect()
+
+    def _is_connection_error(self, error: Exception, client: Client) -> bool:
+        if isinstance(error, _CONNECTION_ERRORS):
+            return True
+        # fastmcp raises RuntimeError once the session has been torn down underneath us.
+        return isinstance(error, RuntimeError) and not client.is_connected()
+
+    async def run(self, operation: Callable[[Client], Awaitable[T]], retry: bool = True) -> T:
+        """Run an operation against the shared session.
+
+        Args:
+            operation: Coroutine function receiving the connected client
+            retry: Run the operation again on a fresh session after a connection error; only
+                safe for operations without side effects. Without it the broken session is
+                still dropped, so the next operation reconnects.
+
+        Returns:
+            Result of the operation
+        """
+        self._bind_loop()
+        retries = self.max_retries if retry else 0
+        async with self._semaphore:
+            for attempt in range(retries + 1):
+                client = await self.connect()
+                try:
+                    return await operation(client)
+                except Exception as e:
+                    if not self._is_connection_error(e, client):
+                        raise
+                    if attempt == retries:
+                        await self._discard(client)
+                        raise
+                    logger.warning(
+                        "MCP session lost, reconnecting",
+                        server_url=self.server_url,
+                        attempt=attempt + 1,
+                        error=str(e),
+                    )
+                    await self._discard(client)
+        raise AssertionError("unreachable")
+
+    @contextlib.asynccontextmanager
+    async def session(self) -> AsyncIterator[Client]:
+        """Hold a concurrency slot and yield the connected client."""
+        self._bind_loop()
+        async with self._semaphore:
+            yield await self.connect()
+
+    async def _fetch_tools(self) -> list[mcp.types.Tool]:
+        return await self.run(lambda client: client.list_tools())
+
+    async def _read_catalog(self, read: Callable[..., Awaitable[T]]) -> T:
+        """Read the tool catalog with a catalog cache method, recording a span."""
+        with get_tracer().span("mcp.list_tools", server_url=self.server_url) as span:
+            fetched = False
+
+            async def fetch() -> list[mcp.types.Tool]:
+                nonlocal fetched
+                fetched = True
+                return await self._fetch_tools()
+
+            tools = await read(self.server_url, fetch)
+            span.set(catalog_cache="miss" if fetched else "hit", tools=len(tools))
+            return tools
+
+    async def list_tools(self, refresh: bool = False) -> list[mcp.types.Tool]:
+        """List the tools exposed by the server, served from the catalog cache.
+
+        Args:
+            refresh: Drop the cached catalog before reading it
+
+        Returns:
+            List of tools
+        """
+        if refresh:
+            self.catalog.invalidate(self.server_url, reason="refresh")
+        return await self._read_catalog(self.catalog.get_tools)
+
+    async def list_tools_serialized(self) -> list[dict[str, Any]]:
+        """List the tools as cached ``model_dump`` dictionaries.
+
+        Returns:
+            List of serialized tools, shared between callers
+        """
+        return await self._read_catalog(self.catalog.get_serialized)
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        retry: bool = False,
+        **kwargs: Any,
+    ) -> CallToolResult:
+        """Call a tool on the server.
+
+        Args:
+            name: Tool name
+            arguments: Tool arguments
+            retry: Call the tool again on a fresh session after a connection error; only
+                for idempotent tools, since the first call may already have run
+            **kwargs: Extra keyword arguments for ``Client.call_tool``
+
+        Returns:
+            Tool call result
+        """
+        with get_tracer().span("mcp.call_tool", server_url=self.server_url, tool=name) as span:
+            if span.recording:
+                span.set(argument_bytes=payload_bytes(arguments or {}))
+            try:
+                result = await self.run(
+                    lambda client: client.call_tool(name, arguments=arguments, **kwargs),
+                    retry=retry,
+                )
+            except ToolError as e:
+                if _is_unknown_tool(str(e)):
+                    self.catalog.invalidate(self.server_url, reason="unknown_tool")
+                raise
+
+            if result.is_error and any(
+                _is_unknown_tool(getattr(item, "text", "")) for item in result.content
+            ):
+                self.catalog.invalidate(self.server_url, reason="unknown_tool")
+            if span.recording:
+                span.set(
+                    is_error=result.is_error,
+                    result_bytes=sum(
+                        payload_bytes(getattr(item, "text", "") or "") for item in result.content
+                    ),
+                )
+            return result
+
+    async def close(self) -> None:
+        """Stop the keep-alive task and close the session."""
+        if self._loop is not asyncio.get_running_loop():
+            # Nothing to clean up from this loop; the old loop owns the old session.
+            self._client = None
+            return
+
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._keepalive_task
+            self._keepalive_task = None
+
+        if self._client is not None:
+            await self._discard(self._client)
+            logger.info("MCP session closed", server_url=self.server_url)
+
+    async def __aenter__(self) -> "MCPSessionManager":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+_session_managers: dict[str, MCPSessionManager] = {}
+
+
+def get_session_manager(server_url: str) -> MCPSessionManager:
+    """Get the process-wide session manager for a server URL.
+
+    Args:
+        server_url: URL of the MCP server
+
+    Returns:
+        Shared session manager
+    """
+    manager = _session_managers.get(server_url)
+    if manager is None:
+        manager = _session_managers[server_url] = MCPSessionManager(server_url)
+    return manager
+
+
+async def close_all_sessions() -> None:
+    """Close every shared session. Call this on shutdown."""
+    managers = list(_session_managers.values())
+    _session_managers.clear()
+    await asyncio.gather(*(manager.close() for manager in managers), return_exceptions=True)
@@ -0,0 +1,267 @@
+"""Actor–critic loop: the actor works on a task step by step and the critic reviews each step."""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.base_agent import BaseAgent
+from agents_core.config import config
+from agents_core.critic_agent import CriticAgent, Verdict
+
+logger = structlog.get_logger(__name__)
+
+CONTINUE_MESSAGE = "Continue with the next step of the task."
+
+
+def _tokens(agent: BaseAgent) -> int:
+    return agent.usage["prompt_tokens"] + agent.usage["output_tokens"]
+
+
+@dataclass
+class StepResult:
+    """One agent call with its latency and token usage."""
+
+    output: Any
+    seconds: float
+    tokens: int
+
+
+@dataclass
+class Iteration:
+    """One actor step and the critic's review of it."""
+
+    step: int
+    output: str
+    verdict: Verdict
+    actor_seconds: float
+    critic_seconds: float
+    actor_tokens: int
+    critic_tokens: int
+    speculative: bool  # The step was started before the previous review finished
+    seconds: float  # Wall time since the previous iteration ended
+
+
+@dataclass
+class OrchestrationResult:
+    """Outcome of a run."""
+
+    output: str  # Output of the last approved step, or of the last step if none was
+    approved: bool  # The critic judged the task complete
+    stop_reason: str  # "approved", "max_turns", "max_tokens" or "max_seconds"
+    iterations: list[Iteration] = field(default_factory=list)
+    seconds: float = 0.0
+    tokens: int = 0
+    # Speculative steps started, kept after an approval, and cancelled after a rejection
+    speculation: dict[str, int] = field(
+        default_factory=lambda: {"started": 0, "kept": 0, "cancelled": 0, "wasted_tokens": 0}
+    )
+
+
+class ActorCriticOrchestrator:
+    """Runs actor → tool → critic iterations until the critic approves or a budget runs out.
+
+    With ``speculative`` set, the actor starts step N+1 (with a generic "continue" message)
+    while the critic reviews step N. An approval keeps the speculative step; a rejection
+    cancels it, rolls the actor's history back, and sends the critic's feedback instead.
+    Tool calls of a cancelled step are not undone, so turn speculation off for tools with
+    side effects.
+
+    Each review is self-contained, so the critic only keeps its last ``critic_memory``
+    reviews in its history; earlier ones would grow every later prompt.
+    """
+
+    def __init__(
+        self,
+        actor: ActorAgent,
+        critic: CriticAgent,
+        max_turns: int | None = None,
+        max_tokens: int | None = None,
+        max_seconds: float | None = None,
+        speculative: bool | None = None,
+        critic_memory: int | None = None,
+    ):
+        """Initialize the orchestrator.
+
+        Args:
+            actor: Agent doing the work
+            critic: Agent reviewing each step
+            max_turns: Maximum actor steps (defaults to config)
+            max_tokens: Maximum prompt and output tokens of both agents, 0 for no limit
+                (defaults to config)
+            max_seconds: Maximum wall time of a run, 0 for no limit (defaults to config)
+            speculative: Start the next actor step during each review (defaults to config)
+            critic_memory: Earlier reviews kept in the critic's history (defaults to config)
+        """
+        settings = config.orchestrator
+        self.actor = actor
+        self.critic = critic
+        self.max_turns = max_turns or settings.orchestrator_max_turns
+        self.max_tokens = settings.orchestrator_max_tokens if max_tokens is None else max_tokens
+        self.max_seconds = settings.orchestrator_max_seconds if max_seconds is None else max_seconds
+        self.speculative = settings.orchestrator_speculative if speculative is None else speculative
+        self.critic_memory = (
+            settings.orchestrator_critic_memory if critic_memory is None else critic_memory
+        )
+        # The speculative actor step, a copy of the actor's history and its token count
+        # before the step
+        self._pending: tuple[asyncio.Task[StepResult], list[dict[str, str]], int] | None = None
+
+    @staticmethod
+    async def _measure(agent: BaseAgent, call) -> StepResult:
+        tokens = _tokens(agent)
+        started = time.perf_counter()
+        output = await call
+        return StepResult(output, time.perf_counter() - started, _tokens(agent) - tokens)
+
+    def _actor_step(self, message: str) -> asyncio.Task[StepResult]:
+        return asyncio.create_task(self._measure(self.actor, self.actor.process_message(message)))
+
+    def _speculate(self, result: OrchestrationResult) -> None:
+        """Start the next actor step before the current review is in."""
+        self._pending = (
+            self._actor_step(CONTINUE_MESSAGE),
+            list(self.actor.conversation_history),
+            _tokens(self.actor),
+        )
+        result.speculation["started"] += 1
+
+    async def _cancel_speculation(self, result: OrchestrationResult) -> None:
+        """Cancel the speculative step, if any, and roll the actor back to before it."""
+        if self._pending is None:
+            return
+        task, history, tokens = self._pending
+        self._pending = None
+        task.cancel()
+        # A failure of the abandoned step does not matter either.
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await task
+        result.speculation["cancelled"] += 1
+        result.speculation["wasted_tokens"] += _tokens(self.actor) - tokens
+        self.actor.restore_conversation(history)
+
+    def _forget_old_reviews(self) -> None:
+        """Drop the critic's reviews beyond the last ``critic_memory`` from its history."""
+        # A review is one request and one reply.
+        keep = 2 * self.critic_memory
+        history = self.critic.conversation_history
+        if len(history) > keep:
+            self.critic.restore_conversation(history[len(history) - keep :])
+
+    async def run(self, task: str) -> OrchestrationResult:
+        """Work on a task until the critic approves it or a budget is exhausted.
+
+        An orchestrator runs one task at a time.
+
+        Args:
+            task: The task for the actor
+
+        Returns:
+            The final output, the stop reason, and per-iteration latency and token usage
+        """
+        result = OrchestrationResult(output="", approved=False, stop_reason="max_turns")
+        started = time.perf_counter()
+        tokens_before = _tokens(self.actor) + _tokens(self.critic)
+        self._pending = None
+        try:
+            async with asyncio.timeout(self.max_seconds or None):
+                await self._iterate(task, result, started, tokens_before)
+        except TimeoutError:
+            result.stop_reason = "max_seconds"
+        finally:
+            await self._cancel_speculation(result)
+
+        result.seconds = time.perf_counter() - started
+        result.tokens = _tokens(self.actor) + _tokens(self.critic) - tokens_before
+        if not result.output and result.iterations:
+            result.output = result.iterations[-1].output
+        logger.info(
+            "Actor-critic run finished",
+            stop_reason=result.stop_reason,
+            iterations=len(result.iterations),
+            seconds=round(result.seconds, 3),
+            tokens=result.tokens,
+            speculation=result.speculation,
+        )
+        return result
+
+    async def _iterate(
+        self, task: str, result: OrchestrationResult, started: float, tokens_before: int
+    ) -> None:
+        """The loop of ``run``; sets the stop reason unless the turns run out."""
+        message = task
+        iteration_started = started
+        for step in range(1, self.max_turns + 1):
+            if self._pending is not None:
+                speculative, actor_step = True, self._pending[0]
+                self._pending = None
+            else:
+                speculative, actor_step = False, self._actor_step(message)
+            actor = await actor_step
+
+            self._forget_old_reviews()
+            review = asyncio.create_task(
+                self._measure(self.critic, self.critic.review(task, step, actor.output))
+            )
+            spent = _tokens(self.actor) + _tokens(self.critic) - tokens_before
+            if (
+                self.speculative
+                and step < self.max_turns
+                and (not self.max_tokens or spent < self.max_tokens)
+            ):
+                self._speculate(result)
+            try:
+                critic = await review
+            except BaseException:
+                review.cancel()
+                raise
+            verdict: Verdict = critic.output
+
+            now = time.perf_counter()
+            result.iterations.append(
+                Iteration(
+                    step=step,
+                    output=actor.output,
+                    verdict=verdict,
+                    actor_seconds=actor.seconds,
+                    critic_seconds=critic.seconds,
+                    actor_tokens=actor.tokens,
+                    critic_tokens=critic.tokens,
+                    speculative=speculative,
+                    seconds=now - iteration_started,
+                )
+            )
+            iteration_started = now
+            logger.info(
+                "Actor-critic iteration",
+                step=step,
+                approved=verdict.approved,
+                complete=verdict.complete,
+                actor_seconds=round(actor.seconds, 3),
+                critic_seconds=round(critic.seconds, 3),
+            )
+
+            if verdict.approved:
+                result.output = actor.output
+                if verdict.complete:
+                    result.approved = True
+                    result.stop_reason = "approved"
+                    return
+                if self._pending is not None:
+                    result.speculation["kept"] += 1
+                message = CONTINUE_MESSAGE
+            else:
+                await self._cancel_speculation(result)
+                message = (
+                    f"The critic rejected your last step: {verdict.feedback}\n"
+                    "Revise it and try again."
+                )
+
+            spent = _tokens(self.actor) + _tokens(self.critic) - tokens_before
+            if self.max_tokens and spent >= self.max_tokens:
+                result.stop_reason = "max_tokens"
+                return
@@ -0,0 +1,252 @@
+"""Local pre-router that picks obvious search tools without a model call."""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+import mcp
+import structlog
+
+from agents_core.config import config
+
+logger = structlog.get_logger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a text."""
+    return _TOKEN.findall(text.lower())
+
+
+@dataclass
+class RouteDecision:
+    """A routing decision for one query."""
+
+    tool_name: str
+    arguments: dict[str, Any]
+    confidence: float
+    source: str  # "rules" or "tfidf"
+
+
+@dataclass
+class Rule:
+    """Routes queries matching ``pattern`` to ``tool_name`` with a fixed confidence."""
+
+    tool_name: str
+    pattern: re.Pattern[str]
+    confidence: float = 0.9
+
+
+DEFAULT_RULES = [
+    Rule(
+        "news_search",
+        re.compile(
+            r"\b(news|headlines?|breaking|latest (on|about)|press release|announce[ds]?|"
+            r"this (week|morning)|today'?s)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    Rule(
+        "image_search",
+        re.compile(
+            r"\b(images?|pictures?|photos?|photographs?|pics|wallpapers?|logos?|"
+            r"what does .+ look like)\b",
+            re.IGNORECASE,
+        ),
+    ),
+    Rule(
+        "video_search",
+        re.compile(
+            r"\b(videos?|youtube|clips?|trailers?|footage|livestream|"
+            r"watch (a|the|how)|video tutorials?)\b",
+            re.IGNORECASE,
+        ),
+    ),
+]
+
+# Example queries per tool, added to the tool descriptions as nearest-neighbour documents.
+DEFAULT_EXAMPLES = {
+    "web_search": [
+        "what is the capital of france",
+        "how does photosynthesis work",
+        "who invented the telephone",
+        "python list comprehension syntax",
+        "best hiking trails near denver",
+        "definition of entropy",
+        "how to change a car tire",
+        "population of tokyo",
+        "recipe for banana bread",
+        "compare postgres and mysql",
+    ],
+    "news_search": [
+        "latest election results",
+        "stock market today",
+        "recent earthquake updates",
+        "what happened at the summit yesterday",
+        "new product launch announcement",
+    ],
+    "image_search": [
+        "golden retriever puppy",
+        "eiffel tower at night",
+        "modern kitchen design ideas",
+        "northern lights over iceland",
+    ],
+    "video_search": [
+        "how to tie a tie step by step",
+        "guitar lesson for beginners",
+        "highlights from last night's game",
+        "cat playing piano",
+    ],
+}
+
+
+class RuleRouter:
+    """Keyword and regex rules.
+
+    A query matching rules of a single tool gets that rule's confidence. When rules of
+    several tools match, the query is ambiguous and the confidence is divided between them.
+    """
+
+    def __init__(self, rules: list[Rule] | None = None):
+        self.rules = DEFAULT_RULES if rules is None else rules
+
+    def route(self, query: str) -> RouteDecision | None:
+        matched: dict[str, float] = {}
+        for rule in self.rules:
+            if rule.pattern.search(query):
+                matched[rule.tool_name] = max(matched.get(rule.tool_name, 0.0), rule.confidence)
+        if not matched:
+            return None
+        tool_name = max(matched, key=matched.get)
+        return RouteDecision(
+            tool_name, {"query": query}, matched[tool_name] / len(matched), source="rules"
+        )
+
+
+class TfidfRouter:
+    """Nearest-neighbour classifier over TF-IDF vectors of tool descriptions and examples.
+
+    The ``k`` most similar documents vote for their tool, weighted by cosine similarity. The
+    confidence is the winning tool's share of the vote, scaled down when even the nearest
+    document is a weaker match than ``min_similarity``.
+    """
+
+    def __init__(
+        self,
+        examples: dict[str, list[str]] | None = None,
+        k: int = 5,
+        min_similarity: float = 0.3,
+    ):
+        """Initialize the classifier.
+
+        Args:
+            examples: Example queries per tool name (defaults to ``DEFAULT_EXAMPLES``)
+            k: Number of nearest documents that vote
+            min_similarity: Similarity of the nearest document below which confidence drops
+        """
+        self.examples = DEFAULT_EXAMPLES if examples is None else examples
+        self.k = k
+        self.min_similarity = min_similarity
+        self._fitted_for: tuple[str, ...] | None = None
+        self._documents: list[tuple[str, dict[str, float]]] = []
+        self._idf: dict[str, float] = {}
+
+    def fit(self, tools: list[mcp.types.Tool]) -> None:
+        """Build document vectors from the tool descriptions and examples."""
+        labelled = []
+        for tool in tools:
+            labelled.append((tool.name, f"{tool.name.replace('_', ' ')} {tool.description or ''}"))
+            labelled.extend((tool.name, text) for text in self.examples.get(tool.name, []))
+
+        tokenized = [(name, tokenize(text)) for name, text in labelled]
+        document_frequency = Counter(token for _, tokens in tokenized for token in set(tokens))
+        count = len(tokenized)
+        self._idf = {
+            token: math.log((1 + count) / (1 + frequency)) + 1
+            for token, frequency in document_frequency.items()
+        }
+        self._documents = [(name, self._vector(tokens)) for name, tokens in tokenized]
+        self._fitted_for = tuple(sorted(tool.name for tool in tools))
+
+    def _vector(self, tokens: list[str]) -> dict[str, float]:
+        counts = Counter(token for token in tokens if token in self._idf)
+        vector = {token: n * self._idf[token] for token, n in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        return {token: value / norm for token, value in vector.items()} if norm else {}
+
+    def route(self, query: str, tools: list[mcp.types.Tool]) -> RouteDecision | None:
+        if self._fitted_for != tuple(sorted(tool.name for tool in tools)):
+            self.fit(tools)
+        vector = self._vector(tokenize(query))
+        if not vector:
+            return None
+
+        scores = sorted(
+            (
+                (sum(weight * document.get(token, 0.0) for token, weight in vector.items()), name)
+                for name, document in self._documents
+            ),
+            reverse=True,
+        )[: self.k]
+        votes: dict[str, float] = {}
+        for similarity, name in scores:
+            votes[name] = votes.get(name, 0.0) + similarity
+        total = sum(votes.values())
+        if not total:
+            return None
+
+        tool_name = max(votes, key=votes.get)
+        confidence = votes[tool_name] / total * min(1.0, scores[0][0] / self.min_similarity)
+        return RouteDecision(tool_name, {"query": query}, confidence, source="tfidf")
+
+
+class PreRouter:
+    """Routes obvious queries locally and defers the rest to the model.
+
+    Rules are tried first, then the TF-IDF classifier. A decision is returned only if its
+    confidence reaches ``threshold`` and its tool is in the server's catalog; otherwise
+    ``route`` returns None and the caller asks the model.
+    """
+
+    def __init__(
+        self,
+        rules: RuleRouter | None = None,
+        classifier: TfidfRouter | None = None,
+        threshold: float | None = None,
+    ):
+        """Initialize the pre-router.
+
+        Args:
+            rules: Rule router (defaults to the built-in rules)
+            classifier: Nearest-neighbour classifier (defaults to the built-in examples)
+            threshold: Minimum confidence for a local decision (defaults to config)
+        """
+        self.rules = rules or RuleRouter()
+        self.classifier = classifier or TfidfRouter()
+        self.threshold = config.router.router_threshold if threshold is None else threshold
+        self.stats = {"routed": 0, "deferred": 0}
+
+    def route(self, query: str, tools: list[mcp.types.Tool]) -> RouteDecision | None:
+        """Route a query if a local decision is confident enough.
+
+        Args:
+            query: The user's query
+            tools: Tools available on the server
+
+        Returns:
+            The decision, or None to defer to the model
+        """
+        available = {tool.name for tool in tools}
+        for decision in (self.rules.route(query), self.classifier.route(query, tools)):
+            if (
+                decision is not None
+                and decision.tool_name in available
+                and decision.confidence >= self.threshold
+            ):
+                self.stats["routed"] += 1
+                return decision
+        self.stats["deferred"] += 1
+        return None
@@ -1,35 +1,121 @@
 """Search agent that uses an MCP server to dynamically select and execute tools."""
 
+import asyncio
+import itertools
 import json
+from collections.abc import AsyncIterator, Iterable
 from typing import Any
 
-import google.generativeai as genai
 import mcp
 import structlog
-from fastmcp import Client
 from fastmcp.client.client import CallToolResult
 
 from agents_core.config import config
+from agents_core.function_calling import function_calls, function_declarations, iter_json_values
+from agents_core.gemini import GeminiBackend
+from agents_core.mcp_session import MCPSessionManager, get_session_manager
+from agents_core.router import PreRouter
+from agents_core.semantic_cache import SemanticCache, get_semantic_cache
+from agents_core.tracing import current_span, get_tracer
 
 logger = structlog.get_logger(__name__)
 
-# Configure the Gemini client
-genai.configure(api_key=config.gemini.gemini_api_key)
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None),
+}
+
+
+def _matches_type(value: Any, schema: dict[str, Any]) -> bool:
+    if "anyOf" in schema:
+        return any(_matches_type(value, option) for option in schema["anyOf"])
+    expected = schema.get("type")
+    if expected is None:
+        return True
+    types = expected if isinstance(expected, list) else [expected]
+    for name in types:
+        python_type = _JSON_TYPES.get(name)
+        # bool is a subclass of int, but JSON keeps them apart.
+        if python_type and isinstance(value, python_type):
+            if isinstance(value, bool) and name in ("integer", "number"):
+                continue
+            return True
+    return False
+
+
+def _matches_schema(arguments: Any, schema: dict[str, Any] | None) -> bool:
+    """Check tool arguments against the top level of a tool's JSON input schema.
+
+    Required properties must be present, known properties must have the declared type, and
+    unknown properties are rejected when the schema disallows them.
+    """
+    if not isinstance(arguments, dict):
+        return False
+    schema = schema or {}
+    properties = schema.get("properties", {})
+    if any(name not in arguments for name in schema.get("required", [])):
+        return False
+    for name, value in arguments.items():
+        if name not in properties:
+            if schema.get("additionalProperties") is False:
+                return False
+            continue
+        if not _matches_type(value, properties[name]):
+            return False
+    return True
 
 
 class SearchAgent:
     """Agent that uses Gemini to select and execute tools from an MCP server."""
 
-    def __init__(self, mcp_server_url: str):
+    def __init__(
+        self,
+        mcp_server_url: str,
+        mcp_session: MCPSessionManager | None = None,
+        backend: GeminiBackend | None = None,
+        router: PreRouter | None = None,
+        cache: SemanticCache | None = None,
+    ):
         """
         Initializes the SearchAgent.
 
         Args:
             mcp_server_url: The URL of the MCP server.
+            mcp_session: Session manager to use, defaults to the shared one for the URL.
+            backend: Builds the Gemini model; pass a fake backend to run offline.
+            router: Local pre-router for obvious tool choices, defaults to a ``PreRouter``
+                when ``config.router.router_enabled`` is set.
+            cache: Semantic cache of tool results, defaults to the shared one when
+                ``config.semantic_cache.semantic_cache_enabled`` is set.
         """
         self.mcp_server_url = mcp_server_url
-        self.model = genai.GenerativeModel(config.gemini.gemini_model)
-        self.mcp_config = {"mcpServers": {"default": {"url": self.mcp_server_url}}}
+        self.model = (backend or GeminiBackend()).generative_model(
+            config.gemini.gemini_model, generation_config=None
+        )
+        self.mcp_session = mcp_session or get_session_manager(self.mcp_server_url)
+        # Gemini calls made for tool selection, queries routed by batched calls, and
+        # queries that had to fall back to their own selection call.
+        self.selection_stats = {"model_calls": 0, "batched_queries": 0, "fallbacks": 0}
+        # Selection replies, and how they were read: as a native function call, as JSON
+        # text, or extracted from text around the JSON; parse failures select no tool.
+        self.parse_stats = {
+            "replies": 0,
+            "native": 0,
+            "text": 0,
+            "recovered": 0,
+            "parse_failures": 0,
+        }
+        self._declared_tools: tuple[list[mcp.types.Tool], list[dict[str, Any]]] | None = None
+        if router is None and config.router.router_enabled:
+            router = PreRouter()
+        self.router = router
+        self.cache = cache or get_semantic_cache()
+        self.cache_namespace = f"search_agent:{mcp_server_url}"
 
     async def __call__(self, query: str) -> str:
         """
@@ -41,38 +127,263 @@ class SearchAgent:
         Returns:
             The result from the executed tool as a string.
         """
+        try:
+            with get_tracer().span("agent.query", agent="SearchAgent"):
+                return await self._answer(query)
+        except Exception as e:
+            logger.error("An error occurred during agent execution.", exc_info=e)
+            return "I'm sorry, but an unexpected error occurred."
+
+    async def _answer(
+        self, query: str, selection: tuple[str | None, dict[str, Any]] | None = None
+    ) -> str:
+        """Answer a query, raising on unexpected errors.
+
+        Args:
+            query: The user's query.
+            selection: A ``(tool_name, arguments)`` decision made earlier, e.g. by
+                ``select_tools_batch``; without one the tool is selected here.
+        """
         logger.info("Agent received query", query=query)
+        # 0. Answer near-duplicates of earlier queries from the semantic cache
+        # A given selection decides the tool call, so it only shares answers with queries
+        # that were given the same one.
+        namespace = self.cache_namespace
+        if selection is not None:
+            namespace += ":" + json.dumps(selection, sort_keys=True, default=str)
+        if self.cache is not None:
+            hit = await self.cache.lookup(namespace, query)
+            current_span().set(semantic_cache="hit" if hit is not None else "miss")
+            if hit is not None:
+                return hit.value
+
+        # 1. List available tools (served from the shared tool catalog)
+        available_tools = await self.mcp_session.list_tools()
+        if not available_tools:
+            logger.warning("No tools available from MCP server.")
+            return "I'm sorry, but there are no tools available for me to use."
+
+        # 2. Route obvious queries locally, otherwise use Gemini to select the best tool
+        routed = selection or self._pre_route(query, available_tools)
+        tool_name, tool_args = routed or await self._select_tool(query, available_tools)
+        current_span().set(tool_name=tool_name, model_selected=routed is None)
+        if not tool_name:
+            logger.warning("Could not select a suitable tool.", query=query)
+            return "I'm sorry, but I couldn't find a suitable tool to answer your query."
+
+        logger.info("Selected tool", tool_name=tool_name, tool_args=tool_args)
+
+        # 3. Call the selected tool
+        result: CallToolResult = await self.mcp_session.call_tool(tool_name, tool_args)
+
+        # 4. Return the result
+        if result.is_error:
+            return f"Error calling tool {tool_name}: {result.data}"
+
+        if isinstance(result.structured_content, dict | list):
+            answer = json.dumps(result.structured_content, indent=2)
+        else:
+            answer = str(result.structured_content)
+        if self.cache is not None:
+            await self.cache.store(namespace, query, answer)
+        return answer
+
+    async def run_batch(
+        self,
+        queries: Iterable[str | Exception],
+        concurrency: int | None = None,
+        selection_batch_size: int = 1,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Answers many queries concurrently, yielding each result as soon as it completes.
+
+        All queries share the agent's MCP session and tool catalog. Queries are pulled from
+        ``queries`` lazily, so a large iterable is never held in memory at once.
+
+        Args:
+            queries: The queries to answer. An item that is an exception, such as an input
+                line that could not be parsed, is reported as that position's error.
+            concurrency: Maximum number of queries in flight (defaults to the MCP
+                session's concurrency limit).
+            selection_batch_size: Queries routed by a single Gemini call. With more than
+                one, each worker takes that many queries at a time and selects their tools
+                with ``select_tools_batch``.
+
+        Yields:
+            Dictionaries with the query's position ("index"), the "query" and either its
+            "result" or, if it failed, an "error". Results arrive in completion order.
+
+        Raises:
+            Exception: Whatever iterating ``queries`` raised, once the queries read before
+                it have been answered.
+        """
+        concurrency = concurrency or config.mcp.max_concurrency
+        pending = enumerate(queries)
+        in_flight = asyncio.Semaphore(concurrency)
+        results: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+
+        async def answer(index: int, query: str, selection=None) -> None:
+            async with in_flight:
+                try:
+                    entry = {
+                        "index": index,
+                        "query": query,
+                        "result": await self._answer(query, selection),
+                    }
+                except Exception as e:
+                    logger.warning("Batch query failed", index=index, error=str(e))
+                    entry = {"index": index, "query": query, "error": str(e) or type(e).__name__}
+            await results.put(entry)
+
+        async def worker() -> None:
+            try:
+                while chunk := list(itertools.islice(pending, selection_batch_size)):
+                    for index, query in chunk:
+                        if isinstance(query, Exception):
+                            await results.put({"index": index, "error": str(query)})
+                    chunk = [(i, query) for i, query in chunk if not isinstance(query, Exception)]
+                    if not chunk:
+                        continue
+                    if selection_batch_size == 1:
+                        await answer(*chunk[0])
+                        continue
+                    try:
+                        selections = await self.select_tools_batch([q for _, q in chunk])
+                    except Exception as e:
+                        logger.warning("Batched tool selection failed", error=str(e))
+                        selections = [None] * len(chunk)
+                    await asyncio.gather(
+                        *(
+                            answer(index, query, selection)
+                            for (index, query), selection in zip(chunk, selections, strict=True)
+                        )
+                    )
+            finally:
+                await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
         try:
-            async with Client(self.mcp_config) as mcp_client:
-                # 1. List available tools
-                available_tools = await mcp_client.list_tools()
-                if not available_tools:
-                    logger.warning("No tools available from MCP server.")
-                    return "I'm sorry, but there are no tools available for me to use."
+            running = len(workers)
+            while running:
+                entry = await results.get()
+                if entry is None:
+                    running -= 1
+                else:
+                    yield entry
+            # Surface a failure to read the queries instead of ending the batch quietly.
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
 
-                # 2. Use Gemini to select the best tool
-                tool_name, tool_args = await self._select_tool(query, available_tools)
-                if not tool_name:
-                    logger.warning("Could not select a suitable tool.", query=query)
-                    return "I'm sorry, but I couldn't find a suitable tool to answer your query."
+    async def select_tools_batch(
+        self, queries: list[str], tools: list[mcp.types.Tool] | None = None
+    ) -> list[tuple[str | None, dict[str, Any]]]:
+        """
+        Selects tools for several queries with a single Gemini call.
 
-                logger.info("Selected tool", tool_name=tool_name, tool_args=tool_args)
+        Queries the local pre-router is confident about skip the model. The tool list is sent
+        once for all other queries, so routing K queries costs one model call instead of K.
+        Every decision is checked against the chosen tool's input schema; a missing or
+        invalid decision falls back to ``_select_tool`` for that query alone.
 
-                # 3. Call the selected tool
-                result: CallToolResult = await mcp_client.call_tool(tool_name, tool_args)
+        Args:
+            queries: The queries to route.
+            tools: The available tools (defaults to the server's tool catalog).
 
-                # 4. Return the result
-                if result.is_error:
-                    return f"Error calling tool {tool_name}: {result.data}"
+        Returns:
+            One ``(tool_name, arguments)`` decision per query, in the order of ``queries``.
+        """
+        tools = tools if tools is not None else await self.mcp_session.list_tools()
+        selections = [self._pre_route(query, tools) for query in queries]
+        remaining = [index for index, selection in enumerate(selections) if selection is None]
+        if remaining:
+            selected = await self._select_tools_with_model([queries[i] for i in remaining], tools)
+            for index, selection in zip(remaining, selected, strict=True):
+                selections[index] = selection
+        return selections
 
-                if isinstance(result.structured_content, dict | list):
-                    return json.dumps(result.structured_content, indent=2)
+    async def _select_tools_with_model(
+        self, queries: list[str], tools: list[mcp.types.Tool]
+    ) -> list[tuple[str | None, dict[str, Any]]]:
+        """Select tools for several queries with one Gemini call, see ``select_tools_batch``."""
+        tools_by_name = {tool.name: tool for tool in tools}
+        tools_prompt = "\n".join(
+            f"- {tool.name}({', '.join((tool.inputSchema or {}).get('properties', {}))}): "
+            f"{tool.description}"
+            for tool in tools
+        )
+        prompt = f"""
+You are an intelligent agent that selects the best tool to answer each of several user queries.
+For every query, choose the most appropriate tool from the list and determine the arguments to pass to it.
 
-                return str(result.structured_content)
+User Queries (a JSON array; the index of a query is its position, starting at 0):
+{json.dumps(queries)}
 
+Available Tools:
+{tools_prompt}
+
+Your response must be a JSON array with one object per query, each with three keys:
+- "index": The index of the query.
+- "tool_name": The name of the selected tool.
+- "arguments": An object containing the arguments for the tool. The query should be the primary argument.
+
+Provide only the JSON array in your response.
+"""
+        decisions: dict[int, Any] = {}
+        self.selection_stats["model_calls"] += 1
+        try:
+            with get_tracer().span("model.generate", agent="SearchAgent", batch=len(queries)):
+                response = await self.model.generate_content_async(prompt)
+            items = self._parse_reply(response.text, list)
+            for position, item in enumerate(items):
+                if isinstance(item, dict):
+                    decisions.setdefault(item.get("index", position), item)
         except Exception as e:
-            logger.error("An error occurred during agent execution.", exc_info=e)
-            return "I'm sorry, but an unexpected error occurred."
+            logger.error("Failed to parse batched tool selection from Gemini.", error=str(e))
+
+        selections: list[tuple[str | None, dict[str, Any]]] = []
+        fallbacks = []
+        for index in range(len(queries)):
+            item = decisions.get(index)
+            tool = tools_by_name.get(item.get("tool_name")) if item else None
+            if tool is not None and _matches_schema(item.get("arguments"), tool.inputSchema):
+                selections.append((tool.name, item["arguments"]))
+            else:
+                selections.append((None, {}))
+                fallbacks.append(index)
+
+        if fallbacks:
+            logger.warning("Falling back to per-query tool selection", count=len(fallbacks))
+            self.selection_stats["fallbacks"] += len(fallbacks)
+            fallback_selections = await asyncio.gather(
+                *(self._select_tool(queries[index], tools) for index in fallbacks)
+            )
+            for index, selection in zip(fallbacks, fallback_selections, strict=True):
+                selections[index] = selection
+        self.selection_stats["batched_queries"] += len(queries) - len(fallbacks)
+        return selections
+
+    def _pre_route(
+        self, query: str, tools: list[mcp.types.Tool]
+    ) -> tuple[str, dict[str, Any]] | None:
+        """Select a tool with the local pre-router, or return None to ask Gemini."""
+        if self.router is None:
+            return None
+        decision = self.router.route(query, tools)
+        if decision is None:
+            return None
+        schema = next(tool.inputSchema for tool in tools if tool.name == decision.tool_name)
+        if not _matches_schema(decision.arguments, schema):
+            return None
+        logger.debug(
+            "Routed query locally",
+            tool_name=decision.tool_name,
+            confidence=round(decision.confidence, 3),
+            source=decision.source,
+        )
+        return decision.tool_name, decision.arguments
 
     async def _select_tool(
         self, query: str, tools: list[mcp.types.Tool]
@@ -104,18 +415,58 @@ Example Response:
 
 Provide only the JSON object in your response.
 """
+        self.selection_stats["model_calls"] += 1
+        kwargs = {}
+        if config.gemini.gemini_function_calling:
+            # Ask for exactly one native function call instead of JSON text.
+            kwargs = {
+                "tools": self._function_tools(tools),
+                "tool_config": {"function_calling_config": {"mode": "ANY"}},
+            }
         try:
-            response = await self.model.generate_content_async(prompt)
-            cleaned_response = response.text.strip().replace("```json", "").replace("```", "")
-            decision = json.loads(cleaned_response)
+            with get_tracer().span("model.generate", agent="SearchAgent"):
+                response = await self.model.generate_content_async(prompt, **kwargs)
+            calls = function_calls(response)
+            if calls:
+                self.parse_stats["replies"] += 1
+                self.parse_stats["native"] += 1
+                return calls[0]
+            decision = self._parse_reply(response.text, dict)
             return decision.get("tool_name"), decision.get("arguments", {})
-        except (json.JSONDecodeError, KeyError, AttributeError) as e:
-            logger.error(
-                "Failed to parse tool selection response from Gemini.",
-                response=response.text,
-                error=e,
-            )
+        except ValueError as e:
+            logger.error("Failed to parse tool selection response from Gemini.", error=str(e))
             return None, {}
         except Exception as e:
             logger.error("An unexpected error occurred during tool selection.", exc_info=e)
             return None, {}
+
+    def _function_tools(self, tools: list[mcp.types.Tool]) -> list[dict[str, Any]]:
+        """Gemini ``tools`` declaring the MCP tools as functions, converted once per catalog."""
+        if self._declared_tools is None or self._declared_tools[0] is not tools:
+            declarations = function_declarations([tool.model_dump() for tool in tools])
+            self._declared_tools = (tools, declarations)
+        return [{"function_declarations": self._declared_tools[1]}]
+
+    def _parse_reply(self, text: str, expected: type) -> Any:
+        """Parse a JSON reply of the ``expected`` type, tolerating text around the JSON.
+
+        The reply is parsed as JSON once any Markdown code fence is removed. Otherwise the
+        first embedded JSON value of the expected type is used.
+
+        Raises:
+            ValueError: If the reply contains no JSON value of the expected type
+        """
+        self.parse_stats["replies"] += 1
+        try:
+            value = json.loads(text.strip().replace("```json", "").replace("```", ""))
+            if isinstance(value, expected):
+                self.parse_stats["text"] += 1
+                return value
+        except json.JSONDecodeError:
+            pass
+        for value in iter_json_values(text):
+            if isinstance(value, expected):
+                self.parse_stats["recovered"] += 1
+                return value
+        self.parse_stats["parse_failures"] += 1
+        raise ValueError(f"No JSON {expected.__name__} in model reply")
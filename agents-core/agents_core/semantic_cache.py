@@ -0,0 +1,519 @@
+"""Semantic answer cache keyed by query embeddings.
+
+Queries are embedded and looked up among earlier queries; a stored tool result or final
+answer is returned when a past query is similar enough, without calling Gemini or the
+tools. Entries live in Qdrant when it is reachable and in an in-process index otherwise.
+
+Embeddings score queries that differ only in a number or a negation as near-identical
+("100 usd" and "1000 usd", "install" and "uninstall"), so a hit is only used when both
+queries agree on those words, see ``conflicting_queries``.
+"""
+
+import hashlib
+import math
+import operator
+import re
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import httpx
+import structlog
+
+from agents_core.config import config
+
+logger = structlog.get_logger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_GUARD_WORD = re.compile(r"[a-z0-9']+")
+
+# Words that invert a query, with contractions written without the apostrophe
+NEGATIONS = frozenset(
+    {
+        "no",
+        "not",
+        "never",
+        "none",
+        "nor",
+        "without",
+        "cannot",
+        "dont",
+        "doesnt",
+        "didnt",
+        "isnt",
+        "arent",
+        "wasnt",
+        "werent",
+        "wont",
+        "cant",
+        "couldnt",
+        "shouldnt",
+    }
+)
+# Prefixes that turn a word into its opposite, as in "uninstall" or "disable"
+NEGATING_PREFIXES = ("un", "dis", "non")
+
+
+def hashing_embedding(text: str, dim: int = 512) -> list[float]:
+    """Embed a text locally with the hashing trick.
+
+    Words and the character trigrams of each word are hashed into ``dim`` signed buckets, so
+    queries differing in punctuation, case or a few characters stay close. The vector is
+    normalized to unit length.
+    """
+    vector = [0.0] * dim
+    words = _WORD.findall(text.lower())
+    features = [f"w:{word}" for word in words]
+    for word in words:
+        padded = f"#{word}#"
+        features.extend(f"c:{padded[i : i + 3]}" for i in range(len(padded) - 2))
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    return _normalize(vector)
+
+
+def conflicting_queries(query: str, cached_query: str) -> bool:
+    """Whether two similar queries differ in a way that changes the answer.
+
+    They conflict when their numbers differ, when only one of them uses a given negation,
+    or when one has a word that is the other's word with a negating prefix.
+    """
+    if _NUMBER.findall(query) != _NUMBER.findall(cached_query):
+        return True
+    words = {word.replace("'", "") for word in _GUARD_WORD.findall(query.lower())}
+    cached_words = {word.replace("'", "") for word in _GUARD_WORD.findall(cached_query.lower())}
+    if words & NEGATIONS != cached_words & NEGATIONS:
+        return True
+    for ours, theirs in ((words, cached_words), (cached_words, words)):
+        for word in ours - theirs:
+            for prefix in NEGATING_PREFIXES:
+                if word.startswith(prefix) and word.removeprefix(prefix) in theirs:
+                    return True
+    return False
+
+
+def _normalize(vector: list[float]) -> list[float]:
+    norm = math.sqrt(sum(value * value for value in vector))
+    return [value / norm for value in vector] if norm else vector
+
+
+def _dot(a: list[float], b: list[float]) -> float:
+    return sum(map(operator.mul, a, b))
+
+
+class Embedder(Protocol):
+    """Turns a text into a vector."""
+
+    dim: int
+
+    async def embed(self, text: str) -> list[float]: ...
+
+
+class HashingEmbedder:
+    """Local embedder for near-duplicate queries, see ``hashing_embedding``."""
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    async def embed(self, text: str) -> list[float]:
+        return hashing_embedding(text, self.dim)
+
+
+class GeminiEmbedder:
+    """Embeds texts with a Gemini embedding model, which also matches paraphrases."""
+
+    def __init__(self, backend: Any = None, model_name: str | None = None, dim: int = 768):
+        """Initialize the embedder.
+
+        Args:
+            backend: Gemini backend with an ``embed`` method (defaults to ``GeminiBackend``)
+            model_name: Embedding model (defaults to config)
+            dim: Dimension of the model's embeddings
+        """
+        if backend is None:
+            from agents_core.gemini import GeminiBackend
+
+            backend = GeminiBackend()
+        self.backend = backend
+        self.model_name = model_name or config.semantic_cache.semantic_cache_embedding_model
+        self.dim = dim
+
+    async def embed(self, text: str) -> list[float]:
+        return _normalize(await self.backend.embed(text, self.model_name))
+
+
+@dataclass
+class CacheHit:
+    """A cached value and how similar its query was to the one looked up."""
+
+    query: str
+    value: Any
+    score: float
+
+
+class VectorIndex(ABC):
+    """Storage for cached entries with nearest-neighbour search."""
+
+    @abstractmethod
+    async def search(
+        self, namespace: str, vector: list[float], threshold: float, now: float
+    ) -> CacheHit | None:
+        """Return the most similar unexpired entry scoring at least ``threshold``."""
+
+    @abstractmethod
+    async def upsert(
+        self, namespace: str, query: str, vector: list[float], value: Any, expires_at: float
+    ) -> None:
+        """Store an entry, replacing any earlier entry for the same query."""
+
+    @abstractmethod
+    async def evict(self, now: float) -> int:
+        """Remove expired entries and entries beyond the size limit.
+
+        Returns:
+            Number of entries removed
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all entries."""
+
+
+def _point_id(namespace: str, query: str) -> str:
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{namespace}\n{query}"))
+
+
+class InMemoryVectorIndex(VectorIndex):
+    """Brute-force cosine search over at most ``max_entries`` least recently used entries."""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        # point id -> (namespace, query, vector, value, expires_at), oldest first
+        self._entries: OrderedDict[str, tuple[str, str, list[float], Any, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def search(
+        self, namespace: str, vector: list[float], threshold: float, now: float
+    ) -> CacheHit | None:
+        best: tuple[float, str] | None = None
+        for point_id, (entry_namespace, _, entry_vector, _, expires_at) in self._entries.items():
+            if entry_namespace != namespace or expires_at <= now:
+                continue
+            score = _dot(vector, entry_vector)
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, point_id)
+        if best is None:
+            return None
+        score, point_id = best
+        self._entries.move_to_end(point_id)
+        _, query, _, value, _ = self._entries[point_id]
+        return CacheHit(query, value, score)
+
+    async def upsert(
+        self, namespace: str, query: str, vector: list[float], value: Any, expires_at: float
+    ) -> None:
+        point_id = _point_id(namespace, query)
+        self._entries[point_id] = (namespace, query, vector, value, expires_at)
+        self._entries.move_to_end(point_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def evict(self, now: float) -> int:
+        expired = [key for key, entry in self._entries.items() if entry[4] <= now]
+        for key in expired:
+            del self._entries[key]
+        return len(expired)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class QdrantVectorIndex(VectorIndex):
+    """Entries stored as points of a Qdrant collection, through its REST API.
+
+    The collection is created on first use with cosine distance. Expired points are
+    filtered out of searches and deleted by ``evict``, which also deletes the oldest points
+    once the collection holds more than ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        collection: str,
+        dim: int,
+        max_entries: int = 100_000,
+        client: httpx.AsyncClient | None = None,
+        timeout: float = 2.0,
+    ):
+        """Initialize the index.
+
+        Args:
+            url: Base URL of the Qdrant server
+            collection: Collection holding the cache entries
+            dim: Dimension of the stored vectors
+            max_entries: Points kept by ``evict``
+            client: HTTP client to use (defaults to a new one for ``url``)
+            timeout: Timeout of each request in seconds
+        """
+        self.collection = collection
+        self.dim = dim
+        self.max_entries = max_entries
+        self.client = client or httpx.AsyncClient(base_url=url, timeout=timeout)
+        self._ready = False
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> dict[str, Any]:
+        response = await self.client.request(
+            method, f"/collections/{self.collection}{path}", **kwargs
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def _ensure_collection(self) -> None:
+        if self._ready:
+            return
+        response = await self.client.get(f"/collections/{self.collection}")
+        if response.status_code == 404:
+            await self._request(
+                "PUT", "", json={"vectors": {"size": self.dim, "distance": "Cosine"}}
+            )
+            for field_name, schema in (("namespace", "keyword"), ("expires_at", "float")):
+                await self._request(
+                    "PUT",
+                    "/index?wait=true",
+                    json={"field_name": field_name, "field_schema": schema},
+                )
+            logger.info("Created semantic cache collection", collection=self.collection)
+        else:
+            response.raise_for_status()
+        self._ready = True
+
+    async def search(
+        self, namespace: str, vector: list[float], threshold: float, now: float
+    ) -> CacheHit | None:
+        await self._ensure_collection()
+        body = {
+            "vector": vector,
+            "limit": 1,
+            "with_payload": True,
+            "score_threshold": threshold,
+            "filter": {
+                "must": [
+                    {"key": "namespace", "match": {"value": namespace}},
+                    {"key": "expires_at", "range": {"gt": now}},
+                ]
+            },
+        }
+        points = (await self._request("POST", "/points/search", json=body))["result"]
+        if not points:
+            return None
+        payload = points[0]["payload"]
+        return CacheHit(payload["query"], payload["value"], points[0]["score"])
+
+    async def upsert(
+        self, namespace: str, query: str, vector: list[float], value: Any, expires_at: float
+    ) -> None:
+        await self._ensure_collection()
+        point = {
+            "id": _point_id(namespace, query),
+            "vector": vector,
+            "payload": {
+                "namespace": namespace,
+                "query": query,
+                "value": value,
+                "expires_at": expires_at,
+            },
+        }
+        await self._request("PUT", "/points?wait=true", json={"points": [point]})
+
+    async def evict(self, now: float) -> int:
+        await self._ensure_collection()
+        expired = {"must": [{"key": "expires_at", "range": {"lte": now}}]}
+        removed = (
+            await self._request("POST", "/points/count", json={"filter": expired, "exact": True})
+        )["result"]["count"]
+        if removed:
+            await self._request("POST", "/points/delete?wait=true", json={"filter": expired})
+
+        count = (await self._request("POST", "/points/count", json={"exact": True}))["result"][
+            "count"
+        ]
+        excess = count - self.max_entries
+        if excess > 0:
+            # Entries expire in the order they were stored, so the soonest to expire are oldest.
+            scroll = await self._request(
+                "POST",
+                "/points/scroll",
+                json={"limit": excess, "order_by": "expires_at", "with_payload": False},
+            )
+            ids = [point["id"] for point in scroll["result"]["points"]]
+            await self._request("POST", "/points/delete?wait=true", json={"points": ids})
+            removed += len(ids)
+        return removed
+
+    async def clear(self) -> None:
+        response = await self.client.delete(f"/collections/{self.collection}")
+        if response.status_code != 404:
+            response.raise_for_status()
+        self._ready = False
+
+
+class SemanticCache:
+    """Looks up answers of earlier queries that are similar enough to a new one.
+
+    Entries are grouped by namespace, so different agents or servers never share answers,
+    and expire ``ttl`` seconds after they were stored. A hit whose query conflicts with the
+    new one (see ``conflicting_queries``) counts as a miss. If the primary index fails (e.g.
+    Qdrant is down or answers with something unexpected), the cache logs the error once and
+    continues with ``fallback``.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        index: VectorIndex | None = None,
+        threshold: float | None = None,
+        ttl: float | None = None,
+        fallback: VectorIndex | None = None,
+        evict_every: int = 100,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the cache.
+
+        Args:
+            embedder: Embeds queries (defaults to a ``HashingEmbedder``)
+            index: Primary entry storage (defaults to an ``InMemoryVectorIndex``)
+            threshold: Minimum cosine similarity of a hit (defaults to config)
+            ttl: Lifetime of an entry in seconds (defaults to config)
+            fallback: Storage used once the primary index fails (defaults to an
+                ``InMemoryVectorIndex``)
+            evict_every: Stores between evictions of expired and excess entries
+            clock: Wall clock; Qdrant payloads outlive the process, so not monotonic
+        """
+        settings = config.semantic_cache
+        self.embedder = embedder or HashingEmbedder()
+        max_entries = settings.semantic_cache_max_entries
+        # Explicit None checks: an empty in-process index is falsy.
+        self.index = InMemoryVectorIndex(max_entries) if index is None else index
+        self.fallback = InMemoryVectorIndex(max_entries) if fallback is None else fallback
+        self.threshold = settings.semantic_cache_threshold if threshold is None else threshold
+        self.ttl = settings.semantic_cache_ttl if ttl is None else ttl
+        self.evict_every = evict_every
+        self.clock = clock
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "conflicts": 0,
+            "stores": 0,
+            "evicted": 0,
+            "errors": 0,
+        }
+        self._stores_since_eviction = 0
+
+    async def _with_fallback(self, operation: str, *args: Any) -> Any:
+        try:
+            return await getattr(self.index, operation)(*args)
+        except Exception as e:
+            if self.index is self.fallback:
+                raise
+            self.stats["errors"] += 1
+            logger.warning(
+                "Semantic cache index failed, using the in-process index",
+                operation=operation,
+                error=str(e),
+            )
+            self.index = self.fallback
+            return await getattr(self.index, operation)(*args)
+
+    async def _embed(self, query: str) -> list[float] | None:
+        # A failing embedder makes the cache miss; it never fails the query itself.
+        try:
+            return await self.embedder.embed(query)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("Could not embed query for the semantic cache", error=str(e))
+            return None
+
+    async def lookup(self, namespace: str, query: str) -> CacheHit | None:
+        """Return the cached value of the most similar earlier query, if similar enough.
+
+        Args:
+            namespace: Group of entries to search
+            query: The new query
+
+        Returns:
+            The hit, or None on a miss
+        """
+        vector = await self._embed(query)
+        if vector is None:
+            return None
+        hit = await self._with_fallback("search", namespace, vector, self.threshold, self.clock())
+        if hit is not None and conflicting_queries(query, hit.query):
+            self.stats["conflicts"] += 1
+            logger.debug("Semantic cache hit rejected", query=query, cached_query=hit.query)
+            hit = None
+        if hit is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        logger.debug("Semantic cache hit", query=query, cached_query=hit.query, score=hit.score)
+        return hit
+
+    async def store(self, namespace: str, query: str, value: Any) -> None:
+        """Store the value answering a query.
+
+        Args:
+            namespace: Group of entries to store into
+            query: The query that was answered
+            value: JSON-serializable answer
+        """
+        vector = await self._embed(query)
+        if vector is None:
+            return
+        now = self.clock()
+        await self._with_fallback("upsert", namespace, query, vector, value, now + self.ttl)
+        self.stats["stores"] += 1
+        self._stores_since_eviction += 1
+        if self._stores_since_eviction >= self.evict_every:
+            self._stores_since_eviction = 0
+            self.stats["evicted"] += await self._with_fallback("evict", now)
+
+    async def clear(self) -> None:
+        """Remove all entries."""
+        await self._with_fallback("clear")
+
+
+_shared_cache: SemanticCache | None = None
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    """Return the shared cache described by ``config.semantic_cache``, or None when disabled.
+
+    Each embedder gets its own Qdrant collection, since their vectors are not comparable.
+    """
+    global _shared_cache
+    settings = config.semantic_cache
+    if not settings.semantic_cache_enabled:
+        return None
+    if _shared_cache is None:
+        if settings.semantic_cache_embedder == "gemini":
+            embedder = GeminiEmbedder()
+        else:
+            embedder = HashingEmbedder()
+        index = None
+        if settings.semantic_cache_url:
+            index = QdrantVectorIndex(
+                settings.semantic_cache_url,
+                f"{settings.semantic_cache_collection}_{settings.semantic_cache_embedder}",
+                embedder.dim,
+            )
+        _shared_cache = SemanticCache(embedder, index)
+    return _shared_cache
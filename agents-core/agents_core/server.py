@@ -0,0 +1,629 @@
+"""HTTP service hosting many concurrent agent sessions in one process.
+
+Each session owns an agent and its conversation history. Turns of all sessions share
+bounded resources: at most ``max_active_turns`` turns run at once and at most
+``max_queued_turns`` wait for a slot, beyond which requests are rejected with
+``429 Too Many Requests``. Model calls and tool calls are capped separately across all
+sessions, and sessions idle for ``idle_timeout`` seconds are evicted. With a session store,
+histories outlive eviction and restarts: an unknown session id is restored from the store,
+and a hosted session that another worker has moved on since is reloaded before its turn.
+"""
+
+import asyncio
+import contextlib
+import math
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.base_agent import BaseAgent
+from agents_core.config import config
+from agents_core.gemini import GeminiBackend
+from agents_core.mcp_session import MCPSessionManager
+from agents_core.session_store import SessionStore, StaleSession, get_session_store
+
+logger = structlog.get_logger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; maps to ``429 Too Many Requests``."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SessionNotFound(KeyError):
+    """Raised for an unknown or evicted session id."""
+
+
+class SessionBusy(Exception):
+    """Raised when a message arrives while the session is still processing another."""
+
+
+class AdmissionController:
+    """Caps the turns running at once and the turns waiting for a slot.
+
+    A request that finds all ``max_active`` slots taken waits in the queue; one that also
+    finds ``max_queued`` requests already waiting is rejected with ``Overloaded`` instead of
+    piling up. The suggested retry delay is the expected time for the queue to drain.
+    """
+
+    def __init__(self, max_active: int, max_queued: int):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.queued = 0
+        self.average_seconds = 1.0  # Moving average of the turn duration
+        self.stats = {"admitted": 0, "rejected": 0}
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free, at least 1."""
+        waves = (self.queued + 1) / self.max_active
+        return max(1, math.ceil(waves * self.average_seconds))
+
+    async def acquire(self) -> float:
+        """Wait for a slot.
+
+        Returns:
+            The time the slot was granted, to be passed to ``release``
+
+        Raises:
+            Overloaded: All slots are taken and the queue is full
+        """
+        if self.active >= self.max_active and self.queued >= self.max_queued:
+            self.stats["rejected"] += 1
+            raise Overloaded("Too many requests in flight", self.retry_after())
+        self.queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        self.stats["admitted"] += 1
+        return time.perf_counter()
+
+    def release(self, started: float) -> None:
+        """Free a slot granted by ``acquire``."""
+        self.active -= 1
+        self._semaphore.release()
+        self.average_seconds = 0.8 * self.average_seconds + 0.2 * (time.perf_counter() - started)
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        started = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(started)
+
+
+class _LimitedStream:
+    """A streamed response that frees its model-call slot once fully read."""
+
+    def __init__(self, response: Any, release: Callable[[], None]):
+        self._response = response
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        try:
+            async for chunk in self._response:
+                yield chunk
+        finally:
+            self._release()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._response, name)
+
+
+class _TurnStream:
+    """The chunks of a streamed turn, which holds its session's lock and an admission slot.
+
+    Both are freed when the iteration ends or, if it never starts, on ``aclose``.
+    """
+
+    def __init__(self, chunks: AsyncIterator[str], release: Callable[[], None]):
+        self._chunks = chunks
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            async for chunk in self._chunks:
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop the turn, if still running, and free its lock and slot."""
+        if self._released:
+            return
+        self._released = True
+        try:
+            await self._chunks.aclose()
+        finally:
+            self._release()
+
+
+class _TurnResponse(StreamingResponse):
+    """Streams a ``_TurnStream``, closing it even if the client is gone before the body."""
+
+    body_iterator: _TurnStream
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+
+class _LimitedModel:
+    """Model proxy whose ``generate_content_async`` holds a slot of its backend."""
+
+    def __init__(self, model: Any, backend: "LimitedGeminiBackend"):
+        self._model = model
+        self._backend = backend
+
+    async def generate_content_async(self, contents: Any, stream: bool = False, **kwargs: Any):
+        await self._backend.acquire()
+        try:
+            response = await self._model.generate_content_async(contents, stream=stream, **kwargs)
+        except BaseException:
+            self._backend.release()
+            raise
+        if stream:
+            return _LimitedStream(response, self._backend.release)
+        self._backend.release()
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+
+class LimitedGeminiBackend:
+    """Gemini backend wrapper capping the model and embedding calls in flight.
+
+    Agents of all sessions share one instance, so ``max_calls`` bounds the requests the
+    process sends to Gemini at once. A streamed reply holds its slot until it is read.
+    """
+
+    def __init__(self, backend: Any, max_calls: int):
+        self.backend = backend
+        self.max_calls = max_calls
+        self._semaphore = asyncio.Semaphore(max_calls)
+        self.in_flight = 0
+        self.stats = {"calls": 0, "peak": 0}
+
+    async def acquire(self) -> None:
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        self.stats["calls"] += 1
+        self.stats["peak"] = max(self.stats["peak"], self.in_flight)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def generative_model(self, *args: Any, **kwargs: Any) -> _LimitedModel:
+        return _LimitedModel(self.backend.generative_model(*args, **kwargs), self)
+
+    async def cached_model(self, *args: Any, **kwargs: Any) -> tuple[_LimitedModel, str]:
+        model, name = await self.backend.cached_model(*args, **kwargs)
+        return _LimitedModel(model, self), name
+
+    async def delete_cache(self, name: str) -> None:
+        await self.backend.delete_cache(name)
+
+    async def embed(self, *args: Any, **kwargs: Any) -> list[float]:
+        await self.acquire()
+        try:
+            return await self.backend.embed(*args, **kwargs)
+        finally:
+            self.release()
+
+
+@dataclass
+class AgentSession:
+    """A hosted conversation: its agent and bookkeeping."""
+
+    session_id: str
+    agent: BaseAgent
+    created: float
+    last_used: float
+    turns: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class AgentServer:
+    """Hosts agent sessions and serves them over HTTP (see ``app``)."""
+
+    def __init__(
+        self,
+        agent_factory: Callable[..., BaseAgent] = ActorAgent,
+        mcp_server_url: str | None = None,
+        mcp_session: MCPSessionManager | None = None,
+        backend: Any = None,
+        max_sessions: int | None = None,
+        max_active_turns: int | None = None,
+        max_queued_turns: int | None = None,
+        max_model_calls: int | None = None,
+        max_tool_calls: int | None = None,
+        idle_timeout: float | None = None,
+        store: SessionStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the server.
+
+        Args:
+            agent_factory: Builds the agent of a new session; called with the keyword
+                arguments ``mcp_server_url``, ``mcp_session``, ``backend`` and
+                ``cache_scope`` (the session id, so sessions never share cached answers)
+            mcp_server_url: URL of the MCP server (defaults to config)
+            mcp_session: Session manager shared by all agents (defaults to a new one whose
+                concurrency is ``max_tool_calls``); its own concurrency limit applies
+            backend: Gemini backend shared by all agents (defaults to ``GeminiBackend``);
+                it is wrapped to cap the model calls in flight
+            max_sessions: Sessions kept at once (defaults to config)
+            max_active_turns: Turns processed at once (defaults to config)
+            max_queued_turns: Turns waiting for a slot before requests are rejected
+                (defaults to config)
+            max_model_calls: Model calls in flight across all sessions (defaults to config)
+            max_tool_calls: Tool calls in flight across all sessions (defaults to config);
+                cannot be combined with ``mcp_session``
+            idle_timeout: Seconds after which an unused session is evicted, 0 disables
+                (defaults to config)
+            store: Store persisting each session's history after every turn (defaults to
+                the shared one when configured)
+            clock: Time source for idle tracking
+
+        Raises:
+            ValueError: Both ``mcp_session`` and ``max_tool_calls`` were given
+        """
+        if mcp_session is not None and max_tool_calls is not None:
+            raise ValueError(
+                "max_tool_calls only applies to the server's own MCP session; "
+                "set max_concurrency on the MCPSessionManager passed as mcp_session instead"
+            )
+        settings = config.server
+        self.agent_factory = agent_factory
+        self.mcp_server_url = mcp_server_url or config.mcp.web_search_mcp_url
+        self.mcp_session = mcp_session or MCPSessionManager(
+            self.mcp_server_url,
+            max_concurrency=max_tool_calls or settings.server_max_tool_calls,
+        )
+        self.backend = LimitedGeminiBackend(
+            backend or GeminiBackend(), max_model_calls or settings.server_max_model_calls
+        )
+        self.max_sessions = max_sessions or settings.server_max_sessions
+        self.admission = AdmissionController(
+            max_active_turns or settings.server_max_active_turns,
+            settings.server_max_queued_turns if max_queued_turns is None else max_queued_turns,
+        )
+        self.idle_timeout = settings.server_idle_timeout if idle_timeout is None else idle_timeout
+        self.store = store or get_session_store()
+        self.clock = clock
+        self.sessions: OrderedDict[str, AgentSession] = OrderedDict()
+        self.stats = {"created": 0, "restored": 0, "closed": 0, "evicted": 0}
+        self._eviction_task: asyncio.Task | None = None
+        # Context caches being released for ended sessions, referenced until done
+        self._releases: set[asyncio.Task] = set()
+
+    def _new_agent(self, session_id: str) -> BaseAgent:
+        return self.agent_factory(
+            mcp_server_url=self.mcp_server_url,
+            mcp_session=self.mcp_session,
+            backend=self.backend,
+            cache_scope=session_id,
+        )
+
+    def _register(self, session_id: str, agent: BaseAgent) -> AgentSession:
+        """Add a session, evicting the least recently used idle one when full.
+
+        Raises:
+            Overloaded: ``max_sessions`` sessions exist and all of them are busy
+        """
+        if len(self.sessions) >= self.max_sessions:
+            idle = next((s for s in self.sessions.values() if not s.lock.locked()), None)
+            if idle is None:
+                raise Overloaded("Too many sessions", self.admission.retry_after())
+            self._drop(idle.session_id, "evicted")
+        now = self.clock()
+        session = AgentSession(session_id, agent, created=now, last_used=now)
+        self.sessions[session_id] = session
+        return session
+
+    def create_session(self) -> AgentSession:
+        """Start a session, evicting the least recently used idle one when full.
+
+        Raises:
+            Overloaded: ``max_sessions`` sessions exist and all of them are busy
+        """
+        session_id = uuid.uuid4().hex
+        session = self._register(session_id, self._new_agent(session_id))
+        self.stats["created"] += 1
+        return session
+
+    async def get_session(self, session_id: str) -> AgentSession:
+        """Look up a session, restoring it from the store if needed, and mark it as used.
+
+        Raises:
+            SessionNotFound: The session is neither hosted nor stored
+        """
+        session = self.sessions.get(session_id)
+        if session is None and self.store is not None:
+            agent = self._new_agent(session_id)
+            if await self.store.restore(session_id, agent):
+                # Another request may have restored the session meanwhile.
+                session = self.sessions.get(session_id) or self._register(session_id, agent)
+                self.stats["restored"] += 1
+        if session is None:
+            raise SessionNotFound(session_id)
+        self.sessions.move_to_end(session_id)
+        session.last_used = self.clock()
+        return session
+
+    async def close_session(self, session_id: str) -> None:
+        """End a session and delete it from the store."""
+        if session_id in self.sessions:
+            self._drop(session_id, "closed")
+        elif self.store is None or await self.store.load(session_id) is None:
+            raise SessionNotFound(session_id)
+        if self.store is not None:
+            await self.store.delete(session_id)
+
+    def _drop(self, session_id: str, reason: str) -> None:
+        session = self.sessions.pop(session_id)
+        self.stats[reason] += 1
+        if self.store is not None:
+            self.store.forget(session_id)
+        # Chat-mode agents may hold a server-side context cache.
+        if session.agent.context_cache_name is not None:
+            task = asyncio.get_running_loop().create_task(session.agent._release_context_cache())
+            self._releases.add(task)
+            task.add_done_callback(self._releases.discard)
+        logger.info("Agent session ended", session_id=session_id, reason=reason)
+
+    def evict_idle(self) -> int:
+        """Evict the sessions unused for ``idle_timeout`` seconds.
+
+        Returns:
+            Number of sessions evicted
+        """
+        if not self.idle_timeout:
+            return 0
+        deadline = self.clock() - self.idle_timeout
+        expired = [
+            s.session_id
+            for s in self.sessions.values()
+            if s.last_used <= deadline and not s.lock.locked()
+        ]
+        for session_id in expired:
+            self._drop(session_id, "evicted")
+        return len(expired)
+
+    async def _refresh(self, session: AgentSession) -> None:
+        """Reload a session's history if another worker has changed it in the store.
+
+        Raises:
+            SessionNotFound: Another worker deleted the session
+        """
+        if self.store is None or await self.store.is_current(session.session_id):
+            return
+        if not await self.store.restore(session.session_id, session.agent):
+            self._drop(session.session_id, "closed")
+            raise SessionNotFound(session.session_id)
+        self.stats["restored"] += 1
+        logger.info("Reloaded agent session changed elsewhere", session_id=session.session_id)
+
+    async def _save(self, session: AgentSession) -> None:
+        """Persist a turn; a session another worker changed meanwhile is dropped instead.
+
+        Raises:
+            StaleSession: The turn was not saved
+        """
+        try:
+            await self.store.save(session.session_id, session.agent)
+        except StaleSession:
+            # The next request restores the session from the store.
+            self._drop(session.session_id, "evicted")
+            raise
+
+    async def _claim(self, session_id: str) -> AgentSession:
+        session = await self.get_session(session_id)
+        if session.lock.locked():
+            raise SessionBusy(session_id)
+        return session
+
+    async def send(self, session_id: str, message: str) -> str:
+        """Process a message in a session.
+
+        Raises:
+            SessionNotFound: Unknown session
+            SessionBusy: The session is processing another message
+            Overloaded: The server is saturated
+            StaleSession: Another worker changed the session during the turn
+        """
+        session = await self._claim(session_id)
+        async with session.lock, self.admission.admit():
+            await self._refresh(session)
+            reply = await session.agent.process_message(message)
+            if self.store is not None:
+                await self._save(session)
+        session.turns += 1
+        session.last_used = self.clock()
+        return reply
+
+    async def stream(self, session_id: str, message: str) -> _TurnStream:
+        """Admit a message like ``send`` and return an iterator over the reply's chunks.
+
+        Admission happens before this returns, so rejections surface before any output.
+        The session stays locked until the iteration ends; call ``aclose`` on the result
+        when not iterating it to the end.
+        """
+        session = await self._claim(session_id)
+        await session.lock.acquire()
+        try:
+            started = await self.admission.acquire()
+        except BaseException:
+            session.lock.release()
+            raise
+
+        def release() -> None:
+            session.last_used = self.clock()
+            self.admission.release(started)
+            session.lock.release()
+
+        try:
+            await self._refresh(session)
+        except BaseException:
+            release()
+            raise
+
+        async def chunks() -> AsyncIterator[str]:
+            async for chunk in session.agent.stream_message(message):
+                yield chunk
+            if self.store is not None:
+                try:
+                    await self._save(session)
+                except StaleSession:
+                    # The reply is already out; the client can only learn it was not kept.
+                    logger.warning("Streamed turn not saved, session changed elsewhere")
+                    return
+            session.turns += 1
+
+        return _TurnStream(chunks(), release)
+
+    def status(self) -> dict[str, Any]:
+        """Load and counters, as served by ``GET /health``."""
+        return {
+            "sessions": len(self.sessions),
+            "active_turns": self.admission.active,
+            "queued_turns": self.admission.queued,
+            "model_calls_in_flight": self.backend.in_flight,
+            **self.stats,
+            **self.admission.stats,
+        }
+
+    async def _evict_periodically(self) -> None:
+        interval = max(1.0, self.idle_timeout / 4)
+        while True:
+            await asyncio.sleep(interval)
+            evicted = self.evict_idle()
+            if evicted:
+                logger.info("Idle agent sessions evicted", count=evicted)
+
+    async def start(self) -> None:
+        """Start background idle-session eviction."""
+        if self.idle_timeout and self._eviction_task is None:
+            self._eviction_task = asyncio.create_task(self._evict_periodically())
+
+    async def stop(self) -> None:
+        """Stop background work, end all sessions and close the MCP session."""
+        if self._eviction_task is not None:
+            self._eviction_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._eviction_task
+            self._eviction_task = None
+        for session in list(self.sessions.values()):
+            await session.agent._release_context_cache()
+        self.sessions.clear()
+        await asyncio.gather(*self._releases, return_exceptions=True)
+        await self.mcp_session.close()
+
+    def app(self) -> Starlette:
+        """ASGI application exposing the sessions.
+
+        Routes:
+            ``POST /sessions``: create a session, returns ``{"session_id": ...}``
+            ``POST /sessions/{id}/messages``: send ``{"message": ..., "stream": false}``,
+            returns ``{"reply": ...}`` or, with ``stream``, the reply as ``text/plain`` chunks
+            ``DELETE /sessions/{id}``: end a session
+            ``GET /health``: load and counters
+        """
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            await self.start()
+            try:
+                yield
+            finally:
+                await self.stop()
+
+        return Starlette(
+            routes=[
+                Route("/sessions", self._create, methods=["POST"]),
+                Route("/sessions/{session_id}/messages", self._message, methods=["POST"]),
+                Route("/sessions/{session_id}", self._delete, methods=["DELETE"]),
+                Route("/health", self._health, methods=["GET"]),
+            ],
+            exception_handlers={
+                Overloaded: self._overloaded,
+                SessionNotFound: self._not_found,
+                SessionBusy: self._busy,
+                StaleSession: self._stale,
+            },
+            lifespan=lifespan,
+        )
+
+    async def _create(self, request: Request) -> Response:
+        session = self.create_session()
+        return JSONResponse({"session_id": session.session_id}, status_code=201)
+
+    async def _message(self, request: Request) -> Response:
+        session_id = request.path_params["session_id"]
+        try:
+            body = await request.json()
+            message = body["message"]
+        except (ValueError, KeyError, TypeError):
+            return JSONResponse({"error": 'Expected {"message": "..."}'}, status_code=400)
+        if body.get("stream"):
+            chunks = await self.stream(session_id, message)
+            return _TurnResponse(chunks, media_type="text/plain")
+        started = time.perf_counter()
+        reply = await self.send(session_id, message)
+        return JSONResponse({"reply": reply, "seconds": round(time.perf_counter() - started, 3)})
+
+    async def _delete(self, request: Request) -> Response:
+        await self.close_session(request.path_params["session_id"])
+        return Response(status_code=204)
+
+    async def _health(self, request: Request) -> Response:
+        return JSONResponse(self.status())
+
+    @staticmethod
+    async def _overloaded(request: Request, error: Overloaded) -> Response:
+        return JSONResponse(
+            {"error": str(error)},
+            status_code=429,
+            headers={"Retry-After": str(error.retry_after)},
+        )
+
+    @staticmethod
+    async def _not_found(request: Request, error: SessionNotFound) -> Response:
+        return JSONResponse({"error": f"Unknown session: {error.args[0]}"}, status_code=404)
+
+    @staticmethod
+    async def _stale(request: Request, error: StaleSession) -> Response:
+        return JSONResponse(
+            {"error": f"Session {error.args[0]} was changed by another request, send it again"},
+            status_code=409,
+        )
+
+    @staticmethod
+    async def _busy(request: Request, error: SessionBusy) -> Response:
+        return JSONResponse(
+            {"error": f"Session {error.args[0]} is processing another message"}, status_code=409
+        )
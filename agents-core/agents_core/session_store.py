@@ -0,0 +1,439 @@
+"""Durable agent conversations: an append-only log of history changes per session.
+
+A session's log holds records of three kinds, replayed in order to rebuild the history:
+
+- ``{"op": "append", "messages": [...]}``: messages added after the previous record
+- ``{"op": "truncate", "length": n}``: the history was cut back to its first ``n`` messages
+- ``{"op": "reset", "messages": [...]}``: the history was replaced (e.g. compacted); stores
+  drop the records before it
+
+``save`` writes only what changed since the session was last saved or restored, so a turn
+costs I/O proportional to the messages it added, and any worker can ``restore`` the session.
+
+Every record carries a ``version``, one more than the record before it (a ``reset`` keeps
+counting). A store remembers the version of each session it last wrote or read, so a worker
+can tell with ``is_current`` that another worker has changed the session since, and ``save``
+refuses to append to a log it has not seen the end of.
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+import structlog
+
+from agents_core.base_agent import BaseAgent
+from agents_core.config import config
+
+logger = structlog.get_logger(__name__)
+
+Record = dict[str, Any]
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+class StaleSession(Exception):
+    """Raised when saving a session that another worker changed since it was last read."""
+
+
+def _record_version(record: Record) -> int:
+    # Logs written before records were versioned count as version 0.
+    return record.get("version", 0)
+
+
+def replay(records: list[Record]) -> list[dict[str, str]]:
+    """Rebuild a history from its log records."""
+    history: list[dict[str, str]] = []
+    for record in records:
+        op = record["op"]
+        if op == "append":
+            history.extend(record["messages"])
+        elif op == "truncate":
+            del history[record["length"] :]
+        elif op == "reset":
+            history = list(record["messages"])
+        else:
+            raise ValueError(f"Unknown session log record: {op}")
+    return history
+
+
+class SessionStore(ABC):
+    """Base class for session stores.
+
+    Subclasses implement the raw log operations. The store remembers, per session id, the
+    messages it last persisted (by identity, like ``Transcript``), which is how ``save``
+    finds the delta. Like history policies, code changing a message must replace the
+    dictionary rather than edit it in place. A session should be driven by one worker at a
+    time; a worker that did not save or restore a session last starts with a ``reset``.
+    The version check in ``save`` reads the log before writing to it, so it catches a
+    worker holding a stale history but not two saves racing at the same instant.
+    """
+
+    def __init__(self):
+        self._persisted: dict[str, list[dict[str, str]]] = {}
+        # Version of the last record of each session log this store wrote or read
+        self._versions: dict[str, int] = {}
+        self.stats = {"appended": 0, "truncated": 0, "resets": 0, "restored": 0}
+
+    @abstractmethod
+    async def _append(self, session_id: str, record: Record) -> None:
+        """Append a record to a session's log."""
+
+    @abstractmethod
+    async def _replace(self, session_id: str, record: Record) -> None:
+        """Replace a session's log with a single record."""
+
+    @abstractmethod
+    async def _read(self, session_id: str) -> list[Record] | None:
+        """Read a session's log, None when the session does not exist."""
+
+    @abstractmethod
+    async def _delete(self, session_id: str) -> None:
+        """Remove a session's log."""
+
+    async def _version(self, session_id: str) -> int | None:
+        """Version of the last record of a session's log, None when the session does not exist.
+
+        Stores override this to avoid reading the whole log.
+        """
+        records = await self._read(session_id)
+        if records is None:
+            return None
+        return _record_version(records[-1]) if records else 0
+
+    async def is_current(self, session_id: str) -> bool:
+        """Whether the session's log ends where this store last wrote or read it."""
+        return await self._version(session_id) == self._versions.get(session_id)
+
+    async def _write(self, session_id: str, record: Record) -> None:
+        version = self._versions.get(session_id, 0) + 1
+        await self._append(session_id, {**record, "version": version})
+        self._versions[session_id] = version
+
+    async def load(self, session_id: str) -> list[dict[str, str]] | None:
+        """Read a session's history, None when the session does not exist."""
+        records = await self._read(session_id)
+        return None if records is None else replay(records)
+
+    async def save(self, session_id: str, agent: BaseAgent) -> int:
+        """Persist the changes to the agent's history since the last save or restore.
+
+        Returns:
+            Number of messages written
+
+        Raises:
+            StaleSession: Another worker changed the session since this store last saved or
+                restored it; nothing is written, restore the session and retry the turn
+        """
+        history = agent.conversation_history
+        persisted = self._persisted.get(session_id)
+        if persisted is None:
+            return await self.snapshot(session_id, agent)
+        if not await self.is_current(session_id):
+            raise StaleSession(session_id)
+
+        count = len(persisted)
+        if len(history) >= count and (count == 0 or history[count - 1] is persisted[-1]):
+            new_messages = history[count:]
+            if not new_messages:
+                return 0
+            await self._write(session_id, {"op": "append", "messages": new_messages})
+            persisted.extend(new_messages)
+            self.stats["appended"] += len(new_messages)
+            return len(new_messages)
+
+        length = len(history)
+        if length < count and (length == 0 or history[-1] is persisted[length - 1]):
+            await self._write(session_id, {"op": "truncate", "length": length})
+            del persisted[length:]
+            self.stats["truncated"] += 1
+            return 0
+
+        # Rewritten (e.g. compacted) history: start the log over.
+        return await self.snapshot(session_id, agent)
+
+    async def snapshot(self, session_id: str, agent: BaseAgent) -> int:
+        """Replace the session's log with the agent's full history.
+
+        Returns:
+            Number of messages written
+        """
+        history = list(agent.conversation_history)
+        version = (await self._version(session_id) or 0) + 1
+        await self._replace(session_id, {"op": "reset", "messages": history, "version": version})
+        self._persisted[session_id] = history
+        self._versions[session_id] = version
+        self.stats["resets"] += 1
+        return len(history)
+
+    async def restore(self, session_id: str, agent: BaseAgent) -> bool:
+        """Load a session's history into an agent, replacing its current history.
+
+        Returns:
+            Whether the session exists; the agent is left unchanged when it does not
+        """
+        records = await self._read(session_id)
+        if records is None:
+            return False
+        history = replay(records)
+        agent.clear_conversation()
+        agent.conversation_history.extend(history)
+        self._persisted[session_id] = list(history)
+        self._versions[session_id] = _record_version(records[-1]) if records else 0
+        self.stats["restored"] += 1
+        return True
+
+    def forget(self, session_id: str) -> None:
+        """Drop the in-process record of a session, e.g. when its agent is discarded.
+
+        The next ``save`` of the session rewrites its full history.
+        """
+        self._persisted.pop(session_id, None)
+        self._versions.pop(session_id, None)
+
+    async def delete(self, session_id: str) -> None:
+        """Delete a session."""
+        self.forget(session_id)
+        await self._delete(session_id)
+
+
+class InMemorySessionStore(SessionStore):
+    """Session logs kept in process, for tests and single-worker deployments."""
+
+    def __init__(self):
+        super().__init__()
+        self._logs: dict[str, list[Record]] = {}
+
+    async def _append(self, session_id: str, record: Record) -> None:
+        self._logs.setdefault(session_id, []).append(_copy(record))
+
+    async def _replace(self, session_id: str, record: Record) -> None:
+        self._logs[session_id] = [_copy(record)]
+
+    async def _read(self, session_id: str) -> list[Record] | None:
+        records = self._logs.get(session_id)
+        return None if records is None else [_copy(record) for record in records]
+
+    async def _version(self, session_id: str) -> int | None:
+        records = self._logs.get(session_id)
+        if records is None:
+            return None
+        return _record_version(records[-1]) if records else 0
+
+    async def _delete(self, session_id: str) -> None:
+        self._logs.pop(session_id, None)
+
+
+def _copy(record: Record) -> Record:
+    if "messages" in record:
+        return {**record, "messages": [dict(message) for message in record["messages"]]}
+    return dict(record)
+
+
+class FileSessionStore(SessionStore):
+    """One JSON Lines file per session in a directory.
+
+    Records are appended to the file; a ``reset`` writes a new file and renames it over the
+    old one, so a reader never sees a partial log. A session id that could not name a file
+    is reported as an unknown session.
+    """
+
+    def __init__(self, directory: str | os.PathLike):
+        """Initialize the store.
+
+        Args:
+            directory: Directory holding the session files; created if missing
+        """
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, session_id: str) -> Path:
+        if not _SESSION_ID.match(session_id):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        return self.directory / f"{session_id}.jsonl"
+
+    async def _append(self, session_id: str, record: Record) -> None:
+        path = self._path(session_id)
+        line = json.dumps(record) + "\n"
+
+        def write() -> None:
+            with path.open("a", encoding="utf-8") as file:
+                file.write(line)
+
+        await asyncio.to_thread(write)
+
+    async def _replace(self, session_id: str, record: Record) -> None:
+        path = self._path(session_id)
+        line = json.dumps(record) + "\n"
+
+        def write() -> None:
+            temporary = path.with_suffix(".tmp")
+            temporary.write_text(line, encoding="utf-8")
+            os.replace(temporary, path)
+
+        await asyncio.to_thread(write)
+
+    async def _read(self, session_id: str) -> list[Record] | None:
+        if not _SESSION_ID.match(session_id):
+            return None
+        path = self._path(session_id)
+
+        def read() -> list[Record] | None:
+            try:
+                text = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                return None
+            # A torn last line (crash during an append) is ignored.
+            records = []
+            for line in text.splitlines():
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping unreadable session record", session_id=session_id)
+            return records
+
+        return await asyncio.to_thread(read)
+
+    async def _version(self, session_id: str) -> int | None:
+        if not _SESSION_ID.match(session_id):
+            return None
+        path = self._path(session_id)
+
+        def last_version() -> int | None:
+            # Read backwards from the end until a complete record turns up.
+            try:
+                file = path.open("rb")
+            except FileNotFoundError:
+                return None
+            with file:
+                end = file.seek(0, os.SEEK_END)
+                tail = b""
+                while end > 0:
+                    start = max(0, end - 4096)
+                    file.seek(start)
+                    tail = file.read(end - start) + tail
+                    end = start
+                    lines = tail.splitlines()
+                    # The first line may be cut off unless the start of the file was reached.
+                    for line in reversed(lines if end == 0 else lines[1:]):
+                        try:
+                            return _record_version(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+                return 0
+
+        return await asyncio.to_thread(last_version)
+
+    async def _delete(self, session_id: str) -> None:
+        if _SESSION_ID.match(session_id):
+            await asyncio.to_thread(self._path(session_id).unlink, missing_ok=True)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session logs in an SQLite database, one row per record.
+
+    The database runs in WAL mode so several worker processes on a host can share it.
+    """
+
+    def __init__(self, path: str | os.PathLike):
+        """Initialize the store.
+
+        Args:
+            path: Database file, created if missing (":memory:" for a private database)
+        """
+        super().__init__()
+        self.path = str(path)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS session_log ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "session_id TEXT NOT NULL, "
+                "record TEXT NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS session_log_session ON session_log (session_id, seq)"
+            )
+
+    async def _execute(self, *statements: tuple[str, tuple[Any, ...]]) -> list[tuple[Any, ...]]:
+        """Run statements in one transaction and return the rows of the last one."""
+
+        def run() -> list[tuple[Any, ...]]:
+            with self._lock, self._connection:
+                rows: list[tuple[Any, ...]] = []
+                for sql, parameters in statements:
+                    rows = self._connection.execute(sql, parameters).fetchall()
+                return rows
+
+        return await asyncio.to_thread(run)
+
+    async def _append(self, session_id: str, record: Record) -> None:
+        await self._execute(
+            (
+                "INSERT INTO session_log (session_id, record) VALUES (?, ?)",
+                (session_id, json.dumps(record)),
+            )
+        )
+
+    async def _replace(self, session_id: str, record: Record) -> None:
+        await self._execute(
+            ("DELETE FROM session_log WHERE session_id = ?", (session_id,)),
+            (
+                "INSERT INTO session_log (session_id, record) VALUES (?, ?)",
+                (session_id, json.dumps(record)),
+            ),
+        )
+
+    async def _read(self, session_id: str) -> list[Record] | None:
+        rows = await self._execute(
+            ("SELECT record FROM session_log WHERE session_id = ? ORDER BY seq", (session_id,))
+        )
+        return [json.loads(row[0]) for row in rows] if rows else None
+
+    async def _version(self, session_id: str) -> int | None:
+        rows = await self._execute(
+            (
+                "SELECT json_extract(record, '$.version') FROM session_log "
+                "WHERE session_id = ? ORDER BY seq DESC LIMIT 1",
+                (session_id,),
+            )
+        )
+        return (rows[0][0] or 0) if rows else None
+
+    async def _delete(self, session_id: str) -> None:
+        await self._execute(("DELETE FROM session_log WHERE session_id = ?", (session_id,)))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+_shared_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore | None:
+    """Return the shared store described by ``config.session_store``, or None when disabled."""
+    global _shared_store
+    settings = config.session_store
+    if not settings.session_store:
+        return None
+    if _shared_store is None:
+        if settings.session_store == "memory":
+            _shared_store = InMemorySessionStore()
+        elif settings.session_store == "sqlite":
+            _shared_store = SQLiteSessionStore(settings.session_store_path)
+        elif settings.session_store == "file":
+            _shared_store = FileSessionStore(settings.session_store_path)
+        else:
+            raise ValueError(f"Unknown session store: {settings.session_store}")
+    return _shared_store
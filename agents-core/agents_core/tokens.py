@@ -0,0 +1,16 @@
+"""Token estimation helpers."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in a text.
+
+    Uses the common approximation of four characters per token, which is close enough for
+    budgeting and reporting without calling the model's tokenizer.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + 3) // 4
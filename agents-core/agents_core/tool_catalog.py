@@ -0,0 +1,154 @@
+"""Cache of MCP tool catalogs, keyed by server URL."""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import mcp
+import structlog
+
+from agents_core.config import config
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class CatalogEntry:
+    """A fetched tool catalog and its serialized form."""
+
+    tools: list[mcp.types.Tool]
+    fetched_at: float
+    serialized: list[dict[str, Any]] = field(default_factory=list)
+
+
+class ToolCatalogCache:
+    """TTL cache for ``list_tools`` results.
+
+    The tool catalog of a server rarely changes, so agents read it from here instead of
+    listing and re-serializing the tools on every turn. Entries expire after ``ttl`` seconds
+    and are dropped early by ``invalidate``, which the session manager calls when the server
+    announces a tools-changed notification or a call fails with an unknown tool. Concurrent
+    misses for the same server share one fetch.
+    """
+
+    def __init__(self, ttl: float | None = None, clock: Callable[[], float] = time.monotonic):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds a catalog stays fresh (defaults to config)
+            clock: Monotonic clock, overridable for tests
+        """
+        self.ttl = config.mcp.tool_catalog_ttl if ttl is None else ttl
+        self.clock = clock
+        self._entries: dict[str, CatalogEntry] = {}
+        self._pending: dict[str, asyncio.Future[CatalogEntry]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def _fresh_entry(self, server_url: str) -> CatalogEntry | None:
+        entry = self._entries.get(server_url)
+        if entry is None or self.clock() - entry.fetched_at >= self.ttl:
+            return None
+        return entry
+
+    async def _get_entry(
+        self, server_url: str, fetch: Callable[[], Awaitable[list[mcp.types.Tool]]]
+    ) -> CatalogEntry:
+        entry = self._fresh_entry(server_url)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        pending = self._pending.get(server_url)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[server_url] = future
+        try:
+            tools = await fetch()
+            entry = CatalogEntry(
+                tools=tools,
+                fetched_at=self.clock(),
+                serialized=[tool.model_dump() for tool in tools],
+            )
+            self._entries[server_url] = entry
+            future.set_result(entry)
+            logger.debug("Tool catalog fetched", server_url=server_url, tools=len(tools))
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting for it.
+            future.exception()
+            raise
+        finally:
+            if self._pending.get(server_url) is future:
+                del self._pending[server_url]
+
+    async def get_tools(
+        self, server_url: str, fetch: Callable[[], Awaitable[list[mcp.types.Tool]]]
+    ) -> list[mcp.types.Tool]:
+        """Get the tools of a server, fetching them on a miss.
+
+        Args:
+            server_url: URL of the MCP server
+            fetch: Coroutine function listing the tools from the server
+
+        Returns:
+            List of tools
+        """
+        return (await self._get_entry(server_url, fetch)).tools
+
+    async def get_serialized(
+        self, server_url: str, fetch: Callable[[], Awaitable[list[mcp.types.Tool]]]
+    ) -> list[dict[str, Any]]:
+        """Get the tools of a server as ``model_dump`` dictionaries.
+
+        The returned list is shared between callers and must not be mutated.
+
+        Args:
+            server_url: URL of the MCP server
+            fetch: Coroutine function listing the tools from the server
+
+        Returns:
+            List of serialized tools
+        """
+        return (await self._get_entry(server_url, fetch)).serialized
+
+    def invalidate(self, server_url: str | None = None, reason: str = "manual") -> None:
+        """Drop cached catalogs so the next read refreshes them.
+
+        Args:
+            server_url: Server to invalidate, or all servers when None
+            reason: Why the catalog is being refreshed, for logging
+        """
+        urls = list(self._entries) if server_url is None else [server_url]
+        for url in urls:
+            if self._entries.pop(url, None) is not None:
+                self.refreshes += 1
+                logger.info("Tool catalog invalidated", server_url=url, reason=reason)
+
+    def stats(self) -> dict[str, int]:
+        """Get cache counters.
+
+        Returns:
+            Hit, miss and refresh counts plus the number of cached servers
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "entries": len(self._entries),
+        }
+
+
+# Process-wide cache shared by all session managers
+tool_catalog = ToolCatalogCache()
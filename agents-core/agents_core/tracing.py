@@ -0,0 +1,404 @@
+"""Spans for agent turns, model calls and MCP round trips.
+
+A ``Tracer`` records spans: named, timed operations with attributes such as token counts,
+payload sizes and cache hits. A span started while another is open becomes its child
+(tracked per task with a context variable). Finished spans are handed to a writer thread
+that exports them in batches:
+
+- ``FileSpanExporter`` appends one JSON object per span to a file, for offline use
+- ``OTLPSpanExporter`` posts OTLP/JSON to a collector's ``/v1/traces`` endpoint
+- ``InMemorySpanExporter`` keeps them in a list, for tests
+
+Without an exporter the tracer hands out a shared no-op span, so instrumented code pays
+almost nothing. ``traceparent`` returns the W3C trace context of the current span; the MCP
+session manager sends it in the ``_meta`` of each tool call so the tools server can join
+its spans to the agent's trace.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+
+from agents_core.config import config
+
+logger = structlog.get_logger(__name__)
+
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "agents_core_span", default=None
+)
+
+
+def payload_bytes(value: Any) -> int:
+    """Size of a payload in bytes: UTF-8 for text, JSON for anything else."""
+    if isinstance(value, bytes):
+        return len(value)
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return len(value.encode("utf-8"))
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_time: float = 0.0  # Unix time in seconds
+    duration: float = 0.0  # Seconds
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: str | None = None
+    recording: bool = True  # False for the no-op span
+
+    @property
+    def traceparent(self) -> str:
+        """W3C ``traceparent`` header value of this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes to the span."""
+        if self.recording:
+            self.attributes.update(attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+_NOOP_SPAN = Span(name="", trace_id="0" * 32, span_id="0" * 16, recording=False)
+
+
+def current_span() -> Span:
+    """The innermost open span of the current task, or a no-op span."""
+    return _current.get() or _NOOP_SPAN
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """Trace and parent span id of a W3C ``traceparent`` value, None when malformed."""
+    parts = (value or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class SpanExporter(ABC):
+    """Destination of finished spans."""
+
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None:
+        """Export a batch of spans; called from the tracer's writer thread."""
+        pass
+
+    def shutdown(self) -> None:  # noqa: B027 - optional hook
+        """Release resources."""
+        pass
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Keeps exported spans in ``spans``."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]) -> None:
+        self.spans.extend(spans)
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends spans to a file as JSON lines."""
+
+    def __init__(self, path: str | os.PathLike, service_name: str = "agents-core"):
+        """Initialize the exporter.
+
+        Args:
+            path: File the spans are appended to
+            service_name: Recorded as ``service`` on every span
+        """
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: list[Span]) -> None:
+        lines = "".join(
+            json.dumps({"service": self.service_name, **span.to_dict()}, default=str) + "\n"
+            for span in spans
+        )
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPSpanExporter(SpanExporter):
+    """Posts spans to an OpenTelemetry collector using OTLP over HTTP with JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "agents-core", timeout: float = 5.0):
+        """Initialize the exporter.
+
+        Args:
+            endpoint: Collector base URL, e.g. ``http://localhost:4318``
+            service_name: ``service.name`` resource attribute
+            timeout: Seconds to wait for the collector
+        """
+        import httpx
+
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self._client = httpx.Client(timeout=timeout)
+
+    def encode(self, spans: list[Span]) -> dict[str, Any]:
+        """OTLP/JSON request body for a batch of spans."""
+        encoded = []
+        for span in spans:
+            start = int(span.start_time * 1e9)
+            item = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 3 if span.name.startswith("mcp.") else 1,  # Client or internal
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(start + int(span.duration * 1e9)),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in span.attributes.items()
+                ],
+                "status": {"code": 2, "message": span.error or ""}
+                if span.status == "error"
+                else {"code": 1},
+            }
+            if span.parent_id:
+                item["parentSpanId"] = span.parent_id
+            encoded.append(item)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": self.service_name}}
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": "agents_core"}, "spans": encoded}],
+                }
+            ]
+        }
+
+    def export(self, spans: list[Span]) -> None:
+        response = self._client.post(self.url, json=self.encode(spans))
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        self._client.close()
+
+
+class Tracer:
+    """Creates spans and exports them from a background thread."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter | None = None,
+        max_batch: int = 256,
+        max_queued: int = 10_000,
+        flush_interval: float = 1.0,
+    ):
+        """Initialize the tracer.
+
+        Args:
+            exporter: Destination of finished spans; None disables tracing
+            max_batch: Spans exported at once
+            max_queued: Finished spans waiting for export before new ones are dropped
+            flush_interval: Seconds the writer waits for a batch to fill
+        """
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue[Span | None] = queue.Queue(max_queued)
+        self._thread: threading.Thread | None = None
+        self._thread_lock = threading.Lock()
+        self.stats = {"spans": 0, "dropped": 0, "export_errors": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_span(self, name: str, parent: Span | None = None, **attributes: Any) -> Span:
+        """Start a span without making it current; finish it with ``end``.
+
+        Args:
+            name: Operation name
+            parent: Parent span, the current span by default
+            **attributes: Initial attributes
+        """
+        if not self.enabled:
+            return _NOOP_SPAN
+        parent = parent or _current.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=attributes,
+        )
+
+    def end(self, span: Span, error: BaseException | None = None) -> None:
+        """Finish a span and queue it for export."""
+        if not span.recording:
+            return
+        span.duration = time.time() - span.start_time
+        if error is not None:
+            span.status = "error"
+            span.error = str(error) or type(error).__name__
+        self.stats["spans"] += 1
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Run a block as a span, making it the parent of spans started inside it.
+
+        Args:
+            name: Operation name
+            **attributes: Initial attributes
+
+        Yields:
+            The span, for adding attributes
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+        parent = _current.get()
+        span = self.start_span(name, parent, **attributes)
+        token = _current.set(span)
+        try:
+            yield span
+        except GeneratorExit:
+            # A consumer stopped reading a stream early.
+            self.end(span)
+            raise
+        except BaseException as e:
+            self.end(span, e)
+            raise
+        else:
+            self.end(span)
+        finally:
+            try:
+                _current.reset(token)
+            except ValueError:
+                # An async generator closed from another task.
+                _current.set(parent)
+
+    def traceparent(self) -> str | None:
+        """W3C ``traceparent`` of the current span, None when there is none."""
+        span = _current.get()
+        return span.traceparent if span is not None else None
+
+    def _ensure_writer(self) -> None:
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._write, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _write(self) -> None:
+        stopping = False
+        while not stopping:
+            batch: list[Span] = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if span is None:
+                    stopping = True
+                    break
+                batch.append(span)
+            if batch:
+                try:
+                    self.exporter.export(batch)
+                except Exception as e:
+                    self.stats["export_errors"] += 1
+                    logger.warning("Span export failed", spans=len(batch), error=str(e))
+
+    def shutdown(self) -> None:
+        """Export the queued spans and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer() -> Tracer:
+    """Return the shared tracer described by ``config.tracing``.
+
+    It is disabled unless ``tracing_exporter`` is ``file`` or ``otlp``.
+    """
+    global _tracer
+    if _tracer is None:
+        settings = config.tracing
+        if not settings.tracing_exporter:
+            exporter = None
+        elif settings.tracing_exporter == "file":
+            exporter = FileSpanExporter(settings.tracing_file, settings.tracing_service_name)
+        elif settings.tracing_exporter == "otlp":
+            exporter = OTLPSpanExporter(
+                settings.tracing_otlp_endpoint, settings.tracing_service_name
+            )
+        else:
+            raise ValueError(f"Unknown span exporter: {settings.tracing_exporter}")
+        _tracer = Tracer(exporter)
+        if exporter is not None:
+            atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer | None:
+    """Replace the shared tracer, e.g. with one using an ``InMemorySpanExporter`` in tests.
+
+    Returns:
+        The previous tracer
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
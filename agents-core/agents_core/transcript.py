@@ -0,0 +1,105 @@
+"""Incremental rendering of conversation transcripts for text prompts."""
+
+import json
+from typing import Any
+
+# Context keys whose values are reused by identity across turns and never mutated in place,
+# e.g. the tool list served from the tool catalog cache.
+STABLE_CONTEXT_KEYS = ("available_tools",)
+
+
+class Transcript:
+    """Renders ``System:/Human:/Assistant:`` transcripts without reformatting old turns.
+
+    The rendered text of the history is cached together with the number of messages it
+    covers, so each turn only formats the messages appended since the previous call. The
+    cache is rebuilt when the system prompt changes or the history is shortened or replaced;
+    callers that edit messages in place must call ``reset``.
+    """
+
+    def __init__(self, stable_context_keys: tuple[str, ...] = STABLE_CONTEXT_KEYS):
+        """Initialize the transcript.
+
+        Args:
+            stable_context_keys: Context keys whose rendered JSON is cached by value identity
+        """
+        self.stable_context_keys = stable_context_keys
+        self._system_prompt: str | None = None
+        self._text = ""
+        self._message_count = 0
+        self._last_message: dict[str, str] | None = None
+        self._context_blocks: dict[str, tuple[Any, str]] = {}
+        self.formatted_messages = 0
+        self.context_renders = 0
+
+    def reset(self) -> None:
+        """Drop the cached rendering."""
+        self._system_prompt = None
+        self._text = ""
+        self._message_count = 0
+        self._last_message = None
+
+    def _is_continuation(self, system_prompt: str, history: list[dict[str, str]]) -> bool:
+        if system_prompt != self._system_prompt or len(history) < self._message_count:
+            return False
+        return self._message_count == 0 or history[self._message_count - 1] is self._last_message
+
+    def render(self, system_prompt: str, history: list[dict[str, str]]) -> str:
+        """Render the transcript, formatting only messages added since the last call.
+
+        Args:
+            system_prompt: System prompt to include
+            history: Conversation history
+
+        Returns:
+            Formatted conversation string
+        """
+        if not self._is_continuation(system_prompt, history):
+            self.reset()
+            self._system_prompt = system_prompt
+            self._text = f"System: {system_prompt}\n\n"
+
+        new_messages = history[self._message_count :]
+        if new_messages:
+            parts = []
+            for message in new_messages:
+                role = "Human" if message["role"] == "user" else "Assistant"
+                parts.append(f"{role}: {message['content']}\n\n")
+            self._text += "".join(parts)
+            self._message_count = len(history)
+            self._last_message = history[-1]
+            self.formatted_messages += len(new_messages)
+
+        return self._text
+
+    def _render_value(self, key: str, value: Any) -> str:
+        if key not in self.stable_context_keys:
+            return json.dumps(value, indent=2)
+        cached = self._context_blocks.get(key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+        rendered = json.dumps(value, indent=2)
+        # Keep a reference to the value so its identity cannot be reused by another object.
+        self._context_blocks[key] = (value, rendered)
+        self.context_renders += 1
+        return rendered
+
+    def render_context(self, context: dict[str, Any] | None) -> str:
+        """Render the context block appended after the transcript.
+
+        The output matches ``json.dumps(context, indent=2)``, but values under
+        ``stable_context_keys`` are only serialized when a different object is passed.
+
+        Args:
+            context: Optional context information
+
+        Returns:
+            Formatted context string, empty when there is no context
+        """
+        if not context:
+            return ""
+        members = []
+        for key, value in context.items():
+            rendered = self._render_value(key, value).replace("\n", "\n  ")
+            members.append(f"  {json.dumps(key)}: {rendered}")
+        return "\nContext: {\n" + ",\n".join(members) + "\n}\n\n"
@@ -0,0 +1,279 @@
+"""Offline load benchmark for the tools and agents.
+
+Drives ``web_search`` and ``python_interpreter`` through an in-process MCP server, and
+``ActorAgent.process_message`` and ``SearchAgent.__call__`` against that same server, with
+Brave replaced by ``FakeBraveSearch`` and Gemini by ``FakeGeminiBackend``. Reports latency
+percentiles, requests per second and peak RSS (including interpreter workers) per scenario,
+and can save the results as a JSON baseline or compare them with an earlier one.
+
+Usage (from agents-core):
+    PYTHONPATH=../agent-tools-mcp uv run python benchmarks/load.py --requests 200 \
+        --concurrency 16 --save baseline.json
+    PYTHONPATH=../agent-tools-mcp uv run python benchmarks/load.py --compare baseline.json
+"""
+
+import os
+
+# The fakes must be selected before the server and agents read their settings.
+os.environ.setdefault("BRAVE_SEARCH_FAKE", "true")
+os.environ.setdefault("BRAVE_SEARCH_API_KEY", "offline")
+os.environ.setdefault("GEMINI_API_KEY", "offline")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import contextlib  # noqa: E402
+import json  # noqa: E402
+import logging  # noqa: E402
+import platform  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from collections.abc import Awaitable, Callable  # noqa: E402
+from dataclasses import asdict, dataclass  # noqa: E402
+
+import psutil  # noqa: E402
+from agent_tools_mcp import search_tools  # noqa: E402
+from agent_tools_mcp.main import server  # noqa: E402
+from fastmcp import Client  # noqa: E402
+
+from agents_core.actor_agent import ActorAgent  # noqa: E402
+from agents_core.fakes import FakeGeminiBackend, fake_tool_call  # noqa: E402
+from agents_core.mcp_session import MCPSessionManager  # noqa: E402
+from agents_core.search_agent import SearchAgent  # noqa: E402
+from agents_core.tool_catalog import ToolCatalogCache  # noqa: E402
+
+SCENARIOS = ("web_search", "python_interpreter", "actor_agent", "search_agent")
+# Metrics compared against a baseline, and whether a higher value is better.
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+
+
+@dataclass
+class LoadResult:
+    """Measurements of one scenario."""
+
+    scenario: str
+    requests: int
+    concurrency: int
+    errors: int
+    duration_s: float
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class RSSSampler:
+    """Samples the resident memory of this process and its children in the background."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = 0
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> None:
+        rss = self.process.memory_info().rss
+        for child in self.process.children(recursive=True):
+            with contextlib.suppress(psutil.Error):
+                rss += child.memory_info().rss
+        self.peak = max(self.peak, rss)
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self) -> "RSSSampler":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._task.cancel()
+        self.sample()
+
+
+async def run_load(
+    scenario: str, call: Callable[[int], Awaitable[object]], requests: int, concurrency: int
+) -> LoadResult:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight and measure them."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    async with RSSSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        duration = time.perf_counter() - started
+
+    latencies.sort()
+    return LoadResult(
+        scenario=scenario,
+        requests=requests,
+        concurrency=concurrency,
+        errors=errors,
+        duration_s=duration,
+        rps=requests / duration if duration else 0.0,
+        p50_ms=percentile(latencies, 0.50),
+        p95_ms=percentile(latencies, 0.95),
+        p99_ms=percentile(latencies, 0.99),
+        peak_rss_mb=sampler.peak / (1024 * 1024),
+    )
+
+
+def _check(result) -> None:
+    if result.is_error:
+        raise RuntimeError(str(result.content))
+
+
+async def run_scenarios(args: argparse.Namespace) -> list[LoadResult]:
+    brave = search_tools.get_search_client()
+    brave.latency = args.brave_latency
+    brave.description_chars = args.payload_chars
+
+    def query(i: int) -> str:
+        return f"benchmark query {i % args.distinct_queries}"
+
+    session = MCPSessionManager(
+        "memory://",
+        max_concurrency=args.concurrency,
+        keepalive_interval=0,
+        client_factory=lambda url, **kwargs: Client(server, **kwargs),
+        catalog=ToolCatalogCache(),
+    )
+    backend = FakeGeminiBackend(
+        lambda contents: fake_tool_call("web_search", query="benchmark"),
+        latency=args.gemini_latency,
+        response_chars=args.payload_chars,
+    )
+    selector = FakeGeminiBackend(
+        lambda contents: json.dumps({"tool_name": "web_search", "arguments": {"query": "b"}}),
+        latency=args.gemini_latency,
+    )
+    search_agent = SearchAgent("memory://", mcp_session=session, backend=selector)
+
+    async def web_search(i: int) -> None:
+        _check(await session.call_tool("web_search", {"query": query(i)}))
+
+    async def python_interpreter(i: int) -> None:
+        code = f"print(sum(range({1000 + i % 100})))"
+        _check(await session.call_tool("python_interpreter", {"code": code}))
+
+    async def actor_agent(i: int) -> None:
+        # A fresh agent per request, so histories do not grow across the run.
+        agent = ActorAgent(mcp_session=session, backend=backend)
+        await agent.process_message(query(i))
+
+    async def search_agent_call(i: int) -> None:
+        await search_agent(query(i))
+
+    calls = {
+        "web_search": web_search,
+        "python_interpreter": python_interpreter,
+        "actor_agent": actor_agent,
+        "search_agent": search_agent_call,
+    }
+    results = []
+    async with session:
+        for scenario in args.scenarios:
+            # One untimed call warms up the session, the worker pool and the tool catalog.
+            await calls[scenario](-1)
+            results.append(
+                await run_load(scenario, calls[scenario], args.requests, args.concurrency)
+            )
+    return results
+
+
+def compare(results: list[LoadResult], baseline: dict, tolerance: float) -> list[str]:
+    """Compare results with a saved baseline.
+
+    Returns:
+        Descriptions of the metrics that regressed by more than ``tolerance``
+    """
+    previous = {row["scenario"]: row for row in baseline["results"]}
+    regressions = []
+    print(f"\n{'scenario':<20}{'metric':<10}{'baseline':>12}{'current':>12}{'change':>10}")
+    for result in results:
+        old = previous.get(result.scenario)
+        if old is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = old[metric], getattr(result, metric)
+            change = (after - before) / before if before else 0.0
+            print(f"{result.scenario:<20}{metric:<10}{before:>12.2f}{after:>12.2f}{change:>+10.1%}")
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(f"{result.scenario} {metric} {change:+.1%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct-queries", type=int, default=50)
+    parser.add_argument("--brave-latency", type=float, default=0.02, help="seconds")
+    parser.add_argument("--gemini-latency", type=float, default=0.05, help="seconds")
+    parser.add_argument("--payload-chars", type=int, default=200)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with a JSON baseline from --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression")
+    args = parser.parse_args()
+
+    # Per-request log lines would dominate the measurements.
+    logging.disable(logging.INFO)
+    results = asyncio.run(run_scenarios(args))
+
+    header = f"{'scenario':<20}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(f"{header}{'errors':>8}{'peak MiB':>10}")
+    for r in results:
+        print(
+            f"{r.scenario:<20}{r.rps:>10.1f}{r.p50_ms:>10.2f}{r.p95_ms:>10.2f}"
+            f"{r.p99_ms:>10.2f}{r.errors:>8}{r.peak_rss_mb:>10.1f}"
+        )
+
+    if args.save:
+        options = {k: v for k, v in vars(args).items() if k not in ("save", "compare", "tolerance")}
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "python": platform.python_version(),
+                    "options": options,
+                    "results": [asdict(r) for r in results],
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions beyond tolerance: " + ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Accuracy and latency of the local tool pre-router on the labelled routing dataset.
+
+For each confidence threshold, reports how many queries are routed locally (coverage), how
+many of those decisions are correct (accuracy), the per-query routing latency, and the model
+time saved compared with sending every query to Gemini.
+
+Usage (from agents-core):
+    uv run python benchmarks/routing.py --thresholds 0.6 0.75 0.9 --llm-latency-ms 400
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import mcp.types
+
+from agents_core.router import PreRouter
+
+DATASET = Path(__file__).parent.parent / "tests" / "test_data" / "routing_queries.jsonl"
+TOOLS = [
+    mcp.types.Tool(
+        name=name,
+        description=description,
+        inputSchema={"type": "object", "properties": {"query": {"type": "string"}}},
+    )
+    for name, description in [
+        ("web_search", "Search the web using Brave Search API."),
+        ("image_search", "Search for images using Brave Search API."),
+        ("video_search", "Search for videos using Brave Search API."),
+        ("news_search", "Search for news articles using Brave Search API."),
+        ("python_interpreter", "Executes a string of Python code and returns the output."),
+    ]
+]
+
+
+def evaluate(rows: list[dict], threshold: float, llm_latency_ms: float) -> dict:
+    router = PreRouter(threshold=threshold)
+    router.route("warm up", TOOLS)
+    latencies = []
+    correct = 0
+    routed = 0
+    errors: Counter[tuple[str, str]] = Counter()
+    for row in rows:
+        started = time.perf_counter()
+        decision = router.route(row["query"], TOOLS)
+        latencies.append((time.perf_counter() - started) * 1_000_000)
+        if decision is None:
+            continue
+        routed += 1
+        if decision.tool_name == row["tool_name"]:
+            correct += 1
+        else:
+            errors[(row["tool_name"], decision.tool_name)] += 1
+
+    latencies.sort()
+    return {
+        "threshold": threshold,
+        "coverage": routed / len(rows),
+        "accuracy": correct / routed if routed else 0.0,
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "model_ms_saved_per_query": routed / len(rows) * llm_latency_ms,
+        "confusions": {f"{label}->{chosen}": n for (label, chosen), n in errors.items()},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--dataset", type=Path, default=DATASET)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.6, 0.75, 0.9])
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    rows = [json.loads(line) for line in args.dataset.read_text().splitlines() if line.strip()]
+    results = [evaluate(rows, threshold, args.llm_latency_ms) for threshold in args.thresholds]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{len(rows)} labelled queries from {args.dataset}")
+    header = f"{'threshold':>10}{'coverage':>10}{'accuracy':>10}{'p50 us':>10}{'p99 us':>10}"
+    print(f"{header}{'saved ms/q':>12}  confusions")
+    for r in results:
+        print(
+            f"{r['threshold']:>10.2f}{r['coverage']:>10.1%}{r['accuracy']:>10.1%}"
+            f"{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}{r['model_ms_saved_per_query']:>12.1f}"
+            f"  {r['confusions'] or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Cold-start benchmark for the CLI and the tools server.
+
+Each measurement runs in a fresh interpreter without API keys in the environment:
+
+- ``cli_help``: wall time of ``mcp-cli --help``
+- ``cli_import`` / ``tools_server_import``: cumulative import time of ``agents_core.cli``
+  and ``agent_tools_mcp.main`` from ``python -X importtime``, with the slowest modules they
+  import directly listed
+- ``list_tools_first_request``: time from starting ``mcp-cli list-tools`` until it
+  connects to the MCP server
+
+It also checks that heavy modules stay deferred (e.g. the CLI does not import the Gemini
+SDK), and can save the results as a JSON baseline or compare them with an earlier one.
+
+Usage (from agents-core):
+    PYTHONPATH=../agent-tools-mcp uv run python benchmarks/startup.py --save startup.json
+    PYTHONPATH=../agent-tools-mcp uv run python benchmarks/startup.py --compare startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules an import must not load; each is only needed once a command or tool uses it.
+DEFERRED = {
+    "agents_core.cli": (
+        "google.generativeai",
+        "fastmcp",
+        "pydantic_settings",
+        "agents_core.actor_agent",
+        "agents_core.search_agent",
+    ),
+    "agent_tools_mcp.main": ("brave_search_python_client",),
+}
+CLI = [sys.executable, "-m", "agents_core.cli"]
+_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def clean_env() -> dict[str, str]:
+    """The current environment without API keys, as a fresh shell would have it."""
+    env = dict(os.environ)
+    for key in ("GEMINI_API_KEY", "BRAVE_SEARCH_API_KEY"):
+        env.pop(key, None)
+    return env
+
+
+def wall_time(command: list[str], runs: int) -> float:
+    """Median wall time of a command in milliseconds."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, env=clean_env(), capture_output=True, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def import_profile(module: str, runs: int) -> tuple[float, list[tuple[str, float]], list[str]]:
+    """Import a module in fresh interpreters.
+
+    Returns:
+        Median cumulative import time in milliseconds, the slowest direct imports of the
+        module in the last run as ``(name, ms)``, and the deferred modules that were loaded
+        anyway
+    """
+    deferred = DEFERRED.get(module, ())
+    code = (
+        f"import json, sys, {module}; "
+        f"print(json.dumps([m for m in {deferred!r} if m in sys.modules]))"
+    )
+    totals = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            env=clean_env(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        # A module's imports are reported before it, indented one level deeper.
+        children: list[tuple[str, float]] = []
+        for line in result.stderr.splitlines():
+            match = _IMPORTTIME.match(line)
+            if not match:
+                continue
+            name, ms, depth = match.group(4), int(match.group(2)) / 1000, len(match.group(3))
+            if depth == 2:
+                children.append((name, ms))
+            elif depth == 0:
+                if name == module:
+                    totals.append(ms)
+                    direct = children
+                children = []
+    slowest = sorted(direct, key=lambda item: -item[1])[:8]
+    return statistics.median(totals), slowest, json.loads(result.stdout)
+
+
+def time_to_first_request(runs: int, timeout: float = 30.0) -> float:
+    """Median time in milliseconds from starting ``list-tools`` to its first connection."""
+    samples = []
+    for _ in range(runs):
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            listener.settimeout(timeout)
+            url = f"http://127.0.0.1:{listener.getsockname()[1]}/mcp/"
+            started = time.perf_counter()
+            process = subprocess.Popen(
+                [*CLI, "list-tools", "--url", url],
+                env=clean_env(),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                connection, _ = listener.accept()
+                samples.append((time.perf_counter() - started) * 1000)
+                connection.close()
+            finally:
+                process.kill()
+                process.wait()
+    return statistics.median(samples)
+
+
+def measure(runs: int) -> tuple[dict[str, float], list[str]]:
+    """Run all measurements and print the import breakdowns.
+
+    Returns:
+        Milliseconds per measurement, and descriptions of deferred modules that were loaded
+    """
+    results = {"cli_help": wall_time([*CLI, "--help"], runs)}
+    violations = []
+    for name, module in (
+        ("cli_import", "agents_core.cli"),
+        ("tools_server_import", "agent_tools_mcp.main"),
+    ):
+        try:
+            total, slowest, loaded = import_profile(module, runs)
+        except subprocess.CalledProcessError as e:
+            print(f"Skipping {module}: {e.stderr.strip().splitlines()[-1]}")
+            continue
+        results[name] = total
+        violations.extend(f"{module} imports {loaded_module}" for loaded_module in loaded)
+        print(f"\nSlowest imports of {module} ({total:.0f} ms):")
+        for imported, ms in slowest:
+            print(f"  {imported:<40}{ms:>10.1f} ms")
+    results["list_tools_first_request"] = time_to_first_request(runs)
+    return results, violations
+
+
+def compare(results: dict[str, float], baseline: dict, tolerance: float) -> list[str]:
+    """Compare results with a saved baseline.
+
+    Returns:
+        Descriptions of the measurements that regressed by more than ``tolerance``
+    """
+    regressions = []
+    print(f"\n{'measurement':<28}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, after in results.items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        change = (after - before) / before
+        print(f"{name:<28}{before:>12.1f}{after:>12.1f}{change:>+10.1%}")
+        if change > tolerance:
+            regressions.append(f"{name} {change:+.1%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5, help="runs per measurement")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with a JSON baseline from --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed regression")
+    args = parser.parse_args()
+
+    results, violations = measure(args.runs)
+    print(f"\n{'measurement':<28}{'ms':>10}")
+    for name, ms in results.items():
+        print(f"{name:<28}{ms:>10.1f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                    "python": platform.python_version(),
+                    "runs": args.runs,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved baseline to {args.save}")
+
+    failures = list(violations)
+    if args.compare:
+        with open(args.compare) as f:
+            failures.extend(compare(results, json.load(f), args.tolerance))
+    if failures:
+        print("\nStartup regressions: " + ", ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Shared fixtures for the agents_core tests."""
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from agents_core.mcp_session import MCPSessionManager
+from agents_core.tool_catalog import ToolCatalogCache
+
+
+@pytest.fixture
+def memory_session():
+    """Connect session managers to in-memory FastMCP servers.
+
+    Returns a function taking the server and, optionally, the tool catalog cache to use
+    (a fresh one by default). Sessions have no keepalive.
+    """
+
+    def connect(server: FastMCP, catalog: ToolCatalogCache | None = None) -> MCPSessionManager:
+        return MCPSessionManager(
+            "memory://",
+            keepalive_interval=0,
+            client_factory=lambda url, **kwargs: Client(server, **kwargs),
+            catalog=catalog or ToolCatalogCache(),
+        )
+
+    return connect
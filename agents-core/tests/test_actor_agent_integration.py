@@ -1,14 +1,18 @@
 """Integration tests for the Actor agent."""
 
+import asyncio
 import json
+import time
 from unittest.mock import AsyncMock, MagicMock
 
 import mcp.types
 import pytest
-from fastmcp import Client
+from fastmcp import Client, Context, FastMCP
 from fastmcp.client.client import CallToolResult
 
 from agents_core.actor_agent import ActorAgent
+from agents_core.fakes import FakeGeminiBackend, fake_tool_call
+from agents_core.mcp_session import MCPSessionManager
 
 
 @pytest.fixture
@@ -56,10 +60,14 @@ async def test_actor_agent_tool_call(mock_mcp_client):
     mock_model_response.text = json.dumps(tool_call_response)
 
     # Patch the agent's model to return the mocked response
-    agent.model.generate_content = AsyncMock(return_value=mock_model_response)
+    agent.model.generate_content_async = AsyncMock(return_value=mock_model_response)
 
-    # patch the agent's mcp client to use the mock client
-    agent.mcp_client = mock_mcp_client
+    # patch the agent's mcp session to hand out the mock client
+    agent.mcp_session = MCPSessionManager(
+        agent.mcp_server_url,
+        keepalive_interval=0,
+        client_factory=lambda url, **kwargs: mock_mcp_client,
+    )
 
     # Process a message that should trigger the tool call
     response = await agent.process_message("Search for 'test'")
@@ -73,3 +81,134 @@ async def test_actor_agent_tool_call(mock_mcp_client):
         'Tool result: [{"type": "text", "text": "some search result", "annotations": null, "meta": null}]'
     )
     assert response == expected
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_streams_partial_tool_output(memory_session):
+    """Partial output of a streaming tool reaches on_tool_output before the call returns."""
+    server = FastMCP("streaming-server")
+
+    @server.tool()
+    async def run(code: str, stream: bool = False, ctx: Context | None = None) -> str:
+        if stream:
+            await ctx.report_progress(1, message=json.dumps({"stream": "stdout", "text": "a\n"}))
+            await ctx.report_progress(2, message="halfway")
+        return "done"
+
+    received = []
+
+    async def on_tool_output(stream: str, text: str) -> None:
+        received.append((stream, text))
+
+    session = memory_session(server)
+    agent = ActorAgent(
+        mcp_session=session,
+        on_tool_output=on_tool_output,
+        backend=FakeGeminiBackend(fake_tool_call("run", code="print('a')")),
+    )
+    async with session:
+        response = await agent.process_message("Run it")
+
+    assert received == [("stdout", "a\n"), ("progress", "halfway")]
+    assert "done" in response
+
+
+@pytest.fixture
+def slow_server():
+    """In-memory MCP server whose tools sleep for the requested time."""
+    server = FastMCP("slow-server")
+
+    @server.tool()
+    async def wait(seconds: float, label: str) -> str:
+        await asyncio.sleep(seconds)
+        return label
+
+    @server.tool()
+    async def fail() -> str:
+        raise ValueError("broken tool")
+
+    return server
+
+
+@pytest.fixture
+def batch_agent(memory_session, slow_server):
+    """Build an actor whose model replies with a list of tool calls to the slow server."""
+
+    def build(calls, **kwargs):
+        session = memory_session(slow_server)
+        backend = FakeGeminiBackend(json.dumps(calls))
+        return ActorAgent(mcp_session=session, backend=backend, **kwargs), session
+
+    return build
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_runs_tool_calls_in_parallel(batch_agent):
+    """A list of tool calls runs concurrently and results keep the order of the calls."""
+    calls = [
+        {"tool_name": "wait", "parameters": {"seconds": 0.3, "label": "slow"}},
+        {"tool_name": "wait", "parameters": {"seconds": 0.0, "label": "fast"}},
+        {"tool_name": "wait", "parameters": {"seconds": 0.3, "label": "slow again"}},
+    ]
+    agent, session = batch_agent(calls)
+    async with session:
+        started = time.monotonic()
+        await agent.process_message("Do three things")
+        elapsed = time.monotonic() - started
+
+    results = [
+        json.loads(m["content"].removeprefix("Tool result: "))
+        for m in agent.conversation_history[2:]
+    ]
+    assert [r["content"][0]["text"] for r in results] == ["slow", "fast", "slow again"]
+    assert elapsed < 0.55
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_batch_reports_timeouts_and_errors(batch_agent):
+    """A slow or failing call yields an error entry without losing the other results."""
+    calls = [
+        {"tool_name": "fail", "parameters": {}},
+        {"tool_name": "wait", "parameters": {"seconds": 5, "label": "too slow"}},
+        {"tool_name": "wait", "parameters": {"seconds": 0, "label": "ok"}},
+    ]
+    agent, session = batch_agent(calls, tool_call_timeout=1.0)
+    async with session:
+        response = await agent.process_message("Try everything")
+
+    results = [
+        json.loads(m["content"].removeprefix("Tool result: "))
+        for m in agent.conversation_history[2:]
+    ]
+    assert "broken tool" in results[0]["error"]
+    assert results[1] == {"tool_name": "wait", "error": "timed out"}
+    assert results[2]["content"][0]["text"] == "ok"
+    assert response.count("\nTool result: ") == 3
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_treats_other_json_objects_as_plain_text(batch_agent):
+    """A JSON object that is not a tool call is the answer, not a failed tool call."""
+    answer = {"answer": 42, "confidence": "high"}
+    agent, session = batch_agent(answer)
+    async with session:
+        response = await agent.process_message("What is the answer?")
+
+    assert response == json.dumps(answer)
+    assert [m["role"] for m in agent.conversation_history] == ["user", "assistant"]
+    assert agent.parse_stats["parse_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_bounds_parallel_tool_calls(batch_agent):
+    """No more than max_parallel_tool_calls calls run at once."""
+    calls = [
+        {"tool_name": "wait", "parameters": {"seconds": 0.2, "label": str(i)}} for i in range(4)
+    ]
+    agent, session = batch_agent(calls, max_parallel_tool_calls=2)
+    async with session:
+        started = time.monotonic()
+        await agent.process_message("Four things, two at a time")
+        elapsed = time.monotonic() - started
+
+    assert 0.4 <= elapsed < 0.7
@@ -35,6 +35,7 @@ async def test_actor_agent_system_prompt(actor_agent):
     """Test the ActorAgent's system prompt."""
     prompt = await actor_agent.get_system_prompt()
     assert "You are an actor agent." in prompt
+    assert '"tool_calls"' in prompt
 
 
 @pytest.mark.asyncio
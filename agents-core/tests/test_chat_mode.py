@@ -0,0 +1,129 @@
+"""Tests for the structured multi-turn chat execution mode."""
+
+import time
+
+import pytest
+
+from agents_core.base_agent import BaseAgent
+from agents_core.fakes import FakeGeminiBackend
+
+SYSTEM_PROMPT = "You are a test agent."
+
+# Large enough to be worth a context cache (over the default minimum token count).
+TOOLS = [
+    {"name": f"tool_{i}", "description": "Searches for things. " * 20, "inputSchema": {}}
+    for i in range(12)
+]
+
+
+class ToolAgent(BaseAgent):
+    """Agent with a fixed system prompt that passes a tool catalog as context."""
+
+    async def get_system_prompt(self) -> str:
+        return SYSTEM_PROMPT
+
+    async def get_available_tools(self):
+        return TOOLS
+
+    async def ask(self, message: str, tools=TOOLS) -> str:
+        return await self.process_message(message, {"available_tools": tools, "step": 1})
+
+
+@pytest.mark.asyncio
+async def test_chat_mode_sends_structured_contents():
+    """History is sent as role/parts contents with the prompt as system instruction."""
+    backend = FakeGeminiBackend(["first", "second"])
+    agent = ToolAgent("Tester", execution_mode="chat", backend=backend)
+
+    await agent.process_message("hello")
+    await agent.process_message("again", {"step": 2})
+
+    model = backend.models[-1]
+    assert model.system_instruction == SYSTEM_PROMPT
+    assert model.calls[-1] == [
+        {"role": "user", "parts": ["hello"]},
+        {"role": "model", "parts": ["first"]},
+        {"role": "user", "parts": ["again"]},
+        {"role": "user", "parts": ['Context: {\n  "step": 2\n}']},
+    ]
+    assert agent.context_cache_name is None
+
+
+@pytest.mark.asyncio
+async def test_chat_mode_reuses_cached_prefix():
+    """The system prompt and tool catalog are cached once and reused every turn."""
+    backend = FakeGeminiBackend("ok")
+    agent = ToolAgent("Tester", execution_mode="chat", backend=backend)
+
+    for turn in range(3):
+        await agent.ask(f"turn {turn}")
+
+    assert len(backend.caches) == 1
+    cache = backend.caches[agent.context_cache_name]
+    assert cache["system_instruction"] == SYSTEM_PROMPT
+    assert "tool_11" in cache["contents"][0]["parts"][0]
+
+    # The cached prefix is not resent with each request.
+    last_call = backend.models[-1].calls[-1]
+    assert all("tool_0" not in str(content) for content in last_call)
+    assert agent.usage["calls"] == 3
+    assert agent.usage["cached_tokens"] > 0
+
+    # A changed catalog replaces the cache.
+    old_cache = agent.context_cache_name
+    await agent.ask("new tools", tools=TOOLS[:-1])
+    assert backend.deleted_caches == [old_cache]
+    assert agent.context_cache_name != old_cache
+
+
+@pytest.mark.asyncio
+async def test_chat_mode_recreates_expiring_and_missing_caches(monkeypatch):
+    """A cache close to its TTL is replaced, and one Gemini no longer has is recreated."""
+    backend = FakeGeminiBackend("ok")
+    agent = ToolAgent("Tester", execution_mode="chat", backend=backend)
+    await agent.ask("turn 0")
+    first = agent.context_cache_name
+
+    # Near the end of the TTL the next turn starts a new cache.
+    monkeypatch.setattr(agent, "_context_cache_expires_at", time.monotonic() + 1)
+    await agent.ask("turn 1")
+    second = agent.context_cache_name
+    assert second != first
+    assert backend.deleted_caches == [first]
+
+    # Gemini dropped the cache early: the request is retried on a new one.
+    backend.expired_caches.add(second)
+    assert await agent.ask("turn 2") == "ok"
+    assert agent.context_cache_name not in (first, second)
+    assert len(backend.caches) == 3
+
+    # So is a streamed request.
+    backend.expired_caches.add(agent.context_cache_name)
+    assert (
+        "".join(
+            [chunk async for chunk in agent.stream_message("turn 3", {"available_tools": TOOLS})]
+        )
+        == "ok"
+    )
+    assert len(backend.caches) == 4
+
+
+@pytest.mark.asyncio
+async def test_chat_mode_bills_fewer_uncached_tokens_than_text_mode():
+    """Both modes report usage, and chat mode moves the stable prefix into the cache."""
+    usage = {}
+    for mode in ("text", "chat"):
+        agent = ToolAgent("Tester", execution_mode=mode, backend=FakeGeminiBackend("ok"))
+        for turn in range(4):
+            await agent.ask(f"turn {turn}")
+        usage[mode] = agent.get_conversation_summary()["usage"]
+
+    uncached = {mode: u["prompt_tokens"] - u["cached_tokens"] for mode, u in usage.items()}
+    assert usage["text"]["calls"] == usage["chat"]["calls"] == 4
+    assert uncached["chat"] < uncached["text"] / 4
+
+
+def test_unknown_execution_mode():
+    """An unsupported execution mode is rejected."""
+    with pytest.raises(ValueError):
+        ToolAgent("Tester", execution_mode="telepathy", backend=FakeGeminiBackend())
@@ -0,0 +1,158 @@
+"""Tests for native function calling and the tolerant JSON extractor."""
+
+import json
+
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.fakes import FakeGeminiBackend, fake_function_call, fake_tool_call
+from agents_core.function_calling import (
+    JSONStreamExtractor,
+    function_declarations,
+    iter_json_values,
+)
+from agents_core.search_agent import SearchAgent
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("tools")
+    server.queries = []
+
+    @server.tool()
+    async def web_search(query: str, count: int | None = None) -> dict:
+        """Search the web."""
+        server.queries.append(query)
+        return {"query": query, "count": count}
+
+    session = memory_session(server)
+    session.server = server
+    return session
+
+
+def test_function_declarations_keep_only_the_gemini_schema_subset():
+    tools = [
+        {
+            "name": "search",
+            "description": "Search.",
+            "inputSchema": {
+                "type": "object",
+                "title": "searchArguments",
+                "additionalProperties": False,
+                "properties": {
+                    "query": {"type": "string", "title": "Query"},
+                    "count": {"anyOf": [{"type": "integer"}, {"type": "null"}], "default": None},
+                    "tags": {"type": "array", "items": {"type": "string"}},
+                    "mode": {"enum": ["fast", "slow"], "type": "string"},
+                    "options": {"type": "object"},
+                },
+                "required": ["query"],
+            },
+        },
+        {"name": "ping", "description": None, "inputSchema": {"type": "object"}},
+    ]
+
+    search, ping = function_declarations(tools)
+
+    assert search["parameters"] == {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "count": {"type": "integer", "nullable": True},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "mode": {"type": "string", "enum": ["fast", "slow"]},
+            "options": {"type": "string", "description": "JSON object"},
+        },
+        "required": ["query"],
+    }
+    assert ping == {"name": "ping", "description": ""}
+
+
+def test_extractor_skips_prose_fences_and_unparseable_brackets():
+    text = (
+        "Sure! I'll use {tool} now.\n```json\n"
+        '{"tool_name": "web_search", "parameters": {"query": "a } in a string"}}\n```'
+        " and then [1, 2]"
+    )
+    assert list(iter_json_values(text)) == [
+        {"tool_name": "web_search", "parameters": {"query": "a } in a string"}},
+        [1, 2],
+    ]
+
+
+def test_extractor_yields_values_as_chunks_complete_them():
+    extractor = JSONStreamExtractor()
+    assert extractor.feed('Calling {"tool_name": "web_') == []
+    assert extractor.feed('search", "parameters": {}}') == [
+        {"tool_name": "web_search", "parameters": {}}
+    ]
+    assert extractor.feed("done") == []
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_runs_native_function_calls(session):
+    backend = FakeGeminiBackend(fake_function_call("web_search", query="otters", count=3.0))
+    agent = ActorAgent(mcp_session=session, backend=backend)
+
+    async with session:
+        response = await agent.process_message("find otters")
+
+    assert session.server.queries == ["otters"]
+    assert json.loads(response.split("\n")[0]) == {
+        "tool_name": "web_search",
+        "parameters": {"query": "otters", "count": 3},
+    }
+    declarations = backend.models[0].call_kwargs[0]["tools"][0]["function_declarations"]
+    assert [declaration["name"] for declaration in declarations] == ["web_search"]
+    assert agent.parse_stats == {
+        "replies": 1,
+        "native": 1,
+        "text": 0,
+        "recovered": 0,
+        "parse_failures": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_recovers_tool_calls_from_text_around_json(session):
+    reply = f"Let me look that up.\n```json\n{fake_tool_call('web_search', query='otters')}\n```"
+    agent = ActorAgent(mcp_session=session, backend=FakeGeminiBackend([reply, "no JSON here"]))
+
+    async with session:
+        await agent.process_message("find otters")
+        # A reply without any tool call is a plain message, not a failed parse.
+        assert await agent.process_message("thanks") == "no JSON here"
+
+    assert session.server.queries == ["otters"]
+    assert "Tool result error" not in [entry["content"] for entry in agent.conversation_history]
+    assert agent.parse_stats["recovered"] == 1
+    assert agent.parse_stats["parse_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_counts_unparseable_tool_calls(session):
+    agent = ActorAgent(
+        mcp_session=session, backend=FakeGeminiBackend('{"tool_name": "web_search", "param')
+    )
+
+    async with session:
+        response = await agent.process_message("find otters")
+
+    assert response.endswith("Tool result: error")
+    assert agent.parse_stats["parse_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_agent_selects_tools_with_a_forced_function_call(session):
+    backend = FakeGeminiBackend(fake_function_call("web_search", query="otters"))
+    agent = SearchAgent("memory://", mcp_session=session, backend=backend)
+    agent.router = None  # select with the model even if the query is obvious
+
+    async with session:
+        result = await agent("tell me about otters")
+
+    assert json.loads(result) == {"query": "otters", "count": None}
+    kwargs = backend.models[0].call_kwargs[0]
+    assert kwargs["tool_config"] == {"function_calling_config": {"mode": "ANY"}}
+    assert agent.parse_stats["native"] == 1
@@ -0,0 +1,108 @@
+"""Tests for conversation history compaction."""
+
+import pytest
+
+from agents_core.base_agent import BaseAgent
+from agents_core.fakes import FakeGeminiBackend, FakeGenerativeModel
+from agents_core.history import (
+    SUMMARY_PREFIX,
+    CompositePolicy,
+    SlidingWindowPolicy,
+    SummarizingPolicy,
+    ToolResultDigestPolicy,
+    history_tokens,
+)
+
+
+class EchoAgent(BaseAgent):
+    """Minimal concrete agent."""
+
+    async def get_system_prompt(self) -> str:
+        return "You are a test agent."
+
+    async def get_available_tools(self):
+        return []
+
+
+def tool_result(size: int) -> dict[str, str]:
+    return {"role": "user", "content": "Tool result: " + "x" * size}
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_keeps_recent_messages_within_budget():
+    """Older messages are dropped until the history fits the budget."""
+    history = [{"role": "user", "content": "a" * 400} for _ in range(10)]
+    compacted = await SlidingWindowPolicy(max_tokens=250).compact(history)
+
+    assert compacted == history[-2:]
+    assert await SlidingWindowPolicy(max_tokens=10_000).compact(history) is history
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_starts_at_a_user_turn():
+    """The window never opens on a reply or on a tool result without its call."""
+    call = {"role": "assistant", "content": '{"tool_name": "web_search", "parameters": {}}'}
+    history = [
+        {"role": "user", "content": "first question"},
+        call,
+        tool_result(400),
+        {"role": "assistant", "content": "a" * 400},
+        {"role": "user", "content": "second question"},
+        call,
+        tool_result(400),
+        {"role": "assistant", "content": "answer"},
+    ]
+
+    # The budget would cut inside the second turn's tool round trip; the turn is kept whole.
+    compacted = await SlidingWindowPolicy(max_tokens=100).compact(history)
+    assert compacted == history[4:]
+
+    # A cut at the first turn's final reply moves forward to the second turn.
+    compacted = await SlidingWindowPolicy(max_tokens=300).compact(history)
+    assert compacted == history[4:]
+
+
+@pytest.mark.asyncio
+async def test_tool_result_digest_keeps_latest_result():
+    """All but the newest large tool results are reduced to a digest."""
+    history = [tool_result(5000), {"role": "assistant", "content": "ok"}, tool_result(5000)]
+    compacted = await ToolResultDigestPolicy(keep_recent=1, max_chars=50).compact(history)
+
+    assert compacted[0]["content"].startswith("Tool result: [digest of 5000 chars")
+    assert len(compacted[0]["content"]) < 150
+    assert compacted[2] is history[2]
+    assert history[0]["content"].endswith("x")  # input left untouched
+
+
+@pytest.mark.asyncio
+async def test_summarizing_policy_replaces_older_turns():
+    """Older turns become a single summary message once over budget."""
+    model = FakeGenerativeModel("the user asked about cats")
+    history = [{"role": "user", "content": "c" * 400} for _ in range(6)]
+    compacted = await SummarizingPolicy(model, max_tokens=300, keep_recent=2).compact(history)
+
+    assert compacted[0] == {
+        "role": "user",
+        "content": f"{SUMMARY_PREFIX} the user asked about cats",
+    }
+    assert compacted[1:] == history[-2:]
+    assert len(model.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_agent_reports_tokens_saved():
+    """The agent applies its policy before each call and reports the savings."""
+    policy = CompositePolicy(ToolResultDigestPolicy(max_chars=20), SlidingWindowPolicy(2000))
+    backend = FakeGeminiBackend("done")
+    agent = EchoAgent("Tester", backend=backend, history_policy=policy)
+
+    for _ in range(4):
+        agent.conversation_history.append(tool_result(4000))
+        await agent.process_message("next")
+
+    summary = agent.get_conversation_summary()
+    assert summary["tokens_saved"] > 2000
+    assert summary["estimated_tokens"] == history_tokens(agent.conversation_history)
+    assert summary["estimated_tokens"] <= 2000
+    # The prompt sent to the model reflects the compacted history.
+    assert "[digest of" in backend.models[0].calls[-1]
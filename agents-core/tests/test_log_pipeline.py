@@ -0,0 +1,104 @@
+"""Tests for the production log pipeline."""
+
+import io
+import json
+import logging
+import sys
+
+import pytest
+import structlog
+
+from agents_core.config import LoggingConfig, configure_logging, stop_logging
+from agents_core.log_pipeline import EventSampler, FieldLimiter, QueuedStream, digest
+
+
+@pytest.fixture
+def json_logging(monkeypatch):
+    output = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", output)
+    configure_logging(
+        "INFO",
+        LoggingConfig(
+            log_format="json", log_max_field_chars=16, log_sample_rates={"hot path": 0.25}
+        ),
+    )
+    yield output
+    stop_logging()
+    configure_logging("INFO")
+
+
+def test_long_fields_are_cut_and_fingerprinted():
+    limiter = FieldLimiter(8)
+    payload = "x" * 100
+    event = limiter(
+        None, "info", {"event": "a long event name", "response": payload, "size": 100, "args": {}}
+    )
+
+    assert event["event"] == "a long event name"
+    assert event["response"] == f"xxxxxxxx...[100 chars, sha256:{digest(payload)}]"
+    assert event["size"] == 100
+    assert event["args"] == {}
+
+
+def test_sampler_keeps_a_share_of_hot_events_and_all_warnings():
+    sampler = EventSampler({"hot": 0.25, "off": 0.0})
+    kept = 0
+    for _ in range(100):
+        try:
+            sampler(None, "info", {"event": "hot"})
+            kept += 1
+        except structlog.DropEvent:
+            pass
+
+    assert kept == 25
+    assert sampler(None, "warning", {"event": "hot"}) == {"event": "hot"}
+    assert sampler(None, "info", {"event": "cold"}) == {"event": "cold"}
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "off"})
+
+
+def test_full_queue_drops_instead_of_blocking():
+    stream = QueuedStream(io.StringIO(), max_queued=1)
+    stream.listener.stop()  # Nothing drains the queue
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, "line", None, None)
+    for _ in range(3):
+        stream.handler.emit(record)
+
+    assert stream.handler.dropped == 2
+
+
+def test_json_mode_writes_bounded_sampled_lines(json_logging):
+    logger = structlog.get_logger("tests.log_pipeline")
+    for i in range(8):
+        logger.info("hot path", i=i)
+    logger.warning("Tool call failed", error="e" * 40)
+    logger.debug("not written")
+    stop_logging()
+
+    lines = [json.loads(line) for line in json_logging.getvalue().splitlines()]
+    assert [line["i"] for line in lines if line["event"] == "hot path"] == [0, 4]
+    failure = lines[-1]
+    assert failure["level"] == "warning"
+    assert failure["logger"] == "tests.log_pipeline"
+    assert failure["error"].startswith("e" * 16 + "...[40 chars")
+    assert "timestamp" in failure
+    assert "lineno" not in failure
+
+
+def test_json_mode_renders_stdlib_records(json_logging):
+    logger = logging.getLogger("httpx")
+    logger.info("HTTP Request: GET %s", "https://example.com/" + "a" * 40)
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logging.getLogger("fastmcp").exception("Tool failed")
+    stop_logging()
+
+    request, failure = (json.loads(line) for line in json_logging.getvalue().splitlines())
+    assert request["logger"] == "httpx"
+    assert request["level"] == "info"
+    assert request["event"].startswith("HTTP Request: GET https://example.com/aaa")
+    assert "timestamp" in request
+    assert failure["level"] == "error"
+    assert failure["logger"] == "fastmcp"
+    assert failure["exception"].startswith("Traceback")
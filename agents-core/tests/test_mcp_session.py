@@ -0,0 +1,145 @@
+"""Tests for the shared MCP session manager."""
+
+import asyncio
+
+import pytest
+from fastmcp import Client, FastMCP
+
+from agents_core.mcp_session import MCPSessionManager, close_all_sessions, get_session_manager
+from agents_core.tool_catalog import ToolCatalogCache
+
+
+@pytest.fixture
+def server():
+    """In-memory MCP server with a slow echo tool that tracks concurrency."""
+    server = FastMCP("test-server")
+    server.in_flight = 0
+    server.peak_in_flight = 0
+
+    @server.tool()
+    async def echo(text: str) -> str:
+        server.in_flight += 1
+        server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        await asyncio.sleep(0.05)
+        server.in_flight -= 1
+        return text
+
+    return server
+
+
+class CountingFactory:
+    """Client factory that records how many clients it built."""
+
+    def __init__(self, server):
+        self.server = server
+        self.clients: list[Client] = []
+
+    def __call__(self, url: str, message_handler=None) -> Client:
+        client = Client(self.server, message_handler=message_handler)
+        self.clients.append(client)
+        return client
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_across_calls(server):
+    """Listing tools and calling a tool share a single connection."""
+    factory = CountingFactory(server)
+    async with MCPSessionManager(
+        "memory://", keepalive_interval=0, client_factory=factory, catalog=ToolCatalogCache()
+    ) as s:
+        tools = await s.list_tools()
+        result = await s.call_tool("echo", {"text": "hi"})
+
+    assert [tool.name for tool in tools] == ["echo"]
+    assert result.data == "hi"
+    assert len(factory.clients) == 1
+    assert not s.is_connected
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_capped(server):
+    """No more than max_concurrency calls are in flight at once."""
+    session = MCPSessionManager(
+        "memory://", max_concurrency=2, keepalive_interval=0, client_factory=CountingFactory(server)
+    )
+    await asyncio.gather(*(session.call_tool("echo", {"text": str(i)}) for i in range(6)))
+    await session.close()
+
+    assert server.peak_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_reconnects_after_connection_error(server):
+    """A call that loses its session is retried on a fresh one."""
+    factory = CountingFactory(server)
+    session = MCPSessionManager("memory://", keepalive_interval=0, client_factory=factory)
+    await session.connect()
+
+    calls = 0
+
+    async def flaky(client):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ConnectionError("connection reset")
+        return await client.call_tool("echo", {"text": "again"})
+
+    result = await session.run(flaky)
+    await session.close()
+
+    assert result.data == "again"
+    assert len(factory.clients) == 2
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_not_retried_after_connection_error(server):
+    """A tool call that loses its session fails instead of running twice."""
+    factory = CountingFactory(server)
+    session = MCPSessionManager("memory://", keepalive_interval=0, client_factory=factory)
+    first = await session.connect()
+    sent = []
+
+    async def dropped(name, arguments=None, **kwargs):
+        sent.append(name)  # The request reached the server, the reply never came back
+        raise ConnectionError("connection reset")
+
+    first.call_tool = dropped
+
+    with pytest.raises(ConnectionError):
+        await session.call_tool("echo", {"text": "once"})
+    assert sent == ["echo"]
+    assert not session.is_connected
+
+    # The broken session was dropped, so the next call reconnects.
+    result = await session.call_tool("echo", {"text": "next"})
+    await session.close()
+
+    assert result.data == "next"
+    assert len(factory.clients) == 2
+
+
+@pytest.mark.asyncio
+async def test_keepalive_reopens_dropped_session(server):
+    """The keep-alive task replaces a session whose ping fails."""
+    factory = CountingFactory(server)
+    session = MCPSessionManager("memory://", keepalive_interval=0.01, client_factory=factory)
+    first = await session.connect()
+    await first.__aexit__(None, None, None)
+
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if len(factory.clients) > 1 and session.is_connected:
+            break
+    await session.close()
+
+    assert len(factory.clients) == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_manager_per_url():
+    """Agents asking for the same URL get the same manager."""
+    first = get_session_manager("http://example.invalid/mcp/")
+    assert get_session_manager("http://example.invalid/mcp/") is first
+    await close_all_sessions()
+    assert get_session_manager("http://example.invalid/mcp/") is not first
+    await close_all_sessions()
@@ -0,0 +1,175 @@
+"""Tests for the actor-critic orchestrator."""
+
+import json
+
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.critic_agent import CriticAgent
+from agents_core.fakes import FakeGeminiBackend
+from agents_core.history import SlidingWindowPolicy
+from agents_core.orchestrator import CONTINUE_MESSAGE, ActorCriticOrchestrator
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("tools")
+
+    @server.tool()
+    async def web_search(query: str) -> str:
+        """Search the web."""
+        return f"results for {query}"
+
+    return memory_session(server)
+
+
+def last_message(contents: str) -> str:
+    """The last human message of a text-mode prompt."""
+    return contents.rsplit("Human: ", 1)[1].split("\n\n")[0]
+
+
+def actor_reply(contents: str) -> str:
+    message = last_message(contents)
+    if message.startswith("The critic rejected"):
+        return "revised draft"
+    if message == CONTINUE_MESSAGE:
+        return "next draft"
+    return "first draft"
+
+
+def verdict(approved: bool, complete: bool = False, feedback: str = "") -> str:
+    return json.dumps({"approved": approved, "complete": complete, "feedback": feedback})
+
+
+def agents(session, critic_reply, latency=0.0):
+    actor = ActorAgent(mcp_session=session, backend=FakeGeminiBackend(actor_reply, latency=latency))
+    critic = CriticAgent(backend=FakeGeminiBackend(critic_reply, latency=latency))
+    return actor, critic
+
+
+@pytest.mark.asyncio
+async def test_rejection_cancels_speculation_and_sends_feedback(session):
+    def critic_reply(contents: str) -> str:
+        if "revised draft" in contents.rsplit("Task:", 1)[1]:
+            return f"Looks good.\n{verdict(True, complete=True)}"
+        return verdict(False, feedback="cite your sources")
+
+    actor, critic = agents(session, critic_reply)
+    async with session:
+        result = await ActorCriticOrchestrator(actor, critic, speculative=True).run("write")
+
+    assert result.stop_reason == "approved"
+    assert result.approved
+    assert result.output == "revised draft"
+    assert [it.verdict.approved for it in result.iterations] == [False, True]
+    assert result.speculation["started"] == 2
+    assert result.speculation["cancelled"] == 2
+    # The abandoned "continue" steps were rolled back out of the actor's history.
+    messages = [entry["content"] for entry in actor.conversation_history]
+    assert CONTINUE_MESSAGE not in messages
+    assert "cite your sources" in messages[2]
+    spent = sum(it.actor_tokens + it.critic_tokens for it in result.iterations)
+    assert result.tokens == spent + result.speculation["wasted_tokens"]
+
+
+@pytest.mark.asyncio
+async def test_speculation_overlaps_the_next_step_with_the_review(session):
+    def critic_reply(contents: str) -> str:
+        return verdict(True, complete="next draft" in contents.rsplit("Task:", 1)[1])
+
+    results = {}
+    # Actor calls started by the time each review finished
+    started_by_review = {}
+    for speculative in (False, True):
+        actor, critic = agents(session, critic_reply, latency=0.1)
+        actor_calls = actor.backend.models[0].calls
+        replies = critic.backend.models[0]
+        started_by_review[speculative] = seen = []
+
+        def reviewed(contents, reply=replies.responder, seen=seen, actor_calls=actor_calls):
+            seen.append(len(actor_calls))
+            return reply(contents)
+
+        replies.responder = reviewed
+        async with session:
+            orchestrator = ActorCriticOrchestrator(actor, critic, speculative=speculative)
+            results[speculative] = await orchestrator.run("write")
+
+    assert [it.output for it in results[True].iterations] == ["first draft", "next draft"]
+    assert results[True].iterations[1].speculative
+    assert results[True].speculation["kept"] == 1
+    # With speculation, each review finishes after the next step has started; without it,
+    # each step waits for the review of the previous one.
+    assert started_by_review == {False: [1, 2], True: [2, 3]}
+    for result in results.values():
+        assert result.stop_reason == "approved"
+        assert all(it.actor_seconds >= 0.1 and it.critic_seconds >= 0.1 for it in result.iterations)
+
+
+@pytest.mark.asyncio
+async def test_rejection_restores_a_history_compacted_by_the_speculative_step(session):
+    actor, critic = agents(session, verdict(False, feedback="again"))
+    # Small enough that every turn drops the earlier ones
+    actor.history_policy = SlidingWindowPolicy(max_tokens=5)
+    snapshots = []
+    restore = actor.restore_conversation
+
+    def restore_conversation(messages):
+        snapshots.append(list(messages))
+        restore(messages)
+
+    actor.restore_conversation = restore_conversation
+    async with session:
+        await ActorCriticOrchestrator(actor, critic, max_turns=2, speculative=True).run("write")
+
+    # The first rollback put back the history as it was before the "continue" step, which
+    # compaction had cut down to that step alone.
+    assert [m["content"] for m in snapshots[0]] == ["write", "first draft"]
+    assert CONTINUE_MESSAGE not in [m["content"] for m in actor.conversation_history]
+
+
+@pytest.mark.asyncio
+async def test_critic_keeps_only_its_last_reviews(session):
+    actor, critic = agents(session, verdict(False, feedback="again"))
+    async with session:
+        orchestrator = ActorCriticOrchestrator(
+            actor, critic, max_turns=5, speculative=False, critic_memory=1
+        )
+        result = await orchestrator.run("write")
+
+    assert len(result.iterations) == 5
+    assert len(critic.conversation_history) == 4
+    assert "Step 5 of the agent" in critic.conversation_history[2]["content"]
+    prompt = critic.backend.models[0].calls[-1]
+    assert "Step 3 of the agent" not in str(prompt)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("budget", "stop_reason", "iterations"),
+    [
+        ({"max_turns": 2}, "max_turns", 2),
+        ({"max_tokens": 1}, "max_tokens", 1),
+        ({"max_seconds": 0.05}, "max_seconds", 0),
+    ],
+)
+async def test_budgets_stop_the_loop(session, budget, stop_reason, iterations):
+    latency = 0.2 if stop_reason == "max_seconds" else 0.0
+    actor, critic = agents(session, verdict(False, feedback="again"), latency=latency)
+    options = {"max_turns": 5, "max_tokens": 0, "max_seconds": 0, **budget}
+    async with session:
+        result = await ActorCriticOrchestrator(actor, critic, **options).run("write")
+
+    assert result.stop_reason == stop_reason
+    assert len(result.iterations) == iterations
+    assert not result.approved
+
+
+@pytest.mark.asyncio
+async def test_critic_reply_without_verdict_counts_as_rejection():
+    critic = CriticAgent(backend=FakeGeminiBackend("This needs more detail."))
+    result = await critic.review("write", 1, "draft")
+    assert not result.approved
+    assert not result.complete
+    assert result.feedback == "This needs more detail."
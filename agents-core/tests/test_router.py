@@ -0,0 +1,108 @@
+"""Tests for the local tool pre-router."""
+
+import json
+from pathlib import Path
+
+import mcp.types
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.fakes import FakeGeminiBackend
+from agents_core.router import PreRouter, RuleRouter, TfidfRouter
+from agents_core.search_agent import SearchAgent
+
+DATASET = Path(__file__).parent / "test_data" / "routing_queries.jsonl"
+QUERY_SCHEMA = {
+    "type": "object",
+    "properties": {"query": {"type": "string"}},
+    "required": ["query"],
+}
+
+
+def search_tools(*names: str) -> list[mcp.types.Tool]:
+    descriptions = {
+        "web_search": "Search the web using Brave Search API.",
+        "image_search": "Search for images using Brave Search API.",
+        "video_search": "Search for videos using Brave Search API.",
+        "news_search": "Search for news articles using Brave Search API.",
+    }
+    return [
+        mcp.types.Tool(name=name, description=descriptions[name], inputSchema=QUERY_SCHEMA)
+        for name in names or descriptions
+    ]
+
+
+def test_labelled_dataset_accuracy_and_coverage():
+    """Confident local decisions are correct and cover most of the dataset."""
+    rows = [json.loads(line) for line in DATASET.read_text().splitlines()]
+    router = PreRouter(threshold=0.75)
+    tools = search_tools()
+
+    decisions = [(router.route(row["query"], tools), row["tool_name"]) for row in rows]
+    routed = [(decision.tool_name, label) for decision, label in decisions if decision]
+
+    accuracy = sum(tool == label for tool, label in routed) / len(routed)
+    assert accuracy == 1.0
+    assert len(routed) / len(rows) >= 0.75
+    assert router.stats == {"routed": len(routed), "deferred": len(rows) - len(routed)}
+
+
+def test_conflicting_rules_lower_confidence():
+    """A query matching rules of two tools is ambiguous and defers to the model."""
+    decision = RuleRouter().route("news video about the launch")
+
+    assert decision.confidence == pytest.approx(0.45)
+    assert PreRouter(threshold=0.75).route("news video about the launch", search_tools()) is None
+
+
+def test_only_available_tools_are_chosen():
+    """A rule for a tool the server does not expose is ignored."""
+    router = PreRouter(threshold=0.75)
+
+    fallback = router.route("photos of red pandas", search_tools("web_search", "news_search"))
+
+    assert fallback is None or fallback.tool_name != "image_search"
+    assert router.route("photos of red pandas", search_tools()).tool_name == "image_search"
+
+
+def test_tfidf_refits_when_tools_change():
+    """The classifier is rebuilt from the current tool catalog."""
+    classifier = TfidfRouter(examples={})
+
+    first = classifier.route("videos", search_tools("web_search", "video_search"))
+    second = classifier.route("videos", search_tools("web_search", "news_search"))
+
+    assert first.tool_name == "video_search"
+    assert second is None or second.tool_name != "video_search"
+
+
+@pytest.mark.asyncio
+async def test_search_agent_skips_model_for_obvious_queries(memory_session):
+    """Obvious queries never reach Gemini; others still do."""
+    server = FastMCP("search-server")
+
+    @server.tool()
+    async def news_search(query: str) -> dict:
+        """Search for news articles using Brave Search API."""
+        return {"query": query, "results": []}
+
+    @server.tool()
+    async def web_search(query: str) -> dict:
+        """Search the web using Brave Search API."""
+        return {"query": query, "results": []}
+
+    session = memory_session(server)
+    backend = FakeGeminiBackend(
+        json.dumps({"tool_name": "web_search", "arguments": {"query": "zq"}})
+    )
+    agent = SearchAgent(
+        "memory://", mcp_session=session, backend=backend, router=PreRouter(threshold=0.75)
+    )
+
+    async with session:
+        news = await agent("breaking news in japan")
+        other = await agent("zq")
+
+    assert json.loads(news)["query"] == "breaking news in japan"
+    assert json.loads(other)["query"] == "zq"
+    assert agent.selection_stats["model_calls"] == 1
@@ -0,0 +1,241 @@
+"""Offline tests for the SearchAgent."""
+
+import asyncio
+import io
+import json
+import time
+
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.cli import _read_batch
+from agents_core.fakes import FakeGeminiBackend
+from agents_core.search_agent import SearchAgent, _matches_schema
+
+
+@pytest.fixture
+def session(memory_session):
+    """Session on an in-memory server with a single search tool."""
+    server = FastMCP("search-server")
+    server.in_flight = 0
+    server.peak_in_flight = 0
+
+    @server.tool()
+    async def web_search(query: str) -> dict:
+        """Search the web."""
+        server.in_flight += 1
+        server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            if query.startswith("fail"):
+                raise ValueError(f"cannot search {query}")
+            # Later queries finish first, so completion order differs from input order.
+            await asyncio.sleep(0.05 if query.endswith("0") else 0.01)
+            return {"query": query, "results": [{"title": f"About {query}"}]}
+        finally:
+            server.in_flight -= 1
+
+    session = memory_session(server)
+    session.server = server
+    return session
+
+
+def echo_selection(contents) -> str:
+    """Select web_search with the quoted user query as its argument."""
+    query = contents.split('User Query: "')[1].split('"')[0]
+    return json.dumps({"tool_name": "web_search", "arguments": {"query": query}})
+
+
+@pytest.mark.asyncio
+async def test_search_agent_runs_selected_tool_offline(session):
+    """The fake backend's selection is executed and the structured result returned."""
+    selection = json.dumps({"tool_name": "web_search", "arguments": {"query": "otters"}})
+    backend = FakeGeminiBackend(f"```json\n{selection}\n```", latency=0.05)
+    agent = SearchAgent("memory://", mcp_session=session, backend=backend)
+
+    async with session:
+        started = time.monotonic()
+        result = await agent("Tell me about otters")
+        elapsed = time.monotonic() - started
+
+    assert json.loads(result) == {"query": "otters", "results": [{"title": "About otters"}]}
+    assert "Tell me about otters" in backend.models[0].calls[0]
+    assert elapsed >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_fake_model_pads_replies_to_payload_size():
+    """Replies are padded to response_chars and still parse as JSON."""
+    backend = FakeGeminiBackend('{"ok": true}', response_chars=1000)
+    model = backend.generative_model("fake", generation_config=None)
+
+    response = await model.generate_content_async("hi")
+
+    assert len(response.text) == 1000
+    assert json.loads(response.text) == {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_streams_results_and_survives_failures(session):
+    """Results arrive as they complete, failures are reported per query."""
+    agent = SearchAgent("memory://", mcp_session=session, backend=FakeGeminiBackend(echo_selection))
+    queries = ["q0", "q1", "fail-2", "q3", "q4", "q5"]
+
+    async with session:
+        entries = [entry async for entry in agent.run_batch(queries, concurrency=3)]
+
+    by_index = {entry["index"]: entry for entry in entries}
+    assert sorted(by_index) == list(range(len(queries)))
+    assert json.loads(by_index[0]["result"])["query"] == "q0"
+    assert "cannot search fail-2" in by_index[2]["error"]
+    assert [entry["index"] for entry in entries] != list(range(len(queries)))
+    assert session.server.peak_in_flight <= 3
+    assert session.connect_count == 1
+
+
+@pytest.mark.asyncio
+async def test_run_batch_bounds_concurrency(session):
+    """No more than ``concurrency`` queries run at once."""
+    agent = SearchAgent("memory://", mcp_session=session, backend=FakeGeminiBackend(echo_selection))
+
+    async with session:
+        entries = [e async for e in agent.run_batch((f"q{i}" for i in range(20)), concurrency=4)]
+
+    assert len(entries) == 20
+    assert session.server.peak_in_flight == 4
+
+
+def test_read_batch_accepts_strings_and_objects():
+    """Batch files may hold plain JSON strings or objects with a query key."""
+    batch = io.StringIO('"first"\n\n{"query": "second", "id": 7}\n')
+
+    assert list(_read_batch(batch)) == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_reports_bad_lines_and_continues(session):
+    """A malformed line or an object without a query becomes that line's error entry."""
+    agent = SearchAgent("memory://", mcp_session=session, backend=FakeGeminiBackend(echo_selection))
+    batch = io.StringIO('"q0"\n{"query": "q1"}\n{not json\n{"id": 3}\n"q4"\n"q5"\n')
+
+    async with session:
+        entries = [e async for e in agent.run_batch(_read_batch(batch), concurrency=2)]
+
+    by_index = {entry["index"]: entry for entry in entries}
+    assert sorted(by_index) == list(range(6))
+    assert "line 3: invalid JSON" in by_index[2]["error"]
+    assert 'line 4: object has no "query" key' in by_index[3]["error"]
+    assert [json.loads(by_index[i]["result"])["query"] for i in (0, 1, 4, 5)] == [
+        "q0",
+        "q1",
+        "q4",
+        "q5",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_raises_when_reading_queries_fails(session):
+    """An error from the query iterable is raised after the queries before it are answered."""
+    agent = SearchAgent("memory://", mcp_session=session, backend=FakeGeminiBackend(echo_selection))
+
+    def queries():
+        yield "q0"
+        raise OSError("disk gone")
+
+    entries = []
+    async with session:
+        with pytest.raises(OSError, match="disk gone"):
+            async for entry in agent.run_batch(queries(), concurrency=2):
+                entries.append(entry)
+
+    assert [entry["index"] for entry in entries] == [0]
+
+
+def batch_selection(corrupt: set[int] = frozenset()):
+    """Responder that routes batched prompts in one reply, corrupting some items."""
+
+    def respond(contents) -> str:
+        if "User Queries (a JSON array" not in contents:
+            return echo_selection(contents)
+        queries = json.loads(contents.split("position, starting at 0):\n")[1].split("\n")[0])
+        items = []
+        for index, query in enumerate(queries):
+            arguments = {"query": 42} if index in corrupt else {"query": query}
+            items.append({"index": index, "tool_name": "web_search", "arguments": arguments})
+        return json.dumps(items)
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_batched_selection_uses_one_model_call(session):
+    """K queries are routed by a single Gemini call that lists the tools once."""
+    backend = FakeGeminiBackend(batch_selection())
+    agent = SearchAgent("memory://", mcp_session=session, backend=backend)
+    queries = [f"q{i}" for i in range(5)]
+
+    async with session:
+        selections = await agent.select_tools_batch(queries)
+
+    assert selections == [("web_search", {"query": q}) for q in queries]
+    assert agent.selection_stats == {"model_calls": 1, "batched_queries": 5, "fallbacks": 0}
+    assert backend.models[0].calls[0].count("- web_search(query)") == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_batched_items_fall_back_to_single_selection(session):
+    """Items that fail schema validation are re-selected one query at a time."""
+    backend = FakeGeminiBackend(batch_selection(corrupt={1, 3}))
+    agent = SearchAgent("memory://", mcp_session=session, backend=backend)
+    queries = [f"q{i}" for i in range(4)]
+
+    async with session:
+        selections = await agent.select_tools_batch(queries)
+
+    assert selections == [("web_search", {"query": q}) for q in queries]
+    assert agent.selection_stats == {"model_calls": 3, "batched_queries": 2, "fallbacks": 2}
+
+
+@pytest.mark.asyncio
+async def test_run_batch_with_batched_selection(session):
+    """run_batch routes queries in groups and still answers every query."""
+    agent = SearchAgent(
+        "memory://", mcp_session=session, backend=FakeGeminiBackend(batch_selection())
+    )
+
+    async with session:
+        entries = [
+            e
+            async for e in agent.run_batch(
+                [f"q{i}" for i in range(12)], concurrency=2, selection_batch_size=4
+            )
+        ]
+
+    assert sorted(e["index"] for e in entries) == list(range(12))
+    assert all(json.loads(e["result"])["query"] == e["query"] for e in entries)
+    assert agent.selection_stats["model_calls"] == 3
+
+
+@pytest.mark.parametrize(
+    ("arguments", "valid"),
+    [
+        ({"query": "x"}, True),
+        ({"query": "x", "count": 3}, True),
+        ({"count": 3}, False),
+        ({"query": "x", "count": "3"}, False),
+        ({"query": "x", "count": True}, False),
+        ({"query": "x", "country": None}, True),
+        ("query", False),
+    ],
+)
+def test_arguments_are_checked_against_the_input_schema(arguments, valid):
+    schema = {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "count": {"type": "integer"},
+            "country": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+        },
+        "required": ["query"],
+    }
+
+    assert _matches_schema(arguments, schema) is valid
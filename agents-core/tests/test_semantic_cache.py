@@ -0,0 +1,331 @@
+"""Tests for the semantic answer cache."""
+
+import json
+
+import httpx
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.fakes import FakeGeminiBackend, fake_tool_call
+from agents_core.search_agent import SearchAgent
+from agents_core.semantic_cache import (
+    GeminiEmbedder,
+    InMemoryVectorIndex,
+    QdrantVectorIndex,
+    SemanticCache,
+    _dot,
+    conflicting_queries,
+    hashing_embedding,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fake_qdrant() -> tuple[httpx.AsyncClient, dict]:
+    """HTTP client on a tiny in-memory imitation of the Qdrant endpoints the index uses."""
+    collections: dict[str, dict] = {}
+
+    def matches(payload: dict, conditions: list[dict]) -> bool:
+        for condition in conditions:
+            value = payload.get(condition["key"])
+            if "match" in condition and value != condition["match"]["value"]:
+                return False
+            bounds = condition.get("range", {})
+            if "gt" in bounds and not value > bounds["gt"]:
+                return False
+            if "lte" in bounds and not value <= bounds["lte"]:
+                return False
+        return True
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        parts = request.url.path.strip("/").split("/")
+        name, action = parts[1], "/".join(parts[2:])
+        body = json.loads(request.content) if request.content else {}
+        if request.method == "GET":
+            if name not in collections:
+                return httpx.Response(404, json={"status": {"error": "Not found"}})
+            return httpx.Response(200, json={"result": {"status": "green"}})
+        if request.method == "DELETE":
+            collections.pop(name, None)
+            return httpx.Response(200, json={"result": True})
+        if action == "":
+            collections[name] = {"config": body, "points": {}}
+            return httpx.Response(200, json={"result": True})
+        points = collections[name]["points"]
+        if action == "index":
+            return httpx.Response(200, json={"result": {"status": "completed"}})
+        if action == "points":
+            for point in body["points"]:
+                points[point["id"]] = point
+            return httpx.Response(200, json={"result": {"status": "completed"}})
+        if action == "points/search":
+            conditions = body["filter"]["must"]
+            scored = sorted(
+                (
+                    {"id": p["id"], "score": _dot(body["vector"], p["vector"]), **p}
+                    for p in points.values()
+                    if matches(p["payload"], conditions)
+                ),
+                key=lambda p: -p["score"],
+            )
+            scored = [p for p in scored if p["score"] >= body["score_threshold"]]
+            return httpx.Response(200, json={"result": scored[: body["limit"]]})
+        if action == "points/count":
+            conditions = body.get("filter", {}).get("must", [])
+            count = sum(matches(p["payload"], conditions) for p in points.values())
+            return httpx.Response(200, json={"result": {"count": count}})
+        if action == "points/scroll":
+            ordered = sorted(points.values(), key=lambda p: p["payload"][body["order_by"]])
+            selected = [{"id": p["id"]} for p in ordered[: body["limit"]]]
+            return httpx.Response(200, json={"result": {"points": selected}})
+        if action == "points/delete":
+            if "points" in body:
+                ids = body["points"]
+            else:
+                ids = [
+                    i for i, p in points.items() if matches(p["payload"], body["filter"]["must"])
+                ]
+            for point_id in ids:
+                points.pop(point_id, None)
+            return httpx.Response(200, json={"result": {"status": "completed"}})
+        return httpx.Response(400, json={"status": {"error": f"unexpected {action}"}})
+
+    client = httpx.AsyncClient(base_url="http://qdrant", transport=httpx.MockTransport(handler))
+    return client, collections
+
+
+def test_hashing_embedding_separates_near_duplicates_from_other_queries():
+    query = hashing_embedding("What is the capital of France?")
+    assert _dot(query, hashing_embedding("what is the capital of france")) == pytest.approx(1.0)
+    assert _dot(query, hashing_embedding("latest AI news")) < 0.5
+    assert _dot(hashing_embedding("latest AI news"), hashing_embedding("latest news on AI")) > 0.9
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_near_duplicates_within_namespace_and_ttl():
+    clock = Clock()
+    cache = SemanticCache(threshold=0.9, ttl=60, clock=clock)
+    await cache.store("search", "What is the capital of France?", "Paris")
+
+    hit = await cache.lookup("search", "what is the capital of france")
+    assert hit.value == "Paris"
+    assert hit.query == "What is the capital of France?"
+    assert await cache.lookup("search", "population of tokyo") is None
+    assert await cache.lookup("actor", "what is the capital of france") is None
+
+    clock.now += 61
+    assert await cache.lookup("search", "what is the capital of france") is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_rejects_hits_that_differ_in_numbers_or_negation():
+    # Low enough that every lookup below finds its stored look-alike.
+    cache = SemanticCache(threshold=0.85)
+    for query in ("convert 100 usd to eur", "how to install docker", "flights to paris"):
+        await cache.store("search", query, query)
+
+    # Similar enough for the embedding, but a different question.
+    similar = _dot(
+        hashing_embedding("convert 100 usd to eur"), hashing_embedding("convert 1000 usd to eur")
+    )
+    assert similar > 0.92
+    assert await cache.lookup("search", "convert 1000 usd to eur") is None
+    assert await cache.lookup("search", "how to uninstall docker") is None
+    assert await cache.lookup("search", "flights not to paris") is None
+    assert (await cache.lookup("search", "Convert 100 USD to EUR?")).value == (
+        "convert 100 usd to eur"
+    )
+    assert cache.stats["conflicts"] == 3
+
+
+def test_conflicting_queries():
+    assert conflicting_queries("lock the screen", "unlock the screen")
+    assert conflicting_queries("python 3.12 release", "python 3.13 release")
+    assert conflicting_queries("why doesn't it build", "why does it build")
+    assert not conflicting_queries("Latest AI news!", "latest news on AI")
+    assert not conflicting_queries("under the sea", "the sea")
+
+
+@pytest.mark.asyncio
+async def test_in_memory_index_evicts_least_recently_used_and_expired():
+    index = InMemoryVectorIndex(max_entries=2)
+    for query in ("alpha", "beta"):
+        await index.upsert("ns", query, hashing_embedding(query), query, expires_at=100)
+    # Using "alpha" makes "beta" the least recently used entry.
+    assert (await index.search("ns", hashing_embedding("alpha"), 0.9, now=0)).value == "alpha"
+    await index.upsert("ns", "gamma", hashing_embedding("gamma"), "gamma", expires_at=50)
+
+    assert len(index) == 2
+    assert await index.search("ns", hashing_embedding("beta"), 0.9, now=0) is None
+    assert await index.evict(now=60) == 1
+    assert await index.search("ns", hashing_embedding("alpha"), 0.9, now=60) is not None
+
+
+@pytest.mark.asyncio
+async def test_qdrant_index_stores_searches_and_evicts():
+    client, collections = fake_qdrant()
+    index = QdrantVectorIndex("http://qdrant", "answers", dim=512, max_entries=2, client=client)
+    cache = SemanticCache(index=index, threshold=0.9, ttl=60, evict_every=3, clock=Clock())
+
+    await cache.store("search", "capital of France", {"answer": "Paris"})
+    hit = await cache.lookup("search", "Capital of France?")
+    assert hit.value == {"answer": "Paris"}
+    assert collections["answers"]["config"]["vectors"] == {"size": 512, "distance": "Cosine"}
+
+    cache.clock.now += 10
+    await cache.store("search", "population of tokyo", "14 million")
+    cache.clock.now += 10
+    await cache.store("search", "tallest mountain", "Everest")
+    # The third store evicts the oldest point to keep two.
+    assert len(collections["answers"]["points"]) == 2
+    assert cache.stats["evicted"] == 1
+    assert await cache.lookup("search", "capital of France") is None
+    assert cache.stats["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_falls_back_to_in_process_index_when_qdrant_is_down():
+    def unavailable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = httpx.AsyncClient(base_url="http://qdrant", transport=httpx.MockTransport(unavailable))
+    fallback = InMemoryVectorIndex()
+    cache = SemanticCache(
+        index=QdrantVectorIndex("http://qdrant", "answers", dim=512, client=client),
+        fallback=fallback,
+        threshold=0.9,
+    )
+
+    assert await cache.lookup("search", "capital of France") is None
+    await cache.store("search", "capital of France", "Paris")
+    assert (await cache.lookup("search", "capital of france?")).value == "Paris"
+    assert cache.index is fallback
+    assert cache.stats["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_falls_back_when_qdrant_answers_unexpectedly():
+    def malformed(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"status": "ok"})
+
+    client = httpx.AsyncClient(base_url="http://qdrant", transport=httpx.MockTransport(malformed))
+    fallback = InMemoryVectorIndex()
+    cache = SemanticCache(
+        index=QdrantVectorIndex("http://qdrant", "answers", dim=512, client=client),
+        fallback=fallback,
+        threshold=0.9,
+    )
+
+    assert await cache.lookup("search", "capital of France") is None
+    assert cache.index is fallback
+    assert cache.stats["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_gemini_embedder_uses_backend_embeddings():
+    backend = FakeGeminiBackend()
+    cache = SemanticCache(embedder=GeminiEmbedder(backend, dim=512), threshold=0.9)
+    await cache.store("search", "capital of France", "Paris")
+    assert (await cache.lookup("search", "capital of france")).value == "Paris"
+    assert backend.embeddings == 2
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("search-server")
+    server.calls = 0
+
+    @server.tool()
+    async def web_search(query: str) -> dict:
+        """Search the web."""
+        server.calls += 1
+        return {"query": query, "results": [{"title": f"About {query}"}]}
+
+    session = memory_session(server)
+    session.server = server
+    return session
+
+
+@pytest.mark.asyncio
+async def test_search_agent_answers_near_duplicates_from_cache(session):
+    backend = FakeGeminiBackend(
+        json.dumps({"tool_name": "web_search", "arguments": {"query": "capital of France"}})
+    )
+    cache = SemanticCache(threshold=0.9)
+    agent = SearchAgent("memory://", mcp_session=session, backend=backend, cache=cache)
+
+    async with session:
+        first = await agent("What is the capital of France?")
+        second = await agent("what is the capital of france")
+
+    assert second == first
+    assert session.server.calls == 1
+    assert agent.selection_stats["model_calls"] == 1
+    assert cache.stats == {
+        "hits": 1,
+        "misses": 1,
+        "conflicts": 0,
+        "stores": 1,
+        "evicted": 0,
+        "errors": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_search_agent_keeps_explicit_selections_apart(session):
+    backend = FakeGeminiBackend(
+        json.dumps({"tool_name": "web_search", "arguments": {"query": "capital of France"}})
+    )
+    cache = SemanticCache(threshold=0.9)
+    agent = SearchAgent("memory://", mcp_session=session, backend=backend, cache=cache)
+
+    async with session:
+        await agent("capital of France")
+        selected = await agent._answer("capital of France", ("web_search", {"query": "Paris"}))
+        again = await agent._answer("capital of France", ("web_search", {"query": "Paris"}))
+
+    assert json.loads(selected)["query"] == "Paris"
+    assert again == selected
+    assert session.server.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_actor_agent_replays_cached_first_turn(session):
+    cache = SemanticCache(threshold=0.9)
+    backend = FakeGeminiBackend(fake_tool_call("web_search", query="capital of France"))
+
+    async with session:
+        first_agent = ActorAgent(mcp_session=session, backend=backend, cache=cache)
+        first = await first_agent.process_message("What is the capital of France?")
+        second_agent = ActorAgent(mcp_session=session, backend=backend, cache=cache)
+        second = await second_agent.process_message("what is the capital of france")
+        # Follow-up turns depend on the conversation and always reach the model.
+        await second_agent.process_message("and its population?")
+
+    assert second == first
+    assert second_agent.conversation_history[:3] == first_agent.conversation_history
+    assert session.server.calls == 2
+    assert len(backend.models[0].calls) + len(backend.models[1].calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_actor_agents_share_cached_turns_only_within_a_scope(session):
+    cache = SemanticCache(threshold=0.9)
+    backend = FakeGeminiBackend(fake_tool_call("web_search", query="capital of France"))
+
+    async with session:
+        for scope in ("alice", "bob", "alice"):
+            agent = ActorAgent(mcp_session=session, backend=backend, cache=cache, cache_scope=scope)
+            await agent.process_message("What is the capital of France?")
+
+    assert session.server.calls == 2
+    assert cache.stats["hits"] == 1
@@ -0,0 +1,195 @@
+"""Tests for the multi-session agent server."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.fakes import FakeGeminiBackend
+from agents_core.mcp_session import MCPSessionManager
+from agents_core.server import AgentServer
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("tools")
+
+    @server.tool()
+    async def web_search(query: str) -> str:
+        """Search the web."""
+        return f"results for {query}"
+
+    return memory_session(server)
+
+
+def echo(contents: str) -> str:
+    """Reply with the last human message."""
+    return "echo: " + contents.rsplit("Human: ", 1)[1].split("\n\n")[0]
+
+
+def client_for(server: AgentServer) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(server.app()), base_url="http://agents")
+
+
+async def new_session(client: httpx.AsyncClient) -> str:
+    response = await client.post("/sessions")
+    assert response.status_code == 201
+    return response.json()["session_id"]
+
+
+@pytest.mark.asyncio
+async def test_sessions_keep_separate_histories(session):
+    server = AgentServer(mcp_session=session, backend=FakeGeminiBackend(echo))
+    async with session, client_for(server) as client:
+        first, second = await new_session(client), await new_session(client)
+        reply = await client.post(f"/sessions/{first}/messages", json={"message": "hello"})
+        await client.post(f"/sessions/{first}/messages", json={"message": "again"})
+        await client.post(f"/sessions/{second}/messages", json={"message": "other"})
+        streamed = await client.post(
+            f"/sessions/{second}/messages", json={"message": "chunks", "stream": True}
+        )
+
+        assert reply.json()["reply"] == "echo: hello"
+        assert streamed.text == "echo: chunks"
+        histories = [server.sessions[s].agent.conversation_history for s in (first, second)]
+        assert [len(history) for history in histories] == [4, 4]
+        assert histories[1][0]["content"] == "other"
+
+        assert (await client.delete(f"/sessions/{first}")).status_code == 204
+        missing = await client.post(f"/sessions/{first}/messages", json={"message": "hi"})
+        assert missing.status_code == 404
+        assert (await client.post(f"/sessions/{second}/messages", json={})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_overload_is_rejected_with_retry_after(session):
+    server = AgentServer(
+        mcp_session=session,
+        backend=FakeGeminiBackend(echo, latency=0.1),
+        max_active_turns=1,
+        max_queued_turns=1,
+    )
+    async with session, client_for(server) as client:
+        ids = [await new_session(client) for _ in range(3)]
+        responses = await asyncio.gather(
+            *(client.post(f"/sessions/{i}/messages", json={"message": "hi"}) for i in ids)
+        )
+        health = (await client.get("/health")).json()
+
+    assert sorted(r.status_code for r in responses) == [200, 200, 429]
+    rejected = next(r for r in responses if r.status_code == 429)
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert health["admitted"] == 2
+    assert health["rejected"] == 1
+    assert health["active_turns"] == 0
+
+
+@pytest.mark.asyncio
+async def test_model_calls_are_capped_across_sessions(session):
+    server = AgentServer(
+        mcp_session=session,
+        backend=FakeGeminiBackend(echo, latency=0.05),
+        max_active_turns=8,
+        max_model_calls=2,
+    )
+    sessions = [server.create_session() for _ in range(6)]
+    async with session:
+        replies = await asyncio.gather(*(server.send(s.session_id, "hi") for s in sessions))
+
+    assert replies == ["echo: hi"] * 6
+    assert server.backend.stats == {"calls": 6, "peak": 2}
+
+
+@pytest.mark.asyncio
+async def test_busy_session_rejects_a_concurrent_message(session):
+    server = AgentServer(mcp_session=session, backend=FakeGeminiBackend(echo, latency=0.1))
+    async with session, client_for(server) as client:
+        session_id = await new_session(client)
+        first, second = await asyncio.gather(
+            client.post(f"/sessions/{session_id}/messages", json={"message": "one"}),
+            client.post(f"/sessions/{session_id}/messages", json={"message": "two"}),
+        )
+    assert sorted((first.status_code, second.status_code)) == [200, 409]
+
+
+@pytest.mark.asyncio
+async def test_idle_and_least_recently_used_sessions_are_evicted(session):
+    clock = Clock()
+    server = AgentServer(
+        mcp_session=session,
+        backend=FakeGeminiBackend(echo),
+        max_sessions=2,
+        idle_timeout=60,
+        clock=clock,
+    )
+    old, recent = server.create_session(), server.create_session()
+    clock.now = 30
+    await server.get_session(old.session_id)
+    clock.now = 50
+    # Full: the least recently used session makes room for the new one.
+    newest = server.create_session()
+    assert list(server.sessions) == [old.session_id, newest.session_id]
+
+    clock.now = 100
+    assert server.evict_idle() == 1
+    assert list(server.sessions) == [newest.session_id]
+    assert recent.session_id not in server.sessions
+    assert server.stats == {"created": 3, "restored": 0, "closed": 0, "evicted": 2}
+
+
+@pytest.mark.asyncio
+async def test_unread_stream_releases_its_session_and_slot(session):
+    server = AgentServer(mcp_session=session, backend=FakeGeminiBackend(echo), max_active_turns=1)
+    hosted = server.create_session()
+    async with session:
+        chunks = await server.stream(hosted.session_id, "never read")
+        assert hosted.lock.locked()
+        assert server.admission.active == 1
+
+        await chunks.aclose()
+        assert not hosted.lock.locked()
+        assert server.admission.active == 0
+        assert await server.send(hosted.session_id, "next") == "echo: next"
+
+
+@pytest.mark.asyncio
+async def test_stream_releases_its_session_when_the_client_is_gone(session):
+    server = AgentServer(mcp_session=session, backend=FakeGeminiBackend(echo))
+    hosted = server.create_session()
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": f"/sessions/{hosted.session_id}/messages",
+        "headers": [(b"content-type", b"application/json")],
+        "query_string": b"",
+    }
+    messages = [{"type": "http.request", "body": b'{"message": "hi", "stream": true}'}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        raise OSError("client went away")
+
+    # The response never gets to read the reply.
+    with pytest.raises(OSError):
+        await server.app()(scope, receive, send)
+
+    assert not hosted.lock.locked()
+    assert server.admission.active == 0
+
+
+def test_max_tool_calls_cannot_be_combined_with_a_session():
+    with pytest.raises(ValueError, match="max_tool_calls"):
+        AgentServer(mcp_session=MCPSessionManager("memory://"), max_tool_calls=4)
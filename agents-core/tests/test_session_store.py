@@ -0,0 +1,254 @@
+"""Tests for the session stores."""
+
+import copy
+
+import httpx
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.critic_agent import CriticAgent
+from agents_core.fakes import FakeGeminiBackend
+from agents_core.server import AgentServer
+from agents_core.session_store import (
+    FileSessionStore,
+    InMemorySessionStore,
+    SQLiteSessionStore,
+    StaleSession,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "file"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemorySessionStore()
+    if request.param == "sqlite":
+        return SQLiteSessionStore(tmp_path / "sessions.db")
+    return FileSessionStore(tmp_path / "sessions")
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("tools")
+
+    @server.tool()
+    async def web_search(query: str) -> str:
+        """Search the web."""
+        return f"results for {query}"
+
+    return memory_session(server)
+
+
+def echo(contents: str) -> str:
+    """Reply with the last human message."""
+    return "echo: " + contents.rsplit("Human: ", 1)[1].split("\n\n")[0]
+
+
+def agent() -> CriticAgent:
+    return CriticAgent(backend=FakeGeminiBackend())
+
+
+def client_for(server: AgentServer) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(server.app()), base_url="http://agents")
+
+
+def message(role: str, content: str) -> dict[str, str]:
+    return {"role": role, "content": content}
+
+
+@pytest.mark.asyncio
+async def test_save_writes_only_the_delta_and_restore_replays_it(store):
+    writer = agent()
+    writer.conversation_history.extend([message("user", "hi"), message("assistant", "hello")])
+    assert await store.save("s1", writer) == 2
+    assert await store.save("s1", writer) == 0
+
+    writer.conversation_history.append(message("user", "more"))
+    assert await store.save("s1", writer) == 1
+    writer.truncate_conversation(2)
+    await store.save("s1", writer)
+    writer.conversation_history.append(message("user", "again"))
+    await store.save("s1", writer)
+
+    assert [record["op"] for record in await store._read("s1")] == [
+        "reset",
+        "append",
+        "truncate",
+        "append",
+    ]
+    reader = agent()
+    assert await store.restore("s1", reader)
+    assert reader.conversation_history == writer.conversation_history
+
+    # The restoring worker continues the log with deltas.
+    reader.conversation_history.append(message("assistant", "done"))
+    assert await store.save("s1", reader) == 1
+    assert len(await store._read("s1")) == 5
+
+
+@pytest.mark.asyncio
+async def test_rewritten_history_replaces_the_log(store):
+    writer = agent()
+    writer.conversation_history.extend([message("user", str(i)) for i in range(4)])
+    await store.save("s1", writer)
+    writer.conversation_history.append(message("user", "4"))
+    await store.save("s1", writer)
+
+    # Compaction replaces messages with new dictionaries.
+    writer.conversation_history[:] = [message("user", "summary"), message("user", "4")]
+    assert await store.save("s1", writer) == 2
+
+    assert await store._read("s1") == [
+        {
+            "op": "reset",
+            "messages": [message("user", "summary"), message("user", "4")],
+            "version": 3,
+        }
+    ]
+    assert store.stats == {"appended": 1, "truncated": 0, "resets": 2, "restored": 0}
+
+
+@pytest.mark.asyncio
+async def test_unknown_and_deleted_sessions(store):
+    assert not await store.restore("missing", agent())
+    assert await store.load("missing") is None
+
+    writer = agent()
+    writer.conversation_history.append(message("user", "hi"))
+    await store.save("s1", writer)
+    await store.delete("s1")
+    assert await store.load("s1") is None
+
+
+@pytest.mark.asyncio
+async def test_save_refuses_a_session_changed_by_another_worker(store):
+    # A second worker: a store of its own over the same storage
+    first, second = agent(), agent()
+    first.conversation_history.append(message("user", "hi"))
+    await store.save("s1", first)
+    other = copy.copy(store)
+    other._persisted, other._versions = {}, {}
+    assert await other.restore("s1", second)
+
+    second.conversation_history.append(message("user", "from the second worker"))
+    await other.save("s1", second)
+    assert await other.is_current("s1")
+    assert not await store.is_current("s1")
+
+    first.conversation_history.append(message("user", "from a stale history"))
+    with pytest.raises(StaleSession):
+        await store.save("s1", first)
+    assert await store.load("s1") == second.conversation_history
+
+    # After reloading, the first worker continues where the second left off.
+    assert await store.restore("s1", first)
+    first.conversation_history.append(message("user", "on top"))
+    await store.save("s1", first)
+    assert [m["content"] for m in await store.load("s1")] == [
+        "hi",
+        "from the second worker",
+        "on top",
+    ]
+
+
+def test_file_store_rejects_path_like_session_ids(tmp_path):
+    with pytest.raises(ValueError):
+        FileSessionStore(tmp_path)._path("../escape")
+
+
+@pytest.mark.asyncio
+async def test_file_store_treats_invalid_session_ids_as_unknown(tmp_path):
+    store = FileSessionStore(tmp_path)
+    assert await store.load("../escape") is None
+    assert not await store.restore("../escape", agent())
+    await store.delete("../escape")
+
+
+@pytest.mark.asyncio
+async def test_file_store_ignores_a_torn_last_record(tmp_path):
+    store = FileSessionStore(tmp_path)
+    writer = agent()
+    writer.conversation_history.append(message("user", "hi"))
+    await store.save("s1", writer)
+    with (tmp_path / "s1.jsonl").open("a") as file:
+        file.write('{"op": "append", "messa')
+
+    assert await store.load("s1") == [message("user", "hi")]
+    assert await store.is_current("s1")
+
+
+@pytest.mark.asyncio
+async def test_another_server_resumes_a_stored_session(session, tmp_path):
+    store = SQLiteSessionStore(tmp_path / "sessions.db")
+    first = AgentServer(mcp_session=session, backend=FakeGeminiBackend(echo), store=store)
+    async with session:
+        session_id = first.create_session().session_id
+        await first.send(session_id, "hello")
+
+        # A second worker with its own store instance on the same database.
+        second = AgentServer(
+            mcp_session=session,
+            backend=FakeGeminiBackend(echo),
+            store=SQLiteSessionStore(tmp_path / "sessions.db"),
+        )
+        await second.send(session_id, "again")
+        history = second.sessions[session_id].agent.conversation_history
+        await second.close_session(session_id)
+
+    assert [entry["content"] for entry in history] == [
+        "hello",
+        "echo: hello",
+        "again",
+        "echo: again",
+    ]
+    assert second.stats["restored"] == 1
+    assert await store.load(session_id) is None
+
+
+@pytest.mark.asyncio
+async def test_workers_reload_sessions_changed_by_another_worker(session, tmp_path):
+    path = tmp_path / "sessions.db"
+    first = AgentServer(
+        mcp_session=session, backend=FakeGeminiBackend(echo), store=SQLiteSessionStore(path)
+    )
+    second = AgentServer(
+        mcp_session=session, backend=FakeGeminiBackend(echo), store=SQLiteSessionStore(path)
+    )
+    async with session:
+        session_id = first.create_session().session_id
+        await first.send(session_id, "one")
+        await second.send(session_id, "two")
+        # The first worker still holds the session, but reloads it before this turn.
+        await first.send(session_id, "three")
+        history = first.sessions[session_id].agent.conversation_history
+
+        async with client_for(first) as client:
+            await second.close_session(session_id)
+            gone = await client.post(f"/sessions/{session_id}/messages", json={"message": "x"})
+            bad = await client.post("/sessions/..%2Fescape/messages", json={"message": "x"})
+
+    assert [entry["content"] for entry in history] == [
+        "one",
+        "echo: one",
+        "two",
+        "echo: two",
+        "three",
+        "echo: three",
+    ]
+    assert first.stats["restored"] == 1
+    assert gone.status_code == 404
+    assert bad.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_file_store_server_answers_unknown_for_invalid_ids(session, tmp_path):
+    server = AgentServer(
+        mcp_session=session,
+        backend=FakeGeminiBackend(echo),
+        store=FileSessionStore(tmp_path),
+    )
+    async with session, client_for(server) as client:
+        response = await client.post("/sessions/bad%20id/messages", json={"message": "x"})
+        deleted = await client.delete("/sessions/bad%20id")
+
+    assert response.status_code == 404
+    assert deleted.status_code == 404
@@ -0,0 +1,43 @@
+"""Startup regression checks: light entry points must not load the heavy stack."""
+
+import json
+import os
+import subprocess
+import sys
+
+
+def loaded_modules(code: str) -> set[str]:
+    """Run code in a fresh interpreter without API keys and return the imported modules."""
+    env = {k: v for k, v in os.environ.items() if k not in ("GEMINI_API_KEY", "GOOGLE_API_KEY")}
+    result = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport json, sys\nprint(json.dumps(list(sys.modules)))"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_cli_import_defers_agents_gemini_and_settings():
+    modules = loaded_modules("import agents_core.cli")
+    assert not modules & {
+        "google.generativeai",
+        "fastmcp",
+        "pydantic_settings",
+        "agents_core.config",
+        "agents_core.search_agent",
+        "agents_core.actor_agent",
+    }
+
+
+def test_offline_agents_and_sessions_need_neither_gemini_sdk_nor_key():
+    modules = loaded_modules(
+        "from agents_core.actor_agent import ActorAgent\n"
+        "from agents_core.fakes import FakeGeminiBackend\n"
+        "from agents_core.mcp_session import MCPSessionManager\n"
+        "ActorAgent(mcp_session=MCPSessionManager('http://localhost:1/mcp/'),"
+        " backend=FakeGeminiBackend())"
+    )
+    assert "agents_core.config" in modules
+    assert "google.generativeai" not in modules
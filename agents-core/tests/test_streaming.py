@@ -0,0 +1,94 @@
+"""Tests for streamed agent replies."""
+
+import asyncio
+import time
+
+import pytest
+from fastmcp import FastMCP
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.critic_agent import CriticAgent
+from agents_core.fakes import FakeGeminiBackend, fake_function_call, fake_tool_call
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("tools")
+    server.started = []
+
+    @server.tool()
+    async def web_search(query: str) -> str:
+        """Search the web."""
+        server.started.append(time.perf_counter())
+        await asyncio.sleep(0.05)
+        return f"results for {query}"
+
+    session = memory_session(server)
+    session.server = server
+    return session
+
+
+async def collect(stream) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["text", "chat"])
+async def test_stream_message_yields_chunks_and_records_time_to_first_token(mode):
+    reply = "A streamed reply that arrives in several chunks."
+    backend = FakeGeminiBackend(reply, latency=0.05, chunk_chars=10)
+    agent = CriticAgent(execution_mode=mode, backend=backend)
+
+    chunks = await collect(agent.stream_message("review this"))
+
+    assert len(chunks) == 5
+    assert "".join(chunks) == reply
+    assert agent.conversation_history[-1] == {"role": "assistant", "content": reply}
+    assert 0.05 <= agent.last_time_to_first_token < 1.0
+    assert agent.usage["streamed_calls"] == 1
+    assert agent.usage["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_actor_stream_matches_process_message(session):
+    reply = fake_tool_call("web_search", query="otters")
+
+    async with session:
+        streamed_agent = ActorAgent(mcp_session=session, backend=FakeGeminiBackend(reply))
+        streamed = "".join(await collect(streamed_agent.stream_message("find otters")))
+        agent = ActorAgent(mcp_session=session, backend=FakeGeminiBackend(reply))
+        returned = await agent.process_message("find otters")
+
+    assert streamed == returned
+    assert streamed_agent.conversation_history == agent.conversation_history
+    assert "results for otters" in streamed
+
+
+@pytest.mark.asyncio
+async def test_actor_stream_starts_tools_before_the_reply_ends(session):
+    reply = f"Searching now. {fake_tool_call('web_search', query='otters')} That should do it."
+    backend = FakeGeminiBackend(reply, chunk_chars=8, chunk_latency=0.01)
+    agent = ActorAgent(mcp_session=session, backend=backend)
+
+    async with session:
+        chunks = []
+        async for chunk in agent.stream_message("find otters"):
+            chunks.append((chunk, time.perf_counter()))
+
+    text_chunks = [at for chunk, at in chunks if not chunk.startswith("\nTool result")]
+    assert session.server.started[0] < text_chunks[-1]
+    assert chunks[-1][0].startswith("\nTool result: ")
+    assert agent.parse_stats["recovered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_actor_stream_renders_native_function_calls(session):
+    backend = FakeGeminiBackend(fake_function_call("web_search", query="otters"))
+    agent = ActorAgent(mcp_session=session, backend=backend)
+
+    async with session:
+        chunks = await collect(agent.stream_message("find otters"))
+
+    assert chunks[0] == fake_tool_call("web_search", query="otters")
+    assert "results for otters" in chunks[1]
+    assert agent.parse_stats["native"] == 1
@@ -0,0 +1,120 @@
+"""Tests for the tool catalog cache."""
+
+import asyncio
+
+import mcp.types
+import pytest
+from fastmcp import Context, FastMCP
+
+from agents_core.tool_catalog import ToolCatalogCache
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_fetch(names):
+    """Build a fetch coroutine that counts how often it is called."""
+
+    async def fetch():
+        fetch.calls += 1
+        await asyncio.sleep(0.01)
+        return [mcp.types.Tool(name=name, inputSchema={"type": "object"}) for name in names]
+
+    fetch.calls = 0
+    return fetch
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_cached_until_ttl():
+    """Reads within the TTL are hits, and an expired entry is fetched again."""
+    clock = FakeClock()
+    cache = ToolCatalogCache(ttl=60, clock=clock)
+    fetch = make_fetch(["web_search"])
+
+    first = await cache.get_serialized("http://a/mcp/", fetch)
+    second = await cache.get_serialized("http://a/mcp/", fetch)
+    clock.now = 61
+    await cache.get_tools("http://a/mcp/", fetch)
+
+    assert first is second
+    assert first[0]["name"] == "web_search"
+    assert fetch.calls == 2
+    assert cache.stats() == {"hits": 1, "misses": 2, "refreshes": 0, "entries": 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    """Simultaneous readers of a cold entry trigger a single fetch."""
+    cache = ToolCatalogCache(ttl=60)
+    fetch = make_fetch(["web_search"])
+
+    results = await asyncio.gather(*(cache.get_tools("http://a/mcp/", fetch) for _ in range(5)))
+
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_invalidate_counts_refresh():
+    """Invalidating an entry forces the next read to refetch."""
+    cache = ToolCatalogCache(ttl=60)
+    fetch = make_fetch(["web_search"])
+
+    await cache.get_tools("http://a/mcp/", fetch)
+    cache.invalidate("http://a/mcp/", reason="test")
+    await cache.get_tools("http://a/mcp/", fetch)
+
+    assert fetch.calls == 2
+    assert cache.stats()["refreshes"] == 1
+
+
+@pytest.fixture
+def server():
+    """In-memory MCP server that can register new tools at runtime."""
+    server = FastMCP("catalog-server")
+
+    @server.tool()
+    async def add_tool(name: str, ctx: Context) -> str:
+        server.tool(name=name)(lambda: name)
+        await ctx.send_tool_list_changed()
+        return name
+
+    return server
+
+
+@pytest.mark.asyncio
+async def test_tools_changed_notification_invalidates(server, memory_session):
+    """The server's tools-changed notification drops the cached catalog."""
+    cache = ToolCatalogCache(ttl=60)
+    session = memory_session(server, cache)
+
+    before = await session.list_tools()
+    await session.call_tool("add_tool", {"name": "new_tool"})
+    await asyncio.sleep(0.05)
+    after = await session.list_tools()
+    await session.close()
+
+    assert [tool.name for tool in before] == ["add_tool"]
+    assert sorted(tool.name for tool in after) == ["add_tool", "new_tool"]
+    assert cache.stats()["refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unknown_tool_invalidates(server, memory_session):
+    """A call to a tool the server no longer knows refreshes the catalog."""
+    cache = ToolCatalogCache(ttl=60)
+    session = memory_session(server, cache)
+
+    await session.list_tools()
+    with pytest.raises(Exception, match="Unknown tool"):
+        await session.call_tool("missing_tool", {})
+    await session.close()
+
+    assert cache.stats()["refreshes"] == 1
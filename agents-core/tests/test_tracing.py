@@ -0,0 +1,116 @@
+"""Tests for tracing of agent turns, model calls and MCP round trips."""
+
+import json
+
+import pytest
+from fastmcp import Context, FastMCP
+
+from agents_core.actor_agent import ActorAgent
+from agents_core.fakes import FakeGeminiBackend, fake_tool_call
+from agents_core.tracing import (
+    FileSpanExporter,
+    InMemorySpanExporter,
+    OTLPSpanExporter,
+    Span,
+    Tracer,
+    parse_traceparent,
+    set_tracer,
+)
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer(InMemorySpanExporter(), flush_interval=0.01)
+    previous = set_tracer(tracer)
+    yield tracer
+    tracer.shutdown()
+    set_tracer(previous)
+
+
+@pytest.fixture
+def session(memory_session):
+    server = FastMCP("tools")
+    server.traceparents = []
+
+    @server.tool()
+    async def web_search(query: str, ctx: Context) -> str:
+        """Search the web."""
+        server.traceparents.append(getattr(ctx.request_context.meta, "traceparent", None))
+        return f"results for {query}"
+
+    session = memory_session(server)
+    session.server = server
+    return session
+
+
+@pytest.mark.asyncio
+async def test_turn_spans_nest_and_propagate_to_the_tools_server(tracer, session):
+    agent = ActorAgent(
+        mcp_session=session, backend=FakeGeminiBackend(fake_tool_call("web_search", query="otters"))
+    )
+    async with session:
+        await agent.process_message("find otters")
+        await agent.process_message("again")
+    tracer.shutdown()
+
+    spans = {}
+    for span in tracer.exporter.spans:
+        spans.setdefault(span.name, []).append(span)
+    turn = spans["agent.turn"][0]
+    assert turn.parent_id is None
+    assert turn.attributes["message_bytes"] == len("find otters")
+
+    model = spans["model.generate"][0]
+    assert model.parent_id == turn.span_id
+    assert model.trace_id == turn.trace_id
+    assert model.attributes["prompt_bytes"] > 0
+    assert model.attributes["output_tokens"] > 0
+
+    assert [s.attributes["catalog_cache"] for s in spans["mcp.list_tools"]] == ["miss", "hit"]
+    call = spans["mcp.call_tool"][0]
+    assert call.parent_id == turn.span_id
+    assert call.attributes["tool"] == "web_search"
+    assert call.attributes["result_bytes"] == len("results for otters")
+    # The server saw the tool-call span as the parent of its work.
+    assert parse_traceparent(session.server.traceparents[0]) == (call.trace_id, call.span_id)
+
+
+@pytest.mark.asyncio
+async def test_failed_spans_record_the_error(tracer):
+    with pytest.raises(ValueError), tracer.span("outer"):
+        raise ValueError("boom")
+    tracer.shutdown()
+
+    assert tracer.exporter.spans[0].status == "error"
+    assert tracer.exporter.spans[0].error == "boom"
+
+
+def test_disabled_tracer_hands_out_a_no_op_span():
+    tracer = Tracer()
+    with tracer.span("turn", agent="a") as span:
+        span.set(tokens=3)
+        assert tracer.traceparent() is None
+    assert not span.recording
+    assert span.attributes == {}
+
+
+def test_exporters_write_json_lines_and_otlp(tmp_path):
+    span = Span(
+        name="mcp.call_tool",
+        trace_id="a" * 32,
+        span_id="b" * 16,
+        parent_id="c" * 16,
+        start_time=1.5,
+        duration=0.25,
+        attributes={"tool": "web_search", "result_bytes": 12, "is_error": False},
+    )
+    FileSpanExporter(tmp_path / "traces.jsonl").export([span])
+    line = json.loads((tmp_path / "traces.jsonl").read_text())
+    assert line["service"] == "agents-core"
+    assert line["attributes"]["tool"] == "web_search"
+
+    body = OTLPSpanExporter("http://collector:4318/").encode([span])
+    encoded = body["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert encoded["parentSpanId"] == "c" * 16
+    assert encoded["endTimeUnixNano"] == str(1_750_000_000)
+    assert {"key": "result_bytes", "value": {"intValue": "12"}} in encoded["attributes"]
@@ -0,0 +1,56 @@
+"""Tests for incremental transcript rendering."""
+
+import json
+
+from agents_core.transcript import Transcript
+
+
+def naive_render(system_prompt, history):
+    """Reference rendering matching the original string concatenation."""
+    formatted = f"System: {system_prompt}\n\n"
+    for message in history:
+        role = "Human" if message["role"] == "user" else "Assistant"
+        formatted += f"{role}: {message['content']}\n\n"
+    return formatted
+
+
+def test_render_matches_full_rebuild():
+    """Incremental rendering produces the same text as a full rebuild every turn."""
+    transcript = Transcript()
+    history = []
+    for turn in range(5):
+        history.append({"role": "user", "content": f"question {turn}"})
+        history.append({"role": "assistant", "content": f"answer {turn}"})
+        assert transcript.render("Be helpful.", history) == naive_render("Be helpful.", history)
+
+    # Each message was formatted exactly once.
+    assert transcript.formatted_messages == len(history)
+
+
+def test_render_rebuilds_when_history_is_replaced():
+    """Shortened or swapped histories and new system prompts invalidate the cache."""
+    transcript = Transcript()
+    history = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+    transcript.render("one", history)
+
+    shorter = history[:1]
+    assert transcript.render("one", shorter) == naive_render("one", shorter)
+
+    replaced = [{"role": "user", "content": "c"}]
+    assert transcript.render("one", replaced) == naive_render("one", replaced)
+    assert transcript.render("two", replaced) == naive_render("two", replaced)
+
+
+def test_render_context_matches_json_dumps_and_reuses_tool_block():
+    """The context block is byte-identical to json.dumps and tools are serialized once."""
+    transcript = Transcript()
+    tools = [{"name": "web_search", "inputSchema": {"type": "object", "properties": {}}}]
+
+    for turn in range(3):
+        context = {"available_tools": tools, "turn": turn, "notes": ["x", {"y": None}]}
+        expected = f"\nContext: {json.dumps(context, indent=2)}\n\n"
+        assert transcript.render_context(context) == expected
+
+    assert transcript.context_renders == 1
+    assert transcript.render_context(None) == ""
+    assert transcript.render_context({}) == ""